@@ -48,11 +48,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.LeagueScopeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -151,9 +153,46 @@ INDEX_REDIRECT_TO_DEFAULT_LEAGUE = config(
     cast=bool,
 )
 
+# Cache for rendered page contexts and fragments (see main.page_cache). Entries are keyed on
+# data versions stored in the database, so a per-process locmem cache never serves stale pages.
+# Point these at Redis to share one cache between processes: only then can a season recompute
+# run as staged steps with the pages held, otherwise it runs in one long transaction.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='cbg-pages'),
+    }
+}
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60 * 24 * 7, cast=int)
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+
+# Debounce and per-season locks for the recompute tasks (see main.task_coordination). The state
+# is kept in Redis so web processes and workers share it; 'memory://' keeps it per process.
+TASK_COORDINATION_URL = config('TASK_COORDINATION_URL', default=CELERY_BROKER_URL)
+TASK_DEBOUNCE_SECONDS = config('TASK_DEBOUNCE_SECONDS', default=5, cast=int)
+TASK_LOCK_TIMEOUT = config('TASK_LOCK_TIMEOUT', default=30 * 60, cast=int)
+# Runs kept per task in the TaskRun history (see main.task_runs)
+TASK_RUN_HISTORY = config('TASK_RUN_HISTORY', default=200, cast=int)
+
+# Opt-in request profiling (see main.profiling): Server-Timing headers, a JSON log line per
+# sampled request and per-view p50/p95 figures on the superuser request profiles page.
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+REQUEST_PROFILING_WINDOW = config('REQUEST_PROFILING_WINDOW', default=200, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'main.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django import forms
 
-from .models import Golfer, Season, Team, Week, Game, GameEntry, SkinEntry, Hole, Score, Handicap, Matchup, Sub, Points, Round, GolferMatchup, RandomDrawnTeam, Course, CourseConfig, League
+from .models import Golfer, Season, Team, Week, Game, GameEntry, SkinEntry, Hole, Score, Handicap, Matchup, Sub, Round, GolferMatchup, RandomDrawnTeam, Course, CourseConfig, League, DirtyWeek, TeamStanding, PlayoffSimulation, ScoreDistribution, DataVersion, SkinResult, Payout, TaskRun, SeasonRecompute
 
 
 class GolferAdmin(admin.ModelAdmin):
@@ -109,7 +109,7 @@ class WeekAdmin(admin.ModelAdmin):
     get_date.admin_order_field = 'date'
     
     def get_scores_count(self, obj):
-        return obj.score_set.count()
+        return obj.scores_entered
     get_scores_count.short_description = 'Scores'
     
     def get_matchups_count(self, obj):
@@ -416,62 +416,11 @@ class SubAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
-class PointsAdmin(admin.ModelAdmin):
-    list_display = ('get_golfer', 'get_week', 'get_hole', 'get_opponent', 'points', 'get_season')
-    list_filter = ('week__season', 'week', 'hole', 'golfer', 'opponent')
-    search_fields = ('golfer__name', 'opponent__name', 'week__date', 'hole__number')
-    list_per_page = 100
-    date_hierarchy = 'week__date'
-    
-    fieldsets = (
-        ('Points Information', {
-            'fields': ('golfer', 'week', 'hole', 'opponent', 'score', 'points')
-        }),
-    )
-    
-    def get_week(self, obj):
-        return f"{obj.week.date.strftime('%Y-%m-%d')} (Week {obj.week.number})"
-    get_week.short_description = 'Week'
-    get_week.admin_order_field = 'week__date'
-    
-    def get_golfer(self, obj):
-        return obj.golfer.name
-    get_golfer.short_description = 'Golfer'
-    get_golfer.admin_order_field = 'golfer__name'
-    
-    def get_hole(self, obj):
-        return f"Hole {obj.hole.number}"
-    get_hole.short_description = 'Hole'
-    get_hole.admin_order_field = 'hole__number'
-    
-    def get_opponent(self, obj):
-        if obj.opponent:
-            return obj.opponent.name
-        return "No Opponent"
-    get_opponent.short_description = 'Opponent'
-    get_opponent.admin_order_field = 'opponent__name'
-    
-    def get_season(self, obj):
-        return obj.week.season.year
-    get_season.short_description = 'Season'
-    get_season.admin_order_field = 'week__season__year'
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('golfer', 'opponent', 'week__season', 'hole', 'score')
-    
-    # Fix the verbose name
-    def get_model_perms(self, request):
-        perms = super().get_model_perms(request)
-        perms['verbose_name'] = 'Points'
-        perms['verbose_name_plural'] = 'Points'
-        return perms
-
-
 class RoundAdmin(admin.ModelAdmin):
     list_display = ('get_golfer', 'get_week', 'get_matchup', 'gross', 'net', 'round_points', 'total_points', 'is_sub', 'get_subbing_for')
     list_filter = ('week__season', 'week', 'is_sub', 'golfer')
     search_fields = ('golfer__name', 'week__date', 'subbing_for__name')
-    readonly_fields = ('gross', 'net', 'round_points', 'total_points')
+    readonly_fields = ('gross', 'net', 'round_points', 'total_points', 'hole_gross', 'hole_net', 'hole_strokes', 'hole_points')
     list_per_page = 50
     date_hierarchy = 'week__date'
     
@@ -487,8 +436,8 @@ class RoundAdmin(admin.ModelAdmin):
             'fields': ('gross', 'net', 'round_points', 'total_points'),
             'classes': ('collapse',)
         }),
-        ('Related Data', {
-            'fields': ('points', 'scores'),
+        ('Holes', {
+            'fields': ('hole_gross', 'hole_net', 'hole_strokes', 'hole_points'),
             'classes': ('collapse',)
         }),
     )
@@ -530,7 +479,7 @@ class RoundAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related(
             'golfer', 'week', 'matchup', 'golfer_matchup', 'handicap', 'subbing_for'
         ).prefetch_related(
-            'matchup__teams__golfers', 'points', 'scores'
+            'matchup__teams__golfers'
         )
 
 
@@ -722,6 +671,89 @@ class LeagueAdmin(admin.ModelAdmin):
         return obj.seasons.count()
     get_season_count.short_description = 'Seasons'
 
+class DirtyWeekAdmin(admin.ModelAdmin):
+    list_display = ("week", "golfer", "reason", "created")
+    list_filter = ("reason", "week__season")
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('week__season__league', 'golfer')
+
+
+class TeamStandingAdmin(admin.ModelAdmin):
+    list_display = ("team", "half", "points", "rounds", "updated")
+    list_filter = ("half", "team__season")
+    readonly_fields = ("updated",)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('team__season__league')
+
+
+class PlayoffSimulationAdmin(admin.ModelAdmin):
+    list_display = ("season", "week", "simulations", "created")
+    list_filter = ("season",)
+    readonly_fields = ("created", "data_version")
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('season__league', 'week')
+
+
+class ScoreDistributionAdmin(admin.ModelAdmin):
+    list_display = ("week", "golfer", "hole", "to_par", "count")
+    list_filter = ("season", "to_par")
+    search_fields = ("golfer__name",)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('week__season__league', 'golfer', 'hole')
+
+class DataVersionAdmin(admin.ModelAdmin):
+    list_display = ("season", "version", "changed")
+    list_filter = ("season__league",)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('season__league')
+
+
+class SkinResultAdmin(admin.ModelAdmin):
+    list_display = ("week", "hole", "golfer", "score", "gross", "payout")
+    list_filter = ("week__season",)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('week__season__league', 'hole', 'golfer')
+
+
+class PayoutAdmin(admin.ModelAdmin):
+    list_display = ("week", "golfer", "kind", "wagered", "won")
+    list_filter = ("kind", "week__season")
+    search_fields = ("golfer__name",)
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('week__season__league', 'golfer')
+
+class TaskRunAdmin(admin.ModelAdmin):
+    list_display = ("task", "season", "status", "started", "duration", "queries")
+    list_filter = ("status", "task")
+    readonly_fields = ("started", "finished", "duration", "queries", "rows_written")
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('season__league')
+
+class SeasonRecomputeAdmin(admin.ModelAdmin):
+    list_display = ("season", "status", "current", "started", "finished")
+    list_filter = ("status",)
+    readonly_fields = ("steps", "done_steps", "lock_token", "started", "finished", "error")
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('season__league')
+
 # Register all models with their admin classes
 admin.site.register(Golfer, GolferAdmin)
 admin.site.register(Season, SeasonAdmin)
@@ -735,10 +767,18 @@ admin.site.register(Score, ScoreAdmin)
 admin.site.register(Handicap, HandicapAdmin)
 admin.site.register(Matchup, MatchupAdmin)
 admin.site.register(Sub, SubAdmin)
-admin.site.register(Points, PointsAdmin)
 admin.site.register(Round, RoundAdmin)
 admin.site.register(GolferMatchup, GolferMatchupAdmin)
 admin.site.register(RandomDrawnTeam, RandomDrawnTeamAdmin)
 admin.site.register(Course, CourseAdmin)
 admin.site.register(CourseConfig, CourseConfigAdmin)
 admin.site.register(League, LeagueAdmin)
+admin.site.register(DirtyWeek, DirtyWeekAdmin)
+admin.site.register(TeamStanding, TeamStandingAdmin)
+admin.site.register(PlayoffSimulation, PlayoffSimulationAdmin)
+admin.site.register(ScoreDistribution, ScoreDistributionAdmin)
+admin.site.register(DataVersion, DataVersionAdmin)
+admin.site.register(SkinResult, SkinResultAdmin)
+admin.site.register(Payout, PayoutAdmin)
+admin.site.register(TaskRun, TaskRunAdmin)
+admin.site.register(SeasonRecompute, SeasonRecomputeAdmin)
@@ -1,25 +1,28 @@
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from main.models import GolferMatchup, Matchup, Sub, Week, Team, Game, GameEntry, SkinEntry
-from main.helper import get_absent_team_from_sub
+from main.models import GolferMatchup, Matchup, Sub, Week, Team, Game, GameEntry, SkinEntry, Season
+from main.query_budget import query_budget
+from main.task_runs import recompute_as_dict, run_as_dict, season_task_runs
 
+@query_budget(6)
 def get_playing_golfers(request, week_id):
     """API endpoint to get all golfers playing in a specific week"""
     week = get_object_or_404(Week, pk=week_id)
     
     # Get all teams for the season
-    teams = Team.objects.filter(season=week.season)
+    teams = Team.objects.filter(season=week.season).prefetch_related('golfers')
     playing_golfers = []
     
     # Get existing skin entries for this week
     existing_skin_entries = set(SkinEntry.objects.filter(week=week).values_list('golfer_id', flat=True))
+    subs = {sub.absent_golfer_id: sub for sub in Sub.objects.filter(week=week).select_related('sub_golfer')}
     
     for team in teams:
         team_golfers = team.golfers.all()
         for golfer in team_golfers:
             # Check if golfer is playing (not absent or has a sub)
-            sub = Sub.objects.filter(week=week, absent_golfer=golfer).first()
+            sub = subs.get(golfer.id)
             if not sub or (sub and sub.sub_golfer):
                 # Golfer is playing (either directly or via sub)
                 if sub and sub.sub_golfer:
@@ -45,6 +48,7 @@ def get_playing_golfers(request, week_id):
     return JsonResponse({'golfers': playing_golfers})
 
 
+@query_budget(2)
 def get_games_for_week(request, week_id):
     """API endpoint to get all games for a specific week"""
     week = get_object_or_404(Week, pk=week_id)
@@ -63,6 +67,7 @@ def get_games_for_week(request, week_id):
     return JsonResponse({'games': games_data})
 
 
+@query_budget(2)
 def get_games_by_week(request, week_id):
     """API endpoint to get games for a specific week (for game creation)"""
     week = get_object_or_404(Week, pk=week_id)
@@ -79,6 +84,7 @@ def get_games_by_week(request, week_id):
     return JsonResponse({'games': games_data})
 
 
+@query_budget(3)
 def get_game_entries(request, week_id, game_id):
     """API endpoint to get all entries for a specific game in a specific week"""
     week = get_object_or_404(Week, pk=week_id)
@@ -97,6 +103,7 @@ def get_game_entries(request, week_id, game_id):
     return JsonResponse({'entries': entries_data})
 
 
+@query_budget(8)
 def get_matchup_data(request, matchup_id):
     matchup = get_object_or_404(Matchup, pk=matchup_id)
     week = matchup.week
@@ -106,7 +113,14 @@ def get_matchup_data(request, matchup_id):
         week=week).filter(
             Q(golfer__in=matchup.teams.all().values_list('golfers', flat=True)) |
             Q(subbing_for_golfer__in=matchup.teams.all().values_list('golfers', flat=True))
-    )
+    ).select_related('golfer', 'opponent', 'subbing_for_golfer')
+    subs = {sub.absent_golfer_id: sub for sub in Sub.objects.filter(week=week)}
+    handicaps = dict(week.handicap_set.values_list('golfer_id', 'handicap'))
+    team_by_golfer = {
+        golfer_id: team
+        for team in Team.objects.filter(season=week.season).prefetch_related('golfers')
+        for golfer_id in (golfer.id for golfer in team.golfers.all())
+    }
 
     # Build dynamic rows based on actual playing golfers
     rows = []
@@ -121,14 +135,14 @@ def get_matchup_data(request, matchup_id):
         playing_for = None
         
         if golfer_matchup.subbing_for_golfer:
-            sub = Sub.objects.filter(week=week, absent_golfer=golfer_matchup.subbing_for_golfer).first()
+            sub = subs.get(golfer_matchup.subbing_for_golfer_id)
             if sub and sub.no_sub:
                 is_playing = False
             else:
                 playing_for = golfer_matchup.subbing_for_golfer.name
         
         if is_playing:
-            handicap = getattr(golfer_matchup.golfer.handicap_set.filter(week=week).first(), 'handicap', 0)
+            handicap = handicaps.get(golfer_matchup.golfer_id, 0)
             
             playing_golfers.append({
                 'golfer_matchup': golfer_matchup,
@@ -137,7 +151,7 @@ def get_matchup_data(request, matchup_id):
                 'playing_for': playing_for,
                 'golfer_id': golfer_matchup.golfer.id,
                 'is_A': golfer_matchup.is_A,
-                'team': get_absent_team_from_sub(golfer_matchup.golfer, week) if playing_for is not None else golfer_matchup.golfer.team_set.get(season=week.season),
+                'team': team_by_golfer.get(golfer_matchup.subbing_for_golfer_id if playing_for is not None else golfer_matchup.golfer_id),
                 'opponent': golfer_matchup.opponent
             })
     
@@ -168,6 +182,7 @@ def get_matchup_data(request, matchup_id):
     return JsonResponse({'rows': rows})
 
 
+@query_budget(5)
 def get_week_matchups(request):
     week_id = request.GET.get('week_id')
     if not week_id:
@@ -195,4 +210,15 @@ def get_week_matchups(request):
                 'team1': team1_golfers,
                 'team2': []
             })
-    return JsonResponse({'team_ids': team_ids, 'matchup_pairs': matchup_pairs})
\ No newline at end of file
+    return JsonResponse({'team_ids': team_ids, 'matchup_pairs': matchup_pairs})
+
+
+@query_budget(5)
+def get_task_runs(request, season_id):
+    """API endpoint polled by the generate rounds page for task progress and recent runs"""
+    runs = season_task_runs(get_object_or_404(Season, pk=season_id))
+    return JsonResponse({
+        'running': [run_as_dict(run) for run in runs['running']],
+        'recent': [run_as_dict(run) for run in runs['recent']],
+        'recompute': recompute_as_dict(runs['recompute']) if runs['recompute'] else None,
+    })
@@ -1,15 +1,13 @@
-from main.models import Week, Season, League
-from main.league_scope import league_and_year_from_path
+from main.helper import get_available_weeks
+from main.models import Season, Golfer
+from main.league_scope import request_league_scope
 
 
-def _league_nav_year(league, path_year):
+def _league_nav_year(scope):
     """Year for building /slug/year/… links: path year, else latest season for league."""
-    if path_year is not None:
-        return path_year
-    if league is None:
-        return None
-    s = Season.objects.filter(league=league).order_by('-year').first()
-    return s.year if s else None
+    if scope.path_year is not None:
+        return scope.path_year
+    return scope.latest_season.year if scope.latest_season else None
 
 
 def weeks_context(request):
@@ -38,8 +36,9 @@ def weeks_context(request):
             is_production_host = False
 
         match = getattr(request, 'resolver_match', None)
+        scope = request_league_scope(request)
         # League chooser, set holes, manage courses: same navbar as landing (brand + superuser tools, no league menus)
-        if (request.path == '/' and League.objects.exists()) or (
+        if (request.path == '/' and scope.league is not None) or (
             match and match.url_name in ('set_holes', 'manage_courses')
         ):
             return {
@@ -60,42 +59,23 @@ def weeks_context(request):
                 'strip_league_nav': False,
             }
 
-        league, path_year = league_and_year_from_path(request.path)
+        league, path_year = scope.league, scope.path_year
 
         if not league:
             raise Season.DoesNotExist
 
-        if path_year is not None:
-            try:
-                current_season = Season.objects.get(league=league, year=path_year)
-            except Season.DoesNotExist:
-                current_season = Season.objects.filter(league=league).order_by('-year').first()
-        else:
-            current_season = Season.objects.filter(league=league).order_by('-year').first()
+        current_season = scope.season
+        latest_season = scope.latest_season
+        is_current_season = (
+            latest_season is not None
+            and current_season is not None
+            and current_season.pk == latest_season.pk
+        )
 
-        latest_season = Season.objects.filter(league=league).order_by('-year').first()
-        try:
-            is_current_season = (
-                latest_season is not None
-                and current_season is not None
-                and current_season.pk == latest_season.pk
-            )
-        except Exception:
-            is_current_season = False
-
-        from main.models import Score, Golfer
-
-        all_seasons = Season.objects.filter(league=league).order_by('-year')
-        multiple_seasons = all_seasons.count() > 1
+        all_seasons = scope.all_seasons
+        multiple_seasons = len(all_seasons) > 1
 
         if current_season is None:
-            is_league_manager = False
-            user = getattr(request, 'user', None)
-            if user and user.is_authenticated:
-                if user.is_superuser:
-                    is_league_manager = True
-                elif league.managers.filter(pk=user.pk).exists():
-                    is_league_manager = True
             return {
                 'available_weeks': [],
                 'current_season': None,
@@ -107,26 +87,15 @@ def weeks_context(request):
                 'is_current_season': False,
                 'is_production_host': is_production_host,
                 'multiple_seasons': multiple_seasons,
-                'is_league_manager': is_league_manager,
+                'is_league_manager': scope.is_league_manager,
                 'current_league': league,
                 'league_slug': league.slug,
-                'league_nav_year': _league_nav_year(league, path_year),
+                'league_nav_year': _league_nav_year(scope),
                 'strip_league_nav': False,
             }
 
-        weeks_with_complete_scores = []
-        all_weeks = Week.objects.filter(
-            season=current_season,
-            rained_out=False
-        ).order_by('number')
-
-        for week in all_weeks:
-            score_count = Score.objects.filter(week=week).count()
-            if score_count > 0:
-                current_season_obj = latest_season
-                if current_season == current_season_obj and score_count < week.num_scores:
-                    continue
-                weeks_with_complete_scores.append(week)
+        # Weeks with scores; in the latest season only once every score is in
+        weeks_with_complete_scores = get_available_weeks(current_season, complete_only=is_current_season)
 
         golfer_list = Golfer.objects.filter(team__season=current_season).order_by('name')
 
@@ -134,14 +103,6 @@ def weeks_context(request):
             sub__week__season=current_season
         ).distinct().order_by('name')
 
-        is_league_manager = False
-        user = getattr(request, 'user', None)
-        if user and user.is_authenticated:
-            if user.is_superuser:
-                is_league_manager = True
-            elif current_season.league.managers.filter(pk=user.pk).exists():
-                is_league_manager = True
-
         return {
             'available_weeks': weeks_with_complete_scores,
             'current_season': current_season,
@@ -153,10 +114,10 @@ def weeks_context(request):
             'is_current_season': is_current_season,
             'is_production_host': is_production_host,
             'multiple_seasons': multiple_seasons,
-            'is_league_manager': is_league_manager,
+            'is_league_manager': scope.is_league_manager,
             'current_league': league,
             'league_slug': league.slug,
-            'league_nav_year': _league_nav_year(league, path_year),
+            'league_nav_year': _league_nav_year(scope),
             'strip_league_nav': False,
         }
     except Season.DoesNotExist:
@@ -0,0 +1,148 @@
+"""Season-wide scoring distribution cube.
+
+``ScoreDistribution`` counts non-sub hole scores by week, golfer, hole and
+strokes relative to par. It is rebuilt for a week from its rounds' hole
+arrays whenever that week's rounds are generated (see ``main.scoring``), so the
+league stats and historics pages read hole averages, scoring breakdowns and
+rate leaderboards from a handful of aggregate queries instead of counting
+scores hole by hole or golfer by golfer.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Hole, Round, ScoreDistribution, Season
+
+# Relative-to-par buckets: -2 or better, -1, 0, +1, +2, +3, +4 or worse
+SCORING_BUCKETS = ('eagle', 'birdie', 'par', 'bogey', 'double', 'triple', 'worse')
+
+
+def bucket_for(to_par: int) -> str:
+    return SCORING_BUCKETS[min(max(to_par, -2), 4) + 2]
+
+
+def bucket_counts(counts: Dict[int, int]) -> Dict[str, int]:
+    """Collapse ``{to_par: count}`` into ``{bucket: count}`` for every bucket."""
+    buckets = dict.fromkeys(SCORING_BUCKETS, 0)
+    for to_par, count in counts.items():
+        buckets[bucket_for(to_par)] += count
+    return buckets
+
+
+def hole_scores(rounds) -> List[Tuple[int, int, Hole, int]]:
+    """``(week_id, golfer_id, hole, gross)`` for every hole score ``rounds`` hold.
+
+    A round keeps its gross scores as an array following its week's nine holes
+    in order, so the scores are read from the rounds themselves with one query
+    and paired with their holes with one more, instead of joining ``Score``
+    rows back to the rounds they count towards.
+
+    Args:
+        rounds (QuerySet): ``Round`` rows, in the order the scores are wanted.
+    """
+    rows = list(rounds.values_list(
+        'week_id', 'golfer_id', 'week__is_front', 'week__season__course_config_id', 'hole_gross',
+    ))
+    nines = defaultdict(list)
+    for hole in Hole.objects.filter(config_id__in={row[3] for row in rows}).order_by('number'):
+        nines[(hole.config_id, hole.number <= 9)].append(hole)
+    return [
+        (week_id, golfer_id, hole, gross)
+        for week_id, golfer_id, is_front, config_id, hole_gross in rows
+        for hole, gross in zip(nines[(config_id, is_front)], hole_gross)
+    ]
+
+
+def refresh_score_distribution(season, weeks: Optional[Iterable] = None) -> None:
+    """Rebuild ``ScoreDistribution`` rows for ``season`` from its rounds.
+
+    Sub rounds are left out, matching the league-wide stats pages. A teammate
+    covering for a golfer with no sub plays two rounds on the same scores, and
+    both count.
+
+    Args:
+        season (Season): The season to rebuild.
+        weeks (iterable, optional): Only rebuild these weeks. Defaults to the whole season.
+    """
+    rounds = Round.objects.filter(week__season=season, subbing_for__isnull=True).order_by()
+    existing = ScoreDistribution.objects.filter(season=season)
+    if weeks is not None:
+        week_ids = [getattr(w, 'pk', w) for w in weeks]
+        rounds = rounds.filter(week_id__in=week_ids)
+        existing = existing.filter(week_id__in=week_ids)
+    counts = Counter(
+        (week_id, golfer_id, hole.id, gross - hole.par)
+        for week_id, golfer_id, hole, gross in hole_scores(rounds)
+    )
+    with transaction.atomic():
+        existing.delete()
+        ScoreDistribution.objects.bulk_create([
+            ScoreDistribution(
+                season_id=season.pk,
+                week_id=week_id,
+                golfer_id=golfer_id,
+                hole_id=hole_id,
+                to_par=to_par,
+                count=count,
+            )
+            for (week_id, golfer_id, hole_id, to_par), count in counts.items()
+        ])
+
+
+def _ensure_built(seasons) -> None:
+    # Seasons scored before the cube existed are built on first read
+    missing = (
+        seasons.filter(week__round__isnull=False, week__round__subbing_for__isnull=True)
+        .filter(score_distribution__isnull=True).distinct()
+    )
+    for season in missing:
+        refresh_score_distribution(season)
+
+
+def hole_distribution(season) -> Dict[int, dict]:
+    """Per-hole score counts for ``season``.
+
+    Returns ``{hole_number: {'par': par, 'counts': {to_par: count}}}`` in hole order.
+    """
+    _ensure_built(Season.objects.filter(pk=season.pk))
+    holes: Dict[int, dict] = {}
+    rows = (
+        ScoreDistribution.objects.filter(season=season)
+        .values('hole__number', 'hole__par', 'to_par')
+        .annotate(num=Sum('count'))
+        .order_by('hole__number', 'to_par')
+    )
+    for row in rows:
+        hole = holes.setdefault(row['hole__number'], {'par': row['hole__par'], 'counts': defaultdict(int)})
+        hole['counts'][row['to_par']] += row['num']
+    return holes
+
+
+def golfer_distribution(league) -> Dict[int, Dict[int, int]]:
+    """All-time ``{golfer_id: {to_par: count}}`` across every season of ``league``."""
+    _ensure_built(Season.objects.filter(league=league))
+    golfers: Dict[int, Dict[int, int]] = defaultdict(dict)
+    rows = (
+        ScoreDistribution.objects.filter(season__league=league)
+        .values('golfer_id', 'to_par')
+        .annotate(num=Sum('count'))
+        .order_by()
+    )
+    for row in rows:
+        golfers[row['golfer_id']][row['to_par']] = row['num']
+    return golfers
+
+
+def to_par_totals(seasons) -> Dict[int, int]:
+    """``{to_par: count}`` over every season in ``seasons``."""
+    _ensure_built(seasons)
+    rows = (
+        ScoreDistribution.objects.filter(season__in=seasons)
+        .values('to_par')
+        .annotate(num=Sum('count'))
+        .order_by()
+    )
+    return {row['to_par']: row['num'] for row in rows}
@@ -210,10 +210,9 @@ class ScheduleForm(forms.Form):
     def __init__(self, weeks, teams, *args, season=None, **kwargs):
         super().__init__(*args, **kwargs)
 
-        earliest_week = get_earliest_week_without_full_matchups(season)
-
         # Only set initial when the form is not bound (GET). For POST, preserve submitted data.
         if not self.is_bound:
+            earliest_week = get_earliest_week_without_full_matchups(season)
             if earliest_week:
                 self.initial['week'] = earliest_week.id
             elif weeks:
@@ -244,12 +243,12 @@ class WeekSelectionForm(forms.Form):
         cs = current_season or get_current_season()
         if cs:
             self.fields['week'] = forms.ModelChoiceField(
-                queryset=Week.objects.filter(season=cs).order_by('number'),
+                queryset=Week.objects.filter(season=cs).select_related('season__league').order_by('number'),
                 label="Select Week"
             )
         else:
             self.fields['week'] = forms.ModelChoiceField(
-                queryset=Week.objects.all().order_by('number'),
+                queryset=Week.objects.select_related('season__league').order_by('number'),
                 label="Select Week"
             )
 
@@ -267,7 +266,7 @@ class TeamForm(forms.Form):
         super().__init__(*args, **kwargs)
         lg = league or get_default_league()
         if lg:
-            self.fields['season'].queryset = Season.objects.filter(league=lg).order_by('-year')
+            self.fields['season'].queryset = Season.objects.filter(league=lg).select_related('league').order_by('-year')
             gq = Golfer.objects.filter(leagues=lg).order_by('name')
             self.fields['golfer1'].queryset = gq
             self.fields['golfer2'].queryset = gq
@@ -315,7 +314,7 @@ def hole_formset_initial_for_config(course_config):
 
 class SkinEntryForm(forms.Form):
     week = forms.ModelChoiceField(
-        queryset=Week.objects.all().order_by('-date'), 
+        queryset=Week.objects.select_related('season__league').order_by('-date'), 
         label='Week',
         required=True
     )
@@ -330,7 +329,7 @@ class SkinEntryForm(forms.Form):
         super().__init__(*args, **kwargs)
         cs = current_season or get_current_season()
         if cs:
-            self.fields['week'].queryset = Week.objects.filter(season=cs).order_by('-date')
+            self.fields['week'].queryset = Week.objects.filter(season=cs).select_related('season__league').order_by('-date')
 
             next_week = get_next_week(cs)
             if next_week:
@@ -398,7 +397,7 @@ class CreateGameForm(forms.Form):
         super().__init__(*args, **kwargs)
         cs = current_season or get_current_season()
         if cs:
-            self.fields['week'].queryset = Week.objects.filter(season=cs).order_by('-number')
+            self.fields['week'].queryset = Week.objects.filter(season=cs).select_related('season__league').order_by('-number')
 
             next_week = get_next_week(cs)
             if next_week:
@@ -421,7 +420,7 @@ class GameEntryForm(forms.Form):
         super().__init__(*args, **kwargs)
         cs = current_season or get_current_season()
         if cs:
-            self.fields['week'].queryset = Week.objects.filter(season=cs).order_by('-number')
+            self.fields['week'].queryset = Week.objects.filter(season=cs).select_related('season__league').order_by('-number')
         week = None
         if self.data.get('week'):
             try:
@@ -500,7 +499,7 @@ class GameWinnerForm(forms.Form):
         super().__init__(*args, **kwargs)
         cs = current_season or get_current_season()
         if cs:
-            self.fields['week'].queryset = Week.objects.filter(season=cs).order_by('-number')
+            self.fields['week'].queryset = Week.objects.filter(season=cs).select_related('season__league').order_by('-number')
         week = None
         if self.data.get('week'):
             try:
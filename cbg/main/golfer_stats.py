@@ -0,0 +1,901 @@
+"""Statistics for the golfer stats page.
+
+A golfer's whole score history in a league is loaded once into NumPy arrays
+(:class:`ScoreHistory`); yearly gross/net stats, per-hole averages, trend
+arrows and scoring distributions are computed from those arrays with
+group-bys instead of one query per year or per hole. Season round data
+(rounds, matchups, opponents, subs) is likewise fetched in a fixed number of
+queries, so the page's query count does not grow with the golfer's history.
+"""
+
+import json
+from collections import Counter
+
+import numpy as np
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .distribution import SCORING_BUCKETS, to_par_totals
+from .helper import conventional_round
+from .models import GameEntry, GolferMatchup, Handicap, Hole, Payout, Round, Score, Season, SkinEntry, SkinResult, Sub, Week
+from .payouts import GAMES, live_payouts, payout_totals
+from .skins import SeasonSkins
+
+HOLES = range(1, 19)
+
+
+class ScoreHistory:
+    """Every hole score a golfer has posted in a league, one array element per ``Score`` row.
+
+    Rows are in ``Score`` primary key order. Arrays: ``year``, ``season_id``,
+    ``week_id``, ``week_number``, ``hole``, ``par``, ``score`` and ``handicap``
+    (the golfer's handicap for that week, NaN when there is none).
+    """
+
+    FIELDS = ('year', 'season_id', 'week_id', 'week_number', 'hole', 'par', 'score')
+
+    def __init__(self, golfer, league):
+        rows = list(
+            Score.objects.filter(golfer=golfer, week__season__league=league)
+            .order_by('id')
+            .values_list('week__season__year', 'week__season_id', 'week_id', 'week__number', 'hole__number', 'hole__par', 'score')
+        )
+        data = np.array(rows, dtype=np.int64).reshape(-1, len(self.FIELDS))
+        for i, name in enumerate(self.FIELDS):
+            setattr(self, name, data[:, i])
+
+        handicaps = dict(
+            Handicap.objects.filter(golfer=golfer, week__season__league=league).values_list('week_id', 'handicap')
+        )
+        self.handicap = np.array([handicaps.get(w, np.nan) for w in self.week_id.tolist()], dtype=float)
+
+    def __len__(self):
+        return len(self.score)
+
+    def for_season(self, season_id):
+        """Boolean mask of the rows belonging to ``season_id``."""
+        return self.season_id == season_id
+
+
+def yearly_gross_stats(history):
+    """Best, worst and average 9-hole gross (and average net) per calendar year."""
+    if not len(history):
+        return []
+
+    # One group per week, in order of the week's first score
+    week_ids, first_idx, inverse, counts = np.unique(
+        history.week_id, return_index=True, return_inverse=True, return_counts=True
+    )
+    gross = np.bincount(inverse, weights=history.score).astype(np.int64)
+    order = np.argsort(first_idx, kind='stable')
+    week_ids, first_idx, gross, counts = week_ids[order], first_idx[order], gross[order], counts[order]
+    week_year = history.year[first_idx]
+    week_hcp = history.handicap[first_idx]
+
+    full = counts >= 9  # Only count rounds with at least 9 holes
+    weeks_needed = set()
+    per_year = []
+    for year in np.unique(history.year).tolist():
+        mask = full & (week_year == year)
+        if not mask.any():
+            continue
+        year_weeks, year_gross = week_ids[mask], gross[mask]
+        best, worst = int(np.argmin(year_gross)), int(np.argmax(year_gross))
+        hcps = week_hcp[mask]
+        has_hcp = ~np.isnan(hcps)
+        nets = [g - conventional_round(h) for g, h in zip(year_gross[has_hcp].tolist(), hcps[has_hcp].tolist())]
+        per_year.append((year, year_weeks, year_gross, best, worst, nets))
+        weeks_needed.update((int(year_weeks[best]), int(year_weeks[worst])))
+
+    weeks = Week.objects.in_bulk(weeks_needed)
+    stats = []
+    for year, year_weeks, year_gross, best, worst, nets in per_year:
+        stats.append({
+            'year': year,
+            'best_gross': {'week': weeks[int(year_weeks[best])], 'gross_score': int(year_gross[best])},
+            'worst_gross': {'week': weeks[int(year_weeks[worst])], 'gross_score': int(year_gross[worst])},
+            'total_rounds': len(year_gross),
+            'avg_gross': int(year_gross.sum()) / len(year_gross),
+            'avg_net': sum(nets) / len(nets) if nets else None,
+        })
+    return stats
+
+
+def yearly_hole_stats(history):
+    """Per-year, per-hole average scores and year-over-year trend arrows.
+
+    Returns ``(stats, trends)``: ``stats[year][hole]`` holds ``avg_score``,
+    ``rounds_played`` and ``par``; ``trends[year][hole]`` is ``'down'``
+    (improved), ``'up'``, ``'same'`` or ``None`` compared with the previous year.
+    """
+    years = np.unique(history.year).tolist()
+    stats = {year: {hole: {'avg_score': None, 'rounds_played': 0, 'par': None} for hole in HOLES} for year in years}
+    if years:
+        keys, first_idx, inverse, counts = np.unique(
+            history.year * 100 + history.hole, return_index=True, return_inverse=True, return_counts=True
+        )
+        sums = np.bincount(inverse, weights=history.score).astype(np.int64)
+        for key, idx, total, count in zip(keys.tolist(), first_idx.tolist(), sums.tolist(), counts.tolist()):
+            year, hole = divmod(key, 100)
+            if hole in stats[year]:
+                stats[year][hole] = {
+                    'avg_score': round(total / count, 2),
+                    'rounds_played': count,
+                    'par': int(history.par[idx]),
+                }
+
+    trends = {}
+    for prev_year, year in zip(years, years[1:]):
+        trends[year] = {}
+        for hole in HOLES:
+            current_avg = stats[year][hole]['avg_score']
+            prev_avg = stats[prev_year][hole]['avg_score']
+            if current_avg is not None and prev_avg is not None:
+                if current_avg < prev_avg:
+                    trends[year][hole] = 'down'  # Improved (green)
+                elif current_avg > prev_avg:
+                    trends[year][hole] = 'up'    # Worsened (red)
+                else:
+                    trends[year][hole] = 'same'
+            else:
+                trends[year][hole] = None
+    return stats, trends
+
+
+def season_hole_stats(history, season_id):
+    """Per-hole stats, scoring distribution and theoretical best/worst holes for one season.
+
+    Returns ``(hole_stats, scoring_breakdown, extremes)`` where ``extremes`` maps
+    hole number to ``(best_score, best_week, worst_score, worst_week)`` for
+    played holes.
+    """
+    mask = history.for_season(season_id)
+    hole, week, score = history.hole[mask], history.week_number[mask], history.score[mask]
+    par = history.par[mask]
+    order = np.lexsort((week, hole))
+    hole, week, score, par = hole[order], week[order], score[order], par[order]
+
+    hole_stats = {}
+    scoring_breakdown = dict.fromkeys(SCORING_BUCKETS, 0)
+    extremes = {}
+    for hole_num in HOLES:
+        rows = hole == hole_num
+        if not rows.any():
+            hole_stats[hole_num] = {
+                'avg_score': None,
+                'best_score': None,
+                'worst_score': None,
+                'rounds_played': 0,
+                'par': None,
+                'avg_vs_par': None,
+                'scores': [],
+            }
+            continue
+        scores, weeks = score[rows], week[rows]
+        hole_par = int(par[rows][0])
+        scores_list = scores.tolist()
+        avg_score = sum(scores_list) / len(scores_list)
+
+        # -2 or better, -1, 0, +1, +2, +3, worse
+        relative = np.clip(scores - hole_par, -2, 4) + 2
+        for bucket, count in zip(SCORING_BUCKETS, np.bincount(relative, minlength=7).tolist()):
+            scoring_breakdown[bucket] += count
+
+        best, worst = min(scores_list), max(scores_list)
+        extremes[hole_num] = (best, int(weeks[scores == best][0]), worst, int(weeks[scores == worst][0]))
+        hole_stats[hole_num] = {
+            'avg_score': round(avg_score, 2),
+            'best_score': best,
+            'worst_score': worst,
+            'rounds_played': len(scores_list),
+            'par': hole_par,
+            'avg_vs_par': round(avg_score - hole_par, 2),
+            'scores': scores_list,
+        }
+    return hole_stats, scoring_breakdown, extremes
+
+
+def theoretical_rounds(extremes, best_gross_week, worst_gross_week):
+    """Best and worst possible rounds from the golfer's best/worst score on every hole."""
+    if not extremes:
+        return {}
+    best_scores, worst_scores = [], []
+    for hole_num in HOLES:
+        if hole_num in extremes:
+            best, best_week, worst, worst_week = extremes[hole_num]
+            best_scores.append({'hole': hole_num, 'score': best, 'week': best_week})
+            worst_scores.append({'hole': hole_num, 'score': worst, 'week': worst_week})
+        else:
+            best_scores.append({'hole': hole_num, 'score': None, 'week': None})
+            worst_scores.append({'hole': hole_num, 'score': None, 'week': None})
+    best_total = sum(s['score'] for s in best_scores if s['score'] is not None)
+    worst_total = sum(s['score'] for s in worst_scores if s['score'] is not None)
+    return {
+        'best': {
+            'total': best_total,
+            'scores': best_scores,
+            'vs_actual_best': best_total - best_gross_week['gross'] if best_gross_week else None
+        },
+        'worst': {
+            'total': worst_total,
+            'scores': worst_scores,
+            'vs_actual_worst': worst_total - worst_gross_week['gross'] if worst_gross_week else None
+        }
+    }
+
+
+class SeasonRounds:
+    """A golfer's rounds, matchups and opponents' rounds for one season, loaded up front."""
+
+    def __init__(self, golfer, season, weeks):
+        self.weeks = list(weeks)
+        self.rounds = list(
+            Round.objects.filter(golfer=golfer, week__season=season)
+            .select_related('week', 'handicap').order_by('week__number')
+        )
+        self.round_for_week = {}
+        for rnd in self.rounds:
+            self.round_for_week.setdefault(rnd.week_id, rnd)
+
+        self.matchup_for_week = {}
+        for gm in (
+            GolferMatchup.objects.filter(Q(golfer=golfer) | Q(subbing_for_golfer=golfer), week__season=season)
+            .select_related('week', 'opponent').order_by('week__number')
+        ):
+            self.matchup_for_week.setdefault(gm.week_id, gm)
+
+        self.opponent_net = {}
+        opponent_ids = {gm.opponent_id for gm in self.matchup_for_week.values()}
+        for golfer_id, week_id, net in (
+            Round.objects.filter(week__season=season, golfer__in=opponent_ids)
+            .order_by('id').values_list('golfer_id', 'week_id', 'net')
+        ):
+            self.opponent_net.setdefault((golfer_id, week_id), net)
+
+        self.nine_par = {True: 0, False: 0}
+        for number, par in Hole.objects.filter(config=season.course_config).values_list('number', 'par'):
+            if 1 <= number <= 9:
+                self.nine_par[True] += par
+            elif 10 <= number <= 18:
+                self.nine_par[False] += par
+
+    def played(self):
+        """(week, round, golfer matchup) for every week the golfer has both."""
+        for week in self.weeks:
+            week_round = self.round_for_week.get(week.id)
+            week_matchup = self.matchup_for_week.get(week.id)
+            if week_round and week_matchup:
+                yield week, week_round, week_matchup
+
+    def opponent_round_net(self, week_matchup, week):
+        """``(played, net)`` for the opponent's round that week."""
+        key = (week_matchup.opponent_id, week.id)
+        return key in self.opponent_net, self.opponent_net.get(key)
+
+
+def weekly_summary(season_rounds):
+    """Per-week chart series and summary rows for the weeks a golfer played."""
+    handicap_data, points_data, gross_scores, net_scores = [], [], [], []
+    performance_vs_opponent, weekly_stats = [], []
+    for week, week_round, week_matchup in season_rounds.played():
+        handicap = float(week_round.handicap.handicap) if week_round.handicap else 0
+        handicap_data.append({'week': week.number, 'handicap': handicap})
+        points_data.append({'week': week.number, 'points': float(week_round.total_points if week_round.total_points else 0)})
+        gross_scores.append({'week': week.number, 'score': week_round.gross if week_round.gross else 0})
+        net_scores.append({'week': week.number, 'score': week_round.net if week_round.net else 0})
+
+        opponent_played, opponent_net = season_rounds.opponent_round_net(week_matchup, week)
+        if opponent_played:
+            # Positive = golfer lost, negative = golfer won
+            net_diff = (week_round.net or 0) - (opponent_net or 0)
+            performance_vs_opponent.append({
+                'week': week.number,
+                'opponent': week_matchup.opponent.name,
+                'net_diff': net_diff,
+                'result': 'Win' if net_diff < 0 else 'Loss' if net_diff > 0 else 'Tie'
+            })
+
+        weekly_stats.append({
+            'week': week.number,
+            'gross': week_round.gross or 0,
+            'net': week_round.net or 0,
+            'points': week_round.total_points or 0,
+            'handicap': handicap,
+            'opponent': week_matchup.opponent.name if week_matchup else 'N/A'
+        })
+    return {
+        'handicap_data': handicap_data,
+        'points_data': points_data,
+        'gross_scores': gross_scores,
+        'net_scores': net_scores,
+        'performance_vs_opponent': performance_vs_opponent,
+        'weekly_stats': weekly_stats,
+    }
+
+
+def next_week_handicap(golfer, season, handicap_data):
+    """The week after the last played week and the golfer's handicap for it, if both exist."""
+    if not handicap_data:
+        return None, None
+    next_week = Week.objects.filter(season=season, number__gt=handicap_data[-1]['week']).order_by('number').first()
+    if not next_week:
+        return None, None
+    next_hcp = Handicap.objects.filter(golfer=golfer, week=next_week).first()
+    return next_week, (float(next_hcp.handicap) if next_hcp else None)
+
+
+def season_summary(weekly, next_week_hcp_value):
+    """Season averages, best/worst weeks, match play record and handicap trend."""
+    weekly_stats = weekly['weekly_stats']
+    performance_vs_opponent = weekly['performance_vs_opponent']
+    handicap_data = weekly['handicap_data']
+    if not weekly_stats:
+        return {
+            'avg_gross': 0, 'avg_net': 0, 'avg_points': 0, 'total_points': 0,
+            'best_gross_week': None, 'worst_gross_week': None, 'best_net_week': None,
+            'worst_net_week': None, 'best_points_week': None, 'worst_points_week': None,
+            'wins': 0, 'losses': 0, 'ties': 0, 'win_percentage': 0,
+            'handicap_trend': "N/A", 'handicap_trend_positive': False,
+        }
+
+    gross = [s['gross'] for s in weekly_stats]
+    net = [s['net'] for s in weekly_stats]
+    points = [s['points'] for s in weekly_stats]
+    results = [perf['result'] for perf in performance_vs_opponent]
+    wins = results.count('Win')
+
+    # Trend from the starting handicap to next week's (or the last played week's)
+    start_handicap_value = float(handicap_data[0]['handicap'])
+    effective_end_hcp = next_week_hcp_value if next_week_hcp_value is not None else float(handicap_data[-1]['handicap'])
+    handicap_trend = effective_end_hcp - start_handicap_value
+
+    return {
+        'avg_gross': sum(gross) / len(gross),
+        'avg_net': sum(net) / len(net),
+        'avg_points': sum(points) / len(points),
+        'total_points': sum(points),
+        'best_gross_week': min(weekly_stats, key=lambda x: x['gross']),
+        'worst_gross_week': max(weekly_stats, key=lambda x: x['gross']),
+        'best_net_week': min(weekly_stats, key=lambda x: x['net']),
+        'worst_net_week': max(weekly_stats, key=lambda x: x['net']),
+        'best_points_week': max(weekly_stats, key=lambda x: x['points']),
+        'worst_points_week': min(weekly_stats, key=lambda x: x['points']),
+        'wins': wins,
+        'losses': results.count('Loss'),
+        'ties': results.count('Tie'),
+        'win_percentage': (wins / len(results) * 100) if results else 0,
+        'handicap_trend': f"{handicap_trend:+.1f}" if handicap_trend != 0 else "No change",
+        'handicap_trend_positive': handicap_trend > 0,
+    }
+
+
+def consistency_stats(season_rounds, hole_stats):
+    """Week-to-week net score consistency (or hole-to-hole if fewer than two rounds)."""
+    played_holes = [stats for stats in hole_stats.values() if stats['rounds_played'] > 0]
+    if not played_holes:
+        return {}
+    net_scores = [r.net for r in season_rounds.rounds if r.subbing_for_id is None]
+    if len(net_scores) > 1:
+        values, tolerance = net_scores, 2
+    else:
+        values, tolerance = [stats['avg_score'] for stats in played_holes], 0.5
+    within = sum(1 for value in values if abs(value - sum(values) / len(values)) <= tolerance)
+    return {
+        'std_dev': _std_dev(values),
+        'score_range': round(max(values) - min(values), 2),
+        'holes_within_half_stroke': within,
+        'consistency_percentage': round((within / len(values)) * 100, 1),
+    }
+
+
+def _std_dev(values):
+    # Population standard deviation rounded for display
+    mean = sum(values) / len(values)
+    return round((sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5, 2)
+
+
+def opponent_vs_handicap(season_rounds):
+    """How each week's opponent's net compared with par for the nine played."""
+    rows = []
+    for week in season_rounds.weeks:
+        week_round = season_rounds.round_for_week.get(week.id)
+        week_matchup = season_rounds.matchup_for_week.get(week.id)
+        if week_round and week_matchup:
+            opponent_played, opponent_net = season_rounds.opponent_round_net(week_matchup, week)
+            rows.append({
+                'week': week.number,
+                'opponent': week_matchup.opponent.name,
+                'opp_vs_hcp': opponent_net - season_rounds.nine_par[week.is_front] if opponent_played else None,
+            })
+        else:
+            rows.append({'week': week.number, 'opponent': None, 'opp_vs_hcp': None})
+
+    values = [item['opp_vs_hcp'] for item in rows if item['opp_vs_hcp'] is not None]
+    return {
+        'opp_vs_hcp_list': rows,
+        'avg_opp_vs_hcp': sum(values) / len(values) if values else 0,
+        'num_better': sum(1 for v in values if v < 0),
+        'num_worse': sum(1 for v in values if v > 0),
+        'num_even': sum(1 for v in values if v == 0),
+    }
+
+
+def sub_history(golfer, season):
+    """Weeks the golfer subbed for someone, and weeks someone subbed for them, with points."""
+    subbed_for_points = {}
+    for week_id, subbing_for_id, points in (
+        Round.objects.filter(week__season=season, golfer=golfer, subbing_for__isnull=False)
+        .order_by('id').values_list('week_id', 'subbing_for_id', 'total_points')
+    ):
+        subbed_for_points.setdefault((week_id, subbing_for_id), points)
+    replaced_points = {}
+    for week_id, points in (
+        Round.objects.filter(week__season=season, subbing_for=golfer).order_by('id').values_list('week_id', 'total_points')
+    ):
+        replaced_points.setdefault(week_id, points)
+
+    subs_as_sub = [
+        {
+            'week': sub.week,
+            'absent_golfer': sub.absent_golfer,
+            'team': [team for team in sub.absent_golfer.team_set.all() if team.season_id == season.pk],
+            'points': subbed_for_points.get((sub.week_id, sub.absent_golfer_id)),
+        }
+        for sub in Sub.objects.filter(sub_golfer=golfer, week__season=season)
+        .select_related('week', 'absent_golfer').prefetch_related('absent_golfer__team_set').order_by('week__number')
+    ]
+    subs_for_absent = [
+        {
+            'week': sub.week,
+            'sub_golfer': sub.sub_golfer,
+            'no_sub': sub.no_sub,
+            'points': replaced_points.get(sub.week_id),
+        }
+        for sub in Sub.objects.filter(absent_golfer=golfer, week__season=season)
+        .select_related('week', 'sub_golfer').order_by('week__number')
+    ]
+    return subs_as_sub, subs_for_absent
+
+
+def wager_summary(golfer, season, weeks):
+    """Skins and games money wagered and won, plus hypothetical skins for non-entrants."""
+    playing_skins = getattr(season, 'playing_skins', False)
+    playing_games = getattr(season, 'playing_games', False)
+    week_ids = [week.id for week in weeks]
+
+    # Totals come from the payout ledger; the details from the saved skins results and game winners
+    totals = payout_totals(live_payouts(golfer=golfer, week__season=season))
+    skin_entries_count = SkinEntry.objects.filter(golfer=golfer, week__season=season).count()
+    total_skins_wagered = totals['skins_wagered']
+    skins_won = totals['skins_won']
+
+    actual_skins = None
+    actual_skins_total = 0.0
+    actual_skins_details = []
+    results = SkinResult.objects.filter(golfer=golfer, week__in=week_ids).select_related('week', 'hole')
+    for result in results.order_by('week__number', 'hole__number') if playing_skins else []:
+        actual_skins_total += result.payout
+        actual_skins_details.append({
+            'week': result.week.number,
+            'date': timezone.localtime(result.week.date).strftime('%m/%d'),
+            'hole': result.hole.number,
+            'score': result.score,
+            'payout': round(result.payout, 2),
+        })
+    if actual_skins_details:
+        actual_skins = {
+            'total': round(actual_skins_total, 2),
+            'skins': len(actual_skins_details),
+            'details': actual_skins_details,
+        }
+
+    game_entries_count = GameEntry.objects.filter(golfer=golfer, week__season=season).count()
+    total_games_wagered = totals['games_wagered']
+    games_won = totals['games_won']
+
+    actual_games = None
+    actual_games_total = 0.0
+    actual_games_details = []
+    if playing_games:
+        won_by_week = dict(
+            Payout.objects.filter(golfer=golfer, kind=GAMES, week__in=week_ids).values_list('week_id', 'won')
+        )
+        game_winners = list(
+            GameEntry.objects.filter(golfer=golfer, week__in=week_ids, winner=True)
+            .select_related('game', 'week').order_by('week__number', 'id')
+        )
+        wins_by_week = Counter(ge.week_id for ge in game_winners)
+        for ge in game_winners:
+            game_winner_payout = won_by_week.get(ge.week_id, 0) / wins_by_week[ge.week_id]
+            actual_games_total += game_winner_payout
+            actual_games_details.append({
+                'week': ge.week.number,
+                'date': timezone.localtime(ge.week.date).strftime('%m/%d'),
+                'game': ge.game.name if ge.game else 'Game',
+                'payout': round(game_winner_payout, 2),
+            })
+    if actual_games_details:
+        actual_games = {
+            'total': round(actual_games_total, 2),
+            'wins': len(actual_games_details),
+            'details': actual_games_details,
+        }
+
+    total_earned = skins_won + games_won
+    total_wagered = total_skins_wagered + total_games_wagered
+    wager_stats = {
+        'total_skins_wagered': total_skins_wagered,
+        'total_games_wagered': total_games_wagered,
+        'total_wagered': total_wagered,
+        'skins_won': round(skins_won, 2),
+        'games_won': round(games_won, 2),
+        'total_earned': round(total_earned, 2),
+        'net_earnings': round(total_earned - total_wagered, 2),
+        'skins_entries': skin_entries_count,
+        'games_entries': game_entries_count,
+    }
+
+    hypothetical_skins = None
+    if skin_entries_count == 0 and playing_skins:
+        hypothetical_skins = _hypothetical_skins(golfer, season)
+    return wager_stats, actual_skins, actual_games, hypothetical_skins
+
+
+def _hypothetical_skins(golfer, season):
+    # What the golfer would have won had they entered skins every week that had entries
+    hypothetical_total = 0.0
+    hypothetical_details = []
+
+    # Consider only weeks that had skins entries to avoid degenerate single-entry cases
+    weeks_with_entries = (
+        Week.objects
+        .filter(season=season, rained_out=False, skinentry__isnull=False)
+        .distinct()
+        .order_by('number')
+    )
+    skins = SeasonSkins(season, weeks_with_entries, golfer=golfer)
+
+    for wk in weeks_with_entries:
+        # Compute winners with injected golfer
+        winners_all = skins.winners(wk, with_golfer=True)
+        if winners_all:
+            per_skin_value = float(skins.pot(wk, with_golfer=True)) / len(winners_all)
+            for winner in winners_all:
+                if winner['golfer'].id == golfer.id:
+                    hypothetical_total += per_skin_value
+                    hypothetical_details.append({
+                        'week': wk.number,
+                        'date': timezone.localtime(wk.date).strftime('%m/%d') if hasattr(wk, 'date') else '',
+                        'hole': winner['hole'],
+                        'score': winner['score'],
+                        'payout': round(per_skin_value, 2),
+                    })
+
+    if not hypothetical_details:
+        return None
+    return {
+        'total': round(hypothetical_total, 2),
+        'skins': len(hypothetical_details),
+        'details': hypothetical_details,
+    }
+
+
+def league_birdies_and_eagles():
+    # Counts over the hole scores of every non-sub round, from the distribution cube
+    counts = to_par_totals(Season.objects.all())
+    total_birdies = counts.get(-1, 0)
+    total_eagles = sum(count for to_par, count in counts.items() if to_par <= -2)
+    return total_birdies, total_eagles
+
+
+def yearly_hole_table(yearly_stats, trends):
+    """Flattened yearly hole rows for the template."""
+    return [
+        {
+            'year': year,
+            'holes': [
+                {
+                    'hole_num': hole_num,
+                    'avg_score': yearly_stats[year][hole_num]['avg_score'] if yearly_stats[year][hole_num]['avg_score'] else None,
+                    'par': yearly_stats[year][hole_num]['par'] if yearly_stats[year][hole_num]['par'] else None,
+                    'vs_par': (yearly_stats[year][hole_num]['avg_score'] - yearly_stats[year][hole_num]['par']) if (yearly_stats[year][hole_num]['avg_score'] is not None and yearly_stats[year][hole_num]['par'] is not None) else None,
+                    'trend': trends.get(year, {}).get(hole_num) if year in trends else None
+                }
+                for hole_num in HOLES
+            ]
+        }
+        for year in sorted(yearly_stats)
+    ]
+
+
+# --- Plotly charts ---------------------------------------------------------
+
+def build_charts(weekly, next_week, next_week_hcp_value, hole_stats, yearly_stats):
+    """JSON-encoded Plotly figures keyed by chart name."""
+    charts = {}
+
+    handicap_data = weekly['handicap_data']
+    if handicap_data:
+        # Extend handicap data with ONLY the immediate next week's handicap after last played week, if present
+        extended_handicap_data = list(handicap_data)
+        if next_week is not None and next_week_hcp_value is not None:
+            extended_handicap_data.append({'week': next_week.number, 'handicap': next_week_hcp_value})
+        charts['handicap'] = json.dumps({
+            'data': [{
+                'x': [d['week'] for d in extended_handicap_data],
+                'y': [round(d['handicap'], 2) for d in extended_handicap_data],
+                'type': 'scatter',
+                'mode': 'lines+markers',
+                'name': 'Handicap',
+                'line': {'color': '#1f77b4', 'width': 3},
+                'marker': {'size': 8},
+                'hovertemplate': 'Week: %{x}<br>Handicap: %{y:.2f}<extra></extra>'
+            }],
+            'layout': {
+                'title': 'Handicap Progression',
+                'xaxis': {'title': 'Week'},
+                'yaxis': {'title': 'Handicap'},
+                'height': 400,
+                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
+            }
+        })
+
+    points_data = weekly['points_data']
+    if points_data:
+        charts['points'] = json.dumps({
+            'data': [{
+                'x': [d['week'] for d in points_data],
+                'y': [round(d['points'], 2) for d in points_data],
+                'type': 'bar',
+                'name': 'Points',
+                'marker': {'color': '#2ca02c'},
+                'hovertemplate': 'Week: %{x}<br>Points: %{y:.2f}<extra></extra>'
+            }],
+            'layout': {
+                'title': 'Points per Week',
+                'xaxis': {'title': 'Week'},
+                'yaxis': {'title': 'Points'},
+                'height': 400,
+                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
+            }
+        })
+
+    gross_scores, net_scores = weekly['gross_scores'], weekly['net_scores']
+    if gross_scores and net_scores:
+        # Mobile-friendly legend below chart with extra spacing
+        charts['scores'] = json.dumps({
+            'data': [
+                {
+                    'x': [d['week'] for d in gross_scores],
+                    'y': [round(d['score'], 2) for d in gross_scores],
+                    'type': 'scatter',
+                    'mode': 'lines+markers',
+                    'name': 'Gross Score',
+                    'line': {'color': '#ff7f0e', 'width': 3},
+                    'marker': {'size': 8},
+                    'hovertemplate': 'Week: %{x}<br>Gross Score: %{y:.2f}<extra></extra>'
+                },
+                {
+                    'x': [d['week'] for d in net_scores],
+                    'y': [round(d['score'], 2) for d in net_scores],
+                    'type': 'scatter',
+                    'mode': 'lines+markers',
+                    'name': 'Net Score',
+                    'line': {'color': '#d62728', 'width': 3},
+                    'marker': {'size': 8},
+                    'hovertemplate': 'Week: %{x}<br>Net Score: %{y:.2f}<extra></extra>'
+                }
+            ],
+            'layout': {
+                'title': 'Gross vs Net Scores',
+                'xaxis': {'title': 'Week'},
+                'yaxis': {'title': 'Score'},
+                'height': 400,
+                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 140},
+                'legend': {
+                    'orientation': 'h',
+                    'x': 0.5,
+                    'xanchor': 'center',
+                    'y': -0.3,
+                    'yanchor': 'top',
+                    'tracegroupgap': 20
+                }
+            }
+        })
+
+    performance_vs_opponent = weekly['performance_vs_opponent']
+    if performance_vs_opponent:
+        charts['performance'] = json.dumps({
+            'data': [{
+                'x': [d['week'] for d in performance_vs_opponent],
+                'y': [round(d['net_diff'], 2) for d in performance_vs_opponent],
+                'type': 'bar',
+                'name': 'Net Score Difference',
+                'marker': {
+                    'color': ['green' if d['net_diff'] < 0 else 'red' if d['net_diff'] > 0 else 'gray' for d in performance_vs_opponent]
+                },
+                'hovertemplate': 'Week: %{x}<br>Net Score Difference: %{y:+.2f}<extra></extra>'
+            }],
+            'layout': {
+                'title': {'text': 'Performance vs Opponent<br>(Negative = Win)', 'x': 0.5, 'xanchor': 'center'},
+                'xaxis': {'title': 'Week'},
+                'yaxis': {'title': 'Net Score Difference'},
+                'height': 400,
+                'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50}
+            }
+        })
+
+    charts.update(_hole_charts(hole_stats))
+    if yearly_stats and len(yearly_stats) > 1:
+        charts['yearly_hole_heatmap'] = json.dumps(_yearly_heatmap(yearly_stats))
+    return charts
+
+
+def _hole_charts(hole_stats):
+    # Strokes vs par and per-hole consistency (std dev of score vs par), played holes only
+    played = [(hole_num, stats) for hole_num, stats in hole_stats.items() if stats['avg_vs_par'] is not None]
+    if not played:
+        return {}
+
+    charts = {}
+    charts['hole_by_hole'] = json.dumps({
+        'data': [{
+            'x': [hole_num for hole_num, _ in played],
+            'y': [round(stats['avg_vs_par'], 2) for _, stats in played],
+            'type': 'bar',
+            'name': 'Strokes vs Par',
+            'marker': {
+                'color': ['red' if s['avg_vs_par'] > 0 else 'green' if s['avg_vs_par'] < 0 else 'gray' for _, s in played]
+            },
+            'hovertemplate': 'Hole: %{x}<br>Avg vs Par: %{y:+.2f}<extra></extra>'
+        }],
+        'layout': {
+            'title': 'Average Strokes vs Par by Hole',
+            'xaxis': {'title': 'Hole Number'},
+            'yaxis': {'title': 'Strokes vs Par'},
+            'height': 400,
+            'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
+        }
+    })
+
+    consistency_x, consistency_y, consistency_colors, consistency_custom = [], [], [], []
+    for hole_num, stats in played:
+        rel_scores = [s - stats['par'] for s in stats['scores']]
+        std_dev = _std_dev(rel_scores) if len(rel_scores) >= 2 else None
+        score_range = max(rel_scores) - min(rel_scores)
+
+        consistency_x.append(hole_num)
+        consistency_y.append(std_dev if std_dev is not None else 0)
+        # Greener for lower std dev, red for higher
+        if std_dev is None:
+            consistency_colors.append('#BBBBBB')
+        elif std_dev <= 0.5:
+            consistency_colors.append('#2ca02c')
+        elif std_dev <= 1.0:
+            consistency_colors.append('#ff7f0e')
+        else:
+            consistency_colors.append('#d62728')
+        consistency_custom.append([len(rel_scores), score_range, stats['avg_vs_par']])
+
+    charts['hole_consistency'] = json.dumps({
+        'data': [{
+            'x': consistency_x,
+            'y': consistency_y,
+            'type': 'bar',
+            'name': 'Std Dev (Score vs Par)',
+            'marker': {
+                'color': consistency_colors
+            },
+            'customdata': consistency_custom,
+            'hovertemplate': 'Hole: %{x}' +
+                             '<br>Std Dev: %{y:.2f}' +
+                             '<br>Rounds: %{customdata[0]}' +
+                             '<br>Range: %{customdata[1]:+.2f}' +
+                             '<br>Avg vs Par: %{customdata[2]:+.2f}<extra></extra>'
+        }],
+        'layout': {
+            'title': {'text': 'Per-Hole Consistency<br>(Lower = More Consistent)', 'x': 0.5, 'xanchor': 'center'},
+            'xaxis': {'title': 'Hole Number'},
+            'yaxis': {'title': 'Std Dev of (Score - Par)'},
+            'height': 400,
+            'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50}
+        }
+    })
+    return charts
+
+
+def _yearly_heatmap(yearly_stats):
+    years = sorted(yearly_stats)
+    holes = list(HOLES)
+
+    # Strokes over/under par per year (rows) and hole (columns)
+    z_values = []
+    all_vs_par = []
+    for year in years:
+        year_data = []
+        for hole in holes:
+            stats = yearly_stats[year][hole]
+            if stats['avg_score'] is not None and stats['par'] is not None:
+                vs_par = round(stats['avg_score'] - stats['par'], 2)
+                year_data.append(vs_par)
+                all_vs_par.append(vs_par)
+            else:
+                year_data.append(None)
+        z_values.append(year_data)
+
+    # Colorbar starts at -1 (averages rarely go lower) and reaches at least +2
+    zmin = -1
+    zmax = max(max(all_vs_par), 2) if all_vs_par else 2
+
+    # Dark green capped at -1, white at +1, orange near +2, red at top
+    def _clamp01(v):
+        return 0 if v < 0 else (1 if v > 1 else v)
+    p_white = _clamp01((1 - zmin) / (zmax - zmin))
+    p_neg1 = _clamp01((-1 - zmin) / (zmax - zmin))
+    p_plus2 = _clamp01((2 - zmin) / (zmax - zmin))
+    p_light = _clamp01(p_neg1 + 0.6 * (p_white - p_neg1))
+
+    # Holes on Y and years on X (better on mobile)
+    z_transposed = [list(col) for col in zip(*z_values)] if z_values else []
+    return {
+        'data': [{
+            'z': z_transposed,
+            'x': years,
+            'y': holes,
+            'type': 'heatmap',
+            'colorscale': [
+                [0, 'rgb(0, 128, 0)'],
+                [p_neg1, 'rgb(0, 128, 0)'],
+                [p_light, 'rgb(144, 238, 144)'],
+                [p_white, 'rgb(255, 255, 255)'],
+                [p_plus2, 'rgb(255, 165, 0)'],
+                [1, 'rgb(255, 0, 0)']
+            ],
+            'zmin': zmin,
+            'zmax': zmax,
+            'colorbar': {
+                'title': 'Strokes vs Par',
+                'titleside': 'right',
+                'tickformat': '+.1f',
+                'tickmode': 'auto',
+                'nticks': 7,
+                'len': 0.85,
+                'thickness': 18
+            },
+            'hovertemplate': 'Year: %{x}<br>Hole: %{y}<br>Avg vs Par: %{z:+.2f}<extra></extra>'
+        }],
+        'layout': {
+            'title': {
+                'text': 'Yearly Hole-by-Hole Performance vs Par',
+                'x': 0.5,
+                'xanchor': 'center',
+                'y': 0.98,
+                'yanchor': 'top',
+                'pad': {'t': 20}
+            },
+            'xaxis': {
+                'title': 'Year',
+                'tickmode': 'linear',
+                'tick0': min(years),
+                'dtick': 1,
+                'automargin': True,
+                'range': [min(years) - 0.5, max(years) + 0.5],
+                'constrain': 'domain'
+            },
+            'yaxis': {
+                'title': 'Hole Number',
+                'tickmode': 'linear',
+                'tick0': 1,
+                'dtick': 1,
+                'automargin': True,
+                'scaleanchor': 'x',
+                'scaleratio': 1,
+                'range': [18.5, 0.5],  # Flip so Hole 1 appears at the top
+                'constrain': 'domain'
+            },
+            'height': 650,
+            'margin': {'l': 40, 'r': 60, 't': 140, 'b': 80},
+            'autosize': True,
+            'responsive': True
+        }
+    }
@@ -1,10 +1,17 @@
 from main.models import *
-from django.db.models import Sum, Count, Q
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
+import logging
 import random
 import math
+from bisect import bisect_left
 
-from main.league_scope import get_default_league
+from main.league_scope import get_default_league, latest_season, season_for_year
+from main.page_cache import bump_data_version
+from main.query_budget import query_budget
+
+logger = logging.getLogger(__name__)
 
 
 # Handicap rulesets (hardcoded defaults; structure-ready for future model-driven rules)
@@ -53,12 +60,7 @@ def get_game(week):
     """
 
     # get the game object for the week
-    if Game.objects.filter(week=week).exists():
-        game = Game.objects.get(week=week)
-    else:
-        game = None
-
-    return game
+    return Game.objects.filter(week=week).first()
 
 
 def get_current_season(year=None, league=None):
@@ -80,58 +82,60 @@ def get_current_season(year=None, league=None):
         league = get_default_league()
     if league is None:
         return None
-    qs = Season.objects.filter(league=league)
     if year is not None:
-        try:
-            return qs.get(year=year)
-        except Season.DoesNotExist:
-            return None
-    return qs.order_by('-year').first()
+        return season_for_year(league, year)
+    return latest_season(league)
+
+
+# Weeks with scores whose expected scores are all in (see Week.scores_complete)
+WEEK_COMPLETE = Q(scores_entered__gt=0) & (Q(num_scores__isnull=True) | Q(scores_entered__gte=F('num_scores')))
 
 
 def get_last_week(season=None):
 
-    print('Getting last week')
+    logger.debug('Getting last week')
     # check if season exists
     if season is None:
         season = get_current_season()
     
     if not season: 
         return None
-    else:
-        # get the latest week that was played before the current date
-        weeks = Week.objects.filter(season=season, date__lt=timezone.now()).order_by('-date')
-        
-        for week in weeks:
-            score_count = Score.objects.filter(week=week).count()
-            # For historical seasons, be more flexible - if there are scores, consider it played
-            # For current season, be more strict about having all expected scores
-            if score_count > 0:
-                # If it's the current season, check for complete scores
-                current_season = get_current_season()
-                if season == current_season and score_count < week.num_scores:
-                    continue
-                return week
-            
-        return None
+
+    # get the latest week that was played before the current date
+    # For historical seasons, be more flexible - if there are scores, consider it played
+    # For current season, be more strict about having all expected scores
+    weeks = Week.objects.filter(season=season, date__lt=timezone.now(), scores_entered__gt=0)
+    if season == get_current_season():
+        weeks = weeks.filter(WEEK_COMPLETE)
+    return weeks.order_by('-date').first()
 
 
 def get_next_week(season=None):
-    print('Getting next week')
+    logger.debug('Getting next week')
     if season is None:
         season = get_current_season()
     if not season:
         return None
-    # Get all weeks in order (by number) starting from week 1
-    weeks = Week.objects.filter(season=season).order_by('number')
-    for week in weeks:
-        if not week.rained_out:
-            score_count = Score.objects.filter(week=week).count()
-            # Find first week with 0 scores or fewer scores than expected
-            if score_count == 0 or score_count < week.num_scores:
-                print(f'Found next week: {week.number} (scores: {score_count}/{week.num_scores})')
-                return week
-    return None
+    # First week (by number) with no scores or fewer scores than expected
+    week = (
+        Week.objects.filter(season=season, rained_out=False)
+        .filter(Q(scores_entered=0) | Q(scores_entered__lt=F('num_scores')))
+        .order_by('number').first()
+    )
+    if week:
+        logger.debug('Found next week: %s (scores: %s/%s)', week.number, week.scores_entered, week.num_scores)
+    return week
+
+
+def get_available_weeks(season, complete_only=False):
+    """Weeks of ``season`` that have scores, in week order, skipping rained out weeks.
+
+    With ``complete_only`` a week is only included once every expected score is in.
+    """
+    weeks = Week.objects.filter(season=season, rained_out=False, scores_entered__gt=0)
+    if complete_only:
+        weeks = weeks.filter(WEEK_COMPLETE)
+    return list(weeks.order_by('number'))
 
 
 def get_absent_team_from_sub(sub_golfer, week):
@@ -153,6 +157,7 @@ def get_absent_team_from_sub(sub_golfer, week):
     return sub_golfer.sub.get(week=week).absent_golfer.team_set.get(season=week.season)
 
 
+@query_budget(1, per_week=17)
 def generate_rounds(season):
     """
     Generate rounds for all weeks in a season that have been played.
@@ -167,73 +172,29 @@ def generate_rounds(season):
     int
         The number of rounds generated
     """
+    from main.scoring import score_week
+
     # Get all weeks in the season that have scores (been played)
-    weeks = Week.objects.filter(season=season).order_by('number')
-    played_weeks = []
-    for week in weeks:
-        if Score.objects.filter(week=week).exists():
-            played_weeks.append(week)
+    played_weeks = Week.objects.filter(season=season, score__isnull=False).distinct().select_related('season__course_config').order_by('number')
     
     total_rounds = 0
     
     # Generate rounds for each played week
     for week in played_weeks:
-        golfer_matchups = GolferMatchup.objects.filter(week=week)
-        
-        for golfer_matchup in golfer_matchups:
-            try:
-                generate_round(golfer_matchup)
-                total_rounds += 1
-            except Exception as e:
-                print(f"Error generating round for {golfer_matchup.golfer.name} in week {week.number}: {e}")
+        total_rounds += score_week(week)
     
     return total_rounds
 
 
 def generate_round(golfer_matchup, **kwargs):
-    
-    golfer = golfer_matchup.golfer
-    week = golfer_matchup.week
-    
-    if golfer_played(golfer, week):
-        gross_score = Score.objects.filter(golfer=golfer, week=week).aggregate(Sum('score'))['score__sum']
-        handicap = Handicap.objects.get(golfer=golfer, week=week)
-        net_score = gross_score - conventional_round(handicap.handicap)  # Use conventionally rounded handicap for net score
-        scores = Score.objects.filter(golfer=golfer, week=week)
-        is_sub = True if golfer_matchup.subbing_for_golfer else False
-        if is_sub:
-            matchup = Matchup.objects.get(week=week, teams__golfers__in=[golfer_matchup.subbing_for_golfer])
-        else:
-            matchup = Matchup.objects.get(week=week, teams__golfers__in=[golfer_matchup.golfer])
-        points_detail = get_golfer_points(golfer_matchup, detail=True)
-        round_points = points_detail['round_points']
-        total_points = points_detail['golfer_points']
-        # Get points objects AFTER calculating points - filter by opponent to get correct Points for this matchup
-        opponent = golfer_matchup.opponent
-        points_objs = Points.objects.filter(golfer=golfer, week=week, opponent=opponent).order_by('hole__number')
-        if Round.objects.filter(golfer=golfer, week=week, golfer_matchup=golfer_matchup).exists():
-            round = Round.objects.get(golfer=golfer, week=week, golfer_matchup=golfer_matchup)
-            round.handicap = handicap
-            round.is_sub = is_sub
-            round.gross = gross_score
-            round.net = net_score
-            round.golfer_matchup = golfer_matchup
-            round.matchup = matchup
-            round.round_points = round_points
-            round.total_points = total_points
-            if is_sub:
-                round.subbing_for = golfer_matchup.subbing_for_golfer
-            round.points.set(points_objs)
-            round.scores.set(scores)
-            round.save()
-        else:
-            round = Round(golfer=golfer, week=week, matchup=matchup, golfer_matchup=golfer_matchup, handicap=handicap, gross=gross_score, net=net_score, round_points=round_points, total_points=total_points, is_sub=is_sub)
-            round.save()
-            round.points.set(points_objs)
-            if is_sub:
-                round.subbing_for = golfer_matchup.subbing_for_golfer
-            round.scores.set(scores)
-            round.save()
+    """Generate (or update) the Round for a single golfer matchup.
+
+    Delegates to the week scoring engine so the week's data is loaded in bulk;
+    use :func:`main.scoring.score_week` directly when scoring a whole week.
+    """
+    from main.scoring import score_week
+
+    score_week(golfer_matchup.week, golfer_matchups=[golfer_matchup])
 
     
 def golfer_played(golfer, week, **kwargs):
@@ -290,24 +251,29 @@ def get_schedule(week_model):
     :return: The schedule of matches for the given week.
     :rtype: List[List[List[str]]]
     """
-    # Get all matches for the inputed week
-    matches = week_model.matchup_set.all()
+    # Get all matches for the inputed week, with their teams and golfers
+    matches = list(week_model.matchup_set.prefetch_related('teams__golfers'))
     schedule = []
     
-    if matches.count() == 0:
+    if not matches:
         return None
     else:
+        # Each golfer's latest handicap from any week, in one query
+        golfer_ids = {golfer.id for match in matches for team in match.teams.all() for golfer in team.golfers.all()}
+        latest_handicap = {}
+        for golfer_id, handicap in Handicap.objects.filter(golfer_id__in=golfer_ids).order_by('week__date').values_list('golfer_id', 'handicap'):
+            latest_handicap[golfer_id] = handicap
+
         # Iterate through the matches and format the information for each match
         for match in matches:
-            team1_golfer1 = match.teams.all()[0].golfers.all()[0]
-            team1_golfer2 = match.teams.all()[0].golfers.all()[1]
-            team2_golfer1 = match.teams.all()[1].golfers.all()[0]
-            team2_golfer2 = match.teams.all()[1].golfers.all()[1]
+            team1, team2 = match.teams.all()[:2]
+            team1_golfer1, team1_golfer2 = team1.golfers.all()[:2]
+            team2_golfer1, team2_golfer2 = team2.golfers.all()[:2]
 
-            team1_golfer1_hcp = team1_golfer1.handicap_set.all().order_by('-week__date').first().handicap if team1_golfer1.handicap_set.all().order_by('-week__date').first() else 0
-            team1_golfer2_hcp = team1_golfer2.handicap_set.all().order_by('-week__date').first().handicap if team1_golfer2.handicap_set.all().order_by('-week__date').first() else 0
-            team2_golfer1_hcp = team2_golfer1.handicap_set.all().order_by('-week__date').first().handicap if team2_golfer1.handicap_set.all().order_by('-week__date').first() else 0
-            team2_golfer2_hcp = team2_golfer2.handicap_set.all().order_by('-week__date').first().handicap if team2_golfer2.handicap_set.all().order_by('-week__date').first() else 0
+            team1_golfer1_hcp = latest_handicap.get(team1_golfer1.id, 0)
+            team1_golfer2_hcp = latest_handicap.get(team1_golfer2.id, 0)
+            team2_golfer1_hcp = latest_handicap.get(team2_golfer1.id, 0)
+            team2_golfer2_hcp = latest_handicap.get(team2_golfer2.id, 0)
 
             if team1_golfer1_hcp > team1_golfer2_hcp and team2_golfer1_hcp > team2_golfer2_hcp:
                 match_low = [(team1_golfer2.name, team1_golfer2_hcp), (team2_golfer2.name, team2_golfer2_hcp)]
@@ -339,52 +305,40 @@ def get_golfer_schedule(week_model):
     :return: The schedule of team matchups with golfer details for the given week.
     :rtype: List[Dict]
     """
-    golfer_matchups = GolferMatchup.objects.filter(week=week_model).select_related(
+    golfer_matchups = list(GolferMatchup.objects.filter(week=week_model).select_related(
         'golfer', 'opponent', 'subbing_for_golfer'
-    ).order_by('is_A', 'golfer__name')
+    ).order_by('is_A', 'golfer__name'))
     
-    if not golfer_matchups.exists():
+    if not golfer_matchups:
         return None
     
     schedule = []
-    team_matchups = week_model.matchup_set.all()
+    team_matchups = week_model.matchup_set.prefetch_related('teams__golfers')
+    handicaps = dict(Handicap.objects.filter(week=week_model).values_list('golfer_id', 'handicap'))
+    
+    def golfer_details(team):
+        team_golfer_ids = {golfer.id for golfer in team.golfers.all()}
+        golfers = []
+        for gm in golfer_matchups:
+            if gm.golfer_id not in team_golfer_ids and gm.subbing_for_golfer_id not in team_golfer_ids:
+                continue
+            golfer_name = gm.golfer.name
+            if gm.subbing_for_golfer:
+                golfer_name += f" (sub for {gm.subbing_for_golfer.name})"
+            
+            golfer_hcp_value = handicaps.get(gm.golfer_id, 999)  # High default for missing handicaps
+            
+            golfers.append((golfer_name, golfer_hcp_value))
+        return golfers
     
     for matchup in team_matchups:
         teams = list(matchup.teams.all())
         if len(teams) == 2:
             team1, team2 = teams[0], teams[1]
             
-            team1_golfer_matchups = golfer_matchups.filter(
-                Q(golfer__in=team1.golfers.all()) | Q(subbing_for_golfer__in=team1.golfers.all())
-            )
-            
-            team2_golfer_matchups = golfer_matchups.filter(
-                Q(golfer__in=team2.golfers.all()) | Q(subbing_for_golfer__in=team2.golfers.all())
-            )
-            
             # Prepare golfer details for each team with handicap sorting
-            team1_golfers = []
-            team2_golfers = []
-            
-            for gm in team1_golfer_matchups:
-                golfer_name = gm.golfer.name
-                if gm.subbing_for_golfer:
-                    golfer_name += f" (sub for {gm.subbing_for_golfer.name})"
-                
-                golfer_hcp = gm.golfer.handicap_set.filter(week=week_model).first()
-                golfer_hcp_value = golfer_hcp.handicap if golfer_hcp else 999  # High default for missing handicaps
-                
-                team1_golfers.append((golfer_name, golfer_hcp_value))
-            
-            for gm in team2_golfer_matchups:
-                golfer_name = gm.golfer.name
-                if gm.subbing_for_golfer:
-                    golfer_name += f" (sub for {gm.subbing_for_golfer.name})"
-                
-                golfer_hcp = gm.golfer.handicap_set.filter(week=week_model).first()
-                golfer_hcp_value = golfer_hcp.handicap if golfer_hcp else 999  # High default for missing handicaps
-                
-                team2_golfers.append((golfer_name, golfer_hcp_value))
+            team1_golfers = golfer_details(team1)
+            team2_golfers = golfer_details(team2)
             
             # Sort by handicap (lower handicap = A golfer, goes first)
             team1_golfers.sort(key=lambda x: x[1])
@@ -463,193 +417,23 @@ def get_golfer_points(golfer_matchup, **kwargs):
             - 1 point for winning a hole, 0.5 points for tying a hole.
             - 3 points for winning the round, 1.5 points for tying the round.
         - When a golfer is subbing for a teammate due to no_sub, they automatically lose the 3 points for lowest net.
-        - Points are stored or updated in the `Points` model for each hole.
+        - Nothing is saved; the hole points are stored on the `Round` when it is generated.
+        - The scoring itself lives in :class:`main.scoring.WeekScoring`, which loads the whole
+          week in bulk; prefer :func:`main.scoring.score_week` when scoring many matchups.
     Raises:
         DoesNotExist: If a score for a specific hole is not found in the database.
     """
-    
+    from main.scoring import WeekScoring
+
     # When detail is set to True, the function returns a dictionary with the points for the golfer and their opponent
     detail = kwargs.get('detail', False)
-    
-    # Get the golfers opponent
-    opponent = golfer_matchup.opponent
-    
-    golfer_model = golfer_matchup.golfer
-    week_model = golfer_matchup.week
-    
-    # Get all scores for the inputed week and golfer
-    scores = Score.objects.filter(golfer=golfer_model, week=week_model)
-    opp_scores = Score.objects.filter(golfer=opponent, week=week_model)
-    
-    # Get the golfers handicap and the opponents handicap
-    golfer_hcp = get_hcp(golfer_model, week_model)
-    opp_hcp = get_hcp(opponent, week_model)
-
-    # ROUND EACH HANDICAP BEFORE SUBTRACTION
-    rounded_golfer_hcp = conventional_round(golfer_hcp)
-    rounded_opp_hcp = conventional_round(opp_hcp)
 
-    gross_score = scores.aggregate(Sum('score'))['score__sum']
-    opp_gross_score = opp_scores.aggregate(Sum('score'))['score__sum']
-
-    net_score = gross_score - rounded_golfer_hcp  # Use rounded handicap for net score
-    opp_net_score = opp_gross_score - rounded_opp_hcp  # Use rounded handicap for net score
-    
-    # Initialize the points to 0
-    points = 0
-    opp_points = 0
-    
-    # Figure out if the golfer is giving or getting strokes
-    if rounded_golfer_hcp > rounded_opp_hcp:
-        hcp_diff = rounded_golfer_hcp - rounded_opp_hcp
-        getting = True
-        giving = False
-    elif rounded_golfer_hcp < rounded_opp_hcp:
-        hcp_diff = rounded_opp_hcp - rounded_golfer_hcp
-        getting = False
-        giving = True
-    else:
-        hcp_diff = 0
-        giving = False
-        getting = False
-
-    if hcp_diff > 9:
-        hcp_diff = hcp_diff - 9
-        rollover = 1
-    else:
-        rollover = 0
-
-    # Get the holes for the inputed week
-    if week_model.is_front:
-        holes = get_front_holes(week_model.season)
-    else:
-        holes = get_back_holes(week_model.season)
-    
-    # Check if this is a virtual matchup (opponent team has no subs)
-    golfer_opponent_team_no_subs = golfer_matchup.opponent_team_no_subs
-    
-    # Iterate over the holes and calculate the points for each golfer
-    for hole in holes:
-        # Get the net scores for the inputed golfer and their opponent
-        golfer_score_model = scores.get(hole=hole)
-        opponent_score_model = opp_scores.get(hole=hole)
-        golfer_score = golfer_score_model.score
-        opponent_score = opponent_score_model.score
-        
-        original_golfer_score = golfer_score
-        original_opponent_score = opponent_score
-        
-        # Apply handicaps
-        if hole.handicap9 <= hcp_diff:
-            if giving:
-                opponent_score = opponent_score - (1 + rollover)
-            if getting:
-                golfer_score = golfer_score - (1 + rollover)
-        elif rollover == 1:
-            if giving:
-                opponent_score = opponent_score - 1
-            if getting:
-                golfer_score = golfer_score - 1
-
-
-
-        # Calculate the points for the hole based on the net scores
-        if golfer_score < opponent_score:
-            points += 1
-            Points.objects.update_or_create(
-                golfer=golfer_model, 
-                week=week_model, 
-                hole=hole, 
-                opponent=opponent,
-                defaults={'score': golfer_score_model, 'points': 1}
-            )
-        elif golfer_score == opponent_score:
-            points += 0.5
-            # In virtual matchups, ties still give golfer 0.5 but opponent gets 0
-            if golfer_opponent_team_no_subs:
-                opp_points += 0  # Virtual opponent gets no points
-            else:
-                opp_points += 0.5
-            Points.objects.update_or_create(
-                golfer=golfer_model, 
-                week=week_model, 
-                hole=hole, 
-                opponent=opponent,
-                defaults={'score': golfer_score_model, 'points': 0.5}
-            )
-        else:
-            # Golfer loses the hole
-            if golfer_opponent_team_no_subs:
-                opp_points += 0  # Virtual opponent cannot take points
-            else:
-                opp_points += 1
-            Points.objects.update_or_create(
-                golfer=golfer_model, 
-                week=week_model, 
-                hole=hole, 
-                opponent=opponent,
-                defaults={'score': golfer_score_model, 'points': 0}
-            )
-        
-
-    
-    hole_points = points
-    opp_hole_points = opp_points
-
-    # Check if either golfer is subbing for a teammate due to no_sub
-    golfer_is_teammate_subbing = golfer_matchup.is_teammate_subbing
-    opponent_is_teammate_subbing = False
-    
-    # Check if opponent is also subbing for a teammate
-    try:
-        opponent_matchup = GolferMatchup.objects.get(week=week_model, golfer=opponent, opponent=golfer_model)
-        opponent_is_teammate_subbing = opponent_matchup.is_teammate_subbing
-    except GolferMatchup.DoesNotExist:
-        # In virtual matchups, the opponent won't have a matchup record
-        pass
-
-    # Calculate the points for the 9th hole based on the net scores
-    # Handle different scenarios for round points
-    if golfer_opponent_team_no_subs:
-        # Virtual matchup - golfer automatically gets 3 points for low net score
-        # Opponent cannot take any points since they already have their own matchup
-        points += 3
-        round_points = 3
-        opp_round_points = 0  # Virtual opponent gets no round points
-    elif golfer_is_teammate_subbing and opponent_is_teammate_subbing:
-        # Both golfers are subbing for teammates - no one gets the 3 points
-        round_points = 0
-        opp_round_points = 0
-    elif golfer_is_teammate_subbing:
-        # Golfer is subbing for teammate - opponent gets the 3 points automatically
-        opp_points += 3
-        round_points = 0
-        opp_round_points = 3
-    elif opponent_is_teammate_subbing:
-        # Opponent is subbing for teammate - golfer gets the 3 points automatically
-        points += 3
-        round_points = 3
-        opp_round_points = 0
-    else:
-        # Normal case - calculate based on net scores
-        if net_score < opp_net_score:
-            points += 3
-            round_points = 3
-            opp_round_points = 0
-        elif net_score == opp_net_score:
-            points += 1.5
-            round_points = 1.5
-            opp_points += 1.5
-            opp_round_points = 1.5
-        else:
-            opp_points += 3
-            opp_round_points = 3
-            round_points = 0
+    result = WeekScoring(golfer_matchup.week).score(golfer_matchup)
 
     if detail:
-        return {'golfer': golfer_model, 'golfer_points': points, 'opponent': opponent, 'opp_points': opp_points, 'hole_points': hole_points, 'opp_hole_points': opp_hole_points, 'round_points': round_points, 'opp_round_points': opp_round_points}
+        return result.detail()
     else:
-        return points
+        return result.golfer_points
 
 
 def calculate_handicap(golfer, season, week, ruleset_member=None, ruleset_sub=None):
@@ -707,7 +491,17 @@ def calculate_handicap(golfer, season, week, ruleset_member=None, ruleset_sub=No
         par_for_nine = par_totals['front'] if row['is_front'] else par_totals['back']
         weekly_deltas.append(row['week_total'] - par_for_nine)
 
-    # Apply drop rule when applicable (full-time member and at least 5 weeks)
+    return handicap_from_deltas(weekly_deltas, rules)
+
+
+def handicap_from_deltas(weekly_deltas, rules):
+    """
+    Turn a golfer's qualifying weekly deltas (gross - par) into a handicap.
+
+    Applies the ruleset's drop rule (best/worst rounds once ``drop_start_threshold``
+    rounds exist), then the adjust factor and rounding. ``weekly_deltas`` must
+    already be limited to the ``max_weeks`` most recent rounds.
+    """
     drop_best = rules.get('drop_best', 0)
     drop_worst = rules.get('drop_worst', 0)
     drop_threshold = rules.get('drop_start_threshold', 0)
@@ -728,7 +522,7 @@ def calculate_handicap(golfer, season, week, ruleset_member=None, ruleset_sub=No
     return round(handicap_value, rules.get('rounding_precision', 5))
 
 
-def calculate_and_save_handicaps_for_season(
+def compute_season_handicaps(
     season,
     weeks=None,
     golfers=None,
@@ -736,445 +530,371 @@ def calculate_and_save_handicaps_for_season(
     ruleset_sub: dict | None = None,
 ):
     """
-    Calculate and save handicaps for a given season.
+    Compute every golfer's handicap for every week of a season without writing.
+
+    Pulls the season's weekly per-golfer totals in one grouped query and walks
+    each golfer's weeks once, keeping a date-ordered window of complete rounds.
+    The result is identical to calling :func:`calculate_handicap` week by week
+    and applying the pre-establishment backfill (see
+    :func:`calculate_and_save_handicaps_for_season`).
 
     Args:
-        season (Season): The season for which to calculate and save handicaps.
-        weeks (QuerySet, optional): The weeks in the season. If not provided, all weeks in the season will be used.
-        golfers (QuerySet, optional): The golfers for whom to calculate and save handicaps. If not provided, all golfers who played in the season will be used.
+        season (Season): The season to compute handicaps for.
+        weeks (iterable, optional): The weeks to compute, in processing order. Defaults to all weeks by number.
+        golfers (iterable, optional): The golfers to compute. Defaults to all golfers with scores in the season.
 
     Returns:
-        None
+        dict: ``{(golfer_id, week_id): handicap}``
     """
+    member_rules = ruleset_member or DEFAULT_MEMBER_HCP_RULES
+    sub_rules = ruleset_sub or DEFAULT_SUB_HCP_RULES
+
+    if weeks is None:
+        weeks = season.week_set.all().order_by('number')
+    weeks = list(weeks)
+
+    par_totals = get_nine_par_totals(season)
+    week_info = {
+        w['id']: w for w in Week.objects.filter(season=season).values('id', 'date', 'is_front')
+    }
+
+    # One grouped query: (golfer, week) -> (gross total, holes played)
+    totals_by_golfer = {}
+    weekly_totals = (
+        Score.objects
+        .filter(week__season=season)
+        .values('golfer', 'week')
+        .annotate(week_total=Sum('score'), num_holes=Count('id'))
+        .order_by()
+    )
+    for row in weekly_totals:
+        totals_by_golfer.setdefault(row['golfer'], {})[row['week']] = (row['week_total'], row['num_holes'])
 
     if golfers is None:
-        # Get all the golfers who played in the season
-        golfers = Golfer.objects.filter(score__week__season=season).distinct()
+        golfer_ids = list(totals_by_golfer.keys())
+    else:
+        golfer_ids = [g.pk for g in golfers]
 
-    # gets the golfers on the teams for the season (exludes subs unless sub is a team member)
-    normal_season_golfers = Golfer.objects.filter(team__season=season)
+    member_ids = set(Golfer.objects.filter(team__season=season).values_list('id', flat=True))
 
-    if weeks is None:
-        # Get all the weeks in the season
-        weeks = season.week_set.all().order_by('number')
+    def delta(week_id, total):
+        par_for_nine = par_totals['front'] if week_info[week_id]['is_front'] else par_totals['back']
+        return total - par_for_nine
 
-    # Loop through each golfer and each week in the season
-    for golfer in golfers:
-        member_rules = ruleset_member or DEFAULT_MEMBER_HCP_RULES
-        sub_rules = ruleset_sub or DEFAULT_SUB_HCP_RULES
-        is_member = Golfer.objects.filter(id=golfer.id, team__season=season).exists()
-        rules = member_rules if is_member else sub_rules
+    handicaps = {}
+    for golfer_id in golfer_ids:
+        rules = member_rules if golfer_id in member_ids else sub_rules
         establish_after = rules.get('establish_after_n_weeks', 3)
         adjust_factor = rules.get('adjust_factor', 0.8)
         rounding_precision = rules.get('rounding_precision', 5)
         required_holes = rules.get('required_holes', 9)
         max_weeks = rules.get('max_weeks', 10)
 
-        # Track played, complete weeks for pre-establishment seeding/backfill
-        weeks_played = 0
-        weeks_played_list = []
+        golfer_totals = totals_by_golfer.get(golfer_id, {})
+
+        # Complete rounds in date order for the prior-only window
+        complete = sorted(
+            (week_info[week_id]['date'], delta(week_id, total))
+            for week_id, (total, num_holes) in golfer_totals.items()
+            if num_holes >= required_holes
+        )
+        complete_dates = [date for date, _ in complete]
 
-        # Preload par totals once
-        par_totals = get_nine_par_totals(season)
+        # Played, complete weeks seen so far (pre-establishment seeding/backfill)
+        weeks_played_list = []
 
         for week in weeks:
-            # Calculate the golfer's handicap for the week using prior-only logic
-            handicap_prior_only = calculate_handicap(
-                golfer,
-                season,
-                week,
-                ruleset_member=member_rules,
-                ruleset_sub=sub_rules,
-            )
-
-            # Save or update the prior-only handicap for this week
-            handicap_obj, created = Handicap.objects.get_or_create(
-                golfer=golfer, week=week, defaults={'handicap': handicap_prior_only}
-            )
-            if not created and handicap_obj.handicap != handicap_prior_only:
-                handicap_obj.handicap = handicap_prior_only
-                handicap_obj.save()
-
-            # If golfer played this week and it's a complete round, track it
-            if golfer_played(golfer, week):
-                hole_count = Score.objects.filter(golfer=golfer, week=week).count()
-                if hole_count >= required_holes:
-                    weeks_played_list.append(week)
-                    weeks_played += 1
-
-            # Pre-establishment behavior
-            if weeks_played > 0 and weeks_played <= establish_after:
-                # Compute seeded handicap from the played complete weeks including current
-                # Use up to max_weeks most recent played weeks
-                recent_weeks = sorted(weeks_played_list, key=lambda w: w.date, reverse=True)[:max_weeks]
-                deltas = []
-                for wk_used in recent_weeks:
-                    total = Score.objects.filter(golfer=golfer, week=wk_used).aggregate(Sum('score'))['score__sum']
-                    if total is None:
-                        continue
-                    par_for_nine = par_totals['front'] if wk_used.is_front else par_totals['back']
-                    deltas.append(total - par_for_nine)
-                if deltas:
-                    seeded_hcp = round((sum(deltas) / len(deltas)) * adjust_factor, rounding_precision)
-                    # Apply to all played weeks so far (retroactive backfill)
-                    for wk_used in weeks_played_list:
-                        prev_obj, _ = Handicap.objects.get_or_create(golfer=golfer, week=wk_used, defaults={'handicap': seeded_hcp})
-                        if prev_obj.handicap != seeded_hcp:
-                            prev_obj.handicap = seeded_hcp
-                            prev_obj.save()
-
-            # Post-establishment: do nothing special; prior-only applies to next week naturally
+            # Prior-only: the most recent max_weeks complete rounds strictly before this week
+            idx = bisect_left(complete_dates, week.date)
+            window = [d for _, d in reversed(complete[max(0, idx - max_weeks):idx])]
+            handicaps[(golfer_id, week.id)] = handicap_from_deltas(window, rules) if window else 0
+
+            total, num_holes = golfer_totals.get(week.id, (None, 0))
+            if num_holes > 0 and num_holes >= required_holes:
+                weeks_played_list.append((week_info[week.id]['date'], week.id, delta(week.id, total)))
+
+            # Pre-establishment behavior: seed from played weeks including current, backfill all of them
+            if 0 < len(weeks_played_list) <= establish_after:
+                recent = sorted(weeks_played_list, key=lambda row: row[0], reverse=True)[:max_weeks]
+                deltas = [d for _, _, d in recent]
+                seeded_hcp = round((sum(deltas) / len(deltas)) * adjust_factor, rounding_precision)
+                for _, week_id, _ in weeks_played_list:
+                    handicaps[(golfer_id, week_id)] = seeded_hcp
+
+    return handicaps
+
+
+# Repeats: the front and back nine par totals
+@query_budget(8, duplicates=1)
+def calculate_and_save_handicaps_for_season(
+    season,
+    weeks=None,
+    golfers=None,
+    ruleset_member: dict | None = None,
+    ruleset_sub: dict | None = None,
+):
+    """
+    Calculate and save handicaps for a given season.
+
+    Each week gets the prior-only handicap (:func:`calculate_handicap`). Until a golfer has
+    ``establish_after_n_weeks`` complete rounds, every week they played is backfilled with
+    the average of those rounds (including the current one).
+
+    Args:
+        season (Season): The season for which to calculate and save handicaps.
+        weeks (QuerySet, optional): The weeks in the season. If not provided, all weeks in the season will be used.
+        golfers (QuerySet, optional): The golfers for whom to calculate and save handicaps. If not provided, all golfers who played in the season will be used.
+
+    Returns:
+        set: ``(golfer_id, week_id)`` pairs whose stored handicap was created or changed.
+    """
+
+    handicaps = compute_season_handicaps(
+        season,
+        weeks=weeks,
+        golfers=golfers,
+        ruleset_member=ruleset_member,
+        ruleset_sub=ruleset_sub,
+    )
+
+    existing = {
+        (golfer_id, week_id): value
+        for golfer_id, week_id, value in Handicap.objects.filter(week__season=season).values_list('golfer_id', 'week_id', 'handicap')
+    }
+    changed = {key for key, value in handicaps.items() if existing.get(key) != value}
+    if changed:
+        Handicap.objects.bulk_create(
+            [Handicap(golfer_id=golfer_id, week_id=week_id, handicap=handicaps[(golfer_id, week_id)]) for golfer_id, week_id in changed],
+            update_conflicts=True,
+            unique_fields=['golfer', 'week'],
+            update_fields=['handicap'],
+        )
+        bump_data_version(pk=season.pk)
+    return changed
+
+
+def _team_lineup(golfers, subs, handicaps):
+    """Who plays the A and B slots of a team for a week.
+
+    Args:
+        golfers (list): The team's two golfers.
+        subs (dict): ``{absent golfer id: Sub}`` for the week.
+        handicaps (dict): ``{golfer id: handicap}`` for the week.
+
+    Returns:
+        tuple: ``(slots, both_absent)`` where ``slots`` holds ``(golfer, subbing_for,
+        is_teammate_subbing)`` for the A then the B slot, and ``both_absent`` is True
+        when both golfers are out with no sub.
+    """
+    originals = list(golfers)
+    players = list(golfers)
+    subbing_for = [None, None]
+    teammate_subbing = [False, False]
+    for i, golfer in enumerate(originals):
+        sub = subs.get(golfer.id)
+        if sub is None:
+            continue
+        subbing_for[i] = sub.absent_golfer
+        if sub.no_sub:
+            # The teammate plays this slot as well
+            teammate_subbing[i] = True
+            players[i] = players[1 - i]
+        else:
+            players[i] = sub.sub_golfer
+
+    # With a teammate covering, A/B stays with the original team golfers' handicaps;
+    # otherwise it follows the golfers actually playing
+    ranked = originals if any(teammate_subbing) else players
+    order = (0, 1) if handicaps.get(ranked[0].id, 0) <= handicaps.get(ranked[1].id, 0) else (1, 0)
+    slots = [(players[i], subbing_for[i], teammate_subbing[i]) for i in order]
+    both_absent = all(
+        golfer.id in subs and subs[golfer.id].no_sub for golfer in originals
+    )
+    return slots, both_absent
 
 
+@query_budget(9)
 def generate_golfer_matchups(week):
     """
-    Generates golfer matchups for a given week by pairing golfers from opposing teams
-    and handling substitutions for absent golfers.
-    This function performs the following steps:
-    1. Retrieves all matchups for the specified week.
-    2. Deletes any existing golfer matchups, rounds, and points for the week.
-    3. Iterates through each matchup and retrieves the teams and their golfers.
-    4. Checks for absent golfers and replaces them with substitutes or teammates.
-    5. Calculates handicaps for each golfer.
-    6. Assigns A and B golfers for each team based on their handicaps.
-    7. Creates golfer matchups, ensuring the correct "subbing_for" field is set.
-    8. Prints information about which golfers are subbing for absent players.
+    Brings a week's golfer matchups in line with its team matchups, subs and handicaps.
+
+    The pairings are worked out in memory from bulk-loaded matchups, subs and
+    handicaps, then diffed against the stored ``GolferMatchup`` rows: only
+    pairings that disappeared are deleted (with their ``Round`` rows),
+    pairings whose details changed are updated in place and new ones are
+    bulk created. Unchanged pairings keep their rows, so a sub or matchup save
+    no longer rebuilds the whole week. When rounds are deleted, the week's
+    standings half and score distribution are refreshed without them.
+
+    Pairing rules:
+        - Each team matchup needs exactly two teams of two golfers, otherwise it is skipped.
+        - An absent golfer is replaced by their sub, or by their teammate when there is no sub.
+        - The lower handicap golfer of each team plays the A matchup. When a teammate
+          is covering, A/B follows the original team golfers' handicaps; otherwise the
+          handicaps of the golfers actually playing (including subs).
+        - When both golfers of a team are out with no sub, the opposing team plays a
+          randomly drawn team instead (stored as a ``RandomDrawnTeam`` so the draw is
+          kept on later runs), with ``opponent_team_no_subs`` set.
+
     Args:
-        week (int): The week number for which golfer matchups are to be generated.
-    Raises:
-        Exception: If there are issues with retrieving or processing matchups, teams, or golfers.
-    Models Used:
-        - Matchup: Represents a matchup between two teams for a given week.
-        - GolferMatchup: Represents a matchup between individual golfers.
-        - Sub: Represents a substitution for an absent golfer.
-    Helper Functions:
-        - get_hcp(golfer, week): Retrieves the handicap for a golfer for the specified week.
-    Notes:
-        - The function assumes that each team has exactly two golfers.
-        - If a golfer is absent and no substitute is available, their teammate may replace them.
-        - A/B status is determined based on current playing golfers' handicaps (including subs) when there are subs.
-        - A/B status is preserved based on original team golfers' handicaps when there is a no_sub situation.
+        week (Week): The week to generate golfer matchups for.
+
+    Returns:
+        dict: ``created``, ``updated`` and ``deleted`` golfer matchup counts.
     """
-    matchups = Matchup.objects.filter(week=week)
+    from main.distribution import refresh_score_distribution
+    from main.standings import half_for_week, refresh_team_standings
+
+    matchups = Matchup.objects.filter(week=week).prefetch_related('teams__golfers')
+    subs = {sub.absent_golfer_id: sub for sub in Sub.objects.filter(week=week).select_related('absent_golfer', 'sub_golfer')}
+    handicaps = dict(Handicap.objects.filter(week=week).values_list('golfer_id', 'handicap'))
+
+    # {(golfer_id, opponent_id): unsaved GolferMatchup}
+    desired = {}
 
-    # delete all rounds, golfer matchups, and points for the week to start fresh
-    Round.objects.filter(week=week).delete()
-    GolferMatchup.objects.filter(week=week).delete()
-    Points.objects.filter(week=week).delete()
+    def pair(golfer, opponent, is_A, subbing_for, is_teammate_subbing, opponent_team_no_subs=False):
+        desired.setdefault((golfer.id, opponent.id), GolferMatchup(
+            week=week, golfer=golfer, opponent=opponent, is_A=is_A, subbing_for_golfer=subbing_for,
+            is_teammate_subbing=is_teammate_subbing, opponent_team_no_subs=opponent_team_no_subs,
+        ))
 
+    playing_teams = []
+    # (present team, absent team, present team's slots)
+    unopposed = []
     for matchup in matchups:
         teams = list(matchup.teams.all())
-        
+
         # Skip matchups that don't have exactly 2 teams (might happen if signal fires before teams are added)
         if len(teams) != 2:
-            print(f'Skipping matchup {matchup.id} - has {len(teams)} teams instead of 2')
+            logger.warning('Skipping matchup %s - has %s teams instead of 2', matchup.id, len(teams))
             continue
-            
-        team1 = teams[0]
-        team2 = teams[1]
 
-        team1_golfers = list(team1.golfers.all())
-        team2_golfers = list(team2.golfers.all())
-        
+        team1_golfers = list(teams[0].golfers.all())
+        team2_golfers = list(teams[1].golfers.all())
+
         # Skip matchups where teams don't have exactly 2 golfers each
         if len(team1_golfers) != 2 or len(team2_golfers) != 2:
-            print(f'Skipping matchup {matchup.id} - team1 has {len(team1_golfers)} golfers, team2 has {len(team2_golfers)} golfers')
+            logger.warning('Skipping matchup %s - team1 has %s golfers, team2 has %s golfers', matchup.id, len(team1_golfers), len(team2_golfers))
             continue
 
-        team1_golfer1 = team1_golfers[0]
-        team1_golfer2 = team1_golfers[1]
-        team2_golfer1 = team2_golfers[0]
-        team2_golfer2 = team2_golfers[1]
+        team1_slots, team1_absent = _team_lineup(team1_golfers, subs, handicaps)
+        team2_slots, team2_absent = _team_lineup(team2_golfers, subs, handicaps)
 
-        # Check if any golfers are absent and set sub details
-        team1_golfer1_sub = Sub.objects.filter(week=week, absent_golfer=team1_golfer1).first()
-        team1_golfer2_sub = Sub.objects.filter(week=week, absent_golfer=team1_golfer2).first()
-        team2_golfer1_sub = Sub.objects.filter(week=week, absent_golfer=team2_golfer1).first()
-        team2_golfer2_sub = Sub.objects.filter(week=week, absent_golfer=team2_golfer2).first()
-        
-        team1_golfer1_has_no_sub = False
-        team1_golfer2_has_no_sub = False
-        team2_golfer1_has_no_sub = False
-        team2_golfer2_has_no_sub = False
-
-        # Store original golfers for A/B determination
-        team1_original_golfer1 = team1_golfer1
-        team1_original_golfer2 = team1_golfer2
-        team2_original_golfer1 = team2_golfer1
-        team2_original_golfer2 = team2_golfer2
-
-        # Replace absent golfers with subs or teammates
-        if team1_golfer1_sub:
-            if team1_golfer1_sub.no_sub:
-                team1_golfer1_has_no_sub = True
-                team1_golfer1 = team1_golfer2  # Replace with teammate
-                team1_golfer1_subbing_for = team1_golfer1_sub.absent_golfer  # Set subbing for absent golfer
-            else:
-                team1_golfer1 = team1_golfer1_sub.sub_golfer
-                team1_golfer1_subbing_for = team1_golfer1_sub.absent_golfer
-        else:
-            team1_golfer1_subbing_for = None
-
-        if team1_golfer2_sub:
-            if team1_golfer2_sub.no_sub:
-                team1_golfer2_has_no_sub = True
-                team1_golfer2 = team1_golfer1  # Replace with teammate
-                team1_golfer2_subbing_for = team1_golfer2_sub.absent_golfer
-            else:
-                team1_golfer2 = team1_golfer2_sub.sub_golfer
-                team1_golfer2_subbing_for = team1_golfer2_sub.absent_golfer
-        else:
-            team1_golfer2_subbing_for = None
-
-        if team2_golfer1_sub:
-            if team2_golfer1_sub.no_sub:
-                team2_golfer1_has_no_sub = True
-                team2_golfer1 = team2_golfer2  # Replace with teammate
-                team2_golfer1_subbing_for = team2_golfer1_sub.absent_golfer
-            else:
-                team2_golfer1 = team2_golfer1_sub.sub_golfer
-                team2_golfer1_subbing_for = team2_golfer1_sub.absent_golfer
-        else:
-            team2_golfer1_subbing_for = None
-
-        if team2_golfer2_sub:
-            if team2_golfer2_sub.no_sub:
-                team2_golfer2_has_no_sub = True
-                team2_golfer2 = team2_golfer1  # Replace with teammate
-                team2_golfer2_subbing_for = team2_golfer2_sub.absent_golfer
-            else:
-                team2_golfer2 = team2_golfer2_sub.sub_golfer
-                team2_golfer2_subbing_for = team2_golfer2_sub.absent_golfer
-        else:
-            team2_golfer2_subbing_for = None
-
-        # Determine A/B status based on whether there are subs or no_sub situations
-        team1_has_no_sub = team1_golfer1_has_no_sub or team1_golfer2_has_no_sub
-        team2_has_no_sub = team2_golfer1_has_no_sub or team2_golfer2_has_no_sub
-        
-        if team1_has_no_sub:
-            # If team1 has a no_sub situation, preserve original A/B based on original team golfers
-            team1_original_golfer1_hcp = get_hcp(team1_original_golfer1, week)
-            team1_original_golfer2_hcp = get_hcp(team1_original_golfer2, week)
-            
-            if team1_original_golfer1_hcp <= team1_original_golfer2_hcp:
-                team1_A_golfer, team1_B_golfer = team1_golfer1, team1_golfer2
-                team1_A_subbing_for = team1_golfer1_subbing_for
-                team1_B_subbing_for = team1_golfer2_subbing_for
-                team1_A_has_no_sub = team1_golfer1_has_no_sub
-                team1_B_has_no_sub = team1_golfer2_has_no_sub
-            else:
-                team1_A_golfer, team1_B_golfer = team1_golfer2, team1_golfer1
-                team1_A_subbing_for = team1_golfer2_subbing_for
-                team1_B_subbing_for = team1_golfer1_subbing_for
-                team1_A_has_no_sub = team1_golfer2_has_no_sub
-                team1_B_has_no_sub = team1_golfer1_has_no_sub
-        else:
-            # If team1 has subs, use current playing golfers' handicaps
-            team1_golfer1_hcp = get_hcp(team1_golfer1, week)
-            team1_golfer2_hcp = get_hcp(team1_golfer2, week)
-            
-            if team1_golfer1_hcp <= team1_golfer2_hcp:
-                team1_A_golfer, team1_B_golfer = team1_golfer1, team1_golfer2
-                team1_A_subbing_for = team1_golfer1_subbing_for
-                team1_B_subbing_for = team1_golfer2_subbing_for
-                team1_A_has_no_sub = team1_golfer1_has_no_sub
-                team1_B_has_no_sub = team1_golfer2_has_no_sub
-            else:
-                team1_A_golfer, team1_B_golfer = team1_golfer2, team1_golfer1
-                team1_A_subbing_for = team1_golfer2_subbing_for
-                team1_B_subbing_for = team1_golfer1_subbing_for
-                team1_A_has_no_sub = team1_golfer2_has_no_sub
-                team1_B_has_no_sub = team1_golfer1_has_no_sub
-
-        if team2_has_no_sub:
-            # If team2 has a no_sub situation, preserve original A/B based on original team golfers
-            team2_original_golfer1_hcp = get_hcp(team2_original_golfer1, week)
-            team2_original_golfer2_hcp = get_hcp(team2_original_golfer2, week)
-            
-            if team2_original_golfer1_hcp <= team2_original_golfer2_hcp:
-                team2_A_golfer, team2_B_golfer = team2_golfer1, team2_golfer2
-                team2_A_subbing_for = team2_golfer1_subbing_for
-                team2_B_subbing_for = team2_golfer2_subbing_for
-                team2_A_has_no_sub = team2_golfer1_has_no_sub
-                team2_B_has_no_sub = team2_golfer2_has_no_sub
-            else:
-                team2_A_golfer, team2_B_golfer = team2_golfer2, team2_golfer1
-                team2_A_subbing_for = team2_golfer2_subbing_for
-                team2_B_subbing_for = team2_golfer1_subbing_for
-                team2_A_has_no_sub = team2_golfer2_has_no_sub
-                team2_B_has_no_sub = team2_golfer1_has_no_sub
-        else:
-            # If team2 has subs, use current playing golfers' handicaps
-            team2_golfer1_hcp = get_hcp(team2_golfer1, week)
-            team2_golfer2_hcp = get_hcp(team2_golfer2, week)
-            
-            if team2_golfer1_hcp <= team2_golfer2_hcp:
-                team2_A_golfer, team2_B_golfer = team2_golfer1, team2_golfer2
-                team2_A_subbing_for = team2_golfer1_subbing_for
-                team2_B_subbing_for = team2_golfer2_subbing_for
-                team2_A_has_no_sub = team2_golfer1_has_no_sub
-                team2_B_has_no_sub = team2_golfer2_has_no_sub
-            else:
-                team2_A_golfer, team2_B_golfer = team2_golfer2, team2_golfer1
-                team2_A_subbing_for = team2_golfer2_subbing_for
-                team2_B_subbing_for = team2_golfer1_subbing_for
-                team2_A_has_no_sub = team2_golfer2_has_no_sub
-                team2_B_has_no_sub = team2_golfer1_has_no_sub
-
-        # Check for teams where both golfers are absent with no_sub
-        team1_both_absent_no_sub = (team1_golfer1_sub and team1_golfer1_sub.no_sub) and (team1_golfer2_sub and team1_golfer2_sub.no_sub)
-        team2_both_absent_no_sub = (team2_golfer1_sub and team2_golfer1_sub.no_sub) and (team2_golfer2_sub and team2_golfer2_sub.no_sub)
-        
-        # Handle virtual matchups for teams that have no opponents
-        if team1_both_absent_no_sub and not team2_both_absent_no_sub:
-            # Team1 is completely absent, create virtual matchups for team2
-            print(f'Team1 ({team1_original_golfer1.name} and {team1_original_golfer2.name}) both absent with no_sub, creating virtual matchups for team2')
-            create_virtual_matchups_for_team(week, team2, team2_A_golfer, team2_B_golfer, team2_A_subbing_for, team2_B_subbing_for)
-        elif team2_both_absent_no_sub and not team1_both_absent_no_sub:
-            # Team2 is completely absent, create virtual matchups for team1
-            print(f'Team2 ({team2_original_golfer1.name} and {team2_original_golfer2.name}) both absent with no_sub, creating virtual matchups for team1')
-            create_virtual_matchups_for_team(week, team1, team1_A_golfer, team1_B_golfer, team1_A_subbing_for, team1_B_subbing_for)
-        elif team1_both_absent_no_sub and team2_both_absent_no_sub:
+        if team1_absent and team2_absent:
             # Both teams completely absent - this shouldn't happen in normal circumstances
-            print(f'Both teams completely absent with no_sub - no matchups created for this matchup')
+            logger.warning('Both teams completely absent with no_sub - no matchups created for matchup %s', matchup.id)
+        elif team1_absent:
+            unopposed.append((teams[1], teams[0], team2_slots))
+        elif team2_absent:
+            unopposed.append((teams[0], teams[1], team1_slots))
         else:
-            # Normal case - create regular golfer matchups
-            GolferMatchup.objects.create(week=week, golfer=team1_A_golfer, is_A=True, opponent=team2_A_golfer, subbing_for_golfer=team1_A_subbing_for, is_teammate_subbing=team1_A_has_no_sub)
-            GolferMatchup.objects.create(week=week, golfer=team2_A_golfer, is_A=True, opponent=team1_A_golfer, subbing_for_golfer=team2_A_subbing_for, is_teammate_subbing=team2_A_has_no_sub)
-            GolferMatchup.objects.create(week=week, golfer=team1_B_golfer, is_A=False, opponent=team2_B_golfer, subbing_for_golfer=team1_B_subbing_for, is_teammate_subbing=team1_B_has_no_sub)
-            GolferMatchup.objects.create(week=week, golfer=team2_B_golfer, is_A=False, opponent=team1_B_golfer, subbing_for_golfer=team2_B_subbing_for, is_teammate_subbing=team2_B_has_no_sub)
-        
-        # print subbing for golfers (only for normal matchups)
-        if not (team1_both_absent_no_sub or team2_both_absent_no_sub):
-            print(f'{team1_A_golfer.name} is subbing for {team1_A_subbing_for.name}') if team1_A_subbing_for else print(f'{team1_A_golfer.name} is not subbing')
-            print(f'{team2_A_golfer.name} is subbing for {team2_A_subbing_for.name}') if team2_A_subbing_for else print(f'{team2_A_golfer.name} is not subbing')
-            print(f'{team1_B_golfer.name} is subbing for {team1_B_subbing_for.name}') if team1_B_subbing_for else print(f'{team1_B_golfer.name} is not subbing')
-            print(f'{team2_B_golfer.name} is subbing for {team2_B_subbing_for.name}') if team2_B_subbing_for else print(f'{team2_B_golfer.name} is not subbing')
+            playing_teams.extend(teams)
+            for is_A, (golfer, subbing_for, teammate), (opponent, opp_subbing_for, opp_teammate) in zip((True, False), team1_slots, team2_slots):
+                pair(golfer, opponent, is_A, subbing_for, teammate)
+                pair(opponent, golfer, is_A, opp_subbing_for, opp_teammate)
+
+    if unopposed:
+        drawn_teams = {
+            drawn.absent_team_id: drawn.drawn_team
+            for drawn in RandomDrawnTeam.objects.filter(week=week).select_related('drawn_team').prefetch_related('drawn_team__golfers')
+        }
+        playing_teams.extend(present for present, _, _ in unopposed)
+        for present_team, absent_team, slots in unopposed:
+            virtual_team = drawn_teams.get(absent_team.id)
+            if virtual_team is None:
+                candidates = [team for team in playing_teams if team.id not in (present_team.id, absent_team.id)]
+                if not candidates:
+                    logger.warning('No teams available for virtual matchup for team %s', present_team)
+                    continue
+                virtual_team = random.choice(candidates)
+                RandomDrawnTeam.objects.create(week=week, absent_team=absent_team, drawn_team=virtual_team)
+                logger.info('Created new virtual team assignment: %s for absent team: %s', virtual_team, absent_team)
+
+            virtual_golfers = list(virtual_team.golfers.all())
+            if len(virtual_golfers) != 2:
+                logger.warning('Virtual team %s does not have exactly 2 golfers', virtual_team)
+                continue
+            # Lower handicap golfer is A, higher handicap golfer is B
+            virtual_golfers.sort(key=lambda golfer: handicaps.get(golfer.id, 0))
+
+            # Only the present team gets matchups, not its virtual opponents
+            for is_A, (golfer, subbing_for, _), opponent in zip((True, False), slots, virtual_golfers):
+                pair(golfer, opponent, is_A, subbing_for, False, opponent_team_no_subs=True)
+
+    fields = ['is_A', 'subbing_for_golfer_id', 'is_teammate_subbing', 'opponent_team_no_subs']
+    existing = {(gm.golfer_id, gm.opponent_id): gm for gm in GolferMatchup.objects.filter(week=week)}
+    stale = [key for key in existing if key not in desired]
+    created = [gm for key, gm in desired.items() if key not in existing]
+    updated = []
+    for key, gm in desired.items():
+        current = existing.get(key)
+        if current is not None and any(getattr(current, name) != getattr(gm, name) for name in fields):
+            for name in fields:
+                setattr(current, name, getattr(gm, name))
+            updated.append(current)
+
+    rounds_deleted = 0
+    with transaction.atomic():
+        if stale:
+            # Rounds, and the hole points they hold, go with their golfer matchup
+            _, deleted = GolferMatchup.objects.filter(id__in=[existing[key].id for key in stale]).delete()
+            rounds_deleted += deleted.get(Round._meta.label, 0)
+        if updated:
+            GolferMatchup.objects.bulk_update(updated, fields)
+        if created:
+            GolferMatchup.objects.bulk_create(created)
+        if existing:
+            # Kept pairings lose their round once the golfer has no scores, as on a full rebuild
+            rounds_deleted += Round.objects.filter(week=week).exclude(
+                golfer_id__in=Score.objects.filter(week=week).values('golfer_id')
+            ).delete()[0]
+        if rounds_deleted:
+            # Points from the deleted rounds come off the standings and stats straight away,
+            # without waiting for the week to be scored again
+            refresh_team_standings(week.season, halves=[half_for_week(week)])
+            refresh_score_distribution(week.season, weeks=[week])
+        if stale or updated or created:
+            # Bulk writes send no signals, so the cached pages are told directly
+            bump_data_version(pk=week.season_id)
+
+    return {'created': len(created), 'updated': len(updated), 'deleted': len(stale)}
+
+
+# Repeats: the front and back nine par totals, and standings refreshed by scoring and after it
+@query_budget(45, duplicates=2)
+def process_week(week):
+    """
+    Brings handicaps, golfer matchups and rounds up to date after a week changes.
 
+    Only the work reachable from the season's dirty marks is redone (see
+    ``main.recompute.process_dirty_weeks``); ``week`` itself is always processed.
 
-def create_virtual_matchups_for_team(week, present_team, team_A_golfer, team_B_golfer, team_A_subbing_for, team_B_subbing_for):
-    """
-    Create virtual matchups for a team that has no opponents due to the opposing team having both golfers absent with no_sub.
-    
     Args:
-        week: The week object
-        present_team: The team that is present and needs virtual opponents
-        team_A_golfer: The A golfer from the present team
-        team_B_golfer: The B golfer from the present team  
-        team_A_subbing_for: Who the A golfer is subbing for (if anyone)
-        team_B_subbing_for: Who the B golfer is subbing for (if anyone)
-    """
-    # Find the absent team (the team this present team was supposed to play against)
-    matchup = Matchup.objects.get(week=week, teams=present_team)
-    absent_team = matchup.teams.exclude(id=present_team.id).first()
-    
-    # Check if RandomDrawnTeam already exists for this absent team and week
-    random_drawn_team_obj = RandomDrawnTeam.objects.filter(week=week, absent_team=absent_team).first()
-    
-    if random_drawn_team_obj:
-        virtual_team = random_drawn_team_obj.drawn_team
-        print(f'Using existing virtual team: {virtual_team} for absent team: {absent_team}')
-    else:
-        # Get all teams that actually played this week (have golfer matchups)
-        playing_teams = Team.objects.filter(
-            season=week.season,
-            golfers__golfermatchup__week=week
-        ).exclude(id=present_team.id).exclude(id=absent_team.id).distinct()
-        
-        if not playing_teams.exists():
-            print(f'No teams available for virtual matchup for team {present_team}')
-            return
-            
-        # Randomly select a team
-        virtual_team = random.choice(list(playing_teams))
-        
-        # Create RandomDrawnTeam record
-        random_drawn_team_obj = RandomDrawnTeam.objects.create(
-            week=week,
-            absent_team=absent_team,
-            drawn_team=virtual_team
-        )
-        print(f'Created new virtual team assignment: {virtual_team} for absent team: {absent_team}')
-    
-    # Get the virtual opponents from the drawn team
-    # We need to match A golfers with A golfers and B golfers with B golfers
-    # Determine A/B status directly from handicaps since GolferMatchup objects might not exist yet
-    virtual_team_golfers = list(virtual_team.golfers.all())
-    
-    if len(virtual_team_golfers) != 2:
-        print(f'Virtual team {virtual_team} does not have exactly 2 golfers')
-        return
-    
-    virtual_golfer1 = virtual_team_golfers[0]
-    virtual_golfer2 = virtual_team_golfers[1]
-    
-    # Get handicaps to determine A/B status
-    virtual_golfer1_hcp = get_hcp(virtual_golfer1, week)
-    virtual_golfer2_hcp = get_hcp(virtual_golfer2, week)
-    
-    # Lower handicap golfer is A, higher handicap golfer is B
-    if virtual_golfer1_hcp <= virtual_golfer2_hcp:
-        virtual_A_golfer = virtual_golfer1
-        virtual_B_golfer = virtual_golfer2
-    else:
-        virtual_A_golfer = virtual_golfer2
-        virtual_B_golfer = virtual_golfer1
-    
-    # Create virtual golfer matchups for the present team
-    # Note: We only create matchups for the present team, not the virtual opponents
-    GolferMatchup.objects.create(
-        week=week, 
-        golfer=team_A_golfer, 
-        is_A=True, 
-        opponent=virtual_A_golfer, 
-        subbing_for_golfer=team_A_subbing_for, 
-        is_teammate_subbing=False,  # They're not subbing for teammates in this case
-        opponent_team_no_subs=True
-    )
-    
-    GolferMatchup.objects.create(
-        week=week, 
-        golfer=team_B_golfer, 
-        is_A=False, 
-        opponent=virtual_B_golfer, 
-        subbing_for_golfer=team_B_subbing_for, 
-        is_teammate_subbing=False,  # They're not subbing for teammates in this case
-        opponent_team_no_subs=True
-    )
-    
-    print(f'Created virtual matchups: {team_A_golfer.name} vs {virtual_A_golfer.name} (A), {team_B_golfer.name} vs {virtual_B_golfer.name} (B)')
+        week (Week): The week that was just completed or edited.
 
+    Returns:
+        dict: ``handicaps_changed`` and the ``weeks_processed`` numbers.
+    """
+    from main.recompute import process_dirty_weeks
 
-def process_week(week):
-    
-    # generate the handicaps for the next week
-    calculate_and_save_handicaps_for_season(week.season)
+    return process_dirty_weeks(week.season, up_to_week=week)
 
-    # get all weeks before this week including this week
-    weeks = Week.objects.filter(season=week.season, number__lte=week.number, rained_out=False)
-    for week in weeks:
-        generate_golfer_matchups(week)
-    
-        # get the golfer matchups for the week
-        golfer_matchups = GolferMatchup.objects.filter(week=week)
 
-        for golfer_matchup in golfer_matchups:
-            generate_round(golfer_matchup)
-        
-        
 def get_playing_golfers_for_week(week):
     """
     Get all golfers who are actually playing in a given week (including subs)
     """
     playing_golfers = set()
-    # Get all teams for the season
-    teams = Team.objects.filter(season=week.season)
+    # Get all teams for the season, and the week's subs by absent golfer
+    teams = Team.objects.filter(season=week.season).prefetch_related('golfers')
+    subs = {}
+    for sub in Sub.objects.filter(week=week).select_related('sub_golfer'):
+        subs[sub.absent_golfer_id] = sub
     for team in teams:
         team_golfers = team.golfers.all()
         for golfer in team_golfers:
             # Check if golfer is playing (not absent or has a sub)
-            sub = Sub.objects.filter(week=week, absent_golfer=golfer).first()
+            sub = subs.get(golfer.id)
             if not sub or (sub and sub.sub_golfer):
                 # Golfer is playing (either directly or via sub)
                 if sub and sub.sub_golfer:
@@ -1205,17 +925,18 @@ def get_earliest_week_without_full_matchups(season=None):
     team_count = Team.objects.filter(season=season).count()
     expected_matchups = team_count // 2 if team_count > 0 else 0
 
-    # Get all non-rained-out weeks for the season ordered by week number
-    weeks = Week.objects.filter(season=season, rained_out=False).order_by('number')
-
-    for week in weeks:
-        matchup_count = Matchup.objects.filter(week=week).count()
-        if matchup_count < expected_matchups:
-            return week
-
-    return None
+    # Earliest non-rained-out week with too few matchups
+    return (
+        Week.objects.filter(season=season, rained_out=False)
+        .annotate(matchup_count=Count('matchup'))
+        .filter(matchup_count__lt=expected_matchups)
+        .order_by('number')
+        .first()
+    )
 
 
+# Repeats: standings are rebuilt once more after the weeks
+@query_budget(15, duplicates=1, per_week=27)
 def process_season(season):
     """
     Process an entire season by generating handicaps, golfer matchups, and rounds for all weeks.
@@ -1231,20 +952,23 @@ def process_season(season):
     Returns:
         dict: A summary of what was processed including counts of handicaps, matchups, and rounds generated
     """
-    print(f"Starting to process season {season.year}...")
+    from main.recompute import clear_dirty_weeks
+    from main.scoring import score_week
+    from main.standings import refresh_team_standings
+
+    logger.info("Starting to process season %s...", season.year)
+
+    # A full pass supersedes any pending incremental work
+    clear_dirty_weeks(season)
     
     # Get all weeks in the season that have been played (have scores)
     weeks = Week.objects.filter(season=season).order_by('number')
-    played_weeks = []
-    
-    for week in weeks:
-        if Score.objects.filter(week=week).exists():
-            played_weeks.append(week)
+    played_weeks = list(weeks.filter(score__isnull=False).distinct().select_related('season__course_config'))
     
-    print(f"Found {len(played_weeks)} weeks with scores out of {weeks.count()} total weeks")
+    logger.info("Found %s weeks with scores out of %s total weeks", len(played_weeks), weeks.count())
     
     if not played_weeks:
-        print("No weeks with scores found. Nothing to process.")
+        logger.info("No weeks with scores found. Nothing to process.")
         return {
             'season': season.year,
             'handicaps_generated': 0,
@@ -1255,19 +979,19 @@ def process_season(season):
         }
     
     # Step 1: Calculate and save handicaps for the entire season
-    print("Calculating handicaps...")
+    logger.info("Calculating handicaps...")
     calculate_and_save_handicaps_for_season(season)
     
     # Count handicaps generated
     handicaps_count = Handicap.objects.filter(week__season=season).count()
-    print(f"Generated {handicaps_count} handicaps")
+    logger.info("Generated %s handicaps", handicaps_count)
     
     # Step 2: Generate golfer matchups and rounds for each played week
     total_matchups = 0
     total_rounds = 0
     
     for week in played_weeks:
-        print(f"Processing week {week.number}...")
+        logger.info("Processing week %s...", week.number)
         
         # Generate golfer matchups for this week
         generate_golfer_matchups(week)
@@ -1275,28 +999,21 @@ def process_season(season):
         # Count matchups generated for this week
         week_matchups = GolferMatchup.objects.filter(week=week).count()
         total_matchups += week_matchups
-        print(f"  Generated {week_matchups} golfer matchups")
+        logger.info("  Generated %s golfer matchups", week_matchups)
         
-        # Generate rounds for each matchup
-        golfer_matchups = GolferMatchup.objects.filter(week=week)
-        week_rounds = 0
-        
-        for golfer_matchup in golfer_matchups:
-            try:
-                generate_round(golfer_matchup)
-                week_rounds += 1
-            except Exception as e:
-                print(f"  Error generating round for {golfer_matchup.golfer.name}: {e}")
+        # Generate rounds for every matchup in the week in one pass
+        week_rounds = score_week(week)
         
         total_rounds += week_rounds
-        print(f"  Generated {week_rounds} rounds")
+        logger.info("  Generated %s rounds", week_rounds)
+    
+    # Rebuild standings once more in case regenerating matchups dropped rounds
+    refresh_team_standings(season)
     
-    print(f"Season {season.year} processing complete!")
-    print(f"Summary:")
-    print(f"  - Handicaps generated: {handicaps_count}")
-    print(f"  - Golfer matchups generated: {total_matchups}")
-    print(f"  - Rounds generated: {total_rounds}")
-    print(f"  - Weeks processed: {len(played_weeks)}")
+    logger.info(
+        "Season %s processing complete: %s handicaps, %s golfer matchups, %s rounds, %s weeks",
+        season.year, handicaps_count, total_matchups, total_rounds, len(played_weeks),
+    )
     
     return {
         'season': season.year,
@@ -0,0 +1,84 @@
+"""Top-N leaderboards with ties.
+
+A leaderboard keeps every row ranked N or better, so a tie for fifth shows all
+the tied golfers. Ranks are competition ranks like SQL's ``RANK()`` (1, 2, 2,
+4) or, with ``dense=True``, dense ranks like ``DENSE_RANK()`` (1, 2, 2, 3).
+
+:func:`top_n_with_ties` ranks a queryset in the database with a window function
+and fetches only the rows within the top N. :func:`rank_with_ties` ranks rows
+already in memory the same way; :func:`top_n_with_ties` falls back to it on a
+database without window functions.
+"""
+
+from operator import itemgetter
+
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import DenseRank, Rank
+
+# Annotation holding a row's rank in the window query
+RANK = 'leaderboard_rank'
+
+
+def rank_with_ties(rows, key, n, reverse=False, dense=False):
+    """The rows ranked ``n`` or better by ``key``, best first.
+
+    Args:
+        rows (iterable): Rows in any order; tied rows keep their relative order.
+        key (callable or str): The value to rank by, or the dict key holding it. Lowest is best.
+        n (int): Lowest rank to keep.
+        reverse (bool): Highest is best.
+        dense (bool): Dense ranks instead of competition ranks.
+
+    Returns:
+        list[tuple[int, object]]: ``(rank, row)`` pairs.
+    """
+    if isinstance(key, str):
+        key = itemgetter(key)
+    ranked = []
+    rank = 0
+    previous = None
+    for position, row in enumerate(sorted(rows, key=key, reverse=reverse), start=1):
+        value = key(row)
+        if position == 1 or value != previous:
+            rank = rank + 1 if dense else position
+            if rank > n:
+                break
+            previous = value
+        ranked.append((rank, row))
+    return ranked
+
+
+def top_n_with_ties(queryset, field, n, reverse=False, dense=False):
+    """The rows of ``queryset`` ranked ``n`` or better by ``field``, best first.
+
+    Runs one query that ranks the rows with ``RANK()`` (or ``DENSE_RANK()``)
+    over ``field`` and keeps those ranked ``n`` or better.
+
+    Args:
+        queryset (QuerySet): Model or ``values()`` queryset; its ordering breaks ties.
+        field (str): Field or annotation to rank by. Lowest is best.
+        n (int): Lowest rank to keep.
+        reverse (bool): Highest is best.
+        dense (bool): Dense ranks instead of competition ranks.
+
+    Returns:
+        list[tuple[int, object]]: ``(rank, row)`` pairs; a row is a model
+        instance, or a dict for a ``values()`` queryset.
+    """
+    tiebreak = queryset.query.order_by
+    if not connections[queryset.db].features.supports_over_clause:
+        key = itemgetter(field) if queryset._fields is not None else lambda row: getattr(row, field)
+        return rank_with_ties(queryset, key, n, reverse=reverse, dense=dense)
+
+    ranking = DenseRank() if dense else Rank()
+    order = F(field).desc() if reverse else F(field).asc()
+    ranked = (
+        queryset
+        .annotate(**{RANK: Window(ranking, order_by=order)})
+        .filter(**{f'{RANK}__lte': n})
+        .order_by(RANK, *tiebreak)
+    )
+    if queryset._fields is not None:
+        return [(row.pop(RANK), row) for row in ranked]
+    return [(getattr(row, RANK), row) for row in ranked]
@@ -1,29 +1,103 @@
-"""Resolve which league a request belongs to and scope Season queries."""
+"""Resolve which league a request belongs to and scope Season queries.
+
+Leagues and seasons change rarely, so they are held in a process-level
+snapshot (two small queries to build) that is dropped whenever a ``League`` or
+``Season`` is saved or deleted (see ``main.signals``). Snapshots also expire
+after ``LEAGUE_CACHE_TIMEOUT`` seconds so other worker processes catch up.
+Callers always receive copies of the cached model instances.
+
+Manager status grants write access, so it is never cached across requests:
+:class:`RequestLeagueScope` queries it at most once per request and league.
+"""
+
+import copy
+import time
+from collections import defaultdict
+from functools import cached_property
 
 from django.conf import settings
 
-from main.models import League
+from main.models import League, Season
+
+_snapshot = None
+
+
+class _LeagueSnapshot:
+    def __init__(self):
+        timeout = getattr(settings, 'LEAGUE_CACHE_TIMEOUT', 60)
+        self.expires = time.monotonic() + timeout
+        self.leagues = list(League.objects.order_by('pk'))
+        self.by_slug = {league.slug: league for league in self.leagues}
+        self.seasons = defaultdict(list)
+        for season in Season.objects.select_related('league').order_by('-year'):
+            self.seasons[season.league_id].append(season)
+
+
+def _leagues():
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None or snapshot.expires < time.monotonic():
+        snapshot = _snapshot = _LeagueSnapshot()
+    return snapshot
+
+
+def invalidate_league_cache(**kwargs):
+    """Drop the cached leagues and seasons (connected to League/Season signals)."""
+    global _snapshot
+    _snapshot = None
 
 
 def get_default_league():
     """Primary league for this site when the URL does not specify one."""
+    snapshot = _leagues()
     slug = getattr(settings, 'DEFAULT_LEAGUE_SLUG', '') or None
-    if slug:
-        league = League.objects.filter(slug=slug).first()
-        if league:
-            return league
-    return League.objects.order_by('pk').first()
+    league = snapshot.by_slug.get(slug) if slug else None
+    if league is None and snapshot.leagues:
+        league = snapshot.leagues[0]
+    return copy.copy(league)
 
 
 def resolve_league(slug=None):
     """Return the League for an optional URL slug, else the default league."""
     if slug:
-        league = League.objects.filter(slug=slug).first()
+        league = _leagues().by_slug.get(slug)
         if league:
-            return league
+            return copy.copy(league)
     return get_default_league()
 
 
+def league_seasons(league):
+    """Seasons of ``league``, newest first."""
+    if league is None:
+        return []
+    return [copy.copy(season) for season in _leagues().seasons.get(league.pk, [])]
+
+
+def latest_season(league):
+    """Most recent season of ``league``, or None."""
+    seasons = _leagues().seasons.get(league.pk, []) if league is not None else []
+    return copy.copy(seasons[0]) if seasons else None
+
+
+def season_for_year(league, year):
+    """Season of ``league`` for calendar ``year``, or None."""
+    if league is None:
+        return None
+    for season in _leagues().seasons.get(league.pk, []):
+        if season.year == year:
+            return copy.copy(season)
+    return None
+
+
+def is_league_manager(user, league):
+    """Whether ``user`` may manage ``league`` (superusers manage every league)."""
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    return league is not None and league.managers.filter(pk=user.pk).exists()
+
+
 def first_year_in_path_parts(parts):
     """First path segment that looks like a 4-digit calendar year ([12]ddd)."""
     for p in parts:
@@ -44,8 +118,68 @@ def league_and_year_from_path(path):
     if not parts:
         return get_default_league(), None
     first = parts[0]
-    if League.objects.filter(slug=first).exists():
-        league = League.objects.get(slug=first)
+    league = _leagues().by_slug.get(first)
+    if league is not None:
         year = first_year_in_path_parts(parts[1:])
-        return league, year
+        return copy.copy(league), year
     return get_default_league(), first_year_in_path_parts(parts)
+
+
+class RequestLeagueScope:
+    """League, season and manager status for one request, each resolved at most once.
+
+    Attached to ``request.league_scope`` by :class:`main.middleware.LeagueScopeMiddleware`.
+    ``season`` is the season for the year in the path, falling back to the latest one.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        # {league id: whether the request's user manages it}
+        self._manages = {}
+
+    @cached_property
+    def _path(self):
+        return league_and_year_from_path(self.request.path)
+
+    @property
+    def league(self):
+        return self._path[0]
+
+    @property
+    def path_year(self):
+        return self._path[1]
+
+    @cached_property
+    def all_seasons(self):
+        return league_seasons(self.league)
+
+    @cached_property
+    def latest_season(self):
+        return self.all_seasons[0] if self.all_seasons else None
+
+    @cached_property
+    def season(self):
+        if self.path_year is not None:
+            for season in self.all_seasons:
+                if season.year == self.path_year:
+                    return season
+        return self.latest_season
+
+    @property
+    def is_league_manager(self):
+        return self.manages(self.league)
+
+    def manages(self, league):
+        """Whether the request's user manages ``league``, queried once per request."""
+        key = league.pk if league is not None else None
+        if key not in self._manages:
+            self._manages[key] = is_league_manager(getattr(self.request, 'user', None), league)
+        return self._manages[key]
+
+
+def request_league_scope(request):
+    """The request's :class:`RequestLeagueScope`, creating one if the middleware did not run."""
+    scope = getattr(request, 'league_scope', None)
+    if scope is None:
+        scope = request.league_scope = RequestLeagueScope(request)
+    return scope
@@ -0,0 +1,109 @@
+import statistics
+import time
+from dataclasses import replace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from main.helper import calculate_and_save_handicaps_for_season, generate_golfer_matchups, process_week
+from main.models import Team, Week
+from main.synthetic import REAL_LEAGUE, generate_league, scaled
+
+TARGETS = [
+    'process_week', 'calculate_and_save_handicaps_for_season', 'generate_golfer_matchups',
+    'main', 'scorecards', 'golfer_stats', 'league_stats', 'historics',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Build synthetic leagues at several multiples of the real league size and report wall time and SQL '
+        'query counts for week processing, handicaps, golfer matchups and the public pages. Everything runs '
+        'inside a transaction that is rolled back, but use a scratch database all the same.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=float, nargs='+', default=[1, 5, 20], help='Multiples of the real team count (default: 1 5 20).')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per target; the median is reported (default: 3).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--teams', type=int, default=REAL_LEAGUE.teams, help='Teams per season at scale 1.')
+        parser.add_argument('--seasons', type=int, default=REAL_LEAGUE.seasons)
+        parser.add_argument('--weeks', type=int, default=REAL_LEAGUE.weeks)
+        parser.add_argument('--targets', nargs='+', choices=TARGETS, default=TARGETS)
+
+    def handle(self, *args, **options):
+        base = replace(REAL_LEAGUE, teams=options['teams'], seasons=options['seasons'], weeks=options['weeks'])
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        # {target: {scale: (seconds, queries)}}
+        results = {target: {} for target in options['targets']}
+        for scale in options['scales']:
+            spec = scaled(scale, base)
+            with transaction.atomic():
+                started = time.perf_counter()
+                league = generate_league(spec, seed=options['seed'])
+                self.stdout.write(
+                    f'{scale:g}x: {spec.teams} teams, {spec.seasons} seasons of {spec.weeks} weeks '
+                    f'built and processed in {time.perf_counter() - started:.1f}s'
+                )
+                for target, run in self._targets(league, options['targets']):
+                    results[target][scale] = self._measure(run, options['repeat'])
+                transaction.set_rollback(True)
+            cache.clear()
+
+        self._report(results, options['scales'])
+
+    def _targets(self, league, names):
+        season = league.seasons.order_by('-year').first()
+        week = Week.objects.filter(season=season, scores_entered__gt=0).order_by('-date').first()
+        golfer = Team.objects.filter(season=season).first().golfers.first()
+        client = Client()
+        urls = {
+            'main': reverse('main_with_league_year', kwargs={'league_slug': league.slug, 'year': season.year}),
+            'scorecards': reverse('scorecards_with_league_year', kwargs={'league_slug': league.slug, 'year': season.year, 'week': week.number}),
+            'golfer_stats': reverse('golfer_stats_with_league_year', kwargs={'league_slug': league.slug, 'year': season.year, 'golfer_id': golfer.id}),
+            'league_stats': reverse('league_stats_with_league_year', kwargs={'league_slug': league.slug, 'year': season.year}),
+            'historics': reverse('historics_with_league', kwargs={'league_slug': league.slug}),
+        }
+
+        def render(url):
+            def run():
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'GET {url} returned {response.status_code}')
+            return run
+
+        runs = {
+            'process_week': lambda: process_week(week),
+            'calculate_and_save_handicaps_for_season': lambda: calculate_and_save_handicaps_for_season(season),
+            'generate_golfer_matchups': lambda: generate_golfer_matchups(week),
+        }
+        runs.update({name: render(url) for name, url in urls.items()})
+        return [(name, runs[name]) for name in names]
+
+    def _measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            # Pages are measured cold: nothing cached from an earlier run
+            cache.clear()
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - started)
+        return statistics.median(timings), len(queries)
+
+    def _report(self, results, scales):
+        header = f"{'target':<42}" + ''.join(f'{f"{scale:g}x ms":>12}{"queries":>9}' for scale in scales)
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for target, by_scale in results.items():
+            self.stdout.write(f'{target:<42}' + ''.join(
+                f'{by_scale[scale][0] * 1000:>12.1f}{by_scale[scale][1]:>9}' for scale in scales
+            ))
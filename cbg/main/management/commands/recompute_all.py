@@ -0,0 +1,152 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Django and the models are only imported inside functions: pool workers started
+# with "spawn" import this module before Django is set up.
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class _InlineExecutor:
+    """Runs submitted work straight away in this process (``--workers 1``)."""
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute handicaps, golfer matchups, rounds, standings, skins and payouts for every season, '
+        'spreading seasons and the weeks within them over a pool of worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--league', help='Only recompute seasons of the league with this slug.')
+        parser.add_argument('--year', type=int, action='append', dest='years', help='Only recompute this season year (repeatable).')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes (default: one per CPU). 1 runs everything in this process.',
+        )
+
+    def handle(self, *args, **options):
+        from django.db import connections
+        from main.models import Season
+        from main.recompute import finish_season_recompute, prepare_season_recompute, recompute_week
+        from main.task_coordination import season_run
+        from main.tasks import recalculate_all_async
+
+        seasons = Season.objects.select_related('league').order_by('league__name', 'year')
+        if options['league']:
+            seasons = seasons.filter(league__slug=options['league'])
+        if options['years']:
+            seasons = seasons.filter(year__in=options['years'])
+        seasons = list(seasons)
+        if not seasons:
+            raise CommandError('No seasons match.')
+        workers = max(1, options['workers'])
+
+        started = time.perf_counter()
+        with ExitStack() as locks:
+            # Hold each season's task lock so signal-driven recomputes wait for this run
+            stats = {}
+            for season in seasons:
+                if locks.enter_context(season_run(recalculate_all_async, season.pk, season.pk)):
+                    stats[season.pk] = {
+                        'season': season, 'weeks': 0, 'handicaps': 0, 'matchups': 0, 'rounds': 0,
+                        'remaining': 0, 'seconds': 0.0, 'started': time.perf_counter(), 'errors': [],
+                    }
+                else:
+                    self.stderr.write(self.style.WARNING(f'Skipping {season}: it is already being recomputed'))
+
+            if workers == 1:
+                executor = _InlineExecutor()
+            else:
+                # Each worker opens its own connection; forked workers must not inherit ours
+                connections.close_all()
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+            with executor:
+                pending = {
+                    executor.submit(_timed, prepare_season_recompute, season_id): ('prepare', season_id)
+                    for season_id in stats
+                }
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, season_id = pending.pop(future)
+                        season_stats = stats[season_id]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            season_stats['errors'].append(f'{stage}: {e}')
+                            if stage == 'prepare':
+                                self._report(season_stats)
+                                continue
+                            result = {'matchups': 0, 'rounds': 0, 'seconds': 0.0}
+                        season_stats['seconds'] += result['seconds']
+
+                        if stage == 'prepare':
+                            season_stats['handicaps'] = result['handicaps']
+                            season_stats['weeks'] = season_stats['remaining'] = len(result['week_ids'])
+                            for week_id in result['week_ids']:
+                                pending[executor.submit(_timed, recompute_week, week_id)] = ('week', season_id)
+                        elif stage == 'week':
+                            season_stats['matchups'] += result['matchups']
+                            season_stats['rounds'] += result['rounds']
+                            season_stats['remaining'] -= 1
+                        else:
+                            self._report(season_stats)
+                            continue
+
+                        if season_stats['remaining'] == 0:
+                            pending[executor.submit(_timed, finish_season_recompute, season_id)] = ('finish', season_id)
+
+        elapsed = time.perf_counter() - started
+        totals = {key: sum(s[key] for s in stats.values()) for key in ('weeks', 'handicaps', 'matchups', 'rounds', 'seconds')}
+        self.stdout.write(
+            f"Total: {len(stats)} seasons, {totals['weeks']} weeks, {totals['handicaps']} handicaps, "
+            f"{totals['matchups']} golfer matchups, {totals['rounds']} rounds in {elapsed:.1f}s "
+            f"({totals['seconds']:.1f}s of work on {workers} worker{'s' if workers != 1 else ''})"
+        )
+        failed = [s for s in stats.values() if s['errors']]
+        if failed:
+            raise CommandError(f"{len(failed)} season(s) had errors: {', '.join(str(s['season']) for s in failed)}")
+        self.stdout.write(self.style.SUCCESS('Recompute complete.'))
+
+    def _report(self, season_stats):
+        elapsed = time.perf_counter() - season_stats['started']
+        line = (
+            f"{season_stats['season']}: {season_stats['weeks']} weeks, {season_stats['handicaps']} handicaps, "
+            f"{season_stats['matchups']} golfer matchups, {season_stats['rounds']} rounds in {elapsed:.1f}s "
+            f"({season_stats['seconds']:.1f}s of work)"
+        )
+        if season_stats['errors']:
+            self.stdout.write(self.style.ERROR(f"{line}; errors: {'; '.join(season_stats['errors'])}"))
+        else:
+            self.stdout.write(line)
@@ -1,23 +1,21 @@
 from django.core.management.base import BaseCommand
-from main.models import Week, SkinEntry
-from main.skins import calculate_skin_winners
+from main.models import Season
+from main.page_cache import bump_data_version
+from main.payouts import record_game_payouts
+from main.skins import SeasonSkins, mark_skin_winners
 
 class Command(BaseCommand):
-    help = 'Reset and set SkinEntry.winner for all weeks across all seasons.'
+    help = 'Reset and set skins winners, skins results and the skins/games payout ledger for all weeks across all seasons.'
 
     def handle(self, *args, **options):
-        weeks = Week.objects.all().order_by('season__year', 'number')
-        total_weeks = weeks.count()
-        self.stdout.write(f'Processing {total_weeks} weeks...')
+        seasons = Season.objects.all().order_by('year')
         updated_weeks = 0
-        for week in weeks:
-            # Reset all winners for this week
-            SkinEntry.objects.filter(week=week).update(winner=False)
-            # Calculate new winners
-            skin_winners = calculate_skin_winners(week)
-            for winner in skin_winners:
-                golfer = winner['golfer']
-                SkinEntry.objects.filter(week=week, golfer=golfer).update(winner=True)
-            updated_weeks += 1
-            self.stdout.write(f'Processed week {week.number} ({week.season.year})')
+        for season in seasons:
+            # Every week of the season is loaded and settled in one pass
+            skins = SeasonSkins(season)
+            won = mark_skin_winners(skins)
+            record_game_payouts(skins.weeks)
+            bump_data_version(pk=season.pk)
+            updated_weeks += len(skins.weeks)
+            self.stdout.write(f'Processed {len(skins.weeks)} weeks ({season.year}): {len(won)} winning entries')
         self.stdout.write(self.style.SUCCESS(f'Successfully set skins winners for {updated_weeks} weeks.'))
@@ -0,0 +1,45 @@
+import time
+
+from main.league_scope import RequestLeagueScope
+from main.profiling import end_profile, record, should_sample, start_profile
+from main.query_budget import log_queries
+
+
+class LeagueScopeMiddleware:
+    """Attach a :class:`~main.league_scope.RequestLeagueScope` to every request as ``request.league_scope``.
+
+    Nav rendering and views read the league, season, latest season and manager
+    status from it instead of resolving them again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.league_scope = RequestLeagueScope(request)
+        return self.get_response(request)
+
+
+class RequestProfilingMiddleware:
+    """Profile sampled requests when ``REQUEST_PROFILING`` is on (see :mod:`main.profiling`).
+
+    List it first so its timings cover the rest of the middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_sample():
+            return self.get_response(request)
+        profile = start_profile()
+        started = time.perf_counter()
+        try:
+            with log_queries(origins=False) as queries:
+                response = self.get_response(request)
+        finally:
+            end_profile()
+        profile.finish(request, response, queries, time.perf_counter() - started)
+        response['Server-Timing'] = profile.server_timing()
+        record(profile)
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_golfer_leagues'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('score', 'Score'), ('sub', 'Sub'), ('matchup', 'Matchup')], max_length=10)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('golfer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='main.golfer')),
+                ('week', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dirty_marks', to='main.week')),
+            ],
+            options={
+                'verbose_name': 'Dirty Week',
+                'verbose_name_plural': 'Dirty Weeks',
+                'unique_together': {('week', 'golfer', 'reason')},
+            },
+        ),
+    ]
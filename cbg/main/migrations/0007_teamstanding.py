@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_dirtyweek'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('half', models.PositiveSmallIntegerField(choices=[(1, 'First Half'), (2, 'Second Half')])),
+                ('points', models.FloatField(default=0)),
+                ('rounds', models.PositiveIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='main.team')),
+            ],
+            options={
+                'verbose_name': 'Team Standing',
+                'verbose_name_plural': 'Team Standings',
+                'unique_together': {('team', 'half')},
+            },
+        ),
+    ]
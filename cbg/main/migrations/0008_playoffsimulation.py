@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_teamstanding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayoffSimulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('simulations', models.PositiveIntegerField()),
+                ('results', models.JSONField(default=list)),
+                ('created', models.DateTimeField(auto_now=True)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='playoff_simulations', to='main.season')),
+                ('week', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='main.week')),
+            ],
+            options={
+                'verbose_name': 'Playoff Simulation',
+                'verbose_name_plural': 'Playoff Simulations',
+                'ordering': ['-created'],
+                'unique_together': {('season', 'week')},
+            },
+        ),
+    ]
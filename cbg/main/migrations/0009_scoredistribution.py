@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_playoffsimulation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_par', models.SmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('golfer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.golfer')),
+                ('hole', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.hole')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_distribution', to='main.season')),
+                ('week', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.week')),
+            ],
+            options={
+                'verbose_name': 'Score Distribution',
+                'verbose_name_plural': 'Score Distribution',
+                'unique_together': {('week', 'golfer', 'hole', 'to_par')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_scoredistribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('changed', models.DateTimeField(default=django.utils.timezone.now)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='data_version', to='main.season')),
+            ],
+            options={
+                'verbose_name': 'Data Version',
+                'verbose_name_plural': 'Data Versions',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_entered_scores(apps, schema_editor):
+    Week = apps.get_model('main', 'Week')
+    Score = apps.get_model('main', 'Score')
+    counts = Score.objects.filter(week=OuterRef('pk')).order_by().values('week').annotate(n=Count('id')).values('n')
+    Week.objects.update(scores_entered=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='week',
+            name='scores_entered',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='week',
+            index=models.Index(fields=['season', 'number'], name='main_week_season__a59255_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='week',
+            index=models.Index(fields=['season', 'date'], name='main_week_season__5b243c_idx'),
+        ),
+        migrations.RunPython(count_entered_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_week_scores_entered'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SKINS', 'Skins'), ('GAMES', 'Games')], max_length=10)),
+                ('wagered', models.PositiveIntegerField(default=0)),
+                ('won', models.FloatField(default=0)),
+                ('golfer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.golfer')),
+                ('week', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.week')),
+            ],
+            options={
+                'verbose_name': 'Payout',
+                'verbose_name_plural': 'Payouts',
+                'unique_together': {('week', 'golfer', 'kind')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SkinResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField(blank=True, null=True)),
+                ('gross', models.IntegerField(blank=True, null=True)),
+                ('payout', models.FloatField(default=0)),
+                ('golfer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='main.golfer')),
+                ('hole', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.hole')),
+                ('week', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.week')),
+            ],
+            options={
+                'verbose_name': 'Skin Result',
+                'verbose_name_plural': 'Skin Results',
+                'unique_together': {('week', 'hole')},
+            },
+        ),
+    ]
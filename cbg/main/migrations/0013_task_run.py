@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_skinresult_payout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200)),
+                ('args', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('success', 'Success'), ('deferred', 'Deferred'), ('error', 'Error')], default='running', max_length=10)),
+                ('started', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('queries', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.JSONField(default=dict)),
+                ('progress_done', models.PositiveIntegerField(default=0)),
+                ('progress_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('progress_message', models.CharField(blank=True, max_length=200)),
+                ('result', models.TextField(blank=True)),
+                ('season', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_runs', to='main.season')),
+            ],
+            options={
+                'verbose_name': 'Task Run',
+                'verbose_name_plural': 'Task Runs',
+                'ordering': ['-started'],
+                'indexes': [models.Index(fields=['task', '-started'], name='main_taskru_task_9dfc11_idx'), models.Index(fields=['season', '-started'], name='main_taskru_season__cd8e16_idx')],
+            },
+        ),
+    ]
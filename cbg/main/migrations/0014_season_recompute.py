@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_task_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='held_changed',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataversion',
+            name='held_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SeasonRecompute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('failed', 'Failed'), ('done', 'Done'), ('abandoned', 'Abandoned')], default='running', max_length=10)),
+                ('steps', models.JSONField(default=list)),
+                ('done_steps', models.JSONField(default=list)),
+                ('current', models.CharField(blank=True, max_length=50)),
+                ('lock_token', models.CharField(blank=True, max_length=32)),
+                ('started', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recomputes', to='main.season')),
+            ],
+            options={
+                'verbose_name': 'Season Recompute',
+                'verbose_name_plural': 'Season Recomputes',
+                'ordering': ['-started'],
+                'indexes': [models.Index(fields=['season', '-started'], name='main_season_season__bea14a_idx')],
+            },
+        ),
+    ]
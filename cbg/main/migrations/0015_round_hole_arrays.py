@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:28
+
+import math
+
+from django.db import migrations, models
+
+
+# Copies of helper.conventional_round and scoring.strokes_on_hole as they were when rounds got their arrays
+def _conventional_round(value):
+    return math.floor(value + 0.5)
+
+
+def _strokes_on_hole(stroke_diff, handicap9):
+    if stroke_diff <= 0:
+        return 0
+    rollover = 1 if stroke_diff > 9 else 0
+    remaining = stroke_diff - 9 if rollover else stroke_diff
+    return rollover + (1 if handicap9 <= remaining else 0)
+
+
+def fill_hole_arrays(apps, schema_editor):
+    """Build each round's hole arrays from its linked scores and points, a week at a time."""
+    Round = apps.get_model('main', 'Round')
+    Handicap = apps.get_model('main', 'Handicap')
+    ScoresLink = Round.scores.through
+    PointsLink = Round.points.through
+
+    for week_id in Round.objects.order_by().values_list('week_id', flat=True).distinct():
+        handicaps = dict(Handicap.objects.filter(week_id=week_id).values_list('golfer_id', 'handicap'))
+        # {round_id: {hole number: (handicap9, score)}}, the first linked score per hole
+        scores = {}
+        for round_id, number, handicap9, score in (
+            ScoresLink.objects.filter(round__week_id=week_id).order_by('score_id')
+            .values_list('round_id', 'score__hole__number', 'score__hole__handicap9', 'score__score')
+        ):
+            scores.setdefault(round_id, {}).setdefault(number, (handicap9, score))
+        points = {}
+        for round_id, number, hole_points in (
+            PointsLink.objects.filter(round__week_id=week_id).order_by('points_id')
+            .values_list('round_id', 'points__hole__number', 'points__points')
+        ):
+            points.setdefault((round_id, number), hole_points)
+
+        rounds = list(Round.objects.filter(week_id=week_id).select_related('handicap', 'golfer_matchup'))
+        for rnd in rounds:
+            holes = sorted(scores.get(rnd.pk, {}).items())
+            stroke_diff = (
+                _conventional_round(rnd.handicap.handicap)
+                - _conventional_round(handicaps.get(rnd.golfer_matchup.opponent_id, 0))
+            )
+            rnd.hole_gross = [score for _, (_, score) in holes]
+            rnd.hole_strokes = [_strokes_on_hole(stroke_diff, handicap9) for _, (handicap9, _) in holes]
+            rnd.hole_net = [gross - strokes for gross, strokes in zip(rnd.hole_gross, rnd.hole_strokes)]
+            rnd.hole_points = [points.get((rnd.pk, number), 0) for number, _ in holes]
+        Round.objects.bulk_update(rounds, ['hole_gross', 'hole_net', 'hole_strokes', 'hole_points'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_season_recompute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='round',
+            name='hole_gross',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='round',
+            name='hole_net',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='round',
+            name='hole_points',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='round',
+            name='hole_strokes',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(fill_hole_arrays, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='round',
+            name='points',
+        ),
+        migrations.RemoveField(
+            model_name='round',
+            name='scores',
+        ),
+        migrations.DeleteModel(
+            name='Points',
+        ),
+    ]
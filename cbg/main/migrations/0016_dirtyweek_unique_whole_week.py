@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:54
+
+from django.db import migrations, models
+
+
+def drop_duplicate_whole_week_marks(apps, schema_editor):
+    """Keep the oldest whole-week mark per week and reason."""
+    DirtyWeek = apps.get_model('main', 'DirtyWeek')
+    seen = set()
+    duplicates = []
+    for mark_id, week_id, reason in DirtyWeek.objects.filter(golfer__isnull=True).order_by('id').values_list('id', 'week_id', 'reason'):
+        if (week_id, reason) in seen:
+            duplicates.append(mark_id)
+        seen.add((week_id, reason))
+    DirtyWeek.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_round_hole_arrays'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_whole_week_marks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dirtyweek',
+            constraint=models.UniqueConstraint(condition=models.Q(('golfer__isnull', True)), fields=('week', 'reason'), name='dirtyweek_unique_whole_week'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_dirtyweek_unique_whole_week'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playoffsimulation',
+            name='data_version',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
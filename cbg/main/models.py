@@ -146,11 +146,23 @@ class Week(models.Model):
     number = models.IntegerField()
     is_front = models.BooleanField()
     num_scores = models.IntegerField(null=True, blank=True)
+    # Number of Score rows for the week. Maintained by main.signals and the bulk scorecard
+    # writer so the last/next/available week lookups never count scores week by week.
+    scores_entered = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['season__league__name', 'season__year', '-date']
+        indexes = [
+            models.Index(fields=['season', 'number']),
+            models.Index(fields=['season', 'date']),
+        ]
         verbose_name = 'Week'
         verbose_name_plural = 'Weeks'
+
+    @property
+    def scores_complete(self):
+        """Whether every expected score for the week has been entered."""
+        return self.scores_entered > 0 and (self.num_scores is None or self.scores_entered >= self.num_scores)
     
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -174,6 +186,12 @@ class Week(models.Model):
                 * 9
                 * (self.season.players_per_team)
             )
+        if not self._state.adding and 'update_fields' not in kwargs and not kwargs.get('force_insert'):
+            # Never write scores_entered back from a possibly stale instance
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'scores_entered'
+            ]
         super().save(*args, **kwargs)
         
     def __str__(self):
@@ -227,6 +245,50 @@ class SkinEntry(models.Model):
         return f'{self.week.season.league.name} {self.week.season.year} - {self.golfer.name} - {self.week.date.strftime("%Y-%m-%d")}'
 
 
+class SkinResult(models.Model):
+    # Skins outcome of one hole of a week, written when skins winners are set (see main.skins).
+    # golfer is the winner; null when the low score was tied and no skin was won.
+    week = models.ForeignKey(Week, on_delete=models.CASCADE)
+    hole = models.ForeignKey('Hole', on_delete=models.CASCADE)
+    golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE, null=True, blank=True)
+    # Winning score (net for NET skins), the gross score behind it and the skin's share of the pot
+    score = models.IntegerField(null=True, blank=True)
+    gross = models.IntegerField(null=True, blank=True)
+    payout = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ('week', 'hole')
+        verbose_name = 'Skin Result'
+        verbose_name_plural = 'Skin Results'
+
+    def __str__(self):
+        winner = self.golfer.name if self.golfer else 'No skin'
+        return f'{self.week.season.league.name} {self.week.season.year} - Week {self.week.number} - Hole {self.hole.number} - {winner}'
+
+
+class Payout(models.Model):
+    # Money ledger: what a golfer put into and took out of a week's skins or games pot.
+    # Rewritten for the week whenever its entries or winners change (see main.payouts).
+    KIND_CHOICES = [
+        ('SKINS', 'Skins'),
+        ('GAMES', 'Games'),
+    ]
+    week = models.ForeignKey(Week, on_delete=models.CASCADE)
+    golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Entry fees paid (whole dollars) and winnings
+    wagered = models.PositiveIntegerField(default=0)
+    won = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ('week', 'golfer', 'kind')
+        verbose_name = 'Payout'
+        verbose_name_plural = 'Payouts'
+
+    def __str__(self):
+        return f'{self.week.season.league.name} {self.week.season.year} - Week {self.week.number} - {self.golfer.name} - {self.get_kind_display()}: {self.won}'
+
+
 class Hole(models.Model):
     config = models.ForeignKey(CourseConfig, on_delete=models.CASCADE, related_name="holes", null=True, blank=True)
     number = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(18)])
@@ -311,22 +373,6 @@ class Sub(models.Model):
             return f'{self.week.season.league.name} {self.week.season.year} - {self.week.date.strftime("%Y-%m-%d")} - {self.sub_golfer.name} for {self.absent_golfer.name}'
         return f'{self.week.season.league.name} {self.week.season.year} - {self.week.date.strftime("%Y-%m-%d")} - {self.absent_golfer.name}'
 
-class Points(models.Model):
-    golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE)
-    week = models.ForeignKey(Week, on_delete=models.CASCADE)
-    hole = models.ForeignKey(Hole, on_delete=models.CASCADE)
-    score = models.ForeignKey(Score, on_delete=models.CASCADE)
-    opponent = models.ForeignKey(Golfer, on_delete=models.CASCADE, related_name='points_against', null=True, blank=True)
-    points = models.FloatField(validators=[MinValueValidator(0)])
-    
-    class Meta:
-        unique_together = ['golfer', 'week', 'hole', 'opponent']
-        verbose_name = 'Point'
-        verbose_name_plural = 'Points'
-    
-    def __str__(self):
-        return f'{self.golfer.name} - {self.week.date.strftime("%Y-%m-%d")} - Hole {self.hole.number} - {self.points} pts'
-        
 class Round(models.Model):
     golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE)
     is_sub = models.BooleanField(default=False)
@@ -334,8 +380,12 @@ class Round(models.Model):
     matchup = models.ForeignKey(Matchup, on_delete=models.CASCADE)
     golfer_matchup = models.ForeignKey('GolferMatchup', on_delete=models.CASCADE)
     handicap = models.ForeignKey(Handicap, on_delete=models.CASCADE)
-    points = models.ManyToManyField(Points)
-    scores = models.ManyToManyField(Score)
+    # One entry per hole of the week's nine, in hole order: the golfer's score, the score after
+    # strokes received from the opponent, those strokes, and the hole points won
+    hole_gross = models.JSONField(default=list)
+    hole_net = models.JSONField(default=list)
+    hole_strokes = models.JSONField(default=list)
+    hole_points = models.JSONField(default=list)
     gross = models.IntegerField(validators=[MinValueValidator(1)])
     net = models.IntegerField(validators=[MinValueValidator(1)])
     round_points = models.FloatField(validators=[MinValueValidator(0)])
@@ -386,4 +436,210 @@ class RandomDrawnTeam(models.Model):
         verbose_name_plural = 'Random Drawn Teams'
     
     def __str__(self):
-        return f'{self.week.season.league.name} {self.week.season.year} - {self.week.date.strftime("%Y-%m-%d")} - {self.drawn_team} plays for {self.absent_team}'
\ No newline at end of file
+        return f'{self.week.season.league.name} {self.week.season.year} - {self.week.date.strftime("%Y-%m-%d")} - {self.drawn_team} plays for {self.absent_team}'
+
+class DirtyWeek(models.Model):
+    # Records that a week's derived data (handicaps, golfer matchups, rounds) is stale.
+    # Score changes mark the golfer; Sub/Matchup changes mark the whole week (golfer is null).
+    REASON_CHOICES = [
+        ("score", "Score"),
+        ("sub", "Sub"),
+        ("matchup", "Matchup"),
+    ]
+
+    week = models.ForeignKey(Week, on_delete=models.CASCADE, related_name='dirty_marks')
+    golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE, null=True, blank=True)
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['week', 'golfer', 'reason']
+        constraints = [
+            # NULLs are distinct in unique_together, so whole-week marks need their own constraint
+            models.UniqueConstraint(
+                fields=('week', 'reason'),
+                condition=models.Q(golfer__isnull=True),
+                name='dirtyweek_unique_whole_week',
+            ),
+        ]
+        verbose_name = 'Dirty Week'
+        verbose_name_plural = 'Dirty Weeks'
+
+    def __str__(self):
+        golfer_text = f" - {self.golfer.name}" if self.golfer else ""
+        return f'{self.week}{golfer_text} ({self.reason})'
+
+
+class TeamStanding(models.Model):
+    # Materialized team points per half, rebuilt from Round rows whenever rounds are scored.
+    # Read by the standings tables and playoff seeding instead of summing rounds per golfer.
+    HALF_CHOICES = [
+        (1, "First Half"),
+        (2, "Second Half"),
+    ]
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standings')
+    half = models.PositiveSmallIntegerField(choices=HALF_CHOICES)
+    points = models.FloatField(default=0)
+    rounds = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['team', 'half']
+        verbose_name = 'Team Standing'
+        verbose_name_plural = 'Team Standings'
+
+    def __str__(self):
+        return f'{self.team} - {self.get_half_display()}: {self.points}'
+
+
+class PlayoffSimulation(models.Model):
+    # Cached Monte Carlo playoff projection for a season as of its last scored week.
+    # results holds one entry per team: playoff/seed probabilities and clinch status.
+    # data_version is the season's page cache version it was simulated from; see main.page_cache.
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='playoff_simulations')
+    week = models.ForeignKey(Week, on_delete=models.CASCADE, null=True, blank=True)
+    simulations = models.PositiveIntegerField()
+    data_version = models.CharField(max_length=64, blank=True, default='')
+    results = models.JSONField(default=list)
+    created = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['season', 'week']
+        ordering = ['-created']
+        verbose_name = 'Playoff Simulation'
+        verbose_name_plural = 'Playoff Simulations'
+
+    def __str__(self):
+        week_text = f" after week {self.week.number}" if self.week else ""
+        return f'{self.season}{week_text} ({self.simulations} simulations)'
+
+
+class ScoreDistribution(models.Model):
+    # Count of non-sub hole scores per week, golfer, hole and strokes relative to par.
+    # Rebuilt for a week whenever its rounds are generated; league_stats and historics read
+    # hole averages, scoring breakdowns and rate leaderboards from it.
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='score_distribution')
+    week = models.ForeignKey(Week, on_delete=models.CASCADE)
+    golfer = models.ForeignKey(Golfer, on_delete=models.CASCADE)
+    hole = models.ForeignKey(Hole, on_delete=models.CASCADE)
+    to_par = models.SmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['week', 'golfer', 'hole', 'to_par']
+        verbose_name = 'Score Distribution'
+        verbose_name_plural = 'Score Distribution'
+
+    def __str__(self):
+        return f'{self.week} - {self.golfer.name} - Hole {self.hole.number} ({self.to_par:+d}): {self.count}'
+
+
+class DataVersion(models.Model):
+    # Bumped whenever a season's league-night data changes (scores, rounds, handicaps, subs,
+    # matchups, skins, games). Cached public pages are keyed on it; see main.page_cache.
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='data_version')
+    version = models.PositiveIntegerField(default=0)
+    changed = models.DateTimeField(default=timezone.now)
+    # Set while a staged recompute rewrites the season: readers see this version until it publishes
+    held_version = models.PositiveIntegerField(null=True, blank=True)
+    held_changed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Data Version'
+        verbose_name_plural = 'Data Versions'
+
+    def __str__(self):
+        return f'{self.season} - v{self.version}'
+
+
+class TaskRun(models.Model):
+    # One execution of a Celery task, recorded by main.task_runs.record_run: timings, query and
+    # row-write counts, arguments, outcome and live progress. Shown on the generate rounds page.
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("success", "Success"),
+        ("deferred", "Deferred"),
+        ("error", "Error"),
+    ]
+
+    task = models.CharField(max_length=200)
+    season = models.ForeignKey(Season, on_delete=models.SET_NULL, null=True, blank=True, related_name='task_runs')
+    args = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    started = models.DateTimeField(default=timezone.now)
+    finished = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)
+    queries = models.PositiveIntegerField(default=0)
+    # {model label: rows inserted, updated or deleted}
+    rows_written = models.JSONField(default=dict)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=200, blank=True)
+    result = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started']
+        indexes = [models.Index(fields=['task', '-started']), models.Index(fields=['season', '-started'])]
+        verbose_name = 'Task Run'
+        verbose_name_plural = 'Task Runs'
+
+    def __str__(self):
+        return f'{self.short_name} {self.args} ({self.status})'
+
+    @property
+    def short_name(self):
+        return self.task.rsplit('.', 1)[-1]
+
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return None
+        return min(100, round(100 * self.progress_done / self.progress_total))
+
+    @property
+    def total_rows_written(self):
+        return sum(self.rows_written.values())
+
+
+class SeasonRecompute(models.Model):
+    # Checkpoint of a staged season recompute (main.recompute.start_season_recompute): the planned
+    # steps in order and the ones already committed, so a failed run resumes where it stopped.
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("failed", "Failed"),
+        ("done", "Done"),
+        ("abandoned", "Abandoned"),
+    ]
+
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='recomputes')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    # Step keys: 'handicaps', 'matchups:<week id>', 'rounds:<week id>', 'finish'
+    steps = models.JSONField(default=list)
+    done_steps = models.JSONField(default=list)
+    current = models.CharField(max_length=50, blank=True)
+    # Season lock token held while the run is going (see main.task_coordination.claim_season)
+    lock_token = models.CharField(max_length=32, blank=True)
+    started = models.DateTimeField(default=timezone.now)
+    finished = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started']
+        indexes = [models.Index(fields=['season', '-started'])]
+        verbose_name = 'Season Recompute'
+        verbose_name_plural = 'Season Recomputes'
+
+    def __str__(self):
+        return f'{self.season} recompute ({self.status})'
+
+    @property
+    def pending_steps(self):
+        done = set(self.done_steps)
+        return [step for step in self.steps if step not in done]
+
+    @property
+    def progress_percent(self):
+        if not self.steps:
+            return 100
+        return min(100, round(100 * len(set(self.done_steps)) / len(self.steps)))
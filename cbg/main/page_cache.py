@@ -0,0 +1,193 @@
+"""Versioned cache for the public league pages.
+
+Every season has a ``DataVersion`` row that is bumped whenever its league-night
+data changes: ``main.signals`` bumps it on saves and deletes, and the bulk
+writers (scorecard entry, week scoring, handicap recalculation, skins winners)
+bump it explicitly. Season pages are keyed on that season's version; league-wide
+pages on a league version derived from every season's version.
+
+:func:`cached_context` keeps one cache entry per page holding the version it
+was built from. A read that finds an older version rebuilds the context and
+overwrites the entry, so stale pages are evicted as soon as they are next
+requested rather than piling up until they expire. Rendered template fragments
+are cached with the ``{% cache %}`` tag keyed on ``data_version`` and simply
+expire after ``PAGE_CACHE_TIMEOUT``.
+
+Versions live in the database rather than the cache so that bumps made by
+Celery workers reach every web process whatever cache backend is configured.
+
+A staged recompute rewrites a season over many transactions. It holds the
+season's version first (:func:`hold_data_version`) and warms every public
+page at it (:func:`warm_season_pages`), so readers keep getting the pages as
+they were until :func:`publish_data_version` releases the hold in the same
+transaction as the recompute's last writes. That only works when the worker
+and the web processes share one cache (:func:`cache_is_shared`): with a per
+process cache the warmed pages never reach the web processes, which rebuild
+them from half-rewritten data, so the recompute runs in one transaction
+instead.
+"""
+
+import hashlib
+import threading
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DataVersion, Season
+
+# Filters bumped by the current thread's open transaction
+_pending = threading.local()
+
+
+def page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+
+
+def cache_is_shared() -> bool:
+    """Whether pages cached by one process are seen by the others, as holding a version needs."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _token(season_id, version, changed):
+    # The change time keeps a recreated season (or a reused primary key) from matching an old entry
+    return f'{season_id}.{version}.{changed.timestamp():.6f}'
+
+
+def bump_data_version(**season_filters) -> None:
+    """Mark the data of every season matching ``season_filters`` as changed.
+
+    Filters are ``Season`` lookups, e.g. ``pk=season.pk``, ``week=week.pk`` or
+    ``course_config=config.pk``. With no filters every season is bumped.
+
+    The bump happens when the current transaction commits (immediately in
+    autocommit mode), once per season however many rows changed.
+    """
+    pending = getattr(_pending, 'filters', None)
+    if pending is None:
+        pending = _pending.filters = set()
+    pending.add(tuple(sorted(season_filters.items())))
+    transaction.on_commit(_flush_pending_bumps)
+
+
+def _flush_pending_bumps():
+    # Every bump registers this callback; the first one to run applies them all in one update
+    pending = getattr(_pending, 'filters', None)
+    _pending.filters = None
+    if not pending:
+        return
+    versions = DataVersion.objects.all()
+    if () not in pending:
+        versions = versions.filter(reduce(or_, (
+            Q(**{f'season__{field}': value for field, value in season_filters})
+            for season_filters in pending
+        )))
+    versions.update(version=F('version') + 1, changed=timezone.now())
+
+
+# A held version pins what readers see while a recompute rewrites the season
+_VERSION_FIELDS = ('version', 'changed', 'held_version', 'held_changed')
+
+
+def _published(version, changed, held_version, held_changed):
+    return (held_version, held_changed) if held_version is not None else (version, changed)
+
+
+def season_version(season) -> str:
+    """Cache version of ``season``'s data (its held version while one is held)."""
+    row = DataVersion.objects.filter(season_id=season.pk).values_list(*_VERSION_FIELDS).first()
+    if row is None:
+        # Created on first read; bumps only ever update existing rows
+        DataVersion.objects.bulk_create([DataVersion(season_id=season.pk)], ignore_conflicts=True)
+        row = DataVersion.objects.filter(season_id=season.pk).values_list(*_VERSION_FIELDS).get()
+    return _token(season.pk, *_published(*row))
+
+
+def league_version(league) -> str:
+    """Cache version of every season in ``league``; moves when any of them changes."""
+    rows = list(
+        Season.objects.filter(league=league).order_by('pk')
+        .values_list('pk', *(f'data_version__{field}' for field in _VERSION_FIELDS))
+    )
+    missing = [row[0] for row in rows if row[1] is None]
+    if missing:
+        DataVersion.objects.bulk_create([DataVersion(season_id=season_id) for season_id in missing], ignore_conflicts=True)
+        return league_version(league)
+    tokens = ','.join(_token(row[0], *_published(*row[1:])) for row in rows)
+    return f'{league.pk}.{hashlib.md5(tokens.encode()).hexdigest()}'
+
+
+def hold_data_version(season) -> bool:
+    """Pin the version readers see for ``season`` at its current value.
+
+    Until :func:`publish_data_version`, pages are served from the contexts
+    cached at the pinned version however often the data is bumped, so work
+    that rewrites the season over several transactions is never shown half
+    done. Holding an already held season keeps the original pin. Only hold
+    with a shared cache (:func:`cache_is_shared`).
+
+    Returns:
+        bool: True if the season was not already held.
+    """
+    season_version(season)
+    return bool(DataVersion.objects.filter(season_id=season.pk, held_version__isnull=True).update(
+        held_version=F('version'), held_changed=F('changed'),
+    ))
+
+
+def publish_data_version(season) -> None:
+    """Release ``season``'s held version and move it on.
+
+    Runs in the caller's transaction, so the pages switch to the new data
+    exactly when the writes that complete it commit.
+    """
+    DataVersion.objects.filter(season_id=season.pk).update(
+        held_version=None, held_changed=None, version=F('version') + 1, changed=timezone.now(),
+    )
+
+
+# Functions that build one page's cached contexts for a season; see warm_season_pages
+_warmers = []
+
+
+def page_warmer(func):
+    """Register ``func(season)`` to build ``season``'s cached contexts for one page."""
+    _warmers.append(func)
+    return func
+
+
+def warm_season_pages(season) -> None:
+    """Build every public page context of ``season`` that is not cached at its current version.
+
+    Run right after :func:`hold_data_version`, this leaves each page of the
+    held season a context to serve until the new data is published.
+    """
+    # The views register the warmers; a Celery worker may not have imported them yet
+    import main.views  # noqa: F401
+
+    for warmer in _warmers:
+        warmer(season)
+
+
+def cached_context(name, version, build, *key_parts):
+    """Return the context for page ``name``, building it only when ``version`` has moved.
+
+    Args:
+        name (str): Page name, e.g. ``'league_stats'``.
+        version (str): From :func:`season_version` or :func:`league_version`.
+        build (callable): Builds the context; called with no arguments.
+        *key_parts: Anything else the context depends on (season, golfer, week, ...).
+    """
+    key = ':'.join(['page', name, *map(str, key_parts)])
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    context = build()
+    cache.set(key, (version, context), page_cache_timeout())
+    return context
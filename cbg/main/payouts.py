@@ -0,0 +1,91 @@
+"""Payout ledger for skins and games.
+
+Every golfer entered in a week's skins or games has one ``Payout`` row per
+kind holding what they wagered and what they won. The rows for a week are
+rewritten whenever its entries or winners change: skins by
+:func:`main.skins.mark_skin_winners`, games by :func:`record_game_payouts`.
+Pages read pots and winnings with one aggregate over the ledger
+(:func:`payout_totals`) instead of recounting entries week by week.
+
+Amounts use the season's entry fee when the rows were written. Whether a
+season plays skins or games is applied when reading (:func:`live_payouts`), so
+toggling ``playing_skins``/``playing_games`` needs no rewrite.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import GameEntry, Payout
+from .page_cache import bump_data_version
+
+SKINS = 'SKINS'
+GAMES = 'GAMES'
+
+
+def replace_payouts(kind, week_ids, payouts):
+    """Replace the ``kind`` ledger rows of ``week_ids`` with ``payouts``."""
+    with transaction.atomic():
+        Payout.objects.filter(kind=kind, week_id__in=week_ids).delete()
+        Payout.objects.bulk_create(payouts)
+        # Bulk writes send no signals, so the cached pages are told directly
+        bump_data_version(week__in=tuple(week_ids))
+
+
+def record_game_payouts(weeks):
+    """Rewrite the games ledger of ``weeks`` from their ``GameEntry`` rows.
+
+    Each week's pot is one entry fee per entry, split evenly between the
+    week's winning entries.
+    """
+    week_ids = [week.id for week in weeks]
+    entries = defaultdict(list)
+    for entry in GameEntry.objects.filter(week__in=week_ids).select_related('week__season').order_by('id'):
+        entries[entry.week_id].append(entry)
+
+    # {(week_id, golfer_id): Payout}
+    payouts = {}
+    for week_id, week_entries in entries.items():
+        fee = week_entries[0].week.season.game_entry_fee
+        winners = [entry for entry in week_entries if entry.winner]
+        share = len(week_entries) * fee / len(winners) if winners else 0
+        for entry in week_entries:
+            payout = payouts.setdefault(
+                (week_id, entry.golfer_id), Payout(week_id=week_id, golfer_id=entry.golfer_id, kind=GAMES)
+            )
+            payout.wagered += fee
+            if entry.winner:
+                payout.won += share
+    replace_payouts(GAMES, week_ids, list(payouts.values()))
+
+
+def live_payouts(**filters):
+    """Ledger rows matching ``filters`` for seasons that play the kind of pot."""
+    return Payout.objects.filter(**filters).filter(
+        Q(kind=SKINS, week__season__playing_skins=True) | Q(kind=GAMES, week__season__playing_games=True)
+    )
+
+
+def _total(field, kind, zero):
+    return Coalesce(Sum(field, filter=Q(kind=kind)), zero)
+
+
+TOTALS = {
+    'skins_wagered': _total('wagered', SKINS, Value(0)),
+    'skins_won': _total('won', SKINS, Value(0.0)),
+    'games_wagered': _total('wagered', GAMES, Value(0)),
+    'games_won': _total('won', GAMES, Value(0.0)),
+}
+
+
+def payout_totals(payouts, *group_by):
+    """Wagered and won totals for skins and games over ``payouts``.
+
+    With no ``group_by`` fields returns one dict; otherwise one dict per group,
+    e.g. ``payout_totals(payouts, 'golfer__name')``.
+    """
+    if not group_by:
+        return payouts.aggregate(**TOTALS)
+    return list(payouts.values(*group_by).annotate(**TOTALS).order_by(*group_by))
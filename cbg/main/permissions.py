@@ -3,7 +3,7 @@ from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
 from .models import League, Season
 from .helper import get_current_season
-from .league_scope import resolve_league as resolve_league_from_slug
+from .league_scope import resolve_league as resolve_league_from_slug, request_league_scope, season_for_year
 
 
 def _resolve_league(kwargs):
@@ -13,7 +13,7 @@ def _resolve_league(kwargs):
     year = kwargs.get('year')
     league = resolve_league_from_slug(None)
     if year is not None and league is not None:
-        season = Season.objects.filter(league=league, year=year).first()
+        season = season_for_year(league, year)
         if season:
             return season.league
     season = get_current_season(league=league) if league else get_current_season()
@@ -28,7 +28,7 @@ def league_manager_required(view_func):
         # Always allow superuser (you), otherwise require per-league manager
         if request.user.is_superuser:
             return view_func(request, *args, **kwargs)
-        if league is None or not league.managers.filter(pk=request.user.pk).exists():
+        if not request_league_scope(request).manages(league):
             raise PermissionDenied
         request.league = league  # handy if you need it in the view
         return view_func(request, *args, **kwargs)
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from django.db.models import Q
+from django.db.models import Sum
 
-from .models import Matchup, Round, Team, Week
+from .models import Round, Team
+from .standings import LAST_FIRST_HALF_WEEK, get_team_points
 
 
 @dataclass
@@ -21,6 +22,20 @@ class SeedInfo:
     tiebreak_note: Optional[str] = None
 
 
+@dataclass
+class HypotheticalResult:
+    """Points a team is assumed to score against an opponent in a week not yet played."""
+    week_number: int
+    team_id: int
+    opponent_id: int
+    team_points: float
+    opponent_points: float
+
+
+# head_to_head[(a, b)] is the points team a scored in the weeks it played team b
+HeadToHead = Dict[Tuple[int, int], float]
+
+
 def _get_team_name(team: Team) -> str:
     golfers = list(team.golfers.all())
     if len(golfers) >= 2:
@@ -28,86 +43,118 @@ def _get_team_name(team: Team) -> str:
     return str(team)
 
 
-def _team_points_for_weeks(team: Team, weeks_qs) -> float:
-    golfers = list(team.golfers.all())
-    if not golfers:
-        return 0.0
-    golfer_ids = [g.id for g in golfers]
-
-    rounds_qs = Round.objects.filter(week__in=weeks_qs)
-
-    own_points = rounds_qs.filter(golfer__in=golfer_ids, subbing_for__isnull=True).values_list(
-        'total_points', flat=True
-    )
-    sub_points = rounds_qs.filter(subbing_for__in=golfer_ids).values_list('total_points', flat=True)
-    return float(sum(own_points) + sum(sub_points))
-
-
 def _full_points_map(season) -> Tuple[Dict[int, float], Dict[int, float], Dict[int, float]]:
-    teams = Team.objects.filter(season=season)
-    weeks_first = Week.objects.filter(season=season, number__lte=9, rained_out=False)
-    weeks_second = Week.objects.filter(season=season, number__gte=10, rained_out=False)
-
-    first: Dict[int, float] = {}
-    second: Dict[int, float] = {}
-    total: Dict[int, float] = {}
-
-    for team in teams:
-        p1 = _team_points_for_weeks(team, weeks_first)
-        p2 = _team_points_for_weeks(team, weeks_second)
-        first[team.id] = p1
-        second[team.id] = p2
-        total[team.id] = p1 + p2
+    first, second, _ = get_team_points(season)
+    team_ids = list(Team.objects.filter(season=season).values_list('id', flat=True))
 
+    first = {tid: first.get(tid, 0.0) for tid in team_ids}
+    second = {tid: second.get(tid, 0.0) for tid in team_ids}
+    total = {tid: first[tid] + second[tid] for tid in team_ids}
     return first, second, total
 
 
-def _matchup_weeks_between(team_a: Team, team_b: Team) -> List[int]:
-    matchups = (
-        Matchup.objects.filter(week__season=team_a.season)
-        .filter(teams=team_a)
-        .filter(teams=team_b)
-        .values_list('week_id', flat=True)
-    )
-    return list(matchups)
-
-
-def _team_points_in_specific_weeks(team: Team, week_ids: List[int]) -> float:
-    if not week_ids:
-        return 0.0
-    weeks_qs = Week.objects.filter(id__in=week_ids)
-    return _team_points_for_weeks(team, weeks_qs)
-
+def head_to_head_matrix(season) -> HeadToHead:
+    """Build the team x team head-to-head points matrix for ``season``.
 
-def _head_to_head_points(team_a: Team, team_b: Team) -> Tuple[float, float]:
-    week_ids = _matchup_weeks_between(team_a, team_b)
-    a_points = _team_points_in_specific_weeks(team_a, week_ids)
-    b_points = _team_points_in_specific_weeks(team_b, week_ids)
-    return a_points, b_points
+    Each round's points go to the golfer's team (or the absent golfer's team
+    for subs) and are counted against the other team(s) in the round's matchup.
+    """
+    teams_by_golfer: Dict[int, List[int]] = defaultdict(list)
+    for team_id, golfer_id in Team.golfers.through.objects.filter(team__season=season).values_list('team_id', 'golfer_id'):
+        teams_by_golfer[golfer_id].append(team_id)
 
-
-def _rank_by_h2h_among_group(teams: List[Team]) -> List[Team]:
+    # One row per (round group, team in the round's matchup)
+    rows = (
+        Round.objects.filter(week__season=season)
+        .values('matchup_id', 'golfer_id', 'subbing_for_id', 'matchup__teams')
+        .annotate(points=Sum('total_points'))
+        .order_by()
+    )
+    points: Dict[Tuple[int, int, Optional[int]], float] = {}
+    matchup_teams: Dict[int, Set[int]] = defaultdict(set)
+    for row in rows:
+        points[(row['matchup_id'], row['golfer_id'], row['subbing_for_id'])] = row['points'] or 0.0
+        if row['matchup__teams'] is not None:
+            matchup_teams[row['matchup_id']].add(row['matchup__teams'])
+
+    matrix: HeadToHead = defaultdict(float)
+    for (matchup_id, golfer_id, subbing_for_id), pts in points.items():
+        for team_id in teams_by_golfer.get(subbing_for_id or golfer_id, []):
+            for opponent_id in matchup_teams[matchup_id]:
+                if opponent_id != team_id:
+                    matrix[(team_id, opponent_id)] += pts
+    return matrix
+
+
+def _rank_by_h2h_among_group(team_ids: List[int], head_to_head: HeadToHead) -> List[int]:
     # Score each team by sum of points vs every other team in the group
     score_map: Dict[int, float] = defaultdict(float)
-    for i in range(len(teams)):
-        for j in range(i + 1, len(teams)):
-            a = teams[i]
-            b = teams[j]
-            a_pts, b_pts = _head_to_head_points(a, b)
-            score_map[a.id] += a_pts
-            score_map[b.id] += b_pts
+    for i in range(len(team_ids)):
+        for j in range(i + 1, len(team_ids)):
+            a = team_ids[i]
+            b = team_ids[j]
+            score_map[a] += head_to_head.get((a, b), 0.0)
+            score_map[b] += head_to_head.get((b, a), 0.0)
 
     # Fall back to 0 if no data; stable order by id to avoid jitter
-    return sorted(teams, key=lambda t: (score_map.get(t.id, 0.0), t.id), reverse=True)
+    return sorted(team_ids, key=lambda tid: (score_map.get(tid, 0.0), tid), reverse=True)
 
 
 def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
-    teams = list(Team.objects.filter(season=season))
+    teams = list(Team.objects.filter(season=season).prefetch_related('golfers'))
     if not teams:
         return []
 
     first_map, second_map, total_map = _full_points_map(season)
+    team_names = {t.id: _get_team_name(t) for t in teams}
+    return seed_teams(team_names, first_map, second_map, total_map, head_to_head_matrix(season), max_playoff_teams)
+
+
+def what_if_playoff_seeds(
+    season,
+    results: Iterable[HypotheticalResult],
+    max_playoff_teams: int = 4,
+) -> List[SeedInfo]:
+    """Seed the playoffs as if ``results`` had been played, without writing anything.
+
+    Current standings and head-to-head points are read once; the hypothetical
+    points are added to the half of their week and to the head-to-head matrix
+    before seeding in memory.
+    """
+    teams = list(Team.objects.filter(season=season).prefetch_related('golfers'))
+    if not teams:
+        return []
 
+    first_map, second_map, total_map = _full_points_map(season)
+    head_to_head = defaultdict(float, head_to_head_matrix(season))
+    for result in results:
+        half_map = first_map if result.week_number <= LAST_FIRST_HALF_WEEK else second_map
+        for team_id, opponent_id, pts in (
+            (result.team_id, result.opponent_id, result.team_points),
+            (result.opponent_id, result.team_id, result.opponent_points),
+        ):
+            half_map[team_id] = half_map.get(team_id, 0.0) + pts
+            total_map[team_id] = total_map.get(team_id, 0.0) + pts
+            head_to_head[(team_id, opponent_id)] += pts
+
+    team_names = {t.id: _get_team_name(t) for t in teams}
+    return seed_teams(team_names, first_map, second_map, total_map, head_to_head, max_playoff_teams)
+
+
+def seed_teams(
+    team_names: Dict[int, str],
+    first_map: Dict[int, float],
+    second_map: Dict[int, float],
+    total_map: Dict[int, float],
+    head_to_head: HeadToHead,
+    max_playoff_teams: int,
+) -> List[SeedInfo]:
+    """Apply the seeding rules to in-memory standings.
+
+    ``team_names`` maps team id to display name in the season's team order.
+    Reads nothing from the database, so it also serves what-if seeding and
+    the playoff simulator.
+    """
     # Determine half winners
     # First half: all teams tied for max points qualify
     max_first = max(first_map.values()) if first_map else 0.0
@@ -123,8 +170,6 @@ def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
         if tid not in first_half_winner_ids and pts == max_second_non_qualified and pts > 0
     ]
 
-    id_to_team: Dict[int, Team] = {t.id: t for t in teams}
-
     half_winner_ids: List[int] = []
     for tid in first_half_winner_ids:
         if tid not in half_winner_ids:
@@ -133,18 +178,18 @@ def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
         if tid not in half_winner_ids:
             half_winner_ids.append(tid)
 
-    half_winners: List[Team] = [id_to_team[tid] for tid in half_winner_ids]
+    half_winners: List[int] = half_winner_ids
 
     # Order half winners for seeding
     # Rule: Half winners are seeded ahead of wildcards. Within the half-winner group,
     # order by TOTAL season points (desc). Only break ties on total points using head-to-head.
     if len(half_winners) > 1:
         # Group by total points
-        points_to_group: Dict[float, List[Team]] = defaultdict(list)
-        for team in half_winners:
-            points_to_group[total_map.get(team.id, 0.0)].append(team)
+        points_to_group: Dict[float, List[int]] = defaultdict(list)
+        for tid in half_winners:
+            points_to_group[total_map.get(tid, 0.0)].append(tid)
 
-        ordered_half_winners: List[Team] = []
+        ordered_half_winners: List[int] = []
         had_tie_break = False
         for pts in sorted(points_to_group.keys(), reverse=True):
             group = points_to_group[pts]
@@ -152,7 +197,7 @@ def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
                 ordered_half_winners.extend(group)
             else:
                 had_tie_break = True
-                ordered_half_winners.extend(_rank_by_h2h_among_group(group))
+                ordered_half_winners.extend(_rank_by_h2h_among_group(group, head_to_head))
         ordering_note = (
             "Half winners ordered by total points; ties broken by head-to-head"
             if had_tie_break else None
@@ -165,9 +210,9 @@ def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
     used_ids: Set[int] = set()
 
     # Add half-winner seeds up to max_playoff_teams
-    for idx, team in enumerate(ordered_half_winners[: max_playoff_teams] ):
-        in_first = team.id in first_half_winner_ids
-        in_second = team.id in second_half_winner_ids
+    for idx, tid in enumerate(ordered_half_winners[: max_playoff_teams] ):
+        in_first = tid in first_half_winner_ids
+        in_second = tid in second_half_winner_ids
         if in_first and in_second:
             source = 'both_halves'
         elif in_first:
@@ -182,51 +227,51 @@ def compute_playoff_seeds(season, max_playoff_teams: int = 4) -> List[SeedInfo]:
         seeds.append(
             SeedInfo(
                 seed=len(seeds) + 1,
-                team_id=team.id,
-                team_name=_get_team_name(team),
+                team_id=tid,
+                team_name=team_names[tid],
                 source=source,
-                points_first_half=first_map.get(team.id, 0.0),
-                points_second_half=second_map.get(team.id, 0.0),
-                points_total=total_map.get(team.id, 0.0),
+                points_first_half=first_map.get(tid, 0.0),
+                points_second_half=second_map.get(tid, 0.0),
+                points_total=total_map.get(tid, 0.0),
                 tiebreak_note=ordering_note,
             )
         )
-        used_ids.add(team.id)
+        used_ids.add(tid)
 
     remaining_slots = max_playoff_teams - len(seeds)
     if remaining_slots <= 0:
         return seeds
 
     # Wildcard candidates: everyone else, sorted by total points
-    wildcard_candidates = [t for t in teams if t.id not in used_ids]
-    wildcard_candidates.sort(key=lambda t: (total_map.get(t.id, 0.0), t.id), reverse=True)
+    wildcard_candidates = [tid for tid in team_names if tid not in used_ids]
+    wildcard_candidates.sort(key=lambda tid: (total_map.get(tid, 0.0), tid), reverse=True)
 
     # Process wildcards with tie-breaking by head-to-head when needed
     i = 0
     while remaining_slots > 0 and i < len(wildcard_candidates):
         # Group by total points (ties)
-        pt = total_map.get(wildcard_candidates[i].id, 0.0)
-        tie_group: List[Team] = [wildcard_candidates[i]]
+        pt = total_map.get(wildcard_candidates[i], 0.0)
+        tie_group: List[int] = [wildcard_candidates[i]]
         j = i + 1
-        while j < len(wildcard_candidates) and abs(total_map.get(wildcard_candidates[j].id, 0.0) - pt) < 1e-9:
+        while j < len(wildcard_candidates) and abs(total_map.get(wildcard_candidates[j], 0.0) - pt) < 1e-9:
             tie_group.append(wildcard_candidates[j])
             j += 1
 
         # Rank within tie group by head-to-head amongst the group
-        ranked_group = tie_group if len(tie_group) == 1 else _rank_by_h2h_among_group(tie_group)
+        ranked_group = tie_group if len(tie_group) == 1 else _rank_by_h2h_among_group(tie_group, head_to_head)
 
-        for team in ranked_group:
+        for tid in ranked_group:
             if remaining_slots <= 0:
                 break
             seeds.append(
                 SeedInfo(
                     seed=len(seeds) + 1,
-                    team_id=team.id,
-                    team_name=_get_team_name(team),
+                    team_id=tid,
+                    team_name=team_names[tid],
                     source='wildcard',
-                    points_first_half=first_map.get(team.id, 0.0),
-                    points_second_half=second_map.get(team.id, 0.0),
-                    points_total=total_map.get(team.id, 0.0),
+                    points_first_half=first_map.get(tid, 0.0),
+                    points_second_half=second_map.get(tid, 0.0),
+                    points_total=total_map.get(tid, 0.0),
                     tiebreak_note=(
                         'Wildcard tie resolved by head-to-head' if len(tie_group) > 1 else None
                     ),
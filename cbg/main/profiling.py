@@ -0,0 +1,207 @@
+"""Opt-in request profiling.
+
+With ``REQUEST_PROFILING`` on, :class:`~main.middleware.RequestProfilingMiddleware`
+profiles a ``REQUEST_PROFILING_SAMPLE_RATE`` fraction of requests. For each one
+it records the view (URL name), total time, SQL query count and time, template
+render time and the most repeated SQL statements, and then:
+
+- adds a ``Server-Timing`` header, so the browser's network panel shows the split;
+- logs one JSON line to the ``main.profiling`` logger;
+- appends the figures to a rolling store of the last ``REQUEST_PROFILING_WINDOW``
+  requests per view, summarised for superusers on the request profiles page.
+
+The store lives in the Django cache, so it is shared between processes when the
+cache is (Redis) and per process with the default locmem cache. Appends are
+read-modify-write, so concurrent requests to one view can occasionally drop a
+sample; the figures are meant for spotting slow views, not accounting.
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Profile of the request being handled on this thread, if it was sampled
+_active = threading.local()
+
+_templates_instrumented = False
+_instrument_lock = threading.Lock()
+
+VIEWS_KEY = 'cbg:profiling:views'
+# Repeated statements kept per request
+TOP_REPEATED = 3
+_SQL_PREVIEW = 200
+
+
+def profiling_enabled():
+    return getattr(settings, 'REQUEST_PROFILING', False)
+
+
+def sample_rate():
+    return getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 1.0)
+
+
+def profile_window():
+    return getattr(settings, 'REQUEST_PROFILING_WINDOW', 200)
+
+
+def should_sample():
+    return profiling_enabled() and random.random() < sample_rate()
+
+
+def _view_key(view):
+    return f'cbg:profiling:view:{view}'
+
+
+class RequestProfile:
+    """Timings for one request."""
+
+    def __init__(self):
+        self.view = None
+        self.method = None
+        self.status = None
+        self.total_seconds = 0.0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        # [(sql, times run)] for the most repeated statements
+        self.repeated = []
+        self._rendering = False
+
+    def finish(self, request, response, queries, total_seconds):
+        match = getattr(request, 'resolver_match', None)
+        self.view = (match.view_name if match else None) or 'unresolved'
+        self.method = request.method
+        self.status = response.status_code
+        self.total_seconds = total_seconds
+        self.sql_count = len(queries)
+        self.sql_seconds = queries.seconds
+        self.repeated = [
+            (sql[:_SQL_PREVIEW], len(origins)) for sql, origins in list(queries.repeated().items())[:TOP_REPEATED]
+        ]
+
+    def server_timing(self):
+        """Value of the ``Server-Timing`` header."""
+        return ', '.join([
+            f'total;dur={self.total_seconds * 1000:.1f}',
+            f'sql;desc="SQL ({self.sql_count} queries)";dur={self.sql_seconds * 1000:.1f}',
+            f'templates;desc="Templates";dur={self.template_seconds * 1000:.1f}',
+        ])
+
+    def as_dict(self):
+        return {
+            'view': self.view,
+            'method': self.method,
+            'status': self.status,
+            'total_ms': round(self.total_seconds * 1000, 1),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'repeated_sql': [{'sql': sql, 'count': count} for sql, count in self.repeated],
+        }
+
+
+def start_profile():
+    """Make a new profile the active one for this thread and return it."""
+    _instrument_templates()
+    profile = _active.profile = RequestProfile()
+    return profile
+
+
+def end_profile():
+    _active.profile = None
+
+
+def _instrument_templates():
+    """Time top-level template renders for the profile active on this thread.
+
+    Wraps the Django template backend's ``render`` once per process. Nested
+    renders ({% include %}, ``render_to_string`` inside a render) are part of
+    the outer one and are not counted again.
+    """
+    global _templates_instrumented
+    with _instrument_lock:
+        if _templates_instrumented:
+            return
+        from django.template.backends.django import Template
+
+        render = Template.render
+
+        def timed_render(self, context=None, request=None):
+            profile = getattr(_active, 'profile', None)
+            if profile is None or profile._rendering:
+                return render(self, context, request)
+            profile._rendering = True
+            started = time.perf_counter()
+            try:
+                return render(self, context, request)
+            finally:
+                profile.template_seconds += time.perf_counter() - started
+                profile._rendering = False
+
+        Template.render = timed_render
+        _templates_instrumented = True
+
+
+def record(profile):
+    """Log ``profile`` and add it to the rolling store."""
+    sample = profile.as_dict()
+    logger.info(json.dumps(sample, sort_keys=True))
+
+    key = _view_key(profile.view)
+    samples = cache.get(key) or []
+    if not samples:
+        views = cache.get(VIEWS_KEY) or []
+        if profile.view not in views:
+            cache.set(VIEWS_KEY, sorted([*views, profile.view]), None)
+    samples.append(sample)
+    cache.set(key, samples[-profile_window():], None)
+
+
+def clear_profiles():
+    """Forget every stored sample."""
+    cache.delete_many([_view_key(view) for view in cache.get(VIEWS_KEY) or []] + [VIEWS_KEY])
+
+
+def _percentile(values, fraction):
+    # Nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def view_summaries():
+    """Per-view p50/p95 figures over the stored samples, slowest p95 first.
+
+    Returns:
+        list[dict]: One row per view with ``view``, ``requests``, ``{total_ms,
+        sql_count, sql_ms, template_ms}_{p50,p95}`` and ``repeated_sql``, the
+        statements most often repeated within a request as ``(sql, requests
+        that repeated it, most times in one request)``.
+    """
+    rows = []
+    for view in cache.get(VIEWS_KEY) or []:
+        samples = cache.get(_view_key(view)) or []
+        if not samples:
+            continue
+        row = {'view': view, 'requests': len(samples)}
+        for field in ('total_ms', 'sql_count', 'sql_ms', 'template_ms'):
+            values = [sample[field] for sample in samples]
+            row[f'{field}_p50'] = _percentile(values, 0.5)
+            row[f'{field}_p95'] = _percentile(values, 0.95)
+        requests = Counter()
+        most = Counter()
+        for sample in samples:
+            for repeat in sample['repeated_sql']:
+                requests[repeat['sql']] += 1
+                most[repeat['sql']] = max(most[repeat['sql']], repeat['count'])
+        row['repeated_sql'] = [(sql, count, most[sql]) for sql, count in requests.most_common(TOP_REPEATED)]
+        rows.append(row)
+    return sorted(rows, key=lambda row: -row['total_ms_p95'])
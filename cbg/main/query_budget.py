@@ -0,0 +1,178 @@
+"""SQL query budgets for views and helpers.
+
+A budget is declared next to the code it covers::
+
+    @query_budget(11)
+    @league_manager_required
+    def enter_schedule(request, league_slug=None, year=None):
+        ...
+
+It only records the limits on the function; nothing is checked at run time.
+The query budget tests in ``main.tests`` run every view, form post and core
+helper against a standard synthetic league and fail when one runs more
+queries than its budget, or repeats the same SQL more often than its
+``duplicates`` allowance. The failure lists each repeated statement with the
+lines of our code that issued it, which is usually enough to spot the loop
+doing an N+1.
+
+Budgets are the counts measured against that league, so a change that adds
+queries has to raise the budget in the same diff. Lower it when you remove an
+N+1. A duplicates allowance above zero is for known repeats only; name them in
+a ``# Repeats:`` comment above the budget.
+
+Duplicates are counted per SQL statement with its parameters left out, so
+``SELECT ... WHERE id = %s`` run for ten different ids counts as nine.
+
+A view that also handles form posts declares the post's budget separately::
+
+    @query_budget(10, duplicates=1)
+    @query_budget(16, duplicates=2, method='POST')
+    @league_manager_required
+    def add_sub(request, league_slug=None, year=None):
+        ...
+
+Helpers that work through a season week by week declare what one played week
+costs with ``per_week``, on top of the fixed ``queries`` and ``duplicates``.
+Those statements repeat from the second week on, so the allowance grows with
+the season instead of hiding repeats behind one large ``duplicates`` number:
+a new query inside the loop still goes over.
+"""
+
+import re
+import time
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db import connection
+
+# Frames from these files say nothing about which of our lines issued a query
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+_IGNORED = ('site-packages', 'dist-packages', __file__)
+
+# Statement shown in failure messages
+_SQL_PREVIEW = 300
+# Frames of our code shown for each origin, innermost last
+_ORIGIN_DEPTH = 3
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Most queries, and most repeats of one statement, a call may run."""
+    queries: int
+    duplicates: int = 0
+    # Queries each played week adds, all repeated from the second week on
+    per_week: int = 0
+
+    def for_weeks(self, weeks):
+        """The fixed budget of a call that works through ``weeks`` played weeks."""
+        return QueryBudget(
+            self.queries + self.per_week * weeks,
+            self.duplicates + self.per_week * max(weeks - 1, 0),
+        )
+
+
+def query_budget(queries, duplicates=0, per_week=0, method='GET'):
+    """Declare the SQL query budget of a view or helper.
+
+    Put it above any other decorators so the budget sits on the function the
+    URL conf (or the caller) actually uses.
+
+    Args:
+        queries (int): Most queries one call may run.
+        duplicates (int): Most extra runs of an already-run statement.
+        per_week (int): Queries each played week adds, for helpers that loop
+            over a season's weeks.
+        method (str): The request method the budget covers. Helpers use the
+            default.
+    """
+    def decorator(func):
+        func.query_budgets = {**getattr(func, 'query_budgets', {}), method: QueryBudget(queries, duplicates, per_week)}
+        return func
+    return decorator
+
+
+def budget_of(func, method='GET'):
+    """The :class:`QueryBudget` declared on ``func`` for ``method``, or None."""
+    return getattr(func, 'query_budgets', {}).get(method)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _origin():
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(_PROJECT_ROOT) and not any(part in frame.filename for part in _IGNORED)
+    ]
+    return ' < '.join(
+        f'{Path(frame.filename).relative_to(_PROJECT_ROOT)}:{frame.lineno} {frame.name}'
+        for frame in reversed(frames[-_ORIGIN_DEPTH:])
+    )
+
+
+class QueryLog:
+    """Statements run on the default connection, with where they came from.
+
+    Args:
+        origins (bool): Record the project frames behind each statement. Walking
+            the stack is the slow part, so leave it off outside tests.
+    """
+
+    def __init__(self, origins=True):
+        self.origins = origins
+        # [(sql, origin)]
+        self.queries = []
+        # Time spent in the database
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, _origin() if self.origins else ''))
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self):
+        """``{sql: [origin, ...]}`` for every statement run more than once, most repeated first."""
+        by_sql = defaultdict(list)
+        for sql, origin in self.queries:
+            by_sql[re.sub(r'\s+', ' ', sql)].append(origin)
+        repeats = {sql: origins for sql, origins in by_sql.items() if len(origins) > 1}
+        return dict(sorted(repeats.items(), key=lambda item: -len(item[1])))
+
+    @property
+    def duplicates(self):
+        return sum(len(origins) - 1 for origins in self.repeated().values())
+
+    def check(self, budget, name):
+        """Raise :class:`QueryBudgetExceeded` if this log is over ``budget``."""
+        if len(self) <= budget.queries and self.duplicates <= budget.duplicates:
+            return
+        lines = [
+            f'{name} ran {len(self)} queries (budget {budget.queries}) '
+            f'with {self.duplicates} duplicates (budget {budget.duplicates}).'
+        ]
+        for sql, origins in self.repeated().items():
+            preview = sql if len(sql) <= _SQL_PREVIEW else sql[:_SQL_PREVIEW] + '...'
+            lines.append(f'\n{len(origins)}x {preview}')
+            counts = defaultdict(int)
+            for origin in origins:
+                counts[origin] += 1
+            lines.extend(f'    {count}x from {origin or "(outside the project)"}' for origin, count in counts.items())
+        raise QueryBudgetExceeded('\n'.join(lines))
+
+
+@contextmanager
+def log_queries(origins=True):
+    """Yield a :class:`QueryLog` of the statements run inside the block."""
+    log = QueryLog(origins)
+    with connection.execute_wrapper(log):
+        yield log
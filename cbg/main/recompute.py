@@ -0,0 +1,410 @@
+"""Dirty-week tracking and incremental week processing.
+
+Signals record a :class:`~main.models.DirtyWeek` mark whenever a ``Score``,
+``Sub`` or ``Matchup`` changes. :func:`process_dirty_weeks` then recomputes
+only what those changes can reach: handicaps for the golfers whose scores
+changed, and golfer matchups/rounds for the marked weeks plus any week where a
+recomputed handicap actually moved. Weeks whose inputs are unchanged are left
+alone, so finishing one week late in the season does not rewrite the rest.
+
+Full recomputes of a season run either all at once (the ``recompute_all``
+command) or as a staged, checkpointed Celery pipeline that keeps public pages
+on the previous data until it is done (:func:`start_season_recompute`).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from main.models import DirtyWeek, Golfer, Score, Week
+
+
+def mark_week_dirty(week, golfers=None, reason='score'):
+    """Record that ``week`` needs reprocessing.
+
+    Parameters
+    ----------
+    week : Week
+        The week whose derived data is stale.
+    golfers : iterable of Golfer, optional
+        Golfers whose scores changed. Omit for week-level changes (subs, schedule).
+    reason : str
+        One of ``DirtyWeek.REASON_CHOICES``.
+    """
+    week_id = week.pk if hasattr(week, 'pk') else week
+    if golfers:
+        marks = [DirtyWeek(week_id=week_id, golfer_id=getattr(g, 'pk', g), reason=reason) for g in golfers]
+    else:
+        marks = [DirtyWeek(week_id=week_id, golfer_id=None, reason=reason)]
+    DirtyWeek.objects.bulk_create(marks, ignore_conflicts=True)
+
+
+def clear_dirty_weeks(season):
+    """Drop every mark for ``season`` (used after a full recompute)."""
+    DirtyWeek.objects.filter(week__season=season).delete()
+
+
+def process_dirty_weeks(season, up_to_week=None):
+    """Recompute handicaps, golfer matchups and rounds affected by dirty marks.
+
+    Parameters
+    ----------
+    season : Season
+        The season to process.
+    up_to_week : Week, optional
+        Only regenerate matchups and rounds for weeks numbered up to this one.
+        The week itself is always processed, even without marks.
+
+    Returns
+    -------
+    dict
+        ``handicaps_changed`` (int) and ``weeks_processed`` (list of week numbers).
+    """
+    from main.helper import calculate_and_save_handicaps_for_season, generate_golfer_matchups
+    from main.scoring import score_week
+    from main.standings import refresh_team_standings
+
+    marks = DirtyWeek.objects.filter(week__season=season)
+    if up_to_week is not None:
+        marks = marks.filter(week__number__lte=up_to_week.number)
+    marks = list(marks.values_list('id', 'week_id', 'golfer_id'))
+
+    dirty_week_ids = {week_id for _, week_id, _ in marks}
+    dirty_golfer_ids = {golfer_id for _, _, golfer_id in marks if golfer_id is not None}
+    if up_to_week is not None:
+        dirty_week_ids.add(up_to_week.pk)
+        dirty_golfer_ids.update(
+            Score.objects.filter(week=up_to_week).values_list('golfer_id', flat=True).distinct()
+        )
+
+    # Handicaps only depend on a golfer's own scores, so only dirty golfers can change.
+    # Weeks where nothing moved drop out here: an unchanged handicap stops the cascade.
+    changed = set()
+    if dirty_golfer_ids:
+        changed = calculate_and_save_handicaps_for_season(
+            season, golfers=Golfer.objects.filter(id__in=dirty_golfer_ids)
+        )
+    affected_week_ids = dirty_week_ids | {week_id for _, week_id in changed}
+
+    weeks = Week.objects.filter(season=season, id__in=affected_week_ids, rained_out=False).select_related('season__course_config').order_by('number')
+    if up_to_week is not None:
+        # Later weeks whose handicaps moved keep a mark so they are picked up when they are processed.
+        later = weeks.filter(number__gt=up_to_week.number)
+        DirtyWeek.objects.bulk_create(
+            [DirtyWeek(week=w, golfer=None, reason='score') for w in later], ignore_conflicts=True
+        )
+        weeks = weeks.filter(number__lte=up_to_week.number)
+
+    processed = []
+    for week in weeks:
+        with transaction.atomic():
+            generate_golfer_matchups(week)
+            score_week(week)
+        processed.append(week.number)
+    if processed:
+        refresh_team_standings(season)
+
+    DirtyWeek.objects.filter(id__in=[mark_id for mark_id, _, _ in marks]).delete()
+
+    return {'handicaps_changed': len(changed), 'weeks_processed': processed}
+
+
+
+# Full recomputes, split so the weeks of a season can run in parallel
+# (see the ``recompute_all`` management command). Handicaps carry from week to
+# week, so they are rebuilt for the whole season first; after that each played
+# week's golfer matchups and rounds depend only on that week.
+
+def prepare_season_recompute(season_id):
+    """Drop the season's dirty marks and rebuild all of its handicaps.
+
+    Returns
+    -------
+    dict
+        ``week_ids`` (the played weeks, to pass to :func:`recompute_week`) and
+        ``handicaps`` (how many handicaps the season now has).
+    """
+    from main.helper import calculate_and_save_handicaps_for_season
+    from main.models import Handicap, Season
+
+    season = Season.objects.get(pk=season_id)
+    clear_dirty_weeks(season)
+    calculate_and_save_handicaps_for_season(season)
+    week_ids = list(
+        Week.objects.filter(season=season, score__isnull=False).distinct().order_by('number').values_list('id', flat=True)
+    )
+    return {'week_ids': week_ids, 'handicaps': Handicap.objects.filter(week__season=season).count()}
+
+
+def recompute_week(week_id):
+    """Regenerate a played week's golfer matchups and rounds.
+
+    Returns
+    -------
+    dict
+        ``matchups`` and ``rounds`` written for the week.
+    """
+    from main.helper import generate_golfer_matchups
+    from main.models import GolferMatchup
+    from main.scoring import score_week
+
+    week = Week.objects.select_related('season').get(pk=week_id)
+    with transaction.atomic():
+        generate_golfer_matchups(week)
+        rounds = score_week(week)
+    return {'matchups': GolferMatchup.objects.filter(week=week).count(), 'rounds': rounds}
+
+
+def finish_season_recompute(season_id):
+    """Rebuild what spans a season's weeks once they have all been recomputed:
+    team standings, skins results and the payout ledger.
+
+    Returns
+    -------
+    dict
+        ``skins_winners``: the number of winning skins entries.
+    """
+    from main.models import Season
+    from main.page_cache import bump_data_version
+    from main.payouts import record_game_payouts
+    from main.skins import SeasonSkins, mark_skin_winners
+    from main.standings import refresh_team_standings
+
+    season = Season.objects.get(pk=season_id)
+    # Weeks refresh their own half as they are scored; in parallel the last write may predate other weeks
+    refresh_team_standings(season)
+    skins = SeasonSkins(season, Week.objects.filter(season=season, rained_out=False))
+    won = mark_skin_winners(skins)
+    record_game_payouts(skins.weeks)
+    bump_data_version(pk=season.pk)
+    return {'skins_winners': len(won)}
+
+
+# Staged recomputes. A full recalculation of a live season runs as a Celery
+# chain of checkpointed steps: handicaps, then every week's golfer matchups,
+# then every week's rounds (the weeks of a stage in parallel), then a finish
+# step for standings, skins and payouts. Each step commits together with its
+# checkpoint, so a failed run resumes from the first step it had not finished.
+# The season's page version is held for the whole run and published by the
+# finish step, so public pages show the season as it was until the new data is
+# complete. Holding needs a page cache shared with the web processes; with a
+# per-process cache every step runs in one transaction instead
+# (run_recompute_steps), which keeps readers on the old rows until it commits.
+
+def plan_season_recompute(season):
+    """Ordered step keys for a full recompute of ``season``.
+
+    Golfer matchups are generated for weeks whose team matchups are all
+    entered, and rounds for weeks that have (or are about to have) golfer
+    matchups and every score entered. One query decides this for every week.
+    """
+    from django.db.models import Count, Exists, OuterRef, Q
+    from main.models import GolferMatchup, Team
+
+    total_teams = Team.objects.filter(season=season).count()
+    weeks = (
+        Week.objects.filter(season=season, rained_out=False).order_by('number')
+        .annotate(
+            team_matchups=Count('matchup', distinct=True),
+            no_subs=Count('sub', filter=Q(sub__no_sub=True), distinct=True),
+            has_golfer_matchups=Exists(GolferMatchup.objects.filter(week=OuterRef('pk'))),
+        )
+    )
+    matchup_steps, round_steps = [], []
+    for week in weeks:
+        full_schedule = week.team_matchups == total_teams // 2
+        if full_schedule:
+            matchup_steps.append(f'matchups:{week.pk}')
+        expected_scores = (total_teams * 2 - week.no_subs) * 9
+        if (full_schedule or week.has_golfer_matchups) and week.scores_entered == expected_scores:
+            round_steps.append(f'rounds:{week.pk}')
+    return ['handicaps', *matchup_steps, *round_steps, 'finish']
+
+
+def start_season_recompute(season, lock_token):
+    """Plan a staged recompute of ``season`` and enqueue its steps.
+
+    The caller holds the season's task lock (``lock_token``, from
+    :func:`~main.task_coordination.claim_season`); the finish step, a failure
+    or :func:`abandon_season_recompute` releases it. A run still pending for
+    the season is abandoned, its hold carrying over to the new one.
+
+    Returns
+    -------
+    SeasonRecompute
+    """
+    from main.models import SeasonRecompute
+    from main.page_cache import cache_is_shared, hold_data_version, warm_season_pages
+
+    SeasonRecompute.objects.filter(season=season, status__in=['running', 'failed']).update(
+        status='abandoned', finished=timezone.now(),
+    )
+    # A full recompute supersedes any pending incremental work
+    clear_dirty_weeks(season)
+    if cache_is_shared() and hold_data_version(season):
+        # Cache the pages as they are now, so readers have them until the run publishes
+        warm_season_pages(season)
+    recompute = SeasonRecompute.objects.create(
+        season=season, steps=plan_season_recompute(season), lock_token=lock_token,
+    )
+    recompute_signature(recompute).apply_async()
+    return recompute
+
+
+def recompute_signature(recompute):
+    """Celery chain running ``recompute``'s pending steps, the weeks of each stage as a group.
+
+    With a per-process page cache it is a single task running every pending
+    step in one transaction (see :func:`run_recompute_steps`).
+    """
+    from itertools import groupby
+
+    from celery import chain, group
+    from main.page_cache import cache_is_shared
+    from main.tasks import recompute_stage, recompute_steps
+
+    if not cache_is_shared():
+        return recompute_steps.si(recompute.pk)
+    stages = []
+    for _, steps in groupby(recompute.pending_steps, key=lambda step: step.partition(':')[0]):
+        signatures = [recompute_stage.si(recompute.pk, step) for step in steps]
+        stages.append(signatures[0] if len(signatures) == 1 else group(signatures))
+    return chain(*stages)
+
+
+def run_recompute_step(recompute_id, step):
+    """Run one step of a staged recompute and checkpoint it in the same transaction.
+
+    Steps of a run that is no longer running, or already checkpointed, are
+    skipped, so a step can safely run twice. A failing step marks the run
+    failed, releases the season lock and re-raises; the held page version
+    stays until the run is resumed or abandoned.
+
+    Returns
+    -------
+    bool
+        False if the step was skipped.
+    """
+    from main.models import SeasonRecompute
+    from main.task_coordination import release_season
+
+    recompute = SeasonRecompute.objects.select_related('season').get(pk=recompute_id)
+    if recompute.status != 'running' or step in recompute.done_steps:
+        return False
+    SeasonRecompute.objects.filter(pk=recompute_id).update(current=step)
+    try:
+        with transaction.atomic():
+            _run_step(recompute.season, step)
+            # Lock the checkpoint only now: weeks of a stage run in parallel
+            checkpoint = SeasonRecompute.objects.select_for_update().get(pk=recompute_id)
+            checkpoint.done_steps = [*checkpoint.done_steps, step]
+            if step == 'finish':
+                checkpoint.status = 'done'
+                checkpoint.finished = timezone.now()
+            checkpoint.save(update_fields=['done_steps', 'status', 'finished'])
+    except Exception as e:
+        SeasonRecompute.objects.filter(pk=recompute_id).update(
+            status='failed', error=f'{step}: {type(e).__name__}: {e}',
+        )
+        release_season(recompute.season_id, recompute.lock_token)
+        raise
+    if step == 'finish':
+        release_season(recompute.season_id, recompute.lock_token)
+    return True
+
+
+def run_recompute_steps(recompute_id):
+    """Run every pending step of a recompute in one transaction.
+
+    Used instead of the staged chain when the page cache is per process: the
+    season's version cannot be held there, so the transaction keeps readers on
+    the old data until the new data commits. A failing step rolls back all of
+    them, marks the run failed, releases the season lock and re-raises.
+
+    Returns
+    -------
+    bool
+        False if the run is no longer running.
+    """
+    from main.models import SeasonRecompute
+    from main.task_coordination import release_season
+
+    recompute = SeasonRecompute.objects.select_related('season').get(pk=recompute_id)
+    if recompute.status != 'running':
+        return False
+    step = None
+    try:
+        with transaction.atomic():
+            for step in recompute.pending_steps:
+                _run_step(recompute.season, step)
+            SeasonRecompute.objects.filter(pk=recompute_id).update(
+                done_steps=recompute.steps, current=step or '', status='done', finished=timezone.now(),
+            )
+    except Exception as e:
+        SeasonRecompute.objects.filter(pk=recompute_id).update(
+            status='failed', current=step or '', error=f'{step}: {type(e).__name__}: {e}',
+        )
+        release_season(recompute.season_id, recompute.lock_token)
+        raise
+    release_season(recompute.season_id, recompute.lock_token)
+    return True
+
+
+def _run_step(season, step):
+    from main.helper import calculate_and_save_handicaps_for_season, generate_golfer_matchups
+    from main.page_cache import publish_data_version
+    from main.payouts import record_game_payouts
+    from main.scoring import score_week
+    from main.skins import SeasonSkins, mark_skin_winners
+    from main.standings import refresh_team_standings
+
+    stage, _, week_id = step.partition(':')
+    if stage == 'handicaps':
+        calculate_and_save_handicaps_for_season(season)
+    elif stage == 'matchups':
+        generate_golfer_matchups(Week.objects.select_related('season').get(pk=week_id))
+    elif stage == 'rounds':
+        score_week(Week.objects.select_related('season').get(pk=week_id))
+    elif stage == 'finish':
+        refresh_team_standings(season)
+        skins = SeasonSkins(season, Week.objects.filter(season=season, rained_out=False))
+        mark_skin_winners(skins)
+        record_game_payouts(skins.weeks)
+        publish_data_version(season)
+    else:
+        raise ValueError(f'Unknown recompute step {step!r}')
+
+
+def resume_season_recompute(recompute):
+    """Run a failed recompute's remaining steps.
+
+    Returns
+    -------
+    bool
+        False if another task holds the season's lock. A full recalculation
+        is then requested for when it is released.
+    """
+    from main.task_coordination import claim_season
+    from main.tasks import recalculate_all_async
+
+    token = claim_season(recalculate_all_async, recompute.season_id, recompute.season_id)
+    if token is None:
+        return False
+    recompute.status = 'running'
+    recompute.lock_token = token
+    recompute.error = ''
+    recompute.save(update_fields=['status', 'lock_token', 'error'])
+    recompute_signature(recompute).apply_async()
+    return True
+
+
+def abandon_season_recompute(recompute):
+    """Give up on ``recompute`` and publish the season's data as it now is."""
+    from main.page_cache import publish_data_version
+    from main.task_coordination import release_season
+
+    with transaction.atomic():
+        recompute.status = 'abandoned'
+        recompute.finished = timezone.now()
+        recompute.save(update_fields=['status', 'finished'])
+        publish_data_version(recompute.season)
+    release_season(recompute.season_id, recompute.lock_token)
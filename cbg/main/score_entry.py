@@ -0,0 +1,116 @@
+"""Bulk scorecard entry.
+
+:func:`save_score_card` validates a whole card, resolves golfers and holes
+from prefetched maps and writes every score with one upsert inside a
+transaction, then recounts ``Week.scores_entered``. Bulk writes skip
+``post_save``, so a single :data:`week_scores_changed` signal is sent instead
+of one ``Score`` signal per hole; ``main.signals`` marks the week dirty and
+queues processing from it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.dispatch import Signal
+
+from .models import Golfer, Hole, Score, Week
+
+# Sent once per saved card with ``week`` and ``golfer_ids`` arguments.
+week_scores_changed = Signal()
+
+MAX_CARD_ROWS = 10
+
+
+class ScoreCardError(ValueError):
+    """A card that cannot be saved; the message is shown to the user."""
+
+
+@dataclass
+class ScoreCardRow:
+    golfer_name: str
+    scores: Dict[int, str]
+
+
+def rows_from_post(data, hole_numbers) -> List[ScoreCardRow]:
+    """Read the active golfer rows of an ``add_round`` form submission.
+
+    Args:
+        data (QueryDict): The POST data, with ``golfer{i}_name``, ``golfer{i}_active``
+            and ``hole{n}_{i}`` fields.
+        hole_numbers (iterable): The nine hole numbers played that week.
+    """
+    rows = []
+    for i in range(1, MAX_CARD_ROWS + 1):
+        golfer_name = data.get(f'golfer{i}_name')
+        if golfer_name and data.get(f'golfer{i}_active') == 'true':
+            rows.append(ScoreCardRow(
+                golfer_name=golfer_name,
+                scores={hole_number: data.get(f'hole{hole_number}_{i}') for hole_number in hole_numbers},
+            ))
+    return rows
+
+
+def save_score_card(week, rows: List[ScoreCardRow]) -> int:
+    """Validate and save a scorecard for ``week``.
+
+    Nothing is written unless every row is valid.
+
+    Args:
+        week (Week): The week the card was played.
+        rows (list of ScoreCardRow): One row per golfer.
+
+    Returns:
+        int: The number of scores written.
+
+    Raises:
+        ScoreCardError: If a golfer is unknown or a score is missing or out of range.
+    """
+    golfers = {}
+    for golfer in Golfer.objects.filter(name__in={row.golfer_name for row in rows}):
+        if golfer.name in golfers:
+            raise ScoreCardError(f"More than one golfer is named {golfer.name}.")
+        golfers[golfer.name] = golfer
+    for row in rows:
+        if row.golfer_name not in golfers:
+            raise ScoreCardError(f"Golfer {row.golfer_name} not found.")
+
+    holes = {hole.number: hole for hole in Hole.objects.filter(config=week.season.course_config)}
+
+    scores = []
+    for row in rows:
+        golfer = golfers[row.golfer_name]
+        for hole_number, score_value in row.scores.items():
+            if not score_value:
+                raise ScoreCardError(f"Missing score for {golfer.name} on hole {hole_number}.")
+            try:
+                score_value = int(score_value)
+            except ValueError:
+                raise ScoreCardError(f"Score for {golfer.name} on hole {hole_number} must be a number.")
+            if not (1 <= score_value <= 10):
+                raise ScoreCardError(f"Score for {golfer.name} on hole {hole_number} must be between 1 and 10.")
+            if hole_number not in holes:
+                raise ScoreCardError(f"Hole {hole_number} is not part of this course.")
+            scores.append(Score(golfer=golfer, week=week, hole=holes[hole_number], score=score_value))
+
+    if not scores:
+        return 0
+
+    with transaction.atomic():
+        # Lock the week so concurrent cards keep scores_entered exact
+        Week.objects.select_for_update().filter(pk=week.pk).exists()
+        Score.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=['golfer', 'week', 'hole'],
+            update_fields=['score'],
+        )
+        # Upserts don't say how many rows were new, so recount the week
+        Week.objects.filter(pk=week.pk).update(scores_entered=Subquery(
+            Score.objects.filter(week=OuterRef('pk')).order_by().values('week').annotate(n=Count('pk')).values('n')
+        ))
+        week_scores_changed.send(
+            sender=Score, week=week, golfer_ids=sorted({g.pk for g in golfers.values()})
+        )
+    return len(scores)
@@ -0,0 +1,178 @@
+"""Scorecards for a played week.
+
+:class:`WeekScorecards` loads a week's matchups, golfer matchups, rounds (which
+carry their hole scores, strokes and points), handicaps and randomly drawn
+teams in a fixed number of queries, then builds every card from dictionaries,
+so rendering a week costs the same number of queries however many teams the
+league has.
+"""
+
+from .distribution import bucket_for
+from .models import GolferMatchup, Handicap, Matchup, RandomDrawnTeam, Round
+
+
+def score_class(score, par):
+    """CSS class used to colour a hole score (blank when there is no score)."""
+    if score == 0:
+        return ''
+    return f'score-{bucket_for(score - par)}'
+
+
+def _at(values, i):
+    return values[i] if i < len(values) else 0
+
+
+class WeekScorecards:
+    """Every scorecard for ``week`` played on ``holes``."""
+
+    def __init__(self, week, holes):
+        self.week = week
+        self.holes = list(holes)
+
+        self.matchups = list(Matchup.objects.filter(week=week).prefetch_related('teams__golfers'))
+        self.golfer_matchups = list(
+            GolferMatchup.objects.filter(week=week)
+            .select_related('golfer', 'opponent', 'subbing_for_golfer').order_by('id')
+        )
+
+        self.round_for_matchup = {}
+        for rnd in Round.objects.filter(week=week).select_related('handicap').order_by('id'):
+            self.round_for_matchup.setdefault(rnd.golfer_matchup_id, rnd)
+
+        self.handicaps = {}
+        for golfer_id, handicap in Handicap.objects.filter(week=week).order_by('id').values_list('golfer_id', 'handicap'):
+            self.handicaps.setdefault(golfer_id, handicap)
+
+        self.drawn_for_absent_team = {}
+        for drawn in (
+            RandomDrawnTeam.objects.filter(week=week)
+            .select_related('absent_team__season__league', 'drawn_team__season__league')
+            .prefetch_related('absent_team__golfers', 'drawn_team__golfers').order_by('id')
+        ):
+            self.drawn_for_absent_team.setdefault(drawn.absent_team_id, drawn)
+
+    def team_golfer_matchups(self, team):
+        """Golfer matchups played for ``team``, A golfers first.
+
+        A golfer can appear in both the A and B positions when a teammate has
+        no sub, so every matchup is returned, not one per golfer.
+        """
+        golfer_ids = {golfer.id for golfer in team.golfers.all()}
+        team_matchups = [
+            gm for gm in self.golfer_matchups
+            if gm.golfer_id in golfer_ids or gm.subbing_for_golfer_id in golfer_ids
+        ]
+        team_matchups.sort(key=lambda gm: not gm.is_A)
+        return team_matchups
+
+    def drawn_team(self, team1, team2):
+        """The ``RandomDrawnTeam`` playing for an absent team in this matchup, if any."""
+        drawn = [self.drawn_for_absent_team.get(team.id) for team in (team1, team2)]
+        drawn = [d for d in drawn if d is not None]
+        return min(drawn, key=lambda d: d.id) if drawn else None
+
+    def golfer_data(self, golfer_matchup):
+        """Card row for one golfer matchup, or None if the round has not been generated."""
+        round_obj = self.round_for_matchup.get(golfer_matchup.id)
+        if not round_obj:
+            return None
+
+        hcp = round_obj.handicap.handicap if round_obj.handicap else 0
+
+        # The round's arrays follow the week's holes in order
+        scores, hole_points, stroke_info, score_classes = [], [], [], []
+        for i, hole in enumerate(self.holes):
+            score = _at(round_obj.hole_gross, i)
+            scores.append(score)
+            hole_points.append(_at(round_obj.hole_points, i))
+            stroke_info.append(_at(round_obj.hole_strokes, i))
+            score_classes.append(score_class(score, hole.par))
+
+        return {
+            'golfer': golfer_matchup.golfer,
+            'is_sub': golfer_matchup.subbing_for_golfer is not None,
+            'sub_for': golfer_matchup.subbing_for_golfer.name if golfer_matchup.subbing_for_golfer else None,
+            'hcp': hcp,
+            'scores': scores,
+            'hole_points': hole_points,
+            'stroke_info': stroke_info,
+            'score_classes': score_classes,
+            'gross': round_obj.gross,
+            'net': round_obj.net,
+            'round_points': round_obj.round_points,
+            'total_points': round_obj.total_points or 0,
+        }
+
+    def virtual_golfer_data(self, golfer, hcp, absent_team):
+        """Placeholder row for a drawn team golfer playing for an absent team."""
+        return {
+            'golfer': golfer,
+            'is_sub': False,
+            'sub_for': None,
+            'hcp': hcp,
+            'scores': ['--' for _ in self.holes],
+            'hole_points': ['--' for _ in self.holes],
+            'stroke_info': [0 for _ in self.holes],
+            'score_classes': ['' for _ in self.holes],
+            'gross': '--',
+            'net': '--',
+            'round_points': '--',
+            'total_points': '--',
+            'is_virtual': True,
+            'virtual_note': f'Drawn team playing for {absent_team}'
+        }
+
+    def _fill_team(self, card, prefix, team_matchups):
+        for position, golfer_matchup in zip('AB', team_matchups[:2]):
+            card[f'{prefix}_golfer{position}'] = self.golfer_data(golfer_matchup)
+
+    def cards(self):
+        """One card per matchup that has at least one golfer on it."""
+        cards = []
+        for matchup in self.matchups:
+            team1, team2 = list(matchup.teams.all())[:2]
+
+            card = {
+                'team1_golferA': None,
+                'team1_golferB': None,
+                'team2_golferA': None,
+                'team2_golferB': None,
+                'is_virtual_matchup': False,
+                'virtual_team_info': None,
+            }
+
+            # A virtual matchup has one team absent, replaced by a random drawn team
+            random_drawn_team = self.drawn_team(team1, team2)
+            if random_drawn_team:
+                card['is_virtual_matchup'] = True
+                absent_team = random_drawn_team.absent_team
+                drawn_team = random_drawn_team.drawn_team
+                if absent_team == team1:
+                    present_team, present_prefix, absent_prefix = team2, 'team2', 'team1'
+                else:
+                    present_team, present_prefix, absent_prefix = team1, 'team1', 'team2'
+
+                self._fill_team(card, present_prefix, self.team_golfer_matchups(present_team))
+
+                drawn_team_golfers = list(drawn_team.golfers.all())
+                card['virtual_team_info'] = {
+                    'absent_team': absent_team,
+                    'drawn_team': drawn_team,
+                    'drawn_golfers': drawn_team_golfers
+                }
+
+                if len(drawn_team_golfers) >= 2:
+                    # Lower handicap plays as the A golfer
+                    drawn_golfer_hcps = sorted(
+                        ((golfer, self.handicaps.get(golfer.id, 0)) for golfer in drawn_team_golfers),
+                        key=lambda x: x[1],
+                    )
+                    for position, (golfer, hcp) in zip('AB', drawn_golfer_hcps[:2]):
+                        card[f'{absent_prefix}_golfer{position}'] = self.virtual_golfer_data(golfer, hcp, absent_team)
+            else:
+                self._fill_team(card, 'team1', self.team_golfer_matchups(team1))
+                self._fill_team(card, 'team2', self.team_golfer_matchups(team2))
+
+            if card['team1_golferA'] or card['team1_golferB'] or card['team2_golferA'] or card['team2_golferB']:
+                cards.append(card)
+        return cards
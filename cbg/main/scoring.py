@@ -0,0 +1,318 @@
+"""Week-level scoring engine.
+
+Loads everything needed to score a :class:`~main.models.Week` (holes, scores,
+handicaps, golfer matchups and team matchups) in a handful of bulk queries,
+computes hole and round points in memory and writes ``Round`` rows, each with
+its per-hole arrays, in one bulk upsert. ``helper.get_golfer_points`` and
+``helper.generate_round`` are thin wrappers around this module.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from .distribution import refresh_score_distribution
+from .helper import conventional_round
+from .models import GolferMatchup, Handicap, Hole, Matchup, Round, Score
+from .page_cache import bump_data_version
+from .standings import half_for_week, refresh_team_standings
+
+logger = logging.getLogger(__name__)
+
+
+def strokes_on_hole(stroke_diff: int, handicap9: int) -> int:
+    """Strokes received on a hole by the higher handicap golfer.
+
+    ``stroke_diff`` is the difference between the two rounded handicaps. The
+    first nine strokes go to holes in ``handicap9`` order; anything over nine
+    rolls over as one extra stroke on every hole.
+    """
+    if stroke_diff <= 0:
+        return 0
+    rollover = 1 if stroke_diff > 9 else 0
+    remaining = stroke_diff - 9 if rollover else stroke_diff
+    return rollover + (1 if handicap9 <= remaining else 0)
+
+
+@dataclass
+class MatchupScore:
+    """In-memory result of scoring one golfer matchup."""
+    golfer_matchup: GolferMatchup
+    gross: int
+    net: int
+    golfer_points: float
+    opp_points: float
+    hole_points: float
+    opp_hole_points: float
+    round_points: float
+    opp_round_points: float
+    # (hole, golfer's score, strokes received, points earned on the hole)
+    holes: List[Tuple[Hole, int, int, float]] = field(default_factory=list)
+
+    def hole_arrays(self) -> dict:
+        """The ``Round`` fields holding the round hole by hole."""
+        return {
+            'hole_gross': [gross for _hole, gross, _strokes, _pts in self.holes],
+            'hole_net': [gross - strokes for _hole, gross, strokes, _pts in self.holes],
+            'hole_strokes': [strokes for _hole, _gross, strokes, _pts in self.holes],
+            'hole_points': [pts for _hole, _gross, _strokes, pts in self.holes],
+        }
+
+    def detail(self) -> dict:
+        """Same shape as ``get_golfer_points(..., detail=True)``."""
+        gm = self.golfer_matchup
+        return {
+            'golfer': gm.golfer,
+            'golfer_points': self.golfer_points,
+            'opponent': gm.opponent,
+            'opp_points': self.opp_points,
+            'hole_points': self.hole_points,
+            'opp_hole_points': self.opp_hole_points,
+            'round_points': self.round_points,
+            'opp_round_points': self.opp_round_points,
+        }
+
+
+class WeekScoring:
+    """Bulk-loaded scoring state for a single week.
+
+    Construction runs a fixed number of queries regardless of how many golfer
+    matchups the week has; :meth:`score` is pure Python and :meth:`save`
+    writes every ``Round`` row with one bulk upsert.
+    """
+
+    def __init__(self, week):
+        self.week = week
+        season = week.season
+        hole_numbers = range(1, 10) if week.is_front else range(10, 19)
+        self.holes: List[Hole] = list(
+            Hole.objects.filter(config=season.course_config, number__in=hole_numbers).order_by('number')
+        )
+
+        # (golfer_id, hole_id) -> Score
+        self.scores: Dict[Tuple[int, int], Score] = {}
+        self.gross: Dict[int, int] = {}
+        for score in Score.objects.filter(week=week):
+            self.scores[(score.golfer_id, score.hole_id)] = score
+            self.gross[score.golfer_id] = self.gross.get(score.golfer_id, 0) + score.score
+
+        self.handicaps: Dict[int, Handicap] = {
+            hcp.golfer_id: hcp for hcp in Handicap.objects.filter(week=week)
+        }
+
+        self.golfer_matchups: List[GolferMatchup] = list(
+            GolferMatchup.objects.filter(week=week).select_related('golfer', 'opponent', 'subbing_for_golfer')
+        )
+        self._by_pair: Dict[Tuple[int, int], GolferMatchup] = {
+            (gm.golfer_id, gm.opponent_id): gm for gm in self.golfer_matchups
+        }
+
+        # golfer_id -> matchup_id for every team golfer scheduled this week
+        self.matchup_for_golfer: Dict[int, int] = {}
+        for matchup_id, golfer_id in Matchup.objects.filter(week=week).values_list('id', 'teams__golfers'):
+            if golfer_id is not None:
+                self.matchup_for_golfer.setdefault(golfer_id, matchup_id)
+
+    def get_hcp(self, golfer_id) -> float:
+        hcp = self.handicaps.get(golfer_id)
+        return hcp.handicap if hcp else 0
+
+    def golfer_played(self, golfer_id) -> bool:
+        return golfer_id in self.gross
+
+    def score(self, golfer_matchup: GolferMatchup) -> MatchupScore:
+        """Score one golfer matchup using only the preloaded data.
+
+        Mirrors the rules documented on ``helper.get_golfer_points``. Raises
+        ``Score.DoesNotExist`` when either golfer is missing a hole score.
+        """
+        golfer_id = golfer_matchup.golfer_id
+        opponent_id = golfer_matchup.opponent_id
+
+        rounded_golfer_hcp = conventional_round(self.get_hcp(golfer_id))
+        rounded_opp_hcp = conventional_round(self.get_hcp(opponent_id))
+
+        if golfer_id not in self.gross or opponent_id not in self.gross:
+            raise Score.DoesNotExist(
+                f'Missing scores for golfer matchup {golfer_matchup.pk} in week {self.week.number}'
+            )
+        gross_score = self.gross[golfer_id]
+        opp_gross_score = self.gross[opponent_id]
+        net_score = gross_score - rounded_golfer_hcp
+        opp_net_score = opp_gross_score - rounded_opp_hcp
+
+        stroke_diff = abs(rounded_golfer_hcp - rounded_opp_hcp)
+        getting = rounded_golfer_hcp > rounded_opp_hcp
+        giving = rounded_golfer_hcp < rounded_opp_hcp
+        virtual = golfer_matchup.opponent_team_no_subs
+
+        points = 0
+        opp_points = 0
+        holes = []
+        for hole in self.holes:
+            golfer_score_model = self.scores.get((golfer_id, hole.id))
+            opponent_score_model = self.scores.get((opponent_id, hole.id))
+            if golfer_score_model is None or opponent_score_model is None:
+                raise Score.DoesNotExist(
+                    f'Missing hole {hole.number} score for golfer matchup {golfer_matchup.pk}'
+                )
+            golfer_score = golfer_score_model.score
+            opponent_score = opponent_score_model.score
+
+            strokes = strokes_on_hole(stroke_diff, hole.handicap9)
+            if giving:
+                opponent_score -= strokes
+            if getting:
+                golfer_score -= strokes
+            strokes_received = strokes if getting else 0
+
+            if golfer_score < opponent_score:
+                points += 1
+                hole_pts = 1
+            elif golfer_score == opponent_score:
+                points += 0.5
+                # In virtual matchups, ties still give golfer 0.5 but opponent gets 0
+                if not virtual:
+                    opp_points += 0.5
+                hole_pts = 0.5
+            else:
+                # Virtual opponent cannot take points
+                if not virtual:
+                    opp_points += 1
+                hole_pts = 0
+            holes.append((hole, golfer_score_model.score, strokes_received, hole_pts))
+
+        hole_points = points
+        opp_hole_points = opp_points
+
+        golfer_is_teammate_subbing = golfer_matchup.is_teammate_subbing
+        opponent_matchup = self._by_pair.get((opponent_id, golfer_id))
+        opponent_is_teammate_subbing = opponent_matchup.is_teammate_subbing if opponent_matchup else False
+
+        if virtual:
+            # Virtual matchup - golfer automatically gets 3 points for low net score
+            points += 3
+            round_points, opp_round_points = 3, 0
+        elif golfer_is_teammate_subbing and opponent_is_teammate_subbing:
+            round_points, opp_round_points = 0, 0
+        elif golfer_is_teammate_subbing:
+            opp_points += 3
+            round_points, opp_round_points = 0, 3
+        elif opponent_is_teammate_subbing:
+            points += 3
+            round_points, opp_round_points = 3, 0
+        elif net_score < opp_net_score:
+            points += 3
+            round_points, opp_round_points = 3, 0
+        elif net_score == opp_net_score:
+            points += 1.5
+            opp_points += 1.5
+            round_points, opp_round_points = 1.5, 1.5
+        else:
+            opp_points += 3
+            round_points, opp_round_points = 0, 3
+
+        return MatchupScore(
+            golfer_matchup=golfer_matchup,
+            gross=gross_score,
+            net=net_score,
+            golfer_points=points,
+            opp_points=opp_points,
+            hole_points=hole_points,
+            opp_hole_points=opp_hole_points,
+            round_points=round_points,
+            opp_round_points=opp_round_points,
+            holes=holes,
+        )
+
+    def save(self, golfer_matchups: Optional[Iterable[GolferMatchup]] = None) -> int:
+        """Score ``golfer_matchups`` (default: the whole week) and persist the results.
+
+        Golfers without scores are skipped, as are matchups that cannot be
+        scored (missing opponent scores, handicap or team matchup); those are
+        reported and left untouched. Returns the number of rounds written.
+        """
+        if golfer_matchups is None:
+            golfer_matchups = self.golfer_matchups
+
+        results: List[MatchupScore] = []
+        for gm in golfer_matchups:
+            if not self.golfer_played(gm.golfer_id):
+                continue
+            lookup_golfer_id = gm.subbing_for_golfer_id or gm.golfer_id
+            if gm.golfer_id not in self.handicaps or lookup_golfer_id not in self.matchup_for_golfer:
+                logger.warning("Skipping round for %s in week %s: missing handicap or matchup", gm.golfer.name, self.week.number)
+                continue
+            try:
+                results.append(self.score(gm))
+            except Score.DoesNotExist as e:
+                # Expected while a week's scores are still being entered
+                logger.warning("Skipping round for %s in week %s: %s", gm.golfer.name, self.week.number, e)
+            except Exception:
+                logger.exception("Error generating round for %s in week %s", gm.golfer.name, self.week.number)
+                raise
+
+        if not results:
+            return 0
+
+        with transaction.atomic():
+            rounds = []
+            for res in results:
+                gm = res.golfer_matchup
+                is_sub = bool(gm.subbing_for_golfer_id)
+                rounds.append(Round(
+                    golfer_id=gm.golfer_id,
+                    week_id=self.week.id,
+                    matchup_id=self.matchup_for_golfer[gm.subbing_for_golfer_id or gm.golfer_id],
+                    golfer_matchup_id=gm.id,
+                    handicap_id=self.handicaps[gm.golfer_id].id,
+                    is_sub=is_sub,
+                    subbing_for_id=gm.subbing_for_golfer_id if is_sub else None,
+                    gross=res.gross,
+                    net=res.net,
+                    round_points=res.round_points,
+                    total_points=res.golfer_points,
+                    **res.hole_arrays(),
+                ))
+            rounds = Round.objects.bulk_create(
+                rounds,
+                update_conflicts=True,
+                unique_fields=['golfer_matchup', 'week'],
+                update_fields=[
+                    'golfer', 'matchup', 'handicap', 'is_sub', 'subbing_for',
+                    'gross', 'net', 'round_points', 'total_points',
+                    'hole_gross', 'hole_net', 'hole_strokes', 'hole_points',
+                ],
+            )
+
+            refresh_team_standings(self.week.season, halves=[half_for_week(self.week)])
+            refresh_score_distribution(self.week.season, weeks=[self.week])
+            bump_data_version(pk=self.week.season_id)
+
+        return len(rounds)
+
+
+def score_week(week, golfer_matchups=None) -> int:
+    """Generate every ``Round`` for ``week`` in bulk.
+
+    Parameters
+    ----------
+    week : Week
+        The week to score.
+    golfer_matchups : iterable of GolferMatchup, optional
+        Restrict scoring to these matchups. Defaults to all matchups in the week.
+
+    Returns
+    -------
+    int
+        The number of rounds written.
+    """
+    engine = WeekScoring(week)
+    if golfer_matchups is not None:
+        wanted = {gm.pk for gm in golfer_matchups}
+        golfer_matchups = [gm for gm in engine.golfer_matchups if gm.pk in wanted]
+    return engine.save(golfer_matchups)
@@ -1,16 +1,20 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.db import transaction
-from main.models import Score, GolferMatchup, Sub, Team, Matchup
+from django.db.models import F
+from main.models import (
+    Score, GolferMatchup, Sub, Team, Matchup, Week, Golfer, League, Season,
+    Round, Handicap, SkinEntry, GameEntry, Game, RandomDrawnTeam, Hole,
+)
 from main.tasks import process_week_async, generate_matchups_async
+from main.league_scope import invalidate_league_cache
+from main.page_cache import bump_data_version
+from main.recompute import mark_week_dirty
+from main.score_entry import week_scores_changed
+from main.task_coordination import request_task
 
-@receiver(post_save, sender=Score)
-def score_updated(sender, instance, created, **kwargs):
-    # 'instance' is the Score object that was saved
-
-    week = instance.week
-    
-    number_of_scores = Score.objects.filter(week=week).count()
+def queue_week_if_complete(week):
+    number_of_scores = Week.objects.values_list('scores_entered', flat=True).get(pk=week.pk)
     
     # check if the scores are for full rounds (divisible by 9)
     if number_of_scores % 9 == 0:
@@ -20,13 +24,38 @@ def score_updated(sender, instance, created, **kwargs):
         
         if number_of_scores == scores_needed:
             # Use on_commit to ensure the Score save is committed before processing
-            transaction.on_commit(lambda: process_week_async.delay(week.id))
+            transaction.on_commit(lambda: request_task(process_week_async, week.id))
             # all scores entered... Process week asynchronously.
+
+@receiver(post_save, sender=Score)
+def score_updated(sender, instance, created, **kwargs):
+    # 'instance' is the Score object that was saved
+
+    week = instance.week
+    if created:
+        Week.objects.filter(pk=instance.week_id).update(scores_entered=F('scores_entered') + 1)
+    mark_week_dirty(week, golfers=[instance.golfer_id], reason='score')
+    queue_week_if_complete(week)
+
+@receiver(week_scores_changed)
+def week_scores_saved(sender, week, golfer_ids, **kwargs):
+    # A whole scorecard was written in bulk (no per-score post_save)
+    mark_week_dirty(week, golfers=golfer_ids, reason='score')
+    bump_data_version(pk=week.season_id)
+    queue_week_if_complete(week)
         
 @receiver(post_delete, sender=Score)
 def score_deleted(sender, instance, **kwargs):
-    pass
-    #print('Score Deleted')
+    Week.objects.filter(pk=instance.week_id, scores_entered__gt=0).update(scores_entered=F('scores_entered') - 1)
+
+    # The week or golfer may be going away with the score (cascade), so mark after commit
+    def mark_dirty():
+        if not Week.objects.filter(pk=instance.week_id).exists():
+            return
+        golfers = [instance.golfer_id] if Golfer.objects.filter(pk=instance.golfer_id).exists() else None
+        mark_week_dirty(instance.week_id, golfers=golfers, reason='score')
+
+    transaction.on_commit(mark_dirty)
 
 @receiver(post_save, sender=Sub)
 def sub_updated(sender, instance, created, **kwargs):
@@ -35,6 +64,7 @@ def sub_updated(sender, instance, created, **kwargs):
     
     # Use on_commit to ensure the Sub save is committed before updating week and generating matchups
     def update_week_and_matchups():
+        mark_week_dirty(instance.week, reason='sub')
         no_sub_golfer_count = Sub.objects.filter(week=instance.week, no_sub=True).count()
         scores_needed = ((Team.objects.filter(season=instance.week.season).count() * 2) - no_sub_golfer_count) * 9
         
@@ -42,7 +72,7 @@ def sub_updated(sender, instance, created, **kwargs):
         instance.week.save()
 
         # Generate matchups asynchronously
-        generate_matchups_async.delay(instance.week.id)
+        request_task(generate_matchups_async, instance.week.id)
     
     transaction.on_commit(update_week_and_matchups)
 
@@ -51,6 +81,9 @@ def sub_deleted(sender, instance, **kwargs):
     
     # Use on_commit to ensure the Sub delete is committed before updating week and generating matchups
     def update_week_and_matchups():
+        if not Week.objects.filter(pk=instance.week_id).exists():
+            return
+        mark_week_dirty(instance.week, reason='sub')
         no_sub_golfer_count = Sub.objects.filter(week=instance.week, no_sub=True).count()
         scores_needed = ((Team.objects.filter(season=instance.week.season).count() * 2) - no_sub_golfer_count) * 9
         
@@ -58,7 +91,7 @@ def sub_deleted(sender, instance, **kwargs):
         instance.week.save()
 
         # Generate matchups asynchronously
-        generate_matchups_async.delay(instance.week.id)
+        request_task(generate_matchups_async, instance.week.id)
     
     transaction.on_commit(update_week_and_matchups)
 
@@ -70,11 +103,42 @@ def matchup_created_or_updated(sender, instance, created, **kwargs):
     """
     def check_and_generate_matchups():
         week = instance.week
+        mark_week_dirty(week, reason='matchup')
         total_teams = Team.objects.filter(season=week.season).count()
         total_matchups = Matchup.objects.filter(week=week).count()
         expected_matchups = total_teams // 2
         if total_matchups == expected_matchups:
             # Only regenerate golfer matchups (do not update num_scores based on no_subs)
             print(f'All matchups entered for Week {week.number}. Regenerating golfer matchups.')
-            generate_matchups_async.delay(week.id)
-    transaction.on_commit(check_and_generate_matchups)
\ No newline at end of file
+            request_task(generate_matchups_async, week.id)
+    transaction.on_commit(check_and_generate_matchups)
+
+# Leagues and seasons are cached per process (see main.league_scope)
+for _model in (League, Season):
+    post_save.connect(invalidate_league_cache, sender=_model, dispatch_uid=f'invalidate_league_cache_save_{_model.__name__}')
+    post_delete.connect(invalidate_league_cache, sender=_model, dispatch_uid=f'invalidate_league_cache_delete_{_model.__name__}')
+
+# Cached public pages are keyed on each season's data version (see main.page_cache)
+def data_changed(sender, instance, **kwargs):
+    if not kwargs.get('action', 'post').startswith('post'):
+        return
+    if isinstance(instance, Season):
+        bump_data_version(pk=instance.pk)
+    elif isinstance(instance, Hole):
+        bump_data_version(course_config=instance.config_id)
+    elif isinstance(instance, Golfer):
+        # Golfers are shared by every league
+        bump_data_version()
+    elif hasattr(instance, 'season_id'):
+        bump_data_version(pk=instance.season_id)
+    elif getattr(instance, 'week_id', None):
+        bump_data_version(week=instance.week_id)
+
+for _model in (
+    Score, Round, Handicap, Sub, Matchup, SkinEntry, GameEntry, Game,
+    GolferMatchup, RandomDrawnTeam, Week, Team, Season, Golfer, Hole,
+):
+    post_save.connect(data_changed, sender=_model, dispatch_uid=f'data_changed_save_{_model.__name__}')
+    post_delete.connect(data_changed, sender=_model, dispatch_uid=f'data_changed_delete_{_model.__name__}')
+for _through in (Matchup.teams.through, Team.golfers.through):
+    m2m_changed.connect(data_changed, sender=_through, dispatch_uid=f'data_changed_m2m_{_through.__name__}')
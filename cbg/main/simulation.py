@@ -0,0 +1,467 @@
+"""Monte Carlo playoff projections.
+
+Simulates the rest of a season many times and seeds every simulated season
+with the same rules as ``playoffs.compute_playoff_seeds``. Each remaining
+scheduled ``Matchup`` is played hole by hole: each hole's score is drawn from
+the golfer's own history of strokes over par on that hole in ``Score`` (see
+:func:`_hole_pools` for golfers with little history there) and scored with
+the league's hole/round points and handicap stroke allocation, vectorized
+across all simulations with NumPy. Seeding is vectorized too, except for
+simulations that need a head-to-head tiebreak. Chunks of simulations run in a
+``billiard`` process pool, which unlike ``multiprocessing`` can start from a
+Celery prefork worker.
+
+A team is only reported clinched or eliminated when no remaining result can
+change that; a team that made or missed the playoffs in every simulation is
+otherwise "projected" in or out.
+
+Projections ignore future subs and handicap movement: every golfer plays
+every remaining week at their latest handicap.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from billiard import Pool
+from django.db.models import F, Max
+
+from .helper import conventional_round
+from .models import Handicap, Hole, Matchup, PlayoffSimulation, Round, Score, Team, Week
+from .playoffs import HeadToHead, _full_points_map, _get_team_name, head_to_head_matrix, seed_teams
+from .standings import LAST_FIRST_HALF_WEEK
+
+DEFAULT_SIMULATIONS = 20000
+
+# Scores a golfer needs on a hole to draw from them alone
+MIN_HOLE_HISTORY = 5
+# Scores a golfer needs on holes of one par to stand in for a hole they have rarely played
+MIN_HISTORY_HOLES = 9
+
+
+@dataclass
+class RemainingMatchup:
+    week_number: int
+    is_front: bool
+    team_ids: Tuple[int, int]
+
+
+@dataclass
+class SimulationInputs:
+    """Everything a simulation needs, as plain picklable data (no ORM access in workers)."""
+    team_names: Dict[int, str]
+    first: Dict[int, float]
+    second: Dict[int, float]
+    head_to_head: HeadToHead
+    remaining: List[RemainingMatchup]
+    # team_id -> [(golfer_id, handicap)] ordered A golfer first
+    lineups: Dict[int, List[Tuple[int, float]]]
+    # golfer_id -> hole number -> strokes over par to draw that hole's score from
+    history: Dict[int, Dict[int, np.ndarray]]
+    # True/False (front/back nine) -> (par, handicap9) arrays
+    nines: Dict[bool, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+
+
+def load_simulation_inputs(season) -> SimulationInputs:
+    """Read the current standings, schedule and golfer history for ``season``."""
+    teams = list(Team.objects.filter(season=season).prefetch_related('golfers'))
+    team_names = {t.id: _get_team_name(t) for t in teams}
+    first, second, _ = _full_points_map(season)
+
+    # Remaining = scheduled, not rained out, and not scored yet
+    scored_week_ids = set(Round.objects.filter(week__season=season).values_list('week_id', flat=True).distinct())
+    remaining_teams: Dict[int, List[int]] = {}
+    matchup_week: Dict[int, Tuple[int, bool]] = {}
+    for matchup_id, week_id, number, is_front, team_id in (
+        Matchup.objects.filter(week__season=season, week__rained_out=False)
+        .exclude(week_id__in=scored_week_ids)
+        .values_list('id', 'week_id', 'week__number', 'week__is_front', 'teams')
+    ):
+        if team_id is not None:
+            remaining_teams.setdefault(matchup_id, []).append(team_id)
+            matchup_week[matchup_id] = (number, is_front)
+    remaining = [
+        RemainingMatchup(week_number=matchup_week[mid][0], is_front=matchup_week[mid][1], team_ids=tuple(tids))
+        for mid, tids in remaining_teams.items()
+        if len(tids) == 2
+    ]
+
+    golfer_ids = [g.id for t in teams for g in t.golfers.all()]
+    latest_hcp: Dict[int, float] = {}
+    for golfer_id, value in (
+        Handicap.objects.filter(golfer__in=golfer_ids, week__season=season)
+        .order_by('golfer_id', 'week__number')
+        .values_list('golfer_id', 'handicap')
+    ):
+        latest_hcp[golfer_id] = value
+    lineups = {}
+    for t in teams:
+        golfers = sorted(((g.id, latest_hcp.get(g.id, 0.0)) for g in t.golfers.all()), key=lambda x: (x[1], x[0]))
+        lineups[t.id] = golfers
+
+    holes = list(Hole.objects.filter(config=season.course_config).order_by('number').values_list('number', 'par', 'handicap9'))
+    scores = (
+        Score.objects.filter(golfer__in=golfer_ids)
+        .annotate(delta=F('score') - F('hole__par'))
+        .values_list('golfer_id', 'hole__number', 'hole__par', 'delta')
+    )
+    history = _hole_pools(golfer_ids, {number: par for number, par, _ in holes}, scores)
+
+    nines = {}
+    for is_front in (True, False):
+        nine = [(par, hcp9) for number, par, hcp9 in holes if number in _nine(is_front)]
+        nines[is_front] = (np.array([p for p, _ in nine]), np.array([h for _, h in nine]))
+
+    return SimulationInputs(
+        team_names=team_names,
+        first=first,
+        second=second,
+        head_to_head=dict(head_to_head_matrix(season)),
+        remaining=remaining,
+        lineups=lineups,
+        history=history,
+        nines=nines,
+    )
+
+
+def _hole_pools(golfer_ids, hole_pars, scores) -> Dict[int, Dict[int, np.ndarray]]:
+    """Strokes over par to draw each golfer's score on each hole from.
+
+    A hole's par and stroke index shape how it is scored, so every hole draws
+    from its own history, in order of preference:
+
+    1. the golfer's scores on that hole, given ``MIN_HOLE_HISTORY`` of them;
+    2. the golfer's scores on every hole of the same par, given ``MIN_HISTORY_HOLES``;
+    3. every golfer's scores on that hole, then on holes of the same par.
+
+    Args:
+        golfer_ids (list): Golfers to build pools for.
+        hole_pars (dict): ``{hole_number: par}`` of the course being simulated.
+        scores (iterable): ``(golfer_id, hole_number, par, strokes_over_par)`` rows.
+    """
+    by_hole: Dict[Tuple[int, int], List[int]] = {}
+    by_par: Dict[Tuple[int, int], List[int]] = {}
+    league_hole: Dict[int, List[int]] = {}
+    league_par: Dict[int, List[int]] = {}
+    for golfer_id, number, par, delta in scores:
+        by_hole.setdefault((golfer_id, number), []).append(delta)
+        by_par.setdefault((golfer_id, par), []).append(delta)
+        league_hole.setdefault(number, []).append(delta)
+        league_par.setdefault(par, []).append(delta)
+
+    def pool(golfer_id, number, par):
+        for deltas, needed in (
+            (by_hole.get((golfer_id, number), []), MIN_HOLE_HISTORY),
+            (by_par.get((golfer_id, par), []), MIN_HISTORY_HOLES),
+            (league_hole.get(number, []), 1),
+            (league_par.get(par, []), 1),
+        ):
+            if len(deltas) >= needed:
+                return np.array(deltas, dtype=np.int16)
+        return np.zeros(1, dtype=np.int16)
+
+    return {
+        golfer_id: {number: pool(golfer_id, number, par) for number, par in hole_pars.items()}
+        for golfer_id in golfer_ids
+    }
+
+
+def _nine(is_front: bool) -> range:
+    return range(1, 10) if is_front else range(10, 19)
+
+
+def _strokes(stroke_diff: int, handicap9: np.ndarray) -> np.ndarray:
+    # Vector form of scoring.strokes_on_hole over a nine
+    if stroke_diff <= 0:
+        return np.zeros_like(handicap9)
+    rollover = 1 if stroke_diff > 9 else 0
+    remaining = stroke_diff - 9 if rollover else stroke_diff
+    return rollover + (handicap9 <= remaining).astype(handicap9.dtype)
+
+
+def _draw_gross(rng, pools, numbers, par, n):
+    # One column per hole, each drawn from that hole's own pool
+    return par + np.stack([rng.choice(pools[number], size=n) for number in numbers], axis=1)
+
+
+def _golfer_points(rng, inputs, golfer, opponent, is_front, par, handicap9, n):
+    """Simulated (golfer_points, opponent_points) arrays of length ``n`` for one golfer matchup."""
+    (golfer_id, golfer_hcp), (opponent_id, opponent_hcp) = golfer, opponent
+    numbers = _nine(is_front)
+    gross = _draw_gross(rng, inputs.history[golfer_id], numbers, par, n)
+    opp_gross = _draw_gross(rng, inputs.history[opponent_id], numbers, par, n)
+    gross = np.maximum(gross, 1)
+    opp_gross = np.maximum(opp_gross, 1)
+
+    rounded, opp_rounded = conventional_round(golfer_hcp), conventional_round(opponent_hcp)
+    strokes = _strokes(abs(rounded - opp_rounded), handicap9)
+    hole_gross, hole_opp = gross, opp_gross
+    if rounded > opp_rounded:
+        hole_gross = gross - strokes
+    elif rounded < opp_rounded:
+        hole_opp = opp_gross - strokes
+
+    won = (hole_gross < hole_opp).sum(axis=1)
+    halved = (hole_gross == hole_opp).sum(axis=1)
+    points = won + 0.5 * halved
+    opp_points = (len(par) - won - halved) + 0.5 * halved
+
+    net = gross.sum(axis=1) - rounded
+    opp_net = opp_gross.sum(axis=1) - opp_rounded
+    points = points + np.where(net < opp_net, 3.0, np.where(net == opp_net, 1.5, 0.0))
+    opp_points = opp_points + np.where(opp_net < net, 3.0, np.where(net == opp_net, 1.5, 0.0))
+    return points, opp_points
+
+
+def _simulate_chunk(inputs: SimulationInputs, simulations: int, max_playoff_teams: int, seed) -> np.ndarray:
+    """Run ``simulations`` seasons; returns seed counts shaped (teams, max_playoff_teams)."""
+    rng = np.random.default_rng(seed)
+    team_ids = list(inputs.team_names)
+    index = {tid: i for i, tid in enumerate(team_ids)}
+
+    first = np.tile(np.array([inputs.first.get(t, 0.0) for t in team_ids]), (simulations, 1))
+    second = np.tile(np.array([inputs.second.get(t, 0.0) for t in team_ids]), (simulations, 1))
+    # Only pairs that play again need per-simulation head-to-head values
+    h2h_delta: Dict[Tuple[int, int], np.ndarray] = {}
+
+    for matchup in inputs.remaining:
+        a, b = matchup.team_ids
+        par, handicap9 = inputs.nines[matchup.is_front]
+        a_points = np.zeros(simulations)
+        b_points = np.zeros(simulations)
+        for golfer, opponent in zip(inputs.lineups[a], inputs.lineups[b]):
+            g_pts, o_pts = _golfer_points(rng, inputs, golfer, opponent, matchup.is_front, par, handicap9, simulations)
+            a_points += g_pts
+            b_points += o_pts
+        half = first if matchup.week_number <= LAST_FIRST_HALF_WEEK else second
+        half[:, index[a]] += a_points
+        half[:, index[b]] += b_points
+        h2h_delta[(a, b)] = h2h_delta.get((a, b), 0) + a_points
+        h2h_delta[(b, a)] = h2h_delta.get((b, a), 0) + b_points
+
+    return _seed_counts(inputs, team_ids, first, second, h2h_delta, max_playoff_teams)
+
+
+def _seed_counts(inputs, team_ids, first, second, h2h_delta, max_playoff_teams) -> np.ndarray:
+    """Seed every simulated season; returns seed counts shaped (teams, max_playoff_teams).
+
+    Half winners and seed order are found for all simulations at once. A
+    simulation where two teams competing for the same place are level on
+    total points needs the head-to-head tiebreak, so it is seeded by
+    ``seed_teams`` instead.
+    """
+    simulations, n_teams = first.shape
+    total = first + second
+    counts = np.zeros((n_teams, max_playoff_teams), dtype=np.int64)
+    seeded = min(max_playoff_teams, n_teams)
+
+    # The first half goes to every team level on the most points; the second to the best team(s) not already in
+    first_winners = (first == first.max(axis=1, keepdims=True)) & (first > 0)
+    open_second = np.where(first_winners, -np.inf, second)
+    second_winners = (open_second == open_second.max(axis=1, keepdims=True)) & (second > 0) & ~first_winners
+    half_winners = first_winners | second_winners
+
+    # Half winners ahead of wildcards, each group by total points
+    order = np.lexsort((-total, ~half_winners), axis=-1)
+    rows = np.arange(simulations)[:, None]
+    ordered_total = total[rows, order]
+    ordered_winner = half_winners[rows, order]
+    # A tie inside the places that are seeded, or for the last one, needs seed_teams
+    edge = min(seeded + 1, n_teams)
+    level = (
+        (np.abs(np.diff(ordered_total[:, :edge], axis=1)) < 1e-9)
+        & (ordered_winner[:, 1:edge] == ordered_winner[:, :edge - 1])
+    )
+    tied = level.any(axis=1)
+
+    for place in range(seeded):
+        np.add.at(counts, (order[~tied, place], place), 1)
+
+    index = {tid: i for i, tid in enumerate(team_ids)}
+    for s in np.flatnonzero(tied):
+        head_to_head = dict(inputs.head_to_head)
+        for pair, delta in h2h_delta.items():
+            head_to_head[pair] = head_to_head.get(pair, 0.0) + float(delta[s])
+        seeds = seed_teams(
+            inputs.team_names,
+            dict(zip(team_ids, first[s].tolist())),
+            dict(zip(team_ids, second[s].tolist())),
+            dict(zip(team_ids, total[s].tolist())),
+            head_to_head,
+            max_playoff_teams,
+        )
+        for seed in seeds:
+            counts[index[seed.team_id], seed.seed - 1] += 1
+    return counts
+
+
+def _points_bounds(inputs):
+    """Fewest and most points each team can finish with, per half, as ``{team_id: (low, high)}`` pairs."""
+    first = {tid: [inputs.first.get(tid, 0.0)] * 2 for tid in inputs.team_names}
+    second = {tid: [inputs.second.get(tid, 0.0)] * 2 for tid in inputs.team_names}
+    for matchup in inputs.remaining:
+        a, b = matchup.team_ids
+        par, _ = inputs.nines[matchup.is_front]
+        # A golfer matchup is worth a point a hole plus 3 for the lower net
+        at_stake = (len(par) + 3.0) * len(list(zip(inputs.lineups[a], inputs.lineups[b])))
+        half = first if matchup.week_number <= LAST_FIRST_HALF_WEEK else second
+        half[a][1] += at_stake
+        half[b][1] += at_stake
+    return first, second
+
+
+def _settled_statuses(inputs, max_playoff_teams) -> Dict[int, str]:
+    """``'clinched'`` or ``'eliminated'`` for the teams whose fate no remaining result can change.
+
+    Works from each team's fewest and most possible points (nothing or
+    everything at stake in each remaining matchup), so it is sure but not
+    exhaustive: a team it leaves out may still be settled in fact. Like the
+    simulation, it assumes no subs.
+    """
+    first, second = _points_bounds(inputs)
+    total = {tid: (first[tid][0] + second[tid][0], first[tid][1] + second[tid][1]) for tid in inputs.team_names}
+
+    def best_low(bounds, teams):
+        return max((bounds[tid][0] for tid in teams), default=0.0)
+
+    # Who can still win a half (the second half's winner comes from teams without the first half)
+    first_possible = {
+        tid for tid in inputs.team_names
+        if first[tid][1] > 0 and first[tid][1] >= best_low(first, [other for other in first if other != tid])
+    }
+    second_possible = {
+        tid for tid in inputs.team_names
+        if second[tid][1] > 0 and second[tid][1] >= best_low(
+            second, [other for other in second if other != tid and other not in first_possible]
+        )
+    }
+    can_win_half = first_possible | second_possible
+
+    settled = {}
+    for tid in inputs.team_names:
+        others = [other for other in inputs.team_names if other != tid]
+        # Teams that could take a place ahead of this one: possible half winners, and anyone who can catch it
+        threats = [other for other in others if other in can_win_half or total[other][1] >= total[tid][0]]
+        # Teams sure to finish ahead of it on total points
+        ahead = [other for other in others if total[other][0] > total[tid][1]]
+        if len(threats) < max_playoff_teams:
+            settled[tid] = 'clinched'
+        elif tid not in can_win_half and len(ahead) >= max_playoff_teams:
+            settled[tid] = 'eliminated'
+    return settled
+
+
+def simulate_playoffs(
+    inputs: SimulationInputs,
+    simulations: int = DEFAULT_SIMULATIONS,
+    max_playoff_teams: int = 4,
+    workers: Optional[int] = None,
+    seed=None,
+) -> List[dict]:
+    """Simulate the remaining schedule and summarise playoff odds per team.
+
+    Returns one dict per team (season team order) with ``team_id``,
+    ``team_name``, ``playoff_probability``, ``seed_probabilities`` (index 0 is
+    seed 1) and ``status``: ``'clinched'`` or ``'eliminated'`` when no result
+    of the remaining matchups can change whether the team makes the playoffs
+    (see :func:`_settled_statuses`), ``'projected_in'`` or ``'projected_out'``
+    when it made or missed them in every simulation without that being
+    settled, otherwise ``'alive'``.
+    """
+    if not inputs.team_names:
+        return []
+    if not inputs.remaining:
+        simulations = 1  # nothing left to play: the current seeds are final
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, simulations))
+
+    chunk_seeds = np.random.SeedSequence(seed).spawn(workers)
+    chunk_sizes = [simulations // workers + (1 if i < simulations % workers else 0) for i in range(workers)]
+    if workers == 1:
+        counts = _simulate_chunk(inputs, simulations, max_playoff_teams, chunk_seeds[0])
+    else:
+        # billiard, not multiprocessing: Celery prefork workers are daemonic, and
+        # multiprocessing refuses to start children from a daemonic process
+        with Pool(processes=workers) as pool:
+            counts = sum(pool.starmap(_simulate_chunk, [
+                (inputs, size, max_playoff_teams, chunk_seed)
+                for size, chunk_seed in zip(chunk_sizes, chunk_seeds)
+            ]))
+
+    settled = _settled_statuses(inputs, max_playoff_teams)
+    results = []
+    for i, (team_id, team_name) in enumerate(inputs.team_names.items()):
+        seed_probabilities = (counts[i] / simulations).tolist()
+        made = float(counts[i].sum()) / simulations
+        if team_id in settled:
+            status = settled[team_id]
+        elif not inputs.remaining:
+            status = 'clinched' if made else 'eliminated'
+        elif made == 1.0:
+            status = 'projected_in'
+        elif made == 0.0:
+            status = 'projected_out'
+        else:
+            status = 'alive'
+        results.append({
+            'team_id': team_id,
+            'team_name': team_name,
+            'playoff_probability': made,
+            'seed_probabilities': seed_probabilities,
+            'status': status,
+        })
+    return results
+
+
+def last_scored_week(season) -> Optional[Week]:
+    number = Round.objects.filter(week__season=season).aggregate(n=Max('week__number'))['n']
+    if number is None:
+        return None
+    return Week.objects.filter(season=season, number=number, rained_out=False).first()
+
+
+def get_playoff_projection(season, week=None) -> Optional[PlayoffSimulation]:
+    """Cached projection for ``season`` as of ``week`` (default: the last scored week)."""
+    if week is None:
+        week = last_scored_week(season)
+    return PlayoffSimulation.objects.filter(season=season, week=week).first()
+
+
+def projection_is_current(projection, season) -> bool:
+    """Whether ``projection`` was simulated from ``season``'s data as it is now."""
+    from .page_cache import season_version
+
+    return projection.data_version == season_version(season)
+
+
+def run_playoff_projection(
+    season,
+    simulations: int = DEFAULT_SIMULATIONS,
+    max_playoff_teams: int = 4,
+    workers: Optional[int] = None,
+    seed=None,
+) -> PlayoffSimulation:
+    """Simulate ``season`` and store the result as the projection for its last scored week."""
+    from .page_cache import season_version
+
+    # Read before the inputs, so a change made while simulating leaves the projection stale
+    version = season_version(season)
+    week = last_scored_week(season)
+    results = simulate_playoffs(
+        load_simulation_inputs(season),
+        simulations=simulations,
+        max_playoff_teams=max_playoff_teams,
+        workers=workers,
+        seed=seed,
+    )
+    projection, _ = PlayoffSimulation.objects.update_or_create(
+        season=season,
+        week=week,
+        defaults={'simulations': simulations, 'results': results, 'data_version': version},
+    )
+    return projection
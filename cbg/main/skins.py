@@ -1,62 +1,235 @@
-from main.models import SkinEntry, Hole, Score
+"""Skins.
+
+A skin is won by the only entrant with the lowest score on a hole. Gross skins
+compare hole scores; NET skins (``Season.skins_type``) first take off the
+strokes each golfer receives on the hole, allocated by ``handicap9`` exactly as
+in matchup scoring (:func:`main.scoring.strokes_on_hole`) with the golfer's
+rounded handicap for the week played against scratch.
+
+:class:`SeasonSkins` loads the entries, entrant scores, holes and handicaps
+for any number of weeks of a season in four queries and finds every skin in
+memory, so a season costs the same as a single week. :func:`mark_skin_winners`
+saves the outcome as ``SkinResult`` rows and skins ``Payout`` ledger rows, which
+pages read instead of recomputing.
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .helper import conventional_round
+from .models import Handicap, Hole, Payout, Score, SkinEntry, SkinResult
+from .payouts import SKINS, replace_payouts
+from .scoring import strokes_on_hole
+
+
+def unique_low(hole_scores):
+    """The ``(golfer_id, score)`` with the only lowest score, or None on a tie.
+
+    Args:
+        hole_scores (dict): ``{golfer_id: score}`` for one hole.
+    """
+    if not hole_scores:
+        return None
+    best = min(hole_scores.values())
+    leaders = [golfer_id for golfer_id, score in hole_scores.items() if score == best]
+    return (leaders[0], best) if len(leaders) == 1 else None
+
+
+class SeasonSkins:
+    """Skins for ``weeks`` of ``season`` (every week when omitted).
+
+    Args:
+        season (Season): The season; ``skins_type`` picks gross or NET skins.
+        weeks (iterable of Week, optional): The weeks to load.
+        golfer (Golfer, optional): Also load this golfer's scores, so
+            :meth:`winners` can be asked what would have happened had they entered.
+    """
+
+    def __init__(self, season, weeks=None, golfer=None):
+        self.season = season
+        self.net = season.skins_type == 'NET'
+        if weeks is None:
+            weeks = season.week_set.all()
+        self.weeks = list(weeks)
+        week_ids = [week.id for week in self.weeks]
+        self.golfer = golfer
+
+        # {is_front: [holes in number order]}
+        self.nines = {True: [], False: []}
+        for hole in Hole.objects.filter(config=season.course_config_id).order_by('number'):
+            self.nines[hole.number <= 9].append(hole)
+
+        # {week_id: [SkinEntry]}
+        self.entries = defaultdict(list)
+        for entry in SkinEntry.objects.filter(week__in=week_ids).select_related('golfer').order_by('id'):
+            self.entries[entry.week_id].append(entry)
+
+        # Only golfers entered that week (or the extra golfer) are kept
+        players = Q(golfer__skinentry__week=F('week'))
+        if golfer is not None:
+            players |= Q(golfer=golfer)
+
+        # {(week_id, golfer_id, hole_id): score}
+        self.scores = {
+            (week_id, golfer_id, hole_id): score
+            for week_id, golfer_id, hole_id, score in Score.objects.filter(players, week__in=week_ids)
+            .distinct().values_list('week_id', 'golfer_id', 'hole_id', 'score')
+        }
+
+        # {(week_id, golfer_id): rounded handicap}
+        self.handicaps = {}
+        if self.net:
+            for week_id, golfer_id, handicap in (
+                Handicap.objects.filter(players, week__in=week_ids)
+                .distinct().order_by('id').values_list('week_id', 'golfer_id', 'handicap')
+            ):
+                self.handicaps.setdefault((week_id, golfer_id), conventional_round(handicap))
+
+    def players(self, week, with_golfer=False):
+        """Golfers playing for ``week``'s skins."""
+        players = [entry.golfer for entry in self.entries.get(week.id, [])]
+        if with_golfer and self.golfer is not None and self.golfer not in players:
+            players.append(self.golfer)
+        return players
+
+    def pot(self, week, with_golfer=False):
+        """Money in ``week``'s skins pot."""
+        return len(self.players(week, with_golfer)) * self.season.skins_entry_fee
+
+    def strokes(self, week, golfer_id, hole):
+        """Strokes ``golfer_id`` receives on ``hole`` (always 0 for gross skins)."""
+        if not self.net:
+            return 0
+        return strokes_on_hole(self.handicaps.get((week.id, golfer_id), 0), hole.handicap9)
+
+    def hole_results(self, week, with_golfer=False):
+        """``(hole, skin)`` for every hole of ``week`` with a score; ``skin`` is None on a tie.
+
+        ``skin`` is a dict with ``golfer``, ``hole`` (number), ``score`` (net
+        for NET skins), ``gross`` and ``strokes``.
+        """
+        players = {golfer.id: golfer for golfer in self.players(week, with_golfer)}
+        for hole in self.nines[week.is_front]:
+            gross = {
+                golfer_id: self.scores[(week.id, golfer_id, hole.id)]
+                for golfer_id in players if (week.id, golfer_id, hole.id) in self.scores
+            }
+            if not gross:
+                continue
+            scored = {golfer_id: score - self.strokes(week, golfer_id, hole) for golfer_id, score in gross.items()}
+            skin = unique_low(scored)
+            if skin is None:
+                yield hole, None
+                continue
+            golfer_id, score = skin
+            yield hole, {
+                'golfer': players[golfer_id],
+                'hole': hole.number,
+                'score': score,
+                'gross': gross[golfer_id],
+                'strokes': gross[golfer_id] - score,
+            }
+
+    def winners(self, week, with_golfer=False):
+        """Skins won in ``week``, one dict per skin (see :meth:`hole_results`).
+
+        Skins are grouped by golfer in the order golfers first won one, then by hole.
+
+        Args:
+            week (Week): A week loaded by this instance.
+            with_golfer (bool): Count the extra ``golfer`` as an entrant.
+        """
+        golfer_skins = {}
+        for _, skin in self.hole_results(week, with_golfer):
+            if skin is not None:
+                golfer_skins.setdefault(skin['golfer'].id, []).append(skin)
+        return [skin for skins in golfer_skins.values() for skin in skins]
+
+    def all_winners(self):
+        """``{week: winners}`` for every loaded week."""
+        return {week: self.winners(week) for week in self.weeks}
+
 
 def calculate_skin_winners(week):
     """
-    Automatically calculate skin winners based on gross scores.
-    A skin is won when a golfer has the best gross score on a hole alone.
+    Calculate skin winners for a week, using gross or net scores per the season's skins type.
+    A skin is won when a golfer has the best score on a hole alone.
+    """
+    return SeasonSkins(week.season, [week]).winners(week)
+
+
+def mark_skin_winners(skins):
+    """Settle skins for every week loaded by ``skins`` (a :class:`SeasonSkins`).
+
+    Sets ``SkinEntry.winner`` and rewrites the weeks' ``SkinResult`` rows and
+    skins ``Payout`` ledger rows. Each skin is worth the pot divided by the
+    number of skins won that week.
+
+    Returns:
+        set: ``(week_id, golfer_id)`` of every winning entry.
+    """
+    week_ids = [week.id for week in skins.weeks]
+    fee = skins.season.skins_entry_fee
+    won = set()
+    results = []
+    payouts = {}
+    for week in skins.weeks:
+        for entry in skins.entries.get(week.id, []):
+            payout = payouts.setdefault(
+                (week.id, entry.golfer_id), Payout(week_id=week.id, golfer_id=entry.golfer_id, kind=SKINS)
+            )
+            payout.wagered += fee
+        hole_results = list(skins.hole_results(week))
+        skin_count = sum(1 for _, skin in hole_results if skin is not None)
+        skin_value = skins.pot(week) / skin_count if skin_count else 0
+        for hole, skin in hole_results:
+            if skin is None:
+                results.append(SkinResult(week_id=week.id, hole=hole))
+                continue
+            golfer_id = skin['golfer'].id
+            won.add((week.id, golfer_id))
+            results.append(SkinResult(
+                week_id=week.id, hole=hole, golfer_id=golfer_id,
+                score=skin['score'], gross=skin['gross'], payout=skin_value,
+            ))
+            payouts[(week.id, golfer_id)].won += skin_value
+
+    with transaction.atomic():
+        SkinEntry.objects.filter(week__in=week_ids).exclude(winner=False).update(winner=False)
+        if won:
+            SkinEntry.objects.filter(reduce(or_, (
+                Q(week_id=week_id, golfer_id=golfer_id) for week_id, golfer_id in won
+            ))).update(winner=True)
+        SkinResult.objects.filter(week__in=week_ids).delete()
+        SkinResult.objects.bulk_create(results)
+        replace_payouts(SKINS, week_ids, list(payouts.values()))
+    return won
+
+
+def stored_skin_winners(**filters):
+    """Skins saved by :func:`mark_skin_winners` for the weeks matching ``filters``.
+
+    Returns ``{week_id: winners}`` with the same dicts and order as
+    :meth:`SeasonSkins.winners`, plus ``payout`` (the skin's value).
     """
-    # Get all golfers in skins for this week
-    skin_entries = SkinEntry.objects.filter(week=week)
-    if not skin_entries.exists():
-        return []
-
-    # Get the holes for this week (front 9 or back 9)
-    if week.is_front:
-        holes = Hole.objects.filter(config=week.season.course_config, number__in=range(1, 10))
-    else:
-        holes = Hole.objects.filter(config=week.season.course_config, number__in=range(10, 19))
-
-    # Dictionary to group skins by golfer
-    golfer_skins = {}
-
-    # Check each hole for skin winners
-    for hole in holes:
-        # Get all scores for this hole from golfers in skins
-        scores = []
-        for skin_entry in skin_entries:
-            score_obj = Score.objects.filter(
-                golfer=skin_entry.golfer,
-                week=week,
-                hole=hole
-            ).first()
-            if score_obj:
-                scores.append((skin_entry.golfer, score_obj.score))
-
-        if scores:
-            # Find the best score
-            best_score = min(scores, key=lambda x: x[1])[1]
-
-            # Count how many golfers have the best score
-            best_score_golfers = [golfer for golfer, score in scores if score == best_score]
-
-            # If only one golfer has the best score, they win the skin
-            if len(best_score_golfers) == 1:
-                winner = best_score_golfers[0]
-                if winner not in golfer_skins:
-                    golfer_skins[winner] = []
-                golfer_skins[winner].append({
-                    'hole': hole.number,
-                    'score': best_score
-                })
-
-    # Convert to list format for template compatibility
-    skin_winners = []
-    for golfer, skins in golfer_skins.items():
-        for skin in skins:
-            skin_winners.append({
-                'golfer': golfer,
-                'hole': skin['hole'],
-                'score': skin['score']
-            })
-
-    return skin_winners
+    by_week = {}
+    for result in (
+        SkinResult.objects.filter(golfer__isnull=False, **{f'week__{key}': value for key, value in filters.items()})
+        .select_related('golfer', 'hole').order_by('hole__number')
+    ):
+        by_week.setdefault(result.week_id, {}).setdefault(result.golfer_id, []).append({
+            'golfer': result.golfer,
+            'hole': result.hole.number,
+            'score': result.score,
+            'gross': result.gross,
+            'strokes': result.gross - result.score,
+            'payout': result.payout,
+        })
+    return {
+        week_id: [skin for skins in golfer_skins.values() for skin in skins]
+        for week_id, golfer_skins in by_week.items()
+    }
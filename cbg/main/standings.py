@@ -0,0 +1,101 @@
+"""Materialized team standings.
+
+``TeamStanding`` holds each team's points per half. It is rebuilt from
+``Round`` rows whenever rounds are scored (see ``main.scoring``), so the home
+page and playoff seeding read standings with one query instead of summing
+rounds golfer by golfer.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db.models import Count, Sum
+
+from .models import Round, Team, TeamStanding
+
+FIRST_HALF = 1
+SECOND_HALF = 2
+
+# Weeks 1-9 are the first half, 10+ the second half
+LAST_FIRST_HALF_WEEK = 9
+
+
+def half_for_week(week) -> int:
+    return FIRST_HALF if week.number <= LAST_FIRST_HALF_WEEK else SECOND_HALF
+
+
+def refresh_team_standings(season, halves: Optional[Iterable[int]] = None) -> None:
+    """Rebuild ``TeamStanding`` rows for ``season`` from its rounds.
+
+    Points from a round go to the golfer's team, or to the absent golfer's team
+    when the round was played by a sub. Rained-out weeks are ignored.
+
+    Args:
+        season (Season): The season to rebuild.
+        halves (iterable, optional): Only rebuild these halves (1 and/or 2). Defaults to both.
+    """
+    halves = sorted(set(halves)) if halves is not None else [FIRST_HALF, SECOND_HALF]
+
+    teams_by_golfer = defaultdict(list)
+    team_ids = []
+    for team_id, golfer_id in Team.objects.filter(season=season).values_list('id', 'golfers'):
+        if team_id not in team_ids:
+            team_ids.append(team_id)
+        if golfer_id is not None:
+            teams_by_golfer[golfer_id].append(team_id)
+    if not team_ids:
+        return
+
+    rounds = Round.objects.filter(week__season=season, week__rained_out=False)
+    if halves == [FIRST_HALF]:
+        rounds = rounds.filter(week__number__lte=LAST_FIRST_HALF_WEEK)
+    elif halves == [SECOND_HALF]:
+        rounds = rounds.filter(week__number__gt=LAST_FIRST_HALF_WEEK)
+    rows = (
+        rounds.values('golfer_id', 'subbing_for_id', 'week__number')
+        .annotate(points=Sum('total_points'), num_rounds=Count('id'))
+        .order_by()
+    )
+
+    points = {(team_id, half): 0.0 for team_id in team_ids for half in halves}
+    counts = {key: 0 for key in points}
+    for row in rows:
+        half = FIRST_HALF if row['week__number'] <= LAST_FIRST_HALF_WEEK else SECOND_HALF
+        credited_golfer = row['subbing_for_id'] or row['golfer_id']
+        for team_id in teams_by_golfer.get(credited_golfer, []):
+            points[(team_id, half)] += row['points'] or 0
+            counts[(team_id, half)] += row['num_rounds']
+
+    TeamStanding.objects.bulk_create(
+        [
+            TeamStanding(team_id=team_id, half=half, points=pts, rounds=counts[(team_id, half)])
+            for (team_id, half), pts in points.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['team', 'half'],
+        update_fields=['points', 'rounds', 'updated'],
+    )
+
+
+def get_team_points(season) -> Tuple[Dict[int, float], Dict[int, float], Dict[int, float]]:
+    """Return ``(first_half, second_half, total)`` points keyed by team id.
+
+    Seasons scored before standings were materialized are rebuilt on first read.
+    """
+    rows = list(TeamStanding.objects.filter(team__season=season).values_list('team_id', 'half', 'points'))
+    if not rows and Round.objects.filter(week__season=season).exists():
+        refresh_team_standings(season)
+        rows = list(TeamStanding.objects.filter(team__season=season).values_list('team_id', 'half', 'points'))
+
+    first: Dict[int, float] = {}
+    second: Dict[int, float] = {}
+    for team_id, half, pts in rows:
+        (first if half == FIRST_HALF else second)[team_id] = pts
+    total = {
+        team_id: first.get(team_id, 0.0) + second.get(team_id, 0.0)
+        for team_id in set(first) | set(second)
+    }
+    for team_id in total:
+        first.setdefault(team_id, 0.0)
+        second.setdefault(team_id, 0.0)
+    return first, second, total
@@ -0,0 +1,216 @@
+"""Synthetic leagues for benchmarking.
+
+:func:`generate_league` builds a complete league (course, golfers, seasons,
+teams, schedule, subs, no-sub weeks, rain-outs, scores, skins and games
+entries) with bulk inserts, then optionally processes it the way the site
+does: handicaps, golfer matchups, rounds, standings and the payout ledger.
+Bulk inserts send no signals, so no Celery tasks are queued while building.
+
+:data:`REAL_LEAGUE` is the shape of the league this site was built for;
+:func:`scaled` multiplies its team count for load testing. The ``benchmark``
+management command times the hot paths against these leagues.
+"""
+
+import random
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Course, CourseConfig, Game, GameEntry, Golfer, Hole, League, Matchup, Score, Season, SkinEntry, Sub, Team, Week,
+)
+
+PARS = [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 5, 4]
+HANDICAP9 = [3, 7, 9, 1, 5, 4, 8, 6, 2, 4, 8, 2, 1, 6, 3, 9, 5, 7]
+
+
+@dataclass(frozen=True)
+class LeagueSpec:
+    """Shape of a synthetic league. Rates are per golfer (or per week for rain-outs)."""
+    teams: int = 8
+    seasons: int = 7
+    weeks: int = 20
+    # Fraction of the current (last) season's weeks already played
+    played_fraction: float = 0.6
+    sub_rate: float = 0.08
+    no_sub_rate: float = 0.03
+    rain_out_rate: float = 0.04
+    skins_rate: float = 0.6
+    games_rate: float = 0.4
+    # Fraction of members replaced between seasons
+    turnover: float = 0.15
+
+
+# About what the original league has run: 8 two-golfer teams, 20 weeks a season, 7 seasons
+REAL_LEAGUE = LeagueSpec()
+
+
+def scaled(factor, spec=REAL_LEAGUE):
+    """``spec`` with ``factor`` times as many teams."""
+    return replace(spec, teams=max(2, round(spec.teams * factor)))
+
+
+def _round_robin(team_ids, week_index):
+    """Pairs for one week of a circle-method round robin (``team_ids`` has an even length)."""
+    n = len(team_ids)
+    rotation = week_index % (n - 1)
+    order = [team_ids[0]] + team_ids[1:][rotation:] + team_ids[1:][:rotation]
+    return [(order[i], order[n - 1 - i]) for i in range(n // 2)]
+
+
+@transaction.atomic
+def generate_league(spec=REAL_LEAGUE, name=None, seed=0, process=True):
+    """Create a synthetic league shaped by ``spec``.
+
+    Args:
+        spec (LeagueSpec): Teams, seasons, weeks and event rates.
+        name (str, optional): League name; defaults to one describing ``spec``.
+        seed (int): Seed for the random draws, so a spec and seed always build the same league.
+        process (bool): Also compute handicaps, golfer matchups, rounds, standings,
+            skins and payouts for every played week.
+
+    Returns:
+        League: The new league. Its seasons run up to the current year; the last
+        one has only ``played_fraction`` of its weeks played.
+    """
+    rng = random.Random(seed)
+    teams_per_season = spec.teams + spec.teams % 2
+    league = League.objects.create(name=name or f'Synthetic {teams_per_season} teams x {spec.seasons} seasons ({seed})')
+
+    course = Course.objects.create(name=f'{league.name} Course', city='Synthetic', state='MI')
+    config = CourseConfig.objects.create(course=course, name='', effective_start=timezone.now().date() - timedelta(days=365 * spec.seasons))
+    holes = Hole.objects.bulk_create([
+        Hole(config=config, number=i + 1, par=PARS[i], handicap=i + 1, handicap9=HANDICAP9[i], yards=150 + 40 * PARS[i])
+        for i in range(18)
+    ])
+    nines = {True: holes[:9], False: holes[9:]}
+
+    # Members, plus a pool of subs that never join a team
+    member_count = teams_per_season * 2
+    sub_count = max(4, teams_per_season // 2)
+    golfers = Golfer.objects.bulk_create([
+        Golfer(name=f'{league.slug}-golfer-{i:04d}')
+        for i in range(member_count + sub_count + round(member_count * spec.turnover * spec.seasons) + 1)
+    ])
+    # Strokes over par per hole; subs play a little worse
+    ability = {golfer.id: rng.uniform(0.2, 2.0) for golfer in golfers}
+    roster = golfers[:member_count]
+    sub_pool = golfers[member_count:member_count + sub_count]
+    newcomers = iter(golfers[member_count + sub_count:])
+    for golfer in sub_pool:
+        ability[golfer.id] += 0.3
+
+    this_year = timezone.now().year
+    for season_index in range(spec.seasons):
+        year = this_year - spec.seasons + 1 + season_index
+        is_current = season_index == spec.seasons - 1
+        if season_index:
+            roster = [next(newcomers) if rng.random() < spec.turnover else golfer for golfer in roster]
+        season = Season.objects.create(
+            year=year, league=league, course_config=config,
+            playing_skins=True, skins_type='NET' if season_index % 2 else 'GROSS', playing_games=True,
+        )
+
+        teams = Team.objects.bulk_create([Team(season=season) for _ in range(teams_per_season)])
+        Team.golfers.through.objects.bulk_create([
+            Team.golfers.through(team_id=team.id, golfer_id=golfer.id)
+            for i, team in enumerate(teams) for golfer in roster[2 * i:2 * i + 2]
+        ])
+        members = {team.id: roster[2 * i:2 * i + 2] for i, team in enumerate(teams)}
+
+        played = round(spec.weeks * spec.played_fraction) if is_current else spec.weeks
+
+        # A rained-out week keeps its number and the schedule resumes the next calendar week
+        calendar = []
+        for number in range(1, spec.weeks + 1):
+            if number <= played and rng.random() < spec.rain_out_rate:
+                calendar.append((number, True))
+            calendar.append((number, False))
+        if is_current:
+            # The last played week was yesterday
+            elapsed = sum(1 for number, _ in calendar if number <= played)
+            first_date = timezone.now() - timedelta(weeks=elapsed - 1, days=1)
+        else:
+            first_date = timezone.now().replace(year=year, month=5, day=1, hour=18, minute=0, second=0, microsecond=0)
+        weeks = Week.objects.bulk_create([
+            Week(season=season, number=number, date=first_date + timedelta(weeks=i), is_front=number % 2 == 1, rained_out=rained_out)
+            for i, (number, rained_out) in enumerate(calendar)
+        ])
+        league_weeks = [week for week in weeks if not week.rained_out]
+
+        matchups = []
+        pairings = []
+        week_pairs = {}
+        for week in league_weeks:
+            pairs = week_pairs[week.id] = _round_robin([team.id for team in teams], week.number - 1)
+            matchups.extend(Matchup(week=week) for _ in pairs)
+            pairings.extend(pairs)
+        matchups = Matchup.objects.bulk_create(matchups)
+        Matchup.teams.through.objects.bulk_create([
+            Matchup.teams.through(matchup_id=matchup.id, team_id=team_id)
+            for matchup, pair in zip(matchups, pairings) for team_id in pair
+        ])
+
+        subs, scores, skin_entries, game_entries = [], [], [], []
+        games = Game.objects.bulk_create([
+            Game(name=f'Closest to the pin {week.number}', desc='Closest tee shot on the par 3', week=week)
+            for week in league_weeks[:played]
+        ])
+        for week, game in zip(league_weeks[:played], games):
+            playing = []
+            free_subs = list(sub_pool)
+            rng.shuffle(free_subs)
+            no_subs = 0
+            for pair in week_pairs[week.id]:
+                # Two covering teammates would meet twice, but a golfer matchup is one row per
+                # pair of golfers, so only one team of a matchup may be short a golfer
+                pair_short = False
+                for team_id in pair:
+                    team_golfers = members[team_id]
+                    no_sub = next((golfer for golfer in team_golfers if rng.random() < spec.no_sub_rate), None)
+                    if no_sub is not None and not pair_short:
+                        # The teammate covers a golfer out with no sub, so they play themselves
+                        subs.append(Sub(week=week, absent_golfer=no_sub, no_sub=True))
+                        playing.extend(golfer for golfer in team_golfers if golfer != no_sub)
+                        no_subs += 1
+                        pair_short = True
+                        continue
+                    for golfer in team_golfers:
+                        if rng.random() < spec.sub_rate and free_subs:
+                            sub_golfer = free_subs.pop()
+                            subs.append(Sub(week=week, absent_golfer=golfer, sub_golfer=sub_golfer))
+                            playing.append(sub_golfer)
+                        else:
+                            playing.append(golfer)
+            for golfer in playing:
+                for hole in nines[week.is_front]:
+                    strokes = round(rng.gauss(ability[golfer.id], 1.1))
+                    scores.append(Score(golfer=golfer, week=week, hole=hole, score=max(1, min(10, hole.par + strokes))))
+            skin_entries.extend(SkinEntry(golfer=golfer, week=week) for golfer in playing if rng.random() < spec.skins_rate)
+            entrants = [golfer for golfer in playing if rng.random() < spec.games_rate]
+            winner = rng.choice(entrants) if entrants else None
+            game_entries.extend(
+                GameEntry(game=game, golfer=golfer, week=week, winner=golfer == winner) for golfer in entrants
+            )
+            week.num_scores = (teams_per_season * 2 - no_subs) * 9
+            week.scores_entered = len(playing) * 9
+        Sub.objects.bulk_create(subs)
+        Score.objects.bulk_create(scores, batch_size=5000)
+        SkinEntry.objects.bulk_create(skin_entries)
+        GameEntry.objects.bulk_create(game_entries)
+        Week.objects.bulk_update(league_weeks[:played], ['num_scores', 'scores_entered'])
+
+        if process:
+            process_synthetic_season(season)
+    return league
+
+
+def process_synthetic_season(season):
+    """Compute everything the site derives from a season's scores."""
+    from .recompute import finish_season_recompute, prepare_season_recompute, recompute_week
+
+    for week_id in prepare_season_recompute(season.pk)['week_ids']:
+        recompute_week(week_id)
+    finish_season_recompute(season.pk)
@@ -0,0 +1,225 @@
+"""Coalescing and per-season locking for the recompute tasks.
+
+Saving a score, sub or matchup asks for a week (or a whole season) to be
+recomputed. Those requests go through :func:`request_task` instead of
+``task.delay``:
+
+- Debounce: the first request for a task and key marks it pending and enqueues
+  the task ``TASK_DEBOUNCE_SECONDS`` later. Requests arriving while it is still
+  pending are dropped, so entering four subs for a week makes one run.
+- Lock: the tasks do their work inside :func:`season_run`, which holds a lock
+  on the season so that processing a week and recalculating the whole season
+  never rewrite the same rows at once. A task that finds its season locked is
+  deferred and requested again when the holder releases the lock.
+- Follow-up: the pending mark is cleared as a run starts, so a change that
+  arrives mid-run requests another run after the current one.
+
+The state lives in Redis (``TASK_COORDINATION_URL``, the Celery broker by
+default) so every web process and worker shares it. When tasks run eagerly, or
+the URL is ``memory://``, a process-local stand-in is used instead.
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from celery import current_app
+from django.conf import settings
+
+MEMORY_URL = 'memory://'
+
+# Seconds a pending mark outlives its countdown, in case the queued task is lost
+PENDING_GRACE = 5 * 60
+
+
+def debounce_seconds():
+    return getattr(settings, 'TASK_DEBOUNCE_SECONDS', 5)
+
+
+def lock_timeout():
+    return getattr(settings, 'TASK_LOCK_TIMEOUT', 30 * 60)
+
+
+class MemoryCoordinator:
+    """Process-local coordination state, for eager tasks and tests."""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        # {key: (value, expires)}
+        self._values = {}
+        # {key: set of items}
+        self._sets = {}
+
+    def _live(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def set_if_absent(self, key, value, ttl):
+        with self._mutex:
+            if self._live(key) is not None:
+                return False
+            self._values[key] = (value, time.monotonic() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._mutex:
+            self._values.pop(key, None)
+
+    def delete_if_equal(self, key, value):
+        with self._mutex:
+            entry = self._live(key)
+            if entry is not None and entry[0] == value:
+                del self._values[key]
+
+    def add_to_set(self, key, item, ttl):
+        with self._mutex:
+            self._sets.setdefault(key, set()).add(item)
+
+    def pop_set(self, key):
+        with self._mutex:
+            return sorted(self._sets.pop(key, ()))
+
+
+class RedisCoordinator:
+    """Coordination state shared through Redis."""
+
+    # Only the holder's token may release a lock
+    RELEASE = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._release = self.client.register_script(self.RELEASE)
+
+    def set_if_absent(self, key, value, ttl):
+        return bool(self.client.set(key, value, nx=True, ex=ttl))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def delete_if_equal(self, key, value):
+        self._release(keys=[key], args=[value])
+
+    def add_to_set(self, key, item, ttl):
+        pipe = self.client.pipeline()
+        pipe.sadd(key, item)
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+    def pop_set(self, key):
+        pipe = self.client.pipeline()
+        pipe.smembers(key)
+        pipe.delete(key)
+        members, _ = pipe.execute()
+        return sorted(members)
+
+
+_coordinators = {}
+_coordinators_lock = threading.Lock()
+
+
+def get_coordinator():
+    """The coordinator for the configured ``TASK_COORDINATION_URL``."""
+    url = getattr(settings, 'TASK_COORDINATION_URL', MEMORY_URL)
+    if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+        # Eager tasks run in the requesting process, so its own state is exact
+        url = MEMORY_URL
+    with _coordinators_lock:
+        if url not in _coordinators:
+            _coordinators[url] = MemoryCoordinator() if url.startswith(MEMORY_URL) else RedisCoordinator(url)
+        return _coordinators[url]
+
+
+def _pending_key(task_name, key):
+    return f'cbg:tasks:pending:{task_name}:{key}'
+
+
+def _lock_key(season_id):
+    return f'cbg:tasks:lock:season:{season_id}'
+
+
+def _deferred_key(season_id):
+    return f'cbg:tasks:deferred:season:{season_id}'
+
+
+# {task name: task} for tasks seen by this process; others come from the Celery registry
+_tasks = {}
+
+
+def _task(name):
+    return _tasks.get(name) or current_app.tasks[name]
+
+
+def request_task(task, key):
+    """Ask for ``task(key)`` to run soon, collapsing repeated requests.
+
+    Args:
+        task (celery.Task): A task that does its work inside :func:`season_run`.
+        key (int): The task's only argument, e.g. a week or season id.
+
+    Returns:
+        bool: True if a run was enqueued, False if one was already pending.
+    """
+    _tasks[task.name] = task
+    countdown = debounce_seconds()
+    if not get_coordinator().set_if_absent(_pending_key(task.name, key), 1, countdown + PENDING_GRACE):
+        return False
+    task.apply_async(args=[key], countdown=countdown)
+    return True
+
+
+def claim_season(task, key, season_id):
+    """Take ``season_id``'s lock for ``task(key)``, for work that outlives one ``with`` block.
+
+    Clears the task's pending mark like :func:`season_run`. Returns the lock
+    token to hand to :func:`release_season`, or None when another task holds
+    the lock; the run is then deferred until that task releases it.
+    """
+    _tasks[task.name] = task
+    coordinator = get_coordinator()
+    # Requests from here on are for changes this run may not see
+    coordinator.delete(_pending_key(task.name, key))
+
+    token = uuid.uuid4().hex
+    if not coordinator.set_if_absent(_lock_key(season_id), token, lock_timeout()):
+        coordinator.add_to_set(_deferred_key(season_id), json.dumps([task.name, key]), lock_timeout())
+        return None
+    return token
+
+
+def release_season(season_id, token):
+    """Release a lock taken by :func:`claim_season` and request the runs deferred meanwhile."""
+    coordinator = get_coordinator()
+    coordinator.delete_if_equal(_lock_key(season_id), token)
+    for item in coordinator.pop_set(_deferred_key(season_id)):
+        name, deferred_key = json.loads(item)
+        request_task(_task(name), deferred_key)
+
+
+@contextmanager
+def season_run(task, key, season_id):
+    """Run ``task(key)``'s work holding ``season_id``'s lock.
+
+    Yields True when the lock was taken. Yields False when another task holds
+    it; the run is then deferred and requested again once the lock is released,
+    and the caller should return without doing any work.
+    """
+    token = claim_season(task, key, season_id)
+    if token is None:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        release_season(season_id, token)
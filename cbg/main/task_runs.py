@@ -0,0 +1,242 @@
+"""Run history for the Celery tasks.
+
+:func:`record_run` wraps a task so every execution leaves a
+:class:`~main.models.TaskRun` row with its arguments, start and end time,
+duration, SQL query count, rows written per model and outcome. Tasks report
+progress through :func:`report_progress`, and the generate rounds page polls
+the running rows to show it live.
+
+A task that catches its own errors or defers itself calls :func:`mark_run` to
+record that outcome; an exception escaping the task is recorded as an error
+and re-raised. Runs of tasks started eagerly from inside another task count
+towards the outer run's queries and rows as well as their own.
+"""
+
+import functools
+import inspect
+import re
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import SeasonRecompute, TaskRun, Week
+
+# Runs in progress on this thread, innermost last
+_local = threading.local()
+
+_WRITE = re.compile(r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+["`]?([\w.]+)', re.IGNORECASE)
+_TASK_RUN_TABLE = TaskRun._meta.db_table
+
+
+def history_per_task():
+    return getattr(settings, 'TASK_RUN_HISTORY', 200)
+
+
+def _runs():
+    if not hasattr(_local, 'runs'):
+        _local.runs = []
+    return _local.runs
+
+
+def current_run():
+    """The :class:`_RunRecorder` of the task running on this thread, or None."""
+    runs = _runs()
+    return runs[-1] if runs else None
+
+
+def mark_run(status, result=''):
+    """Record the outcome of the current run, e.g. ``'deferred'`` or a caught ``'error'``."""
+    run = current_run()
+    if run is not None:
+        run.status = status
+        run.result = result
+
+
+def report_progress(done, total=None, message=''):
+    """Save the current run's progress so the page polling it can show it."""
+    run = current_run()
+    if run is not None:
+        fields = {'progress_done': done, 'progress_message': message[:200]}
+        if total is not None:
+            fields['progress_total'] = total
+        TaskRun.objects.filter(pk=run.row.pk).update(**fields)
+
+
+def week_season(week_id, *args, **kwargs):
+    """Season id of a task whose first argument is a week id."""
+    return Week.objects.filter(pk=week_id).values_list('season_id', flat=True).first()
+
+
+def season_argument(season_id, *args, **kwargs):
+    """Season id of a task whose first argument is a season id."""
+    return season_id
+
+
+def recompute_season(recompute_id, *args, **kwargs):
+    """Season id of a task whose first argument is a SeasonRecompute id."""
+    return SeasonRecompute.objects.filter(pk=recompute_id).values_list('season_id', flat=True).first()
+
+
+class _RunRecorder:
+    """Counts one run's queries and written rows; installed as a database execute wrapper."""
+
+    def __init__(self, row, tables):
+        self.row = row
+        self.tables = tables
+        self.queries = 0
+        self.rows = Counter()
+        self.status = None
+        self.result = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        if _TASK_RUN_TABLE in sql:
+            # Our own bookkeeping is not part of the task's work
+            return execute(sql, params, many, context)
+        result = execute(sql, params, many, context)
+        self.queries += 1
+        match = _WRITE.match(sql)
+        if match:
+            self.rows[self.tables.get(match.group(1), match.group(1))] += _rows_written(sql, params, many, context)
+        return result
+
+
+def _rows_written(sql, params, many, context):
+    rowcount = getattr(context['cursor'], 'rowcount', -1)
+    if rowcount > 0:
+        return rowcount
+    if sql.lstrip()[:6].upper() != 'INSERT':
+        return max(rowcount, 0)
+    # SQLite reports no rowcount for INSERT ... RETURNING until the rows are fetched
+    if many:
+        return len(params)
+    values = sql.upper().partition(' VALUES ')[2]
+    return values.count('), (') + 1 if values else 0
+
+
+def _table_labels():
+    return {model._meta.db_table: model._meta.label for model in apps.get_models(include_auto_created=True)}
+
+
+def _arguments(signature, args, kwargs):
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        return {'args': list(args), 'kwargs': kwargs}
+    return dict(bound.arguments)
+
+
+def record_run(season=None):
+    """Decorate a task function (under ``@shared_task``) to record each run as a TaskRun.
+
+    Args:
+        season (callable, optional): Called with the task's arguments, returns
+            the id of the season the run belongs to, e.g. :func:`week_season`.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            season_id = season(*args, **kwargs) if season else None
+            row = TaskRun.objects.create(task=name, season_id=season_id, args=_arguments(signature, args, kwargs))
+            recorder = _RunRecorder(row, _table_labels())
+            _runs().append(recorder)
+            started = time.perf_counter()
+            try:
+                with connection.execute_wrapper(recorder):
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                recorder.status, recorder.result = 'error', f'{type(e).__name__}: {e}'
+                raise
+            else:
+                if recorder.status is None:
+                    recorder.status, recorder.result = 'success', result if isinstance(result, str) else ''
+                return result
+            finally:
+                _runs().pop()
+                _finish(row, recorder, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def _finish(row, recorder, seconds):
+    TaskRun.objects.filter(pk=row.pk).update(
+        status=recorder.status,
+        result=recorder.result,
+        finished=timezone.now(),
+        duration=seconds,
+        queries=recorder.queries,
+        rows_written=dict(recorder.rows.most_common()),
+    )
+    # Keep the most recent runs of each task
+    cutoff = TaskRun.objects.filter(task=row.task).order_by('-started').values_list('started', flat=True)[
+        history_per_task():history_per_task() + 1
+    ]
+    if cutoff:
+        TaskRun.objects.filter(task=row.task, started__lte=cutoff[0]).delete()
+
+
+def run_as_dict(run):
+    return {
+        'id': run.pk,
+        'task': run.short_name,
+        'args': run.args,
+        'status': run.status,
+        'started': run.started.isoformat(),
+        'duration': run.duration,
+        'queries': run.queries,
+        'rows_written': run.rows_written,
+        'progress_done': run.progress_done,
+        'progress_total': run.progress_total,
+        'progress_percent': run.progress_percent,
+        'progress_message': run.progress_message,
+        'result': run.result,
+    }
+
+
+def recompute_as_dict(recompute):
+    return {
+        'id': recompute.pk,
+        'status': recompute.status,
+        'steps': len(recompute.steps),
+        'done': len(recompute.done_steps),
+        'progress_percent': recompute.progress_percent,
+        'current': recompute.current,
+        'started': recompute.started.isoformat(),
+        'error': recompute.error,
+    }
+
+
+def season_task_runs(season, recent=15, per_task=10):
+    """Task runs for ``season`` as shown on the generate rounds page.
+
+    Returns:
+        dict: ``running`` and ``recent`` lists of TaskRun (newest first),
+        ``durations``: per task, the last, median and slowest duration in
+        seconds over its last ``per_task`` successful runs, and ``recompute``:
+        the season's latest staged recompute, or None.
+    """
+    runs = TaskRun.objects.filter(season=season)
+    finished = list(runs.filter(status='success').order_by('-started').only('task', 'duration')[:per_task * 20])
+    by_task = {}
+    for run in finished:
+        durations = by_task.setdefault(run.short_name, [])
+        if len(durations) < per_task:
+            durations.append(run.duration)
+    return {
+        'running': list(runs.filter(status='running').order_by('-started')),
+        'recent': list(runs.exclude(status='running').order_by('-started')[:recent]),
+        'durations': [
+            {'task': task, 'runs': len(durations), 'last': durations[0],
+             'median': statistics.median(durations), 'slowest': max(durations)}
+            for task, durations in sorted(by_task.items())
+        ],
+        'recompute': SeasonRecompute.objects.filter(season=season).order_by('-started').first(),
+    }
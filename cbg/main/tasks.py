@@ -2,109 +2,130 @@ from celery import shared_task
 from main.models import GolferMatchup, Score, Matchup, Week, Season, Team, Sub
 from main.helper import generate_golfer_matchups, process_week, calculate_and_save_handicaps_for_season, generate_rounds, generate_round
 import logging
-from main.skins import calculate_skin_winners
-from main.models import SkinEntry
+from main.skins import SeasonSkins, mark_skin_winners
+from main.scoring import score_week
+from main.recompute import run_recompute_step, run_recompute_steps, start_season_recompute
+from main.page_cache import bump_data_version
+from main.task_coordination import claim_season, release_season, season_run
+from main.task_runs import mark_run, record_run, recompute_season, season_argument, week_season
 
 logger = logging.getLogger(__name__)
 
 @shared_task
+@record_run()
 def test_task():
     """Simple test task to verify Celery is working"""
     logger.info("Test task executed successfully!")
     return "Test task completed successfully!"
 
 @shared_task
+@record_run(season=week_season)
 def process_week_async(week_id):
     """Process a week asynchronously"""
     try:
         week = Week.objects.get(id=week_id)
-        process_week(week)
+        with season_run(process_week_async, week_id, week.season_id) as running:
+            if not running:
+                logger.info(f"Week {week.number} deferred: season {week.season_id} is being recomputed")
+                mark_run("deferred", f"Week {week.number} deferred")
+                return f"Week {week.number} deferred"
+            process_week(week)
         set_skin_winners_async.delay(week.id)
+        simulate_playoffs_async.delay(week.season_id)
         logger.info(f"Week {week.number} processed successfully")
         return f"Week {week.number} processed successfully"
     except Week.DoesNotExist:
         logger.error(f"Week with id {week_id} does not exist")
+        mark_run("error", f"Week with id {week_id} does not exist")
         return f"Week with id {week_id} does not exist"
     except Exception as e:
         logger.error(f"Error processing week {week_id}: {str(e)}")
+        mark_run("error", f"Error processing week {week_id}: {str(e)}")
         return f"Error processing week {week_id}: {str(e)}"
 
 @shared_task
+@record_run(season=week_season)
 def generate_matchups_async(week_id):
     """Generate golfer matchups for a week asynchronously"""
     try:
         week = Week.objects.get(id=week_id)
-        generate_golfer_matchups(week)
+        with season_run(generate_matchups_async, week_id, week.season_id) as running:
+            if not running:
+                logger.info(f"Matchups for week {week.number} deferred: season {week.season_id} is being recomputed")
+                mark_run("deferred", f"Matchups for week {week.number} deferred")
+                return f"Matchups for week {week.number} deferred"
+            generate_golfer_matchups(week)
         logger.info(f"Matchups generated for week {week.number}")
         return f"Matchups generated for week {week.number}"
     except Week.DoesNotExist:
         logger.error(f"Week with id {week_id} does not exist")
+        mark_run("error", f"Week with id {week_id} does not exist")
         return f"Week with id {week_id} does not exist"
     except Exception as e:
         logger.error(f"Error generating matchups for week {week_id}: {str(e)}")
+        mark_run("error", f"Error generating matchups for week {week_id}: {str(e)}")
         return f"Error generating matchups for week {week_id}: {str(e)}"
 
 @shared_task
+@record_run(season=season_argument)
 def recalculate_all_async(season_id):
-    """Recalculate all data for a season: handicaps, matchups, and rounds"""
+    """Recalculate all data for a season: handicaps, matchups, rounds and skins, as a staged recompute"""
     try:
         season = Season.objects.get(pk=season_id)
-        
-        # Step 1: Calculate handicaps for all weeks
-        logger.info(f"Starting handicap calculation for season {season.year}")
-        calculate_and_save_handicaps_for_season(season)
-        
-        # Step 2: Generate matchups for weeks that have team matchups entered
-        teams = Team.objects.filter(season=season)
-        total_teams = teams.count()
-        expected_matchups = total_teams // 2
-        
-        matchup_weeks = []
-        for week in Week.objects.filter(season=season, rained_out=False).order_by('number'):
-            actual_matchups = Matchup.objects.filter(week=week).count()
-            if actual_matchups == expected_matchups:
-                generate_golfer_matchups(week)
-                matchup_weeks.append(week.number)
-                logger.info(f"Matchups generated for week {week.number}")
-        
-        # Step 3: Generate rounds for weeks with all scores entered
-        round_weeks = []
-        for week in Week.objects.filter(season=season, rained_out=False).order_by('number'):
-            golfer_matchups = GolferMatchup.objects.filter(week=week)
-            if golfer_matchups.exists():
-                # Check if all scores are entered for this week
-                no_sub_golfer_count = Sub.objects.filter(week=week, no_sub=True).count()
-                expected_scores = ((total_teams * 2) - no_sub_golfer_count) * 9
-                actual_scores = Score.objects.filter(week=week).count()
-                
-                if actual_scores == expected_scores:
-                    # Generate rounds for each golfer matchup
-                    for golfer_matchup in golfer_matchups:
-                        generate_round(golfer_matchup)
-                    round_weeks.append(week.number)
-                    logger.info(f"Rounds generated for week {week.number} (all scores entered)")
-                    # Trigger skins winner setter after rounds are generated
-                    set_skin_winners_async.delay(week.id)
-                else:
-                    logger.info(f"Skipping week {week.number} - only {actual_scores}/{expected_scores} scores entered")
-        
-        logger.info(f"Recalculation complete for season {season.year}")
-        logger.info(f"Handicaps calculated for all weeks")
-        logger.info(f"Matchups generated for {len(matchup_weeks)} weeks: {matchup_weeks}")
-        logger.info(f"Rounds generated for {len(round_weeks)} weeks: {round_weeks}")
-        
-        return f"Recalculation complete for season {season.year}. Handicaps: all weeks, Matchups: {len(matchup_weeks)} weeks, Rounds: {len(round_weeks)} weeks"
-        
+
+        token = claim_season(recalculate_all_async, season_id, season.pk)
+        if token is None:
+            logger.info(f"Recalculation of season {season.year} deferred: the season is being recomputed")
+            mark_run("deferred", f"Recalculation of season {season.year} deferred")
+            return f"Recalculation of season {season.year} deferred"
+
+        try:
+            recompute = start_season_recompute(season, token)
+        except Exception:
+            release_season(season.pk, token)
+            raise
+        logger.info(f"Recalculation of season {season.year} started: {len(recompute.steps)} steps")
+        return f"Recalculation of season {season.year} started: {len(recompute.steps)} steps"
+
     except Season.DoesNotExist:
         logger.error(f"Season id {season_id} does not exist")
+        mark_run("error", f"Season id {season_id} does not exist")
         return f"Season id {season_id} does not exist"
     except Exception as e:
         logger.error(f"Error in recalculation for season {season_id}: {str(e)}")
+        mark_run("error", f"Error in recalculation for season {season_id}: {str(e)}")
         return f"Error in recalculation for season {season_id}: {str(e)}"
 
+@shared_task
+@record_run(season=recompute_season)
+def recompute_stage(recompute_id, step):
+    """Run one checkpointed step of a staged season recompute"""
+    try:
+        if not run_recompute_step(recompute_id, step):
+            return f"Recompute {recompute_id} step {step} skipped"
+    except Exception as e:
+        # The run is marked failed; failing the task stops the chain before the next step
+        logger.error(f"Error in recompute {recompute_id} step {step}: {str(e)}")
+        raise
+    logger.info(f"Recompute {recompute_id} step {step} done")
+    return f"Recompute {recompute_id} step {step} done"
 
+@shared_task
+@record_run(season=recompute_season)
+def recompute_steps(recompute_id):
+    """Run every pending step of a season recompute in one transaction (per-process page cache)"""
+    try:
+        if not run_recompute_steps(recompute_id):
+            return f"Recompute {recompute_id} skipped"
+    except Exception as e:
+        # The run is marked failed; the task fails with it
+        logger.error(f"Error in recompute {recompute_id}: {str(e)}")
+        raise
+    logger.info(f"Recompute {recompute_id} done")
+    return f"Recompute {recompute_id} done"
 
 @shared_task
+@record_run(season=season_argument)
 def calculate_handicaps_async(season_id, weeks=None, golfers=None):
     """Calculate and save handicaps for a season asynchronously"""
     try:
@@ -114,45 +135,69 @@ def calculate_handicaps_async(season_id, weeks=None, golfers=None):
         return f"Handicaps calculated for season {season.year}"
     except Season.DoesNotExist:
         logger.error(f"Season id {season_id} does not exist")
+        mark_run("error", f"Season id {season_id} does not exist")
         return f"Season id {season_id} does not exist"
     except Exception as e:
         logger.error(f"Error calculating handicaps for season {season_id}: {str(e)}")
+        mark_run("error", f"Error calculating handicaps for season {season_id}: {str(e)}")
         return f"Error calculating handicaps for season {season_id}: {str(e)}"
 
 @shared_task
+@record_run(season=season_argument)
 def generate_rounds_async(season_id):
     """Generate rounds for a season asynchronously"""
     try:
         season = Season.objects.get(pk=season_id)
         generate_rounds(season)
-        # After generating rounds for all weeks, set skins winners for all weeks
-        for week in Week.objects.filter(season=season, rained_out=False).order_by('number'):
-            set_skin_winners_async.delay(week.id)
+        # After generating rounds for all weeks, set skins winners for all weeks in one pass
+        mark_skin_winners(SeasonSkins(season, Week.objects.filter(season=season, rained_out=False)))
+        bump_data_version(pk=season.pk)
         logger.info(f"Rounds generated for season {season.year}")
         return f"Rounds generated for season {season.year}"
     except Season.DoesNotExist:
         logger.error(f"Season id {season_id} does not exist")
+        mark_run("error", f"Season id {season_id} does not exist")
         return f"Season id {season_id} does not exist"
     except Exception as e:
         logger.error(f"Error generating rounds for season {season_id}: {str(e)}")
+        mark_run("error", f"Error generating rounds for season {season_id}: {str(e)}")
         return f"Error generating rounds for season {season_id}: {str(e)}"
 
 @shared_task
+@record_run(season=week_season)
 def set_skin_winners_async(week_id):
-    """Reset and set SkinEntry.winner for a week using calculate_skin_winners."""
+    """Reset and set SkinEntry.winner for a week."""
     try:
         week = Week.objects.get(id=week_id)
     except Week.DoesNotExist:
         logger.error(f"Week with id {week_id} does not exist for skins winner setting")
         return f"Week with id {week_id} does not exist"
 
-    # Reset all winners for this week
-    SkinEntry.objects.filter(week=week).update(winner=False)
-
-    # Calculate new winners
-    skin_winners = calculate_skin_winners(week)
-    for winner in skin_winners:
-        golfer = winner['golfer']
-        SkinEntry.objects.filter(week=week, golfer=golfer).update(winner=True)
+    mark_skin_winners(SeasonSkins(week.season, [week]))
+    bump_data_version(pk=week.season_id)
     logger.info(f"Skins winners set for week {week.number}")
     return f"Skins winners set for week {week.number}"
+
+
+@shared_task
+@record_run(season=season_argument)
+def simulate_playoffs_async(season_id, simulations=None, force=False):
+    """Run the Monte Carlo playoff projection for a season, cached per last scored week and data version"""
+    from main.simulation import DEFAULT_SIMULATIONS, get_playoff_projection, projection_is_current, run_playoff_projection
+    try:
+        season = Season.objects.get(pk=season_id)
+        simulations = simulations or DEFAULT_SIMULATIONS
+        cached = get_playoff_projection(season)
+        if cached and not force and cached.simulations >= simulations and projection_is_current(cached, season):
+            return f"Playoff projection for season {season.year} already cached"
+        projection = run_playoff_projection(season, simulations=simulations)
+        logger.info(f"Playoff projection for season {season.year} complete ({projection.simulations} simulations)")
+        return f"Playoff projection for season {season.year} complete"
+    except Season.DoesNotExist:
+        logger.error(f"Season id {season_id} does not exist")
+        mark_run("error", f"Season id {season_id} does not exist")
+        return f"Season id {season_id} does not exist"
+    except Exception as e:
+        logger.error(f"Error simulating playoffs for season {season_id}: {str(e)}")
+        mark_run("error", f"Error simulating playoffs for season {season_id}: {str(e)}")
+        return f"Error simulating playoffs for season {season_id}: {str(e)}"
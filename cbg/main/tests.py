@@ -1,8 +1,8 @@
-from django.test import TestCase
-from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.db.models import Count, Sum
 from django.utils import timezone
 from main.models import *
-from main.helper import get_current_season, get_last_week, get_next_week, get_golfer_points, calculate_and_save_handicaps_for_season, generate_golfer_matchups, generate_rounds
+from main.helper import get_current_season, get_last_week, get_next_week, get_golfer_points, calculate_and_save_handicaps_for_season, generate_golfer_matchups, generate_rounds, process_season, process_week
 import random
 from django.urls import reverse
 
@@ -264,7 +264,7 @@ class RoundTestCase(TestCase):
         
         self.assertEqual(round.gross, 56)
         self.assertEqual(round.net, 44)
-        self.assertEqual(round.points.aggregate(Sum('points'))['points__sum'], 3.5)
+        self.assertEqual(sum(round.hole_points), 3.5)
         self.assertEqual(round.total_points, 3.5)
         self.assertEqual(round.matchup, self.matchup)
         self.assertEqual(round.week, self.week1)
@@ -729,4 +729,1428 @@ class AddSubViewTests(TestCase):
             self.assertEqual(sub.sub_golfer, self.sub_golfer)
             self.assertEqual(sub.week, self.week)
         else:
-            self.fail('Sub not created')
\ No newline at end of file
+            self.fail('Sub not created')
+
+def _course_config(name='Test Course'):
+    course = Course.objects.create(name=name, city='Test', state='MI')
+    config = CourseConfig.objects.create(course=course, name='', effective_start=timezone.now().date())
+    for i in range(1, 19):
+        Hole.objects.create(config=config, number=i, par=4, handicap=i, handicap9=(i if i <= 9 else i - 9), yards=250)
+    return config
+
+
+class WeekScoringTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config())
+        self.week = Week.objects.create(date=timezone.now() - timedelta(days=7), season=self.season, number=1, rained_out=False, is_front=True)
+        self.holes = list(Hole.objects.filter(config=self.season.course_config, number__lte=9).order_by('number'))
+
+        # Same cards as RoundTestCase: golfer1 (12) vs golfer4 (9), golfer2 (14) vs golfer3 (11)
+        self.team1_golfer1 = self._golfer('Team 1 Golfer 1', 12, [4, 6, 4, 8, 9, 5, 6, 6, 8])
+        self.team1_golfer2 = self._golfer('Team 1 Golfer 2', 14, [5, 4, 5, 7, 7, 4, 7, 8, 4])
+        self.team2_golfer1 = self._golfer('Team 2 Golfer 1', 11, [6, 8, 9, 8, 7, 4, 6, 5, 5])
+        self.team2_golfer2 = self._golfer('Team 2 Golfer 2', 9, [7, 3, 6, 6, 6, 5, 4, 7, 6])
+        self.matchup = self._matchup([self.team1_golfer1, self.team1_golfer2], [self.team2_golfer1, self.team2_golfer2])
+
+    def _golfer(self, name, hcp, scores):
+        golfer = Golfer.objects.create(name=name)
+        Handicap.objects.create(golfer=golfer, week=self.week, handicap=hcp)
+        for hole, score in zip(self.holes, scores):
+            Score.objects.create(golfer=golfer, week=self.week, hole=hole, score=score)
+        return golfer
+
+    def _matchup(self, team1_golfers, team2_golfers):
+        team1 = Team.objects.create(season=self.season)
+        team1.golfers.add(*team1_golfers)
+        team2 = Team.objects.create(season=self.season)
+        team2.golfers.add(*team2_golfers)
+        matchup = Matchup.objects.create(week=self.week)
+        matchup.teams.add(team1, team2)
+        return matchup
+
+    def test_score_week_creates_rounds_and_points(self):
+        from main.scoring import score_week
+        generate_golfer_matchups(self.week)
+
+        self.assertEqual(score_week(self.week), 4)
+
+        round = Round.objects.get(golfer=self.team1_golfer1, week=self.week)
+        self.assertEqual(round.gross, 56)
+        self.assertEqual(round.net, 44)
+        self.assertEqual(round.round_points, 0)
+        self.assertEqual(round.total_points, 3.5)
+        self.assertEqual(round.matchup, self.matchup)
+        self.assertEqual(len(round.hole_points), 9)
+        self.assertEqual(sum(round.hole_points), 3.5)
+        self.assertEqual(sum(round.hole_gross), round.gross)
+        self.assertEqual([gross - strokes for gross, strokes in zip(round.hole_gross, round.hole_strokes)], round.hole_net)
+        self.assertEqual(Round.objects.filter(week=self.week).aggregate(Sum('total_points'))['total_points__sum'], 24)
+
+    def test_partially_entered_week_logs_a_warning_without_traceback(self):
+        from main.scoring import score_week
+        generate_golfer_matchups(self.week)
+        Score.objects.filter(golfer=self.team2_golfer1, hole=self.holes[-1]).delete()
+
+        with self.assertLogs('main.scoring', level='WARNING') as logs:
+            self.assertEqual(score_week(self.week), 2)
+
+        self.assertEqual({record.levelname for record in logs.records}, {'WARNING'})
+        self.assertTrue(all(record.exc_info is None for record in logs.records))
+
+    def test_score_week_matches_get_golfer_points(self):
+        from main.scoring import score_week
+        generate_golfer_matchups(self.week)
+        expected = {gm.id: get_golfer_points(gm, detail=True) for gm in GolferMatchup.objects.filter(week=self.week)}
+
+        score_week(self.week)
+        score_week(self.week)  # re-scoring updates in place
+
+        self.assertEqual(Round.objects.filter(week=self.week).count(), 4)
+        self.assertEqual(sum(len(round.hole_points) for round in Round.objects.filter(week=self.week)), 36)
+        for round in Round.objects.filter(week=self.week):
+            self.assertEqual(round.total_points, expected[round.golfer_matchup_id]['golfer_points'])
+            self.assertEqual(round.round_points, expected[round.golfer_matchup_id]['round_points'])
+
+    def test_score_week_query_count_does_not_grow_with_matchups(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from main.scoring import score_week
+        generate_golfer_matchups(self.week)
+        with CaptureQueriesContext(connection) as one_matchup:
+            score_week(self.week)
+
+        self._matchup(
+            [self._golfer('Team 3 Golfer 1', 10, [5] * 9), self._golfer('Team 3 Golfer 2', 6, [4] * 9)],
+            [self._golfer('Team 4 Golfer 1', 15, [6] * 9), self._golfer('Team 4 Golfer 2', 3, [3] * 9)],
+        )
+        generate_golfer_matchups(self.week)
+        with CaptureQueriesContext(connection) as two_matchups:
+            self.assertEqual(score_week(self.week), 8)
+
+        self.assertEqual(len(two_matchups), len(one_matchup))
+
+
+    def test_scorecards_query_count_does_not_grow_with_matchups(self):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from main.scoring import score_week
+        url = reverse('scorecards_with_year', kwargs={'year': self.season.year, 'week': 1})
+        generate_golfer_matchups(self.week)
+        score_week(self.week)
+        self.client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as one_matchup:
+            response = self.client.get(url)
+        card = response.context['cards'][0]
+        self.assertEqual(card['team1_golferA']['golfer'], self.team1_golfer1)
+        self.assertEqual(card['team1_golferA']['scores'], [4, 6, 4, 8, 9, 5, 6, 6, 8])
+        self.assertEqual(sum(card['team1_golferA']['hole_points']), card['team1_golferA']['total_points'] - card['team1_golferA']['round_points'])
+
+        self._matchup(
+            [self._golfer('Team 3 Golfer 1', 10, [5] * 9), self._golfer('Team 3 Golfer 2', 6, [4] * 9)],
+            [self._golfer('Team 4 Golfer 1', 15, [6] * 9), self._golfer('Team 4 Golfer 2', 3, [3] * 9)],
+        )
+        generate_golfer_matchups(self.week)
+        score_week(self.week)
+        cache.clear()
+        with CaptureQueriesContext(connection) as two_matchups:
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.context['cards']), 2)
+        self.assertEqual(len(two_matchups), len(one_matchup))
+
+    def test_regenerating_matchups_only_touches_changed_pairings(self):
+        from main.scoring import score_week
+        generate_golfer_matchups(self.week)
+        score_week(self.week)
+        rounds = dict(Round.objects.filter(week=self.week).values_list('golfer_matchup_id', 'id'))
+
+        self.assertEqual(generate_golfer_matchups(self.week), {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(dict(Round.objects.filter(week=self.week).values_list('golfer_matchup_id', 'id')), rounds)
+
+        # golfer1 (A) is replaced by a 10 handicap sub, who takes the A matchup
+        sub = self._golfer('Sub', 10, [5] * 9)
+        Sub.objects.create(week=self.week, absent_golfer=self.team1_golfer1, sub_golfer=sub)
+        self.assertEqual(generate_golfer_matchups(self.week), {'created': 2, 'updated': 0, 'deleted': 2})
+
+        kept = GolferMatchup.objects.filter(week=self.week, is_A=False)
+        self.assertEqual({gm.id: rounds[gm.id] for gm in kept}, dict(Round.objects.filter(week=self.week).values_list('golfer_matchup_id', 'id')))
+        self.assertFalse(Round.objects.filter(week=self.week, golfer=self.team1_golfer1).exists())
+        self.assertEqual(GolferMatchup.objects.get(week=self.week, golfer=sub).subbing_for_golfer, self.team1_golfer1)
+        self.assertEqual(score_week(self.week), 4)
+
+    def test_regenerating_matchups_query_count_does_not_grow_with_matchups(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        generate_golfer_matchups(self.week)
+        with CaptureQueriesContext(connection) as one_matchup:
+            generate_golfer_matchups(self.week)
+
+        self._matchup(
+            [self._golfer('Team 3 Golfer 1', 10, [5] * 9), self._golfer('Team 3 Golfer 2', 6, [4] * 9)],
+            [self._golfer('Team 4 Golfer 1', 15, [6] * 9), self._golfer('Team 4 Golfer 2', 3, [3] * 9)],
+        )
+        generate_golfer_matchups(self.week)
+        with CaptureQueriesContext(connection) as two_matchups:
+            generate_golfer_matchups(self.week)
+
+        self.assertEqual(len(two_matchups), len(one_matchup))
+        self.assertEqual(GolferMatchup.objects.filter(week=self.week).count(), 8)
+
+
+class SeasonHandicapCalculatorTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config())
+        holes = list(Hole.objects.filter(config=self.season.course_config).order_by('number'))
+        start = timezone.now() - timedelta(weeks=9)
+        self.weeks = [
+            Week.objects.create(date=start + timedelta(weeks=i), season=self.season, number=i + 1, rained_out=False, is_front=(i % 2 == 0))
+            for i in range(8)
+        ]
+        self.member1 = Golfer.objects.create(name='Member 1')
+        self.member2 = Golfer.objects.create(name='Member 2')
+        self.sub = Golfer.objects.create(name='Sub 1')
+        team = Team.objects.create(season=self.season)
+        team.golfers.add(self.member1, self.member2)
+
+        cards = [
+            [4, 6, 4, 8, 9, 5, 6, 6, 8],
+            [5, 4, 5, 7, 7, 4, 7, 8, 4],
+            [6, 8, 9, 8, 7, 4, 6, 5, 5],
+            [7, 3, 6, 6, 6, 5, 4, 7, 6],
+            [4, 4, 4, 6, 5, 3, 6, 7, 5],
+            [5, 9, 6, 4, 7, 3, 8, 7, 4],
+            [8, 5, 7, 6, 4, 4, 5, 8, 6],
+        ]
+        played = {
+            self.member1: range(7),
+            self.member2: [0, 2, 3, 5, 6],
+            self.sub: [1, 4],
+        }
+        for golfer, week_indexes in played.items():
+            for i in week_indexes:
+                week = self.weeks[i]
+                nine = holes[:9] if week.is_front else holes[9:]
+                for hole, score in zip(nine, cards[(i + golfer.id) % len(cards)]):
+                    Score.objects.create(golfer=golfer, week=week, hole=hole, score=score)
+
+    def test_matches_week_by_week_verification(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        changed = calculate_and_save_handicaps_for_season(self.season)
+
+        self.assertEqual(len(changed), 3 * len(self.weeks))
+        self.assertEqual(Handicap.objects.filter(week__season=self.season).count(), 3 * len(self.weeks))
+        out = StringIO()
+        call_command('verify_handicaps', season=self.season.year, stdout=out)
+        self.assertIn('Verification PASSED', out.getvalue())
+
+    def test_recalculation_only_reports_changes(self):
+        calculate_and_save_handicaps_for_season(self.season)
+        self.assertEqual(calculate_and_save_handicaps_for_season(self.season), set())
+
+        Handicap.objects.filter(golfer=self.member1, week=self.weeks[-1]).update(handicap=99)
+        self.assertEqual(
+            calculate_and_save_handicaps_for_season(self.season),
+            {(self.member1.id, self.weeks[-1].id)},
+        )
+
+    def test_query_count_is_flat(self):
+        with self.assertNumQueries(8):
+            calculate_and_save_handicaps_for_season(self.season)
+
+
+class DirtyWeekProcessingTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config())
+        holes = list(Hole.objects.filter(config=self.season.course_config).order_by('number'))
+        start = timezone.now() - timedelta(weeks=5)
+        self.weeks = [
+            Week.objects.create(date=start + timedelta(weeks=i), season=self.season, number=i + 1, rained_out=False, is_front=(i % 2 == 0))
+            for i in range(4)
+        ]
+        self.golfers = [Golfer.objects.create(name=f'Golfer {i}') for i in range(4)]
+        team1 = Team.objects.create(season=self.season)
+        team1.golfers.add(*self.golfers[:2])
+        team2 = Team.objects.create(season=self.season)
+        team2.golfers.add(*self.golfers[2:])
+        for week in self.weeks:
+            matchup = Matchup.objects.create(week=week)
+            matchup.teams.add(team1, team2)
+            nine = holes[:9] if week.is_front else holes[9:]
+            for g, golfer in enumerate(self.golfers):
+                for h, hole in enumerate(nine):
+                    Score.objects.create(golfer=golfer, week=week, hole=hole, score=4 + (g + h + week.number) % 3)
+        process_season(self.season)
+
+    def _snapshot(self):
+        return sorted(Round.objects.filter(week__season=self.season).values_list(
+            'golfer_id', 'week__number', 'handicap__handicap', 'net', 'total_points', 'round_points'))
+
+    def test_saving_scores_marks_week(self):
+        self.assertFalse(DirtyWeek.objects.exists())
+
+        score = Score.objects.filter(week=self.weeks[1], golfer=self.golfers[0]).first()
+        score.score = 9
+        score.save()
+
+        self.assertTrue(DirtyWeek.objects.filter(week=self.weeks[1], golfer=self.golfers[0], reason='score').exists())
+
+    def test_repeated_whole_week_marks_collapse(self):
+        from main.recompute import mark_week_dirty
+        for _ in range(3):
+            mark_week_dirty(self.weeks[2], reason='sub')
+        mark_week_dirty(self.weeks[2], reason='matchup')
+
+        marks = DirtyWeek.objects.filter(week=self.weeks[2], golfer__isnull=True)
+        self.assertEqual(sorted(marks.values_list('reason', flat=True)), ['matchup', 'sub'])
+
+    def test_late_change_only_touches_affected_weeks(self):
+        last_week = self.weeks[-1]
+        score = Score.objects.filter(week=last_week, golfer=self.golfers[0]).first()
+        score.score += 3
+        score.save()
+
+        result = process_week(last_week)
+
+        self.assertEqual(result['weeks_processed'], [last_week.number])
+        self.assertFalse(DirtyWeek.objects.filter(week__season=self.season).exists())
+
+    def test_incremental_matches_full_recompute(self):
+        score = Score.objects.filter(week=self.weeks[0], golfer=self.golfers[1]).first()
+        score.score += 4
+        score.save()
+
+        result = process_week(self.weeks[-1])
+        incremental = self._snapshot()
+        process_season(self.season)
+
+        self.assertEqual(result['weeks_processed'][0], 1)
+        self.assertGreater(result['handicaps_changed'], 0)
+        self.assertEqual(incremental, self._snapshot())
+
+    @override_settings(TASK_COORDINATION_URL='memory://')
+    def test_recompute_all_command_matches_process_season(self):
+        from io import StringIO
+        from django.core.management import call_command
+        expected = self._snapshot()
+        standings = sorted(TeamStanding.objects.values_list('team_id', 'half', 'points'))
+        Round.objects.filter(week__season=self.season).delete()
+        Handicap.objects.filter(week__season=self.season).delete()
+
+        out = StringIO()
+        call_command('recompute_all', workers=1, years=[self.season.year], stdout=out)
+
+        self.assertEqual(self._snapshot(), expected)
+        self.assertEqual(sorted(TeamStanding.objects.values_list('team_id', 'half', 'points')), standings)
+        self.assertIn(f'{self.season}: 4 weeks', out.getvalue())
+        self.assertIn('16 rounds', out.getvalue())
+
+class TeamStandingTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config())
+        holes = list(Hole.objects.filter(config=self.season.course_config).order_by('number'))
+        start = timezone.now() - timedelta(weeks=13)
+        golfers = [Golfer.objects.create(name=f'Golfer {i}') for i in range(4)]
+        self.sub = Golfer.objects.create(name='Sub')
+        self.team1 = Team.objects.create(season=self.season)
+        self.team1.golfers.add(*golfers[:2])
+        self.team2 = Team.objects.create(season=self.season)
+        self.team2.golfers.add(*golfers[2:])
+        # Weeks 1, 2, 10 and 11 so both halves have rounds; Golfer 1 is subbed for in week 2
+        for i, number in enumerate([1, 2, 10, 11]):
+            week = Week.objects.create(date=start + timedelta(weeks=i), season=self.season, number=number, rained_out=False, is_front=(i % 2 == 0))
+            matchup = Matchup.objects.create(week=week)
+            matchup.teams.add(self.team1, self.team2)
+            playing = list(golfers)
+            if number == 2:
+                Sub.objects.create(week=week, absent_golfer=golfers[1], sub_golfer=self.sub)
+                playing[1] = self.sub
+            nine = holes[:9] if week.is_front else holes[9:]
+            for g, golfer in enumerate(playing):
+                for h, hole in enumerate(nine):
+                    Score.objects.create(golfer=golfer, week=week, hole=hole, score=4 + (g * 2 + h + number) % 3)
+        process_season(self.season)
+
+    def _round_points(self, team, first_half):
+        golfer_ids = list(team.golfers.values_list('id', flat=True))
+        rounds = Round.objects.filter(week__season=self.season)
+        rounds = rounds.filter(week__number__lte=9) if first_half else rounds.filter(week__number__gte=10)
+        own = rounds.filter(golfer__in=golfer_ids, subbing_for__isnull=True).aggregate(t=Sum('total_points'))['t'] or 0
+        subbed = rounds.filter(subbing_for__in=golfer_ids).aggregate(t=Sum('total_points'))['t'] or 0
+        return own + subbed
+
+    def test_standings_match_round_totals(self):
+        self.assertTrue(Round.objects.filter(week__season=self.season, is_sub=True).exists())
+        for team in (self.team1, self.team2):
+            self.assertEqual(TeamStanding.objects.get(team=team, half=1).points, self._round_points(team, True))
+            self.assertEqual(TeamStanding.objects.get(team=team, half=2).points, self._round_points(team, False))
+
+    def test_rescoring_a_week_updates_standings(self):
+        from main.scoring import score_week
+        week = Week.objects.get(season=self.season, number=10)
+        Round.objects.filter(week=week).delete()
+        score_week(week)
+
+        self.assertEqual(TeamStanding.objects.get(team=self.team1, half=2).points, self._round_points(self.team1, False))
+
+    def test_dropping_matchups_updates_standings(self):
+        # A sub save regenerates the week's pairings; the replaced golfer's rounds go with theirs
+        week = Week.objects.get(season=self.season, number=10)
+        golfer = self.team1.golfers.order_by('name').first()
+        before = TeamStanding.objects.get(team=self.team1, half=2).points
+        Sub.objects.create(week=week, absent_golfer=golfer, sub_golfer=self.sub)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(generate_golfer_matchups(week)['deleted'], 2)
+
+        self.assertFalse(Round.objects.filter(week=week, golfer=golfer).exists())
+        for team in (self.team1, self.team2):
+            self.assertEqual(TeamStanding.objects.get(team=team, half=2).points, self._round_points(team, False))
+        self.assertNotEqual(TeamStanding.objects.get(team=self.team1, half=2).points, before)
+
+    def test_full_standings_read_in_constant_queries(self):
+        from main.views import get_full_standings
+        with self.assertNumQueries(3):
+            standings = get_full_standings(self.season)
+        self.assertEqual(sum(row['total'] for row in standings), Round.objects.filter(week__season=self.season).aggregate(t=Sum('total_points'))['t'])
+
+
+class PlayoffSeedingTests(TestCase):
+    setUp = TeamStandingTests.setUp
+
+    def test_head_to_head_matrix_reads_in_constant_queries(self):
+        from main.playoffs import head_to_head_matrix
+        with self.assertNumQueries(2):
+            matrix = head_to_head_matrix(self.season)
+
+        for team, opponent in ((self.team1, self.team2), (self.team2, self.team1)):
+            self.assertEqual(matrix[(team.id, opponent.id)], sum(TeamStanding.objects.filter(team=team).values_list('points', flat=True)))
+
+    def test_what_if_reseeds_without_writing(self):
+        from main.playoffs import HypotheticalResult, compute_playoff_seeds, what_if_playoff_seeds
+        current = compute_playoff_seeds(self.season, max_playoff_teams=2)
+        leader, trailer = current[0].team_id, current[1].team_id
+        standings_before = list(TeamStanding.objects.values_list('team_id', 'half', 'points'))
+
+        seeds = what_if_playoff_seeds(
+            self.season,
+            [HypotheticalResult(week_number=12, team_id=trailer, opponent_id=leader, team_points=100, opponent_points=0)],
+            max_playoff_teams=2,
+        )
+
+        self.assertEqual([s.team_id for s in seeds], [trailer, leader])
+        self.assertEqual(seeds[0].points_total, current[1].points_total + 100)
+        self.assertEqual(list(TeamStanding.objects.values_list('team_id', 'half', 'points')), standings_before)
+
+
+class PlayoffSimulationTests(TestCase):
+    setUp = TeamStandingTests.setUp
+
+    @staticmethod
+    def _history(*strokes_over_par):
+        # The same strokes over par on every hole of the course
+        import numpy as np
+        return {number: np.array(strokes_over_par) for number in range(1, 19)}
+
+    def _race(self):
+        import numpy as np
+        from main.simulation import RemainingMatchup, SimulationInputs
+        # Two teams level on points, one match left: a coin flip for the single place
+        return SimulationInputs(
+            team_names={1: 'One', 2: 'Two'},
+            first={1: 50.0, 2: 50.0}, second={}, head_to_head={},
+            remaining=[RemainingMatchup(week_number=2, is_front=True, team_ids=(1, 2))],
+            lineups={1: [(11, 5.0)], 2: [(12, 5.0)]},
+            history={11: self._history(-1, 0, 1, 2), 12: self._history(-1, 0, 1, 2)},
+            nines={True: (np.full(9, 4), np.arange(1, 10))},
+        )
+
+    def test_simulated_points_follow_stroke_allocation(self):
+        import numpy as np
+        from main.simulation import SimulationInputs, _golfer_points
+        inputs = SimulationInputs(team_names={}, first={}, second={}, head_to_head={}, remaining=[], lineups={},
+                                  history={1: self._history(0), 2: self._history(1)})
+        par, handicap9 = np.full(9, 4), np.arange(1, 10)
+
+        # 6 strokes to the higher handicap golfer: 6 halved holes, 3 won, and a lower net
+        points, opp_points = _golfer_points(np.random.default_rng(0), inputs, (1, 2.0), (2, 8.0), True, par, handicap9, 5)
+
+        self.assertEqual(points.tolist(), [9.0] * 5)
+        self.assertEqual(opp_points.tolist(), [3.0] * 5)
+
+    def test_each_hole_is_drawn_from_its_own_history(self):
+        import numpy as np
+        from main.simulation import SimulationInputs, _golfer_points
+        # Birdies the first hole every time and doubles the rest; the opponent pars everything
+        streaky = self._history(2)
+        streaky[1] = np.array([-1])
+        inputs = SimulationInputs(team_names={}, first={}, second={}, head_to_head={}, remaining=[], lineups={},
+                                  history={1: streaky, 2: self._history(0)})
+        par, handicap9 = np.full(9, 4), np.arange(1, 10)
+
+        points, opp_points = _golfer_points(np.random.default_rng(0), inputs, (1, 5.0), (2, 5.0), True, par, handicap9, 5)
+
+        self.assertEqual(points.tolist(), [1.0] * 5)
+        self.assertEqual(opp_points.tolist(), [11.0] * 5)
+
+    def test_hole_pools_fall_back_from_the_hole_to_its_par(self):
+        from main.simulation import MIN_HOLE_HISTORY, _hole_pools
+        scores = (
+            [(1, 1, 4, 0)] * MIN_HOLE_HISTORY          # golfer 1 has plenty of history on hole 1
+            + [(1, 2, 4, 2)] * 2                       # but little on hole 2
+            + [(1, 3, 4, 1)] * 9                       # so par 4s stand in for it
+            + [(2, 5, 3, 1)]                           # golfer 2 has almost none
+        )
+        pools = _hole_pools([1, 2], {1: 4, 2: 4, 5: 3, 6: 5}, scores)
+
+        self.assertEqual(set(pools[1][1].tolist()), {0})
+        self.assertEqual(sorted(set(pools[1][2].tolist())), [0, 1, 2])
+        # No history of their own: the league's scores on the hole, then on holes of its par
+        self.assertEqual(pools[2][1].tolist(), [0] * MIN_HOLE_HISTORY)
+        self.assertEqual(pools[2][5].tolist(), [1])
+        self.assertEqual(pools[2][6].tolist(), [0])
+
+    def test_process_pool_runs_from_a_daemonic_worker(self):
+        import multiprocessing
+        from unittest import mock
+        from billiard import process
+        from main.simulation import simulate_playoffs
+        # Celery prefork children are daemonic; billiard's pool has to start from one
+        with mock.patch.dict(multiprocessing.current_process()._config, {'daemon': True}), \
+                mock.patch.dict(process.current_process()._config, {'daemon': True}):
+            results = simulate_playoffs(self._race(), simulations=400, max_playoff_teams=1, workers=2, seed=3)
+
+        self.assertAlmostEqual(sum(r['playoff_probability'] for r in results), 1.0)
+        self.assertTrue(all(0 < r['playoff_probability'] < 1 for r in results))
+        self.assertEqual({r['status'] for r in results}, {'alive'})
+
+    def test_only_results_that_cannot_change_settle_a_team(self):
+        import numpy as np
+        from main.simulation import RemainingMatchup, SimulationInputs, simulate_playoffs
+        # The leader always beats the runner-up, who can still catch it; the third team has no points
+        inputs = SimulationInputs(
+            team_names={1: 'Leader', 2: 'Runner-up', 3: 'Last'},
+            first={1: 100.0, 2: 90.0, 3: 0.0}, second={}, head_to_head={},
+            remaining=[RemainingMatchup(week_number=2, is_front=True, team_ids=(1, 2))],
+            lineups={1: [(11, 0.0)], 2: [(12, 0.0)], 3: [(13, 0.0)]},
+            history={11: self._history(0), 12: self._history(3), 13: self._history(0)},
+            nines={True: (np.full(9, 4), np.arange(1, 10))},
+        )
+
+        results = simulate_playoffs(inputs, simulations=50, max_playoff_teams=1, workers=1, seed=1)
+
+        self.assertEqual([r['status'] for r in results], ['projected_in', 'projected_out', 'eliminated'])
+        self.assertEqual(results[0]['playoff_probability'], 1.0)
+
+    def test_projection_is_cached_per_week(self):
+        from datetime import timedelta
+        from main.simulation import get_playoff_projection, run_playoff_projection
+        from main.tasks import simulate_playoffs_async
+        last = Week.objects.get(season=self.season, number=11)
+        week = Week.objects.create(date=last.date + timedelta(weeks=1), season=self.season, number=12, rained_out=False, is_front=True)
+        Matchup.objects.create(week=week).teams.add(self.team1, self.team2)
+
+        projection = run_playoff_projection(self.season, simulations=200, max_playoff_teams=2, workers=1, seed=1)
+
+        self.assertEqual(projection.week, last)
+        self.assertEqual([r['status'] for r in projection.results], ['clinched', 'clinched'])
+        self.assertAlmostEqual(sum(r['seed_probabilities'][0] for r in projection.results), 1.0)
+        self.assertEqual(get_playoff_projection(self.season), projection)
+        self.assertIn('already cached', simulate_playoffs_async(self.season.pk, simulations=200))
+
+    def test_projection_reruns_when_the_season_data_changes(self):
+        from unittest import mock
+        from main.page_cache import bump_data_version
+        from main.simulation import run_playoff_projection
+        from main.tasks import simulate_playoffs_async
+        run_playoff_projection(self.season, simulations=200, max_playoff_teams=2, workers=1, seed=1)
+
+        with mock.patch('main.simulation.run_playoff_projection') as rerun:
+            simulate_playoffs_async(self.season.pk, simulations=200)
+            rerun.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_data_version(pk=self.season.pk)
+            simulate_playoffs_async(self.season.pk, simulations=200)
+        rerun.assert_called_once()
+
+
+class GolferStatsTests(TestCase):
+    setUp = TeamStandingTests.setUp
+
+    def _stats_context(self, golfer):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('golfer_stats_with_year', kwargs={'year': self.season.year, 'golfer_id': golfer.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.context, len(queries)
+
+    def test_yearly_stats_match_scores(self):
+        golfer = Golfer.objects.get(name='Golfer 0')
+        context, _ = self._stats_context(golfer)
+
+        scores = Score.objects.filter(golfer=golfer)
+        gross = [scores.filter(week=week).aggregate(t=Sum('score'))['t'] for week in Week.objects.filter(season=self.season)]
+        year_stats = context['yearly_gross_stats'][0]
+        self.assertEqual(year_stats['total_rounds'], 4)
+        self.assertEqual(year_stats['avg_gross'], sum(gross) / 4)
+        self.assertEqual(year_stats['best_gross']['gross_score'], min(gross))
+        self.assertEqual(sum(context['scoring_breakdown'].values()), scores.count())
+        hole_one = context['yearly_hole_stats'][self.season.year][1]
+        self.assertEqual(hole_one['rounds_played'], scores.filter(hole__number=1).count())
+
+    def test_query_count_does_not_grow_with_history(self):
+        from datetime import timedelta
+        golfer = Golfer.objects.get(name='Golfer 0')
+        _, queries = self._stats_context(golfer)
+
+        # Two earlier seasons of history for the same golfer
+        holes = list(Hole.objects.filter(config=self.season.course_config).order_by('number'))
+        for offset in (1, 2):
+            season = Season.objects.create(year=self.season.year - offset, league=self.season.league, course_config=self.season.course_config)
+            for number in range(1, 4):
+                week = Week.objects.create(date=timezone.now() - timedelta(weeks=52 * offset + number), season=season, number=number, rained_out=False, is_front=True)
+                for h, hole in enumerate(holes[:9]):
+                    Score.objects.create(golfer=golfer, week=week, hole=hole, score=4 + (h + number) % 3)
+
+        context, queries_with_history = self._stats_context(golfer)
+
+        self.assertEqual(len(context['yearly_gross_stats']), 3)
+        self.assertEqual(queries_with_history, queries)
+        self.assertEqual(set(context['hole_trends']), {self.season.year - 1, self.season.year})
+
+
+class ScoreDistributionTests(TestCase):
+    setUp = TeamStandingTests.setUp
+
+    def _non_sub_scores(self, **filters):
+        # Each score once per non-sub round it counts towards
+        from collections import Counter
+        rounds = Counter(Round.objects.filter(week__season=self.season, subbing_for__isnull=True).values_list('golfer_id', 'week_id'))
+        scores = Score.objects.filter(week__season=self.season, **filters).select_related('hole')
+        return [score for score in scores for _ in range(rounds[(score.golfer_id, score.week_id)])]
+
+    def test_cube_counts_non_sub_scores(self):
+        from main.distribution import hole_distribution
+        scores = self._non_sub_scores()
+        self.assertEqual(ScoreDistribution.objects.filter(season=self.season).aggregate(t=Sum('count'))['t'], len(scores))
+
+        hole = hole_distribution(self.season)[1]
+        to_par = [s.score - s.hole.par for s in scores if s.hole.number == 1]
+        self.assertEqual(dict(hole['counts']), {value: to_par.count(value) for value in set(to_par)})
+
+    def test_league_birdies_and_eagles_count_non_sub_rounds(self):
+        from main.golfer_stats import league_birdies_and_eagles
+        to_par = [s.score - s.hole.par for s in self._non_sub_scores()]
+        self.assertEqual(league_birdies_and_eagles(), (to_par.count(-1), sum(1 for value in to_par if value <= -2)))
+
+    def test_missing_cube_is_rebuilt_on_read(self):
+        from main.distribution import golfer_distribution
+        ScoreDistribution.objects.all().delete()
+
+        distribution = golfer_distribution(self.season.league)
+
+        sub_scores = Score.objects.filter(golfer=self.sub).count()
+        self.assertEqual(sub_scores, 9)
+        self.assertNotIn(self.sub.id, distribution)
+        self.assertEqual(sum(sum(counts.values()) for counts in distribution.values()), Score.objects.count() - sub_scores)
+
+    def test_sub_stats_read_hole_scores_from_sub_rounds(self):
+        response = self.client.get(reverse('sub_stats_detail_with_year', kwargs={'year': self.season.year, 'golfer_id': self.sub.id}))
+
+        hole_stats = response.context['hole_stats']
+        hole = Score.objects.filter(golfer=self.sub).select_related('hole').first().hole
+        scores = Score.objects.filter(golfer=self.sub, week__season=self.season, hole=hole).order_by('week__number')
+        self.assertEqual(hole_stats[hole.number]['scores'], [s.score for s in scores])
+        self.assertEqual(hole_stats[hole.number]['par'], hole.par)
+        self.assertEqual(sum(response.context['scoring_breakdown'].values()), Score.objects.filter(golfer=self.sub).count())
+
+    def test_league_stats_hole_averages(self):
+        response = self.client.get(reverse('league_stats_with_year', kwargs={'year': self.season.year}))
+
+        hole_stats = response.context['hole_stats']
+        scores = [s.score for s in self._non_sub_scores(hole__number=1)]
+        self.assertEqual(hole_stats[1]['avg_score'], round(sum(scores) / len(scores), 2))
+        self.assertEqual(hole_stats[1]['total_rounds'], len(scores))
+        self.assertEqual(response.context['total_holes'], sum(s['total_rounds'] for s in hole_stats.values()))
+
+
+class ScoreCardEntryTests(TestCase):
+    def setUp(self):
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config())
+        self.golfers = [Golfer.objects.create(name=f'Golfer {i}') for i in range(4)]
+        for pair in (self.golfers[:2], self.golfers[2:]):
+            Team.objects.create(season=self.season).golfers.add(*pair)
+        self.week = Week.objects.create(date=timezone.now(), season=self.season, number=1, rained_out=False, is_front=True)
+
+    def _card(self, score=5):
+        from main.score_entry import ScoreCardRow
+        return [ScoreCardRow(golfer_name=g.name, scores={hole: str(score) for hole in range(1, 10)}) for g in self.golfers]
+
+    def test_card_is_written_in_bulk(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from main.score_entry import save_score_card
+        with CaptureQueriesContext(connection) as queries:
+            saved = save_score_card(self.week, self._card())
+
+        self.assertEqual(saved, 36)
+        self.assertLessEqual(len(queries), 11)
+        self.assertEqual(Score.objects.filter(week=self.week, score=5).count(), 36)
+        self.assertEqual(set(DirtyWeek.objects.filter(week=self.week).values_list('golfer_id', flat=True)), {g.id for g in self.golfers})
+
+        # Re-entering the card updates the existing scores
+        save_score_card(self.week, self._card(score=4))
+        self.assertEqual(Score.objects.filter(week=self.week).count(), 36)
+        self.assertEqual(Score.objects.filter(week=self.week, score=4).count(), 36)
+
+    def test_invalid_card_writes_nothing(self):
+        from main.score_entry import ScoreCardError, save_score_card
+        card = self._card()
+        card[-1].scores[9] = '11'
+
+        with self.assertRaisesMessage(ScoreCardError, 'Score for Golfer 3 on hole 9 must be between 1 and 10.'):
+            save_score_card(self.week, card)
+        self.assertFalse(Score.objects.filter(week=self.week).exists())
+
+        card[-1].golfer_name = 'Nobody'
+        with self.assertRaisesMessage(ScoreCardError, 'Golfer Nobody not found.'):
+            save_score_card(self.week, card)
+
+    def test_week_counts_entered_scores(self):
+        from main.score_entry import save_score_card
+        stale_week = Week.objects.get(pk=self.week.pk)
+        save_score_card(self.week, self._card())
+        self.week.refresh_from_db()
+        self.assertEqual(self.week.scores_entered, 36)
+
+        # Re-entering a card only updates scores
+        save_score_card(self.week, self._card(score=4))
+        self.week.refresh_from_db()
+        self.assertEqual(self.week.scores_entered, 36)
+
+        # Saving an instance loaded before the scores does not reset the count
+        stale_week.num_scores = 36
+        stale_week.save()
+        self.week.refresh_from_db()
+        self.assertEqual(self.week.scores_entered, 36)
+        self.assertTrue(self.week.scores_complete)
+
+        Score.objects.filter(week=self.week, golfer=self.golfers[0]).first().delete()
+        self.week.refresh_from_db()
+        self.assertEqual(self.week.scores_entered, 35)
+        self.assertFalse(self.week.scores_complete)
+
+    def test_last_and_next_week_are_single_queries(self):
+        from main.score_entry import save_score_card
+        self.week.num_scores = 36
+        self.week.date = timezone.now() - timezone.timedelta(days=7)
+        self.week.save()
+        week2 = Week.objects.create(date=timezone.now() + timezone.timedelta(days=7), season=self.season, number=2, rained_out=False, is_front=False, num_scores=36)
+        save_score_card(self.week, self._card())
+        get_current_season()  # load the league cache
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_last_week(self.season), self.week)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_next_week(self.season), week2)
+
+
+class LeagueScopeTests(TestCase):
+    def setUp(self):
+        self.league = _test_league()
+        self.season = Season.objects.create(year=2024, league=self.league, course_config=_course_config())
+
+    def test_request_scope_resolves_path_year(self):
+        from main.league_scope import invalidate_league_cache
+        Season.objects.create(year=2025, league=self.league, course_config=self.season.course_config)
+        response = self.client.get(reverse('league_stats_with_year', kwargs={'year': 2024}))
+
+        scope = response.wsgi_request.league_scope
+        self.assertEqual(scope.league, self.league)
+        self.assertEqual(scope.season, self.season)
+        self.assertEqual(scope.latest_season.year, 2025)
+        self.assertFalse(response.context['is_current_season'])
+        self.assertTrue(response.context['multiple_seasons'])
+
+        # The snapshot is reused until a league or season changes
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from main.league_scope import latest_season
+        with CaptureQueriesContext(connection) as queries:
+            latest_season(self.league)
+        self.assertEqual(len(queries), 0)
+
+        invalidate_league_cache()
+        with CaptureQueriesContext(connection) as queries:
+            latest_season(self.league)
+        self.assertGreater(len(queries), 0)
+
+    def test_new_season_invalidates_cache(self):
+        self.assertEqual(get_current_season(league=self.league).year, 2024)
+        Season.objects.create(year=2025, league=self.league, course_config=self.season.course_config)
+        self.assertEqual(get_current_season(league=self.league).year, 2025)
+
+    def test_manager_status_is_read_per_request(self):
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+        from main.league_scope import RequestLeagueScope, is_league_manager
+        user = User.objects.create_user(username='manager', password='pw')
+        self.assertFalse(is_league_manager(user, self.league))
+        self.league.managers.add(user)
+        self.assertTrue(is_league_manager(user, self.league))
+
+        request = RequestFactory().get('/')
+        request.user = user
+        scope = RequestLeagueScope(request)
+        get_current_season()  # load the league cache
+        with self.assertNumQueries(1):
+            self.assertTrue(scope.manages(self.league))
+            self.assertTrue(scope.is_league_manager)
+
+        # A revoked manager loses access on their next request, with nothing to invalidate
+        League.managers.through.objects.filter(user=user).delete()
+        self.assertTrue(scope.manages(self.league))
+        self.assertFalse(RequestLeagueScope(request).manages(self.league))
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        self.season = Season.objects.create(year=2024, league=_test_league(), course_config=_course_config())
+        self.week = Week.objects.create(date=timezone.now(), season=self.season, number=1, rained_out=False, is_front=True)
+        self.golfer = Golfer.objects.create(name='Golfer')
+        self.hole = Hole.objects.get(config=self.season.course_config, number=1)
+
+    def test_version_moves_when_scores_change(self):
+        from main.page_cache import league_version, season_version
+        before = season_version(self.season), league_version(self.season.league)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Score.objects.create(golfer=self.golfer, week=self.week, hole=self.hole, score=4)
+
+        after = season_version(self.season), league_version(self.season.league)
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_bumps_are_applied_once_per_transaction(self):
+        from main.page_cache import season_version
+        season_version(self.season)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.week.save()
+        version = DataVersion.objects.get(season=self.season).version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for hole in Hole.objects.filter(config=self.season.course_config, number__lte=9):
+                Score.objects.create(golfer=self.golfer, week=self.week, hole=hole, score=4)
+            Handicap.objects.create(golfer=self.golfer, week=self.week, handicap=10)
+
+        self.assertEqual(DataVersion.objects.get(season=self.season).version, version + 1)
+
+    def test_context_is_rebuilt_only_when_version_moves(self):
+        from main.page_cache import cached_context
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {'builds': len(builds)}
+
+        self.assertEqual(cached_context('test_page', 'v1', build, self.season.pk), {'builds': 1})
+        self.assertEqual(cached_context('test_page', 'v1', build, self.season.pk), {'builds': 1})
+        self.assertEqual(cached_context('test_page', 'v2', build, self.season.pk), {'builds': 2})
+        self.assertEqual(len(builds), 2)
+
+    def test_league_stats_served_from_cache_until_data_changes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('league_stats_with_year', kwargs={'year': self.season.year})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as uncached:
+            self.client.get(url)
+        cached_queries = len(uncached)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.week.rained_out = True
+            self.week.save()
+        with CaptureQueriesContext(connection) as rebuilt:
+            self.client.get(url)
+
+        self.assertGreater(len(rebuilt), cached_queries)
+
+
+class SkinsTests(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        self.season = Season.objects.create(year=timezone.now().year, league=_test_league(), course_config=_course_config(), playing_skins=True)
+        self.holes = list(Hole.objects.filter(config=self.season.course_config, number__lte=9).order_by('number'))
+        self.week = Week.objects.create(date=timezone.now() - timedelta(days=7), season=self.season, number=1, rained_out=False, is_front=True)
+        self.golfer_a = self._entrant(self.week, 'A', 0, [3, 4, 4, 4, 4, 4, 4, 4, 4])
+        self.golfer_b = self._entrant(self.week, 'B', 9, [4, 4, 5, 5, 5, 5, 5, 5, 4])
+        self.golfer_c = self._entrant(self.week, 'C', 2, [4, 4, 4, 4, 4, 4, 4, 4, 5])
+
+    def _entrant(self, week, name, hcp, scores, golfer=None):
+        golfer = golfer or Golfer.objects.create(name=name)
+        Handicap.objects.create(golfer=golfer, week=week, handicap=hcp)
+        Score.objects.bulk_create([Score(golfer=golfer, week=week, hole=hole, score=score) for hole, score in zip(self.holes, scores)])
+        SkinEntry.objects.create(golfer=golfer, week=week)
+        return golfer
+
+    def test_gross_skins(self):
+        from main.skins import calculate_skin_winners
+        winners = calculate_skin_winners(self.week)
+        self.assertEqual([(w['golfer'], w['hole'], w['score']) for w in winners], [(self.golfer_a, 1, 3)])
+
+    def test_net_skins_use_matchup_stroke_allocation(self):
+        from main.skins import calculate_skin_winners
+        self.season.skins_type = 'NET'
+        self.season.save()
+        winners = calculate_skin_winners(Week.objects.get(pk=self.week.pk))
+        self.assertEqual(
+            [(w['golfer'], w['hole'], w['score'], w['gross'], w['strokes']) for w in winners],
+            [(self.golfer_b, 9, 3, 4, 1)],
+        )
+
+    def test_season_skins_cost_a_fixed_number_of_queries(self):
+        from main.skins import SeasonSkins, mark_skin_winners
+        self.season.skins_type = 'NET'
+        self.season.save()
+        week2 = Week.objects.create(date=timezone.now(), season=self.season, number=2, rained_out=False, is_front=True)
+        for golfer in (self.golfer_a, self.golfer_b, self.golfer_c):
+            self._entrant(week2, None, 0, [4] * 9, golfer=golfer)
+        Score.objects.filter(week=week2, golfer=self.golfer_c, hole=self.holes[4]).update(score=2)
+
+        weeks = list(Week.objects.filter(season=self.season).order_by('number'))
+        with self.assertNumQueries(4):
+            skins = SeasonSkins(self.season, weeks)
+        with self.assertNumQueries(0):
+            winners = skins.all_winners()
+        self.assertEqual([(w['golfer'], w['hole']) for w in winners[week2]], [(self.golfer_c, 5)])
+        self.assertEqual(skins.pot(week2), 3 * self.season.skins_entry_fee)
+
+        mark_skin_winners(skins)
+        self.assertEqual(
+            set(SkinEntry.objects.filter(winner=True).values_list('week__number', 'golfer__name')),
+            {(1, 'B'), (2, 'C')},
+        )
+
+    def test_settling_writes_results_and_payout_ledger(self):
+        from main.payouts import live_payouts, payout_totals, record_game_payouts
+        from main.skins import SeasonSkins, mark_skin_winners, stored_skin_winners
+        mark_skin_winners(SeasonSkins(self.season, [self.week]))
+
+        self.assertEqual(SkinResult.objects.filter(week=self.week).count(), 9)
+        self.assertEqual(
+            [(w['golfer'], w['hole'], w['payout']) for w in stored_skin_winners(pk=self.week.pk)[self.week.id]],
+            [(self.golfer_a, 1, 15.0)],
+        )
+        self.assertTrue(SkinEntry.objects.get(week=self.week, golfer=self.golfer_a).winner)
+
+        game = Game.objects.create(name='Closest', desc='', week=self.week)
+        for golfer in (self.golfer_a, self.golfer_b, self.golfer_c):
+            GameEntry.objects.create(game=game, golfer=golfer, week=self.week, winner=golfer != self.golfer_a)
+        record_game_payouts([self.week])
+
+        totals = {row['golfer__name']: row for row in payout_totals(Payout.objects.filter(week=self.week), 'golfer__name')}
+        self.assertEqual(totals['A']['skins_won'], 15.0)
+        self.assertEqual(totals['A']['games_won'], 0)
+        self.assertEqual(totals['B']['games_won'], 3.0)
+        self.assertEqual(totals['C']['skins_wagered'], 5)
+
+        # Games only count for seasons playing them
+        self.assertEqual(payout_totals(live_payouts(week=self.week))['games_wagered'], 0)
+        self.assertEqual(payout_totals(live_payouts(week=self.week))['skins_wagered'], 15)
+
+
+class _RecordingTask:
+    """Stands in for a Celery task, recording the runs it is asked for."""
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = []
+
+    def apply_async(self, args, countdown=None):
+        self.runs.append(args[0])
+
+
+@override_settings(TASK_COORDINATION_URL='memory://')
+class TaskCoordinationTests(TestCase):
+    def setUp(self):
+        from main import task_coordination
+        task_coordination._coordinators.clear()
+        self.process = _RecordingTask('test.process_week')
+        self.recalc = _RecordingTask('test.recalculate_all')
+
+    def test_repeated_requests_run_once_and_mid_run_changes_follow_up(self):
+        from main.task_coordination import request_task, season_run
+        # Four subs entered for week 1, one for week 2
+        self.assertEqual([request_task(self.process, 1) for _ in range(4)], [True, False, False, False])
+        request_task(self.process, 2)
+        self.assertEqual(self.process.runs, [1, 2])
+
+        with season_run(self.process, 1, season_id=1) as running:
+            self.assertTrue(running)
+            # Week 2 is still pending; week 1 changes again mid-run
+            self.assertFalse(request_task(self.process, 2))
+            self.assertTrue(request_task(self.process, 1))
+        self.assertEqual(self.process.runs, [1, 2, 1])
+
+    def test_locked_season_defers_runs_until_released(self):
+        from main.task_coordination import season_run
+        with season_run(self.recalc, 1, season_id=1) as running:
+            self.assertTrue(running)
+            with season_run(self.process, 7, season_id=1) as waiting:
+                self.assertFalse(waiting)
+            # Other seasons are not held up
+            with season_run(self.process, 8, season_id=2) as other:
+                self.assertTrue(other)
+            self.assertEqual(self.process.runs, [])
+        self.assertEqual(self.process.runs, [7])
+        self.assertEqual(self.recalc.runs, [])
+
+
+class SyntheticLeagueTests(TestCase):
+    def test_generated_league_is_fully_processed(self):
+        from main.synthetic import LeagueSpec, generate_league
+        spec = LeagueSpec(teams=4, seasons=2, weeks=4, played_fraction=0.5, sub_rate=0.3, no_sub_rate=0.1, rain_out_rate=0.2)
+        league = generate_league(spec, seed=1)
+
+        seasons = list(league.seasons.order_by('year'))
+        self.assertEqual([s.year for s in seasons], [timezone.now().year - 1, timezone.now().year])
+        self.assertEqual(Team.objects.filter(season=seasons[0]).count(), 4)
+        played = Week.objects.filter(season__league=league, scores_entered__gt=0)
+        self.assertEqual(played.count(), 4 + 2)
+        self.assertTrue(Sub.objects.filter(week__season__league=league).exists())
+        for week in played:
+            # Every slot of every matchup is played, by a member, a sub or a covering teammate
+            self.assertEqual(Round.objects.filter(week=week).count(), 8)
+            self.assertEqual(Score.objects.filter(week=week).count(), week.scores_entered)
+            self.assertTrue(week.scores_complete)
+        # The current season is part way through
+        self.assertEqual(get_next_week(seasons[1]).number, 3)
+        self.assertTrue(Payout.objects.filter(week__season=seasons[1]).exists())
+
+    def test_benchmark_command_reports_every_target(self):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('benchmark', scales=[1, 2], repeat=1, teams=2, seasons=1, weeks=3, stdout=out)
+
+        report = out.getvalue()
+        self.assertIn('1x: 2 teams', report)
+        self.assertIn('2x: 4 teams', report)
+        for target in ('process_week', 'generate_golfer_matchups', 'scorecards', 'historics'):
+            self.assertIn(target, report)
+        self.assertFalse(League.objects.exists())
+
+
+class QueryBudgetTests(TestCase):
+    """Every view, form post and core helper stays within the query budget declared on it (see ``main.query_budget``)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth.models import User
+        from main.synthetic import LeagueSpec, generate_league
+        spec = LeagueSpec(teams=4, seasons=2, weeks=6, played_fraction=0.5, sub_rate=0.2, no_sub_rate=0.05, rain_out_rate=0.1)
+        cls.league = generate_league(spec, seed=3)
+        cls.season = cls.league.seasons.order_by('-year').first()
+        cls.week = Week.objects.filter(season=cls.season, scores_entered__gt=0).order_by('-date').first()
+        cls.golfer = Team.objects.filter(season=cls.season).first().golfers.first()
+        cls.sub = Sub.objects.filter(week__season=cls.season, sub_golfer__isnull=False).first().sub_golfer
+        cls.game = Game.objects.filter(week=cls.week).first()
+        cls.user = User.objects.create_superuser('budget', 'budget@example.com', 'pw')
+
+    def setUp(self):
+        from django.core.cache import cache
+        self.client.force_login(self.user)
+        self.addCleanup(cache.clear)
+
+    def _kwargs(self, names):
+        values = {
+            'league_slug': self.league.slug, 'year': self.season.year, 'week': self.week.number,
+            'week_id': self.week.pk, 'golfer_id': self.golfer.pk, 'season_id': self.season.pk,
+            'matchup_id': Matchup.objects.filter(week=self.week).first().pk, 'game_id': self.game.pk,
+        }
+        return {name: values[name] for name in names}
+
+    def _view_requests(self):
+        """``(name, view, url)`` for every named route of ``main.urls``."""
+        from django.urls import URLPattern
+        from main.urls import urlpatterns
+        for pattern in urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                url = reverse(pattern.name, kwargs=self._kwargs(pattern.pattern.converters))
+                if pattern.name == 'get_week_matchups':
+                    url += f'?week_id={self.week.pk}'
+                elif pattern.name == 'sub_stats_with_league_year':
+                    url += f'?golfer_id={self.sub.pk}'
+                yield pattern.name, pattern.callback, url
+
+    def _run(self, name, budget, call):
+        from django.core.cache import cache
+        from main.query_budget import log_queries
+        # Budgets cover a cold page: nothing cached from an earlier request
+        cache.clear()
+        with log_queries() as log:
+            call()
+        log.check(budget, name)
+
+    def test_every_view_declares_a_budget(self):
+        from main.query_budget import budget_of
+        missing = sorted({view.__name__ for _, view, _ in self._view_requests() if budget_of(view) is None})
+        self.assertEqual(missing, [])
+
+    def test_views_stay_within_budget(self):
+        from main.query_budget import budget_of
+        for name, view, url in self._view_requests():
+            with self.subTest(name):
+                self._run(name, budget_of(view), lambda: self.assertLess(self.client.get(url).status_code, 400))
+
+    def test_posts_stay_within_budget(self):
+        from main.query_budget import budget_of
+        from main.views import add_scores, add_sub, enter_schedule
+        matchup = Matchup.objects.filter(week=self.week).prefetch_related('teams__golfers').first()
+        teams = list(matchup.teams.all())
+        holes = range(1, 10) if self.week.is_front else range(10, 19)
+        card = {'week_id': self.week.pk, 'matchup_id': matchup.pk}
+        for i, golfer in enumerate((golfer for team in teams for golfer in team.golfers.all()), start=1):
+            card.update({f'golfer{i}_name': golfer.name, f'golfer{i}_active': 'true'})
+            card.update({f'hole{number}_{i}': 5 for number in holes})
+        open_week = Week.objects.filter(season=self.season, rained_out=False, scores_entered=0).first()
+        # The sub form offers the league's golfers
+        self.sub.leagues.add(self.league)
+        posts = [
+            (add_scores, 'add_round_with_league_year', card),
+            (add_sub, 'add_sub_with_league_year', {'absent_golfer': self.golfer.pk, 'sub_golfer': self.sub.pk, 'week': open_week.pk}),
+            (enter_schedule, 'enter_schedule_with_league_year', {'week': self.week.pk, 'team1': teams[0].pk, 'team2': teams[1].pk}),
+        ]
+        for view, name, data in posts:
+            with self.subTest(name):
+                self.assertIsNotNone(budget_of(view, 'POST'))
+                url = reverse(name, kwargs=self._kwargs(['league_slug', 'year']))
+                self._run(name, budget_of(view, 'POST'), lambda: self.assertLess(self.client.post(url, data).status_code, 400))
+        self.assertEqual(Score.objects.filter(week=self.week, golfer__team=teams[0], score=5).count(), 2 * len(holes))
+        self.assertTrue(Sub.objects.filter(week=open_week, absent_golfer=self.golfer, sub_golfer=self.sub).exists())
+        self.assertTrue(Matchup.objects.filter(week=self.week, teams=teams[0]).filter(teams=teams[1]).exists())
+
+    def test_helpers_stay_within_budget(self):
+        from main.query_budget import budget_of
+        played_weeks = Week.objects.filter(season=self.season, score__isnull=False).distinct().count()
+        helpers = [
+            (calculate_and_save_handicaps_for_season, self.season),
+            (generate_golfer_matchups, self.week),
+            (generate_rounds, self.season),
+            (process_week, self.week),
+            (process_season, self.season),
+        ]
+        for helper, argument in helpers:
+            with self.subTest(helper.__name__):
+                self.assertIsNotNone(budget_of(helper))
+                self._run(helper.__name__, budget_of(helper).for_weeks(played_weeks), lambda: helper(argument))
+
+    def test_failure_shows_repeated_sql_and_origin(self):
+        from main.query_budget import QueryBudget, QueryBudgetExceeded, log_queries
+        with log_queries() as log:
+            for golfer in Golfer.objects.all()[:3]:
+                list(Score.objects.filter(golfer=golfer))
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            log.check(QueryBudget(queries=10), 'n_plus_one')
+
+        message = str(raised.exception)
+        self.assertIn('n_plus_one ran 4 queries (budget 10) with 2 duplicates (budget 0)', message)
+        self.assertIn('3x SELECT', message)
+        self.assertIn('main_score', message)
+        self.assertIn('main/tests.py:', message)
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        self.season = Season.objects.create(year=2024, league=_test_league(), course_config=_course_config())
+        self.url = reverse('league_stats_with_year', kwargs={'year': self.season.year})
+        self.addCleanup(cache.clear)
+
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_profiled(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    @override_settings(REQUEST_PROFILING=True)
+    def test_sampled_request_is_timed_logged_and_summarised(self):
+        import json
+        from django.contrib.auth.models import User
+        with self.assertLogs('main.profiling', level='INFO') as logs:
+            response = self.client.get(self.url)
+
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'sql;desc="SQL (', 'templates;desc="Templates";dur='):
+            self.assertIn(metric, timing)
+        sample = json.loads(logs.records[0].getMessage())
+        self.assertEqual(sample['view'], 'league_stats_with_year')
+        self.assertEqual(sample['status'], 200)
+        self.assertGreater(sample['sql_count'], 0)
+        self.assertGreater(sample['template_ms'], 0)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        with self.assertLogs('main.profiling', level='INFO'):
+            page = self.client.get(reverse('request_profiles'))
+        row = next(row for row in page.context['rows'] if row['view'] == 'league_stats_with_year')
+        self.assertEqual(row['requests'], 1)
+        self.assertEqual(row['sql_count_p95'], sample['sql_count'])
+        self.assertContains(page, 'league_stats_with_year')
+
+
+class _EagerTasksMixin:
+    """Runs Celery tasks in the test process, with no broker or Redis needed."""
+
+    def setUp(self):
+        super().setUp()
+        from cbg.celery import app
+        from main import task_coordination
+        eager = override_settings(CELERY_TASK_ALWAYS_EAGER=True, TASK_COORDINATION_URL='memory://')
+        eager.enable()
+        self.addCleanup(eager.disable)
+        # The Celery app read its settings at import, so it is told directly
+        was_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', was_eager)
+        task_coordination._coordinators.clear()
+        self.addCleanup(task_coordination._coordinators.clear)
+
+
+class TaskRunTests(_EagerTasksMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from main.synthetic import LeagueSpec, generate_league
+        cls.league = generate_league(LeagueSpec(teams=4, seasons=1, weeks=4, played_fraction=0.5), seed=2, process=False)
+        cls.season = cls.league.seasons.get()
+
+    def test_run_records_timing_queries_rows_and_progress(self):
+        from main.tasks import recalculate_all_async
+        recalculate_all_async(self.season.pk)
+
+        run = TaskRun.objects.get(task='main.tasks.recalculate_all_async')
+        self.assertEqual(run.status, 'success')
+        self.assertEqual(run.season, self.season)
+        self.assertEqual(run.args, {'season_id': self.season.pk})
+        self.assertIsNotNone(run.finished)
+        self.assertGreater(run.duration, 0)
+        self.assertGreater(run.queries, 0)
+        self.assertEqual(run.rows_written['main.Round'], Round.objects.filter(week__season=self.season).count())
+        self.assertEqual(run.rows_written['main.GolferMatchup'], GolferMatchup.objects.filter(week__season=self.season).count())
+        self.assertEqual(SeasonRecompute.objects.get(season=self.season).progress_percent, 100)
+        # Tasks it starts eagerly get runs of their own; with the locmem cache the steps run as one task
+        self.assertTrue(TaskRun.objects.filter(task='main.tasks.recompute_steps', season=self.season).exists())
+
+    def test_caught_error_is_recorded(self):
+        from main.tasks import process_week_async
+        process_week_async(0)
+
+        run = TaskRun.objects.get(task='main.tasks.process_week_async')
+        self.assertEqual(run.status, 'error')
+        self.assertIn('does not exist', run.result)
+
+    def test_generate_rounds_page_shows_recent_durations(self):
+        from django.contrib.auth.models import User
+        from main.tasks import recalculate_all_async
+        recalculate_all_async(self.season.pk)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+        page = self.client.get(reverse('generate_rounds_with_league_year', kwargs={'league_slug': self.league.slug, 'year': self.season.year}))
+        self.assertIn('recalculate_all_async', [row['task'] for row in page.context['task_runs']['durations']])
+        self.assertContains(page, 'Recent runs')
+
+        runs = self.client.get(reverse('get_task_runs', kwargs={'season_id': self.season.pk})).json()
+        self.assertEqual(runs['running'], [])
+        self.assertIn('recalculate_all_async', [run['task'] for run in runs['recent']])
+
+
+class SeasonRecomputeTests(_EagerTasksMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from main.synthetic import LeagueSpec, generate_league
+        cls.league = generate_league(LeagueSpec(teams=4, seasons=1, weeks=5, played_fraction=0.6, sub_rate=0.2), seed=4)
+        cls.season = cls.league.seasons.get()
+
+    def setUp(self):
+        super().setUp()
+        import tempfile
+        # Pages are only held with a cache the web processes share (see main.page_cache.cache_is_shared)
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        shared = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location.name,
+        }})
+        shared.enable()
+        self.addCleanup(shared.disable)
+
+    def _rounds(self):
+        return sorted(
+            Round.objects.filter(week__season=self.season)
+            .values_list('golfer_id', 'week_id', 'handicap__handicap', 'total_points')
+        )
+
+    def _clear(self):
+        Round.objects.filter(week__season=self.season).delete()
+        GolferMatchup.objects.filter(week__season=self.season).delete()
+        Handicap.objects.filter(week__season=self.season).delete()
+
+    def test_pipeline_rebuilds_what_full_processing_builds(self):
+        from main.tasks import recalculate_all_async
+        expected = self._rounds()
+        self._clear()
+
+        recalculate_all_async(self.season.pk)
+
+        recompute = SeasonRecompute.objects.get(season=self.season)
+        self.assertEqual(recompute.status, 'done')
+        self.assertEqual(recompute.progress_percent, 100)
+        self.assertEqual(recompute.steps[0], 'handicaps')
+        self.assertEqual(recompute.steps[-1], 'finish')
+        self.assertEqual(self._rounds(), expected)
+        self.assertIsNone(DataVersion.objects.get(season=self.season).held_version)
+
+    def test_each_step_checkpoints_as_it_runs(self):
+        from unittest import mock
+        from main.recompute import run_recompute_step, start_season_recompute
+        from main.task_coordination import claim_season
+        from main.tasks import recalculate_all_async
+        expected = self._rounds()
+        self._clear()
+
+        token = claim_season(recalculate_all_async, self.season.pk, self.season.pk)
+        # Plan the run without dispatching it, then run its steps here in order
+        with mock.patch('main.recompute.recompute_signature') as signature:
+            recompute = start_season_recompute(self.season, token)
+        signature.return_value.apply_async.assert_called_once_with()
+
+        for done, step in enumerate(recompute.steps, start=1):
+            self.assertTrue(run_recompute_step(recompute.pk, step))
+            recompute.refresh_from_db()
+            self.assertEqual(recompute.done_steps, recompute.steps[:done])
+            self.assertEqual(recompute.status, 'done' if step == 'finish' else 'running')
+        # A checkpointed step is skipped when it runs again
+        self.assertFalse(run_recompute_step(recompute.pk, 'handicaps'))
+        self.assertEqual(recompute.progress_percent, 100)
+        self.assertEqual(self._rounds(), expected)
+        self.assertIsNone(DataVersion.objects.get(season=self.season).held_version)
+
+    def test_failed_step_keeps_pages_pinned_until_resumed(self):
+        from unittest import mock
+        from main.page_cache import season_version
+        from main.recompute import resume_season_recompute
+        from main.tasks import recalculate_all_async
+        before = season_version(self.season)
+        expected = self._rounds()
+        self._clear()
+
+        with mock.patch('main.scoring.score_week', side_effect=RuntimeError('database went away')):
+            recalculate_all_async(self.season.pk)
+
+        recompute = SeasonRecompute.objects.get(season=self.season)
+        self.assertEqual(recompute.status, 'failed')
+        self.assertIn('database went away', recompute.error)
+        self.assertIn('handicaps', recompute.done_steps)
+        self.assertLess(recompute.progress_percent, 100)
+        # Readers still get the season as it was before the run
+        self.assertEqual(season_version(self.season), before)
+        self.assertTrue(TaskRun.objects.filter(task='main.tasks.recompute_stage', status='error').exists())
+        # The failed step stopped the chain: the steps after it were never dispatched
+        self.assertFalse(TaskRun.objects.filter(task='main.tasks.recompute_stage', args__step='finish').exists())
+
+        self.assertTrue(resume_season_recompute(recompute))
+
+        recompute.refresh_from_db()
+        self.assertEqual(recompute.status, 'done')
+        self.assertEqual(self._rounds(), expected)
+        self.assertNotEqual(season_version(self.season), before)
+
+    def test_per_process_cache_recomputes_in_one_transaction(self):
+        from unittest import mock
+        from main.recompute import resume_season_recompute
+        from main.tasks import recalculate_all_async
+        expected = self._rounds()
+        self._clear()
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with mock.patch('main.scoring.score_week', side_effect=RuntimeError('database went away')):
+                recalculate_all_async(self.season.pk)
+
+            recompute = SeasonRecompute.objects.get(season=self.season)
+            self.assertEqual(recompute.status, 'failed')
+            self.assertIn('database went away', recompute.error)
+            # The season was never held, and nothing the failed run wrote was kept
+            self.assertFalse(DataVersion.objects.filter(season=self.season, held_version__isnull=False).exists())
+            self.assertEqual(recompute.done_steps, [])
+            self.assertFalse(Handicap.objects.filter(week__season=self.season).exists())
+
+            self.assertTrue(resume_season_recompute(recompute))
+
+        recompute.refresh_from_db()
+        self.assertEqual(recompute.status, 'done')
+        self.assertEqual(recompute.progress_percent, 100)
+        self.assertEqual(self._rounds(), expected)
+
+    def test_abandoning_from_the_page_publishes_the_season(self):
+        from unittest import mock
+        from django.contrib.auth.models import User
+        from main.page_cache import season_version
+        from main.tasks import recalculate_all_async
+        before = season_version(self.season)
+        with mock.patch('main.scoring.score_week', side_effect=RuntimeError('database went away')):
+            recalculate_all_async(self.season.pk)
+        recompute = SeasonRecompute.objects.get(season=self.season)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        url = reverse('generate_rounds_with_league_year', kwargs={'league_slug': self.league.slug, 'year': self.season.year})
+
+        self.assertContains(self.client.get(url), 'Abandon and publish')
+        self.assertEqual(self.client.get(reverse('get_task_runs', kwargs={'season_id': self.season.pk})).json()['recompute']['status'], 'failed')
+        self.client.post(url, {'recompute_id': recompute.pk, 'abandon_recompute': '1'})
+
+        recompute.refresh_from_db()
+        self.assertEqual(recompute.status, 'abandoned')
+        self.assertNotEqual(season_version(self.season), before)
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from main.synthetic import LeagueSpec, generate_league
+        cls.league = generate_league(LeagueSpec(teams=4, seasons=1, weeks=6), seed=2)
+        cls.rounds = Round.objects.filter(week__season__league=cls.league).order_by('week__date', 'pk')
+
+    def test_ranks_share_places_and_keep_every_tie(self):
+        from main.leaderboards import rank_with_ties
+        rows = [{'name': name, 'score': score} for name, score in [('a', 40), ('b', 38), ('c', 40), ('d', 41), ('e', 42)]]
+
+        ranked = [(rank, row['name']) for rank, row in rank_with_ties(rows, 'score', 2)]
+        self.assertEqual(ranked, [(1, 'b'), (2, 'a'), (2, 'c')])
+        dense = [(rank, row['name']) for rank, row in rank_with_ties(rows, 'score', 3, dense=True)]
+        self.assertEqual(dense, [(1, 'b'), (2, 'a'), (2, 'c'), (3, 'd')])
+        worst = [(rank, row['name']) for rank, row in rank_with_ties(rows, 'score', 3, reverse=True)]
+        self.assertEqual(worst, [(1, 'e'), (2, 'd'), (3, 'a'), (3, 'c')])
+
+    def test_window_query_matches_the_python_ranking(self):
+        from unittest import mock
+        from django.db import connection
+        from main.leaderboards import rank_with_ties, top_n_with_ties
+        for field, reverse, dense in [('gross', False, False), ('net', True, False), ('gross', True, True)]:
+            expected = [(rank, r.pk) for rank, r in rank_with_ties(self.rounds, lambda r: getattr(r, field), 5, reverse, dense)]
+            with self.assertNumQueries(1):
+                ranked = [(rank, r.pk) for rank, r in top_n_with_ties(self.rounds, field, 5, reverse, dense)]
+            self.assertEqual(ranked, expected)
+            self.assertGreaterEqual(len(ranked), 5)
+            with mock.patch.object(connection.features, 'supports_over_clause', False):
+                self.assertEqual([(rank, r.pk) for rank, r in top_n_with_ties(self.rounds, field, 5, reverse, dense)], expected)
+
+        played = self.rounds.values('golfer__name').annotate(played=Count('id')).order_by('golfer__name')
+        ranked = top_n_with_ties(played, 'played', 3, reverse=True)
+        self.assertEqual([rank for rank, _ in ranked], [rank for rank, _ in rank_with_ties(played, 'played', 3, reverse=True)])
+        self.assertNotIn('leaderboard_rank', ranked[0][1])
@@ -1,6 +1,6 @@
 from django.urls import path, register_converter, include
 from . import views
-from .api import get_matchup_data, get_playing_golfers, get_games_for_week, get_games_by_week, get_game_entries, get_week_matchups
+from .api import get_matchup_data, get_playing_golfers, get_games_for_week, get_games_by_week, get_game_entries, get_week_matchups, get_task_runs
 
 # Custom path converter for 4-digit years
 class YearConverter:
@@ -55,6 +55,7 @@ urlpatterns = [
     path('create_team', views.create_team, name='create_team'),
     path('set_holes', views.set_holes, name='set_holes'),
     path('courses/', views.manage_courses, name='manage_courses'),
+    path('profiling/', views.request_profiles, name='request_profiles'),
     path('generate_rounds', views.generate_rounds_page, name='generate_rounds'),
     path('manage_skins', views.manage_skins, name='manage_skins'),
     path('manage_games', views.manage_games, name='manage_games'),
@@ -64,6 +65,7 @@ urlpatterns = [
     path('api/get_games_by_week/<int:week_id>/', get_games_by_week, name='get_games_by_week'),
     path('api/get_game_entries/<int:week_id>/<int:game_id>/', get_game_entries, name='get_game_entries'),
     path('api/get_week_matchups/', get_week_matchups, name='get_week_matchups'),
+    path('api/get_task_runs/<int:season_id>/', get_task_runs, name='get_task_runs'),
     
     # New URL patterns with year parameter (4-digit years only) - must come before week patterns
     path('<year:year>/<int:week>/', views.scorecards, name='scorecards_with_year'),
@@ -15,12 +15,29 @@ from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.core.exceptions import PermissionDenied
 from django.utils.dateparse import parse_date
-from datetime import timedelta
+from datetime import date, timedelta
 from main.permissions import league_manager_required
 from main.league_scope import resolve_league, get_default_league
 from main.url_helpers import redirect_home, redirect_sub_stats_detail
 from main.tasks import calculate_handicaps_async, generate_rounds_async, generate_matchups_async, recalculate_all_async, process_week_async, set_skin_winners_async
-from main.skins import calculate_skin_winners
+from main.skins import SeasonSkins, mark_skin_winners, stored_skin_winners
+from main.payouts import live_payouts, payout_totals, record_game_payouts
+from main.score_entry import ScoreCardError, rows_from_post, save_score_card
+from main.leaderboards import rank_with_ties, top_n_with_ties
+from main.distribution import SCORING_BUCKETS, bucket_counts, golfer_distribution, hole_distribution, hole_scores
+from main.scorecards import WeekScorecards
+from main.page_cache import cached_context, league_version, page_cache_timeout, page_warmer, season_version
+from main.task_coordination import request_task
+from main.task_runs import season_task_runs
+from main.recompute import abandon_season_recompute, resume_season_recompute
+from main.query_budget import query_budget
+from main.profiling import clear_profiles, profile_window, profiling_enabled, sample_rate, view_summaries
+from main.golfer_stats import (
+    ScoreHistory, SeasonRounds, build_charts, consistency_stats, league_birdies_and_eagles,
+    next_week_handicap, opponent_vs_handicap, season_hole_stats, season_summary, sub_history,
+    theoretical_rounds, wager_summary, weekly_summary, yearly_gross_stats, yearly_hole_stats,
+    yearly_hole_table,
+)
 
 HoleFormSet = formset_factory(form=HoleForm, min_num=18, max_num=18, validate_min=True)
 
@@ -70,191 +87,109 @@ def _league_chooser_rows():
     return rows
 
 
+def _standings_handicaps(season, teams):
+    """
+    Handicaps shown next to each golfer in the standings tables, from a single query.
+    Returns {golfer_id: (first_half_hcp, second_half_hcp)}: the week 9 handicap (or the
+    latest available) for the first half and the latest week 10+ handicap for the second.
+    """
+    golfer_ids = [g.id for team in teams for g in team.golfers.all()]
+    by_golfer = {}
+    for golfer_id, number, value in (
+        Handicap.objects.filter(golfer__in=golfer_ids, week__season=season)
+        .values_list('golfer_id', 'week__number', 'handicap')
+    ):
+        by_golfer.setdefault(golfer_id, []).append((number, value))
+
+    handicaps = {}
+    for golfer_id, rows in by_golfer.items():
+        rows.sort()
+        week9 = [value for number, value in rows if number == 9]
+        first = week9[0] if week9 else rows[-1][1]
+        second_rows = [value for number, value in rows if number >= 10]
+        handicaps[golfer_id] = (first, second_rows[-1] if second_rows else None)
+    return handicaps
+
+
 def get_first_half_standings(season):
     """
-    Calculate first half standings (weeks 1-9) using Round models.
+    First half standings (weeks 1-9) from the materialized TeamStanding table.
     Returns a list of dictionaries with team standings data.
     """
-    # Get all teams for the season
-    teams = Team.objects.filter(season=season)
-    
-    # Get all rounds for weeks 1-9 (first half)
-    first_half_rounds = Round.objects.filter(
-        week__season=season,
-        week__number__lte=9,
-        week__rained_out=False
-    ).select_related('golfer', 'week', 'subbing_for')
-    
-    # Initialize standings dictionary
-    team_standings = {}
-    
-    # Process each team
+    from main.standings import get_team_points
+
+    teams = list(Team.objects.filter(season=season).prefetch_related('golfers'))
+    first_points, _, _ = get_team_points(season)
+    handicaps = _standings_handicaps(season, teams)
+
+    standings_list = []
     for team in teams:
-        team_golfers = team.golfers.all()
-        team_total_points = 0
-        golfer_points = {}
-        
-        # Calculate points for each golfer in the team
-        for golfer in team_golfers:
-            golfer_total = 0
-            
-            # 1. Rounds where golfer played for their own team (not as a sub)
-            own_rounds = first_half_rounds.filter(golfer=golfer, subbing_for__isnull=True)
-            own_points = own_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            golfer_total += own_points
-            
-            # 2. Rounds where someone subbed for this golfer (points go to this golfer's team)
-            sub_rounds = first_half_rounds.filter(subbing_for=golfer)
-            sub_points = sub_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            golfer_total += sub_points
-            
-            golfer_points[golfer.name] = golfer_total
-            team_total_points += golfer_total
-        
-        # Get current handicaps for the golfers (use week 9 handicap, or latest if week 9 hasn't been played)
-        golfer1 = team_golfers[0]
-        golfer2 = team_golfers[1]
-        
-        # Try to get week 9 handicap first, fall back to latest available
-        golfer1_hcp = Handicap.objects.filter(
-            golfer=golfer1, 
-            week__season=season,
-            week__number=9
-        ).first()
-        
-        if not golfer1_hcp:
-            # If week 9 handicap doesn't exist, get the latest available
-            golfer1_hcp = Handicap.objects.filter(
-                golfer=golfer1, 
-                week__season=season
-            ).order_by('-week__number').first()
-        
-        golfer2_hcp = Handicap.objects.filter(
-            golfer=golfer2, 
-            week__season=season,
-            week__number=9
-        ).first()
-        
-        if not golfer2_hcp:
-            # If week 9 handicap doesn't exist, get the latest available
-            golfer2_hcp = Handicap.objects.filter(
-                golfer=golfer2, 
-                week__season=season
-            ).order_by('-week__number').first()
-        
-        # Create team standings entry
-        team_standings[team.id] = {
+        golfer1, golfer2 = team.golfers.all()[:2]
+        standings_list.append({
             'golfer1': golfer1.name,
             'golfer2': golfer2.name,
-            'first': team_total_points,
-            'golfer1FirstHcp': golfer1_hcp.handicap if golfer1_hcp else 0,
-            'golfer2FirstHcp': golfer2_hcp.handicap if golfer2_hcp else 0,
-        }
-    
-    # Convert to list and sort by total points (descending)
-    standings_list = list(team_standings.values())
+            'first': first_points.get(team.id, 0),
+            'golfer1FirstHcp': handicaps.get(golfer1.id, (0, None))[0],
+            'golfer2FirstHcp': handicaps.get(golfer2.id, (0, None))[0],
+        })
+
     standings_list.sort(key=lambda x: x['first'], reverse=True)
-    
     return standings_list
 
 
 def get_second_half_standings(season):
     """
-    Calculate second half standings (weeks 10-18) using Round models.
+    Second half standings (weeks 10-18) from the materialized TeamStanding table.
     Returns a list of dictionaries with team standings data.
     """
-    teams = Team.objects.filter(season=season)
-    second_half_rounds = Round.objects.filter(
-        week__season=season,
-        week__number__gte=10,
-        week__rained_out=False
-    ).select_related('golfer', 'week', 'subbing_for')
-    team_standings = {}
+    from main.standings import get_team_points
+
+    teams = list(Team.objects.filter(season=season).prefetch_related('golfers'))
+    _, second_points, _ = get_team_points(season)
+    handicaps = _standings_handicaps(season, teams)
+
+    standings_list = []
     for team in teams:
-        team_golfers = team.golfers.all()
-        team_total_points = 0
-        for golfer in team_golfers:
-            golfer_total = 0
-            own_rounds = second_half_rounds.filter(golfer=golfer, subbing_for__isnull=True)
-            own_points = own_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            golfer_total += own_points
-            sub_rounds = second_half_rounds.filter(subbing_for=golfer)
-            sub_points = sub_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            golfer_total += sub_points
-            team_total_points += golfer_total
-        golfer1 = team_golfers[0]
-        golfer2 = team_golfers[1]
-        golfer1_hcp = Handicap.objects.filter(golfer=golfer1, week__season=season, week__number__gte=10).order_by('-week__number').first()
-        golfer2_hcp = Handicap.objects.filter(golfer=golfer2, week__season=season, week__number__gte=10).order_by('-week__number').first()
-        team_standings[team.id] = {
+        golfer1, golfer2 = team.golfers.all()[:2]
+        standings_list.append({
             'golfer1': golfer1.name,
             'golfer2': golfer2.name,
-            'second': team_total_points,
-            'golfer1SecondHcp': golfer1_hcp.handicap if golfer1_hcp else 0,
-            'golfer2SecondHcp': golfer2_hcp.handicap if golfer2_hcp else 0,
-        }
-    standings_list = list(team_standings.values())
+            'second': second_points.get(team.id, 0),
+            'golfer1SecondHcp': handicaps.get(golfer1.id, (0, None))[1] or 0,
+            'golfer2SecondHcp': handicaps.get(golfer2.id, (0, None))[1] or 0,
+        })
     standings_list.sort(key=lambda x: x['second'], reverse=True)
     return standings_list
 
 
 def get_full_standings(season):
     """
-    Calculate full season standings using the sum of first and second half points for each team.
+    Full season standings using the sum of first and second half points for each team.
     Returns a list of dictionaries with team standings data.
     """
-    teams = Team.objects.filter(season=season)
-    # Get first and second half points for each team
-    first_half_points = {}
-    second_half_points = {}
-    # First half
-    first_half_rounds = Round.objects.filter(
-        week__season=season,
-        week__number__lte=9,
-        week__rained_out=False
-    ).select_related('golfer', 'week', 'subbing_for')
-    # Second half
-    second_half_rounds = Round.objects.filter(
-        week__season=season,
-        week__number__gte=10,
-        week__rained_out=False
-    ).select_related('golfer', 'week', 'subbing_for')
-    for team in teams:
-        team_golfers = team.golfers.all()
-        # First half
-        team_first = 0
-        for golfer in team_golfers:
-            own_rounds = first_half_rounds.filter(golfer=golfer, subbing_for__isnull=True)
-            own_points = own_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            sub_rounds = first_half_rounds.filter(subbing_for=golfer)
-            sub_points = sub_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            team_first += own_points + sub_points
-        first_half_points[team.id] = team_first
-        # Second half
-        team_second = 0
-        for golfer in team_golfers:
-            own_rounds = second_half_rounds.filter(golfer=golfer, subbing_for__isnull=True)
-            own_points = own_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            sub_rounds = second_half_rounds.filter(subbing_for=golfer)
-            sub_points = sub_rounds.aggregate(total=Sum('total_points'))['total'] or 0
-            team_second += own_points + sub_points
-        second_half_points[team.id] = team_second
-    # Build standings using the sum of first and second half points
+    from main.standings import get_team_points
+
+    teams = Team.objects.filter(season=season).prefetch_related('golfers')
+    first_points, second_points, _ = get_team_points(season)
+
     standings = []
     for team in teams:
-        team_id = team.id
-        total = first_half_points[team_id] + second_half_points[team_id]
+        golfers = team.golfers.all()
+        first = first_points.get(team.id, 0)
+        second = second_points.get(team.id, 0)
         standings.append({
-            'golfer1': team.golfers.all()[0].name,
-            'golfer2': team.golfers.all()[1].name,
-            'total': total,
-            'first': first_half_points[team_id],
-            'second': second_half_points[team_id],
+            'golfer1': golfers[0].name,
+            'golfer2': golfers[1].name,
+            'total': first + second,
+            'first': first,
+            'second': second,
         })
     standings.sort(key=lambda x: x['total'], reverse=True)
     return standings
 
 
+# Repeats: the form and the view each check the league exists
+@query_budget(10, duplicates=1)
 @league_manager_required
 def create_season(request, league_slug=None, year=None):
     # Set up season related information and create a new season
@@ -304,6 +239,7 @@ def create_season(request, league_slug=None, year=None):
     return render(request, 'create_season.html', {'form': form})
 
 
+@query_budget(8)
 @login_required
 def edit_season(request, league_slug=None, year=None, season_id=None):
     """Update course layout and gameplay settings for an existing season."""
@@ -343,6 +279,7 @@ def edit_season(request, league_slug=None, year=None, season_id=None):
     )
 
 
+@query_budget(2)
 @user_passes_test(lambda u: u.is_superuser)
 def add_league(request):
     """Create a league (superuser only). POST from the multi-league chooser page."""
@@ -363,6 +300,8 @@ def add_league(request):
     )
 
 
+# Repeats: the data version (page and league), the week's game (both weeks shown) and the golfer list
+@query_budget(27, duplicates=3)
 def main(request, year=None, league_slug=None):
     if year is None and league_slug is None and League.objects.exists():
         if (
@@ -398,9 +337,32 @@ def main(request, year=None, league_slug=None):
             {'initialized': False, 'year': year, 'league': league},
         )
 
+    # Use timezone-naive date for consistent calculations
+    context = _main_page_context(league, season, year, date.today())
+    return render(request, 'main.html', context)
+
+
+def _main_page_context(league, season, year, today):
+    # The page also depends on the date: which weeks are last/next and the forecast Tuesday
     last_week = get_last_week(season)
     next_week = get_next_week(season)
-    
+    return cached_context(
+        'main', league_version(league), lambda: _main_context(league, season, year, last_week, next_week, today),
+        season.pk, year, last_week.pk if last_week else None, next_week.pk if next_week else None, today,
+    )
+
+
+@page_warmer
+def _warm_main(season):
+    today = date.today()
+    _main_page_context(season.league, season, season.year, today)
+    if get_current_season(league=season.league) == season:
+        # Year-less URLs show the current season
+        _main_page_context(season.league, season, None, today)
+
+
+def _main_context(league, season, year, last_week, next_week, today):
+    """Home page context for ``season``: schedule, results, standings and playoff picture."""
     initialized = True
     
     if next_week:
@@ -419,12 +381,14 @@ def main(request, year=None, league_slug=None):
         # check if season is in the second half
         is_second_half = last_week.number > 8
         
+        # Pots for last week from the payout ledger
+        pots = payout_totals(Payout.objects.filter(week=last_week))
+
         # Get skins winners for last week (only if enabled)
         if getattr(season, 'playing_skins', False):
-            skin_winners = calculate_skin_winners(last_week)
+            skin_winners = stored_skin_winners(pk=last_week.pk).get(last_week.id)
             if skin_winners:
-                skins_entries = SkinEntry.objects.filter(week=last_week)
-                total_skins_pot = skins_entries.count() * (last_week.season.skins_entry_fee)
+                total_skins_pot = pots['skins_wagered']
                 skin_winner_payout = total_skins_pot / len(skin_winners) if len(skin_winners) > 0 else 0
                 
                 # Group skin winners by golfer for template display
@@ -453,11 +417,10 @@ def main(request, year=None, league_slug=None):
         
         # Get game winners for last week (only if enabled)
         if getattr(season, 'playing_games', False):
-            game_winners = GameEntry.objects.filter(week=last_week, winner=True).select_related('golfer', 'game')
-            if game_winners.exists():
-                game_entries = GameEntry.objects.filter(week=last_week)
-                total_game_pot = game_entries.count() * (last_week.season.game_entry_fee)
-                game_winner_payout = total_game_pot / game_winners.count() if game_winners.count() > 0 else 0
+            game_winners = list(GameEntry.objects.filter(week=last_week, winner=True).select_related('golfer', 'game'))
+            if game_winners:
+                total_game_pot = pots['games_wagered']
+                game_winner_payout = total_game_pot / len(game_winners)
             else:
                 game_winners = None
                 game_winner_payout = 0
@@ -501,8 +464,6 @@ def main(request, year=None, league_slug=None):
         playoff_seeds = compute_playoff_seeds(season)
     
     # Calculate the next Tuesday for weather forecast (use today if it's Tuesday)
-    from datetime import timedelta, date
-    today = date.today()  # Use timezone-naive date for consistent calculations
     days_ahead = 1 - today.weekday()  # Tuesday is weekday 1
     # If today is Tuesday, use today; otherwise roll forward to the next Tuesday
     if days_ahead < 0:
@@ -543,10 +504,13 @@ def main(request, year=None, league_slug=None):
         'season_options': season_options,
         'current_season': actual_current_season,
     }
-    
-    return render(request, 'main.html', context)
+
+    return context
 
 
+# Repeats: the golfer matchup auto-heal reloads the week's matchups and team golfers
+@query_budget(27, duplicates=4)
+@query_budget(19, method='POST')
 @league_manager_required
 def add_scores(request, league_slug=None, year=None):
     season, league = _management_season(league_slug, year)
@@ -569,46 +533,11 @@ def add_scores(request, league_slug=None, year=None):
 
         hole_numbers = range(1, 10) if week.is_front else range(10, 19)
 
-        # Get all active golfer rows (those that aren't grayed out)
-        active_golfers = []
-        for i in range(1, 11):  # Support up to 10 potential rows
-            golfer_name = request.POST.get(f'golfer{i}_name')
-            is_active = request.POST.get(f'golfer{i}_active') == 'true'
-            
-            if golfer_name and is_active:
-                try:
-                    golfer = Golfer.objects.get(name=golfer_name)
-                    active_golfers.append((i, golfer))
-                except Golfer.DoesNotExist:
-                    return HttpResponseBadRequest(f"Golfer {golfer_name} not found.")
-
-        # Process scores for each active golfer
-        for row_num, golfer in active_golfers:
-            for hole_number in hole_numbers:
-                field_name = f'hole{hole_number}_{row_num}'
-                score_value = request.POST.get(field_name)
-
-                if not score_value:
-                    return HttpResponseBadRequest(f"Missing score for {golfer.name} on hole {hole_number}.")
-
-                try:
-                    score_value = int(score_value)
-                    if not (1 <= score_value <= 10):
-                        return HttpResponseBadRequest(f"Score for {golfer.name} on hole {hole_number} must be between 1 and 10.")
-                except ValueError:
-                    return HttpResponseBadRequest(f"Score for {golfer.name} on hole {hole_number} must be a number.")
-
-                hole = Hole.objects.get(
-                    number=hole_number,
-                    config=week.season.course_config,
-                )
-
-                Score.objects.update_or_create(
-                    golfer=golfer,
-                    week=week,
-                    hole=hole,
-                    defaults={'score': score_value}
-                )
+        # Validate the whole card, then write it in one transaction
+        try:
+            save_score_card(week, rows_from_post(request.POST, hole_numbers))
+        except ScoreCardError as e:
+            return HttpResponseBadRequest(str(e))
 
         return _management_redirect('add_round', league, season.year)
 
@@ -628,7 +557,7 @@ def add_scores(request, league_slug=None, year=None):
         except Exception:
             # Fail silently to avoid blocking the page; admins can regenerate from tools
             pass
-        matchups = Matchup.objects.filter(week=week)
+        matchups = Matchup.objects.filter(week=week).prefetch_related('teams__golfers')
         front = week.is_front
 
         holes = list(Hole.objects.filter(
@@ -647,6 +576,7 @@ def add_scores(request, league_slug=None, year=None):
         })
 
 
+@query_budget(6)
 @league_manager_required
 def add_golfer(request, league_slug=None, year=None):
     season, league = _management_season(league_slug, year)
@@ -674,6 +604,10 @@ def add_golfer(request, league_slug=None, year=None):
     return render(request, 'add_golfer.html', {'form': form})
 
 
+# Repeats: the form and the view each list the team golfers, and after a post
+# the blank form looks up the next week again
+@query_budget(10, duplicates=1)
+@query_budget(16, duplicates=2, method='POST')
 @league_manager_required
 def add_sub(request, league_slug=None, year=None):
     season, league = _management_season(league_slug, year)
@@ -682,7 +616,7 @@ def add_sub(request, league_slug=None, year=None):
     current_season = season
     absent_golfers = Golfer.objects.filter(team__season=current_season)
     sub_golfers = Golfer.objects.filter(leagues=league)
-    weeks = Week.objects.filter(season=current_season, rained_out=False).order_by('-date')
+    weeks = Week.objects.filter(season=current_season, rained_out=False).select_related('season__league').order_by('-date')
 
     if request.method == 'POST':
         form = SubForm(absent_golfers, sub_golfers, weeks, request.POST, season=season)
@@ -696,8 +630,9 @@ def add_sub(request, league_slug=None, year=None):
             week_id = form.cleaned_data['week']
             no_sub = form.cleaned_data['no_sub']
             
-            # Get the golfer and week objects
-            absent_golfer = Golfer.objects.get(id=absent_golfer_id)
+            # Get the golfer and week objects, both golfers in one query
+            golfers = Golfer.objects.in_bulk([absent_golfer_id] + ([sub_golfer_id] if sub_golfer_id else []))
+            absent_golfer = golfers[int(absent_golfer_id)]
             week = Week.objects.get(id=week_id)
             
             # Print info for debugging
@@ -715,7 +650,7 @@ def add_sub(request, league_slug=None, year=None):
                 )
                 print(f'Sub Golfer: None')
             else:
-                sub_golfer = Golfer.objects.get(id=sub_golfer_id)
+                sub_golfer = golfers[int(sub_golfer_id)]
                 # Create the sub object
                 sub = Sub(
                     absent_golfer=absent_golfer,
@@ -742,13 +677,16 @@ def add_sub(request, league_slug=None, year=None):
     return render(request, 'add_sub.html', {'form': form})
 
 
+# Repeats: after a post the blank form looks up the earliest week without full matchups again
+@query_budget(11)
+@query_budget(21, duplicates=2, method='POST')
 @league_manager_required
 def enter_schedule(request, league_slug=None, year=None):
     _schedule_season, league = _management_season(league_slug, year)
     if not _schedule_season:
         return redirect_home(league, year)
-    weeks = Week.objects.filter(season=_schedule_season, rained_out=False).order_by('-date')
-    teams = Team.objects.filter(season=_schedule_season)
+    weeks = Week.objects.filter(season=_schedule_season, rained_out=False).select_related('season__league').order_by('-date')
+    teams = Team.objects.filter(season=_schedule_season).select_related('season__league').prefetch_related('golfers')
     message = None
     message_type = None
 
@@ -762,10 +700,11 @@ def enter_schedule(request, league_slug=None, year=None):
             team1_id = form.cleaned_data['team1']
             team2_id = form.cleaned_data['team2']
             
-            # Get the week and team objects
-            week = Week.objects.get(id=week_id)
-            team1 = Team.objects.get(id=team1_id)
-            team2 = Team.objects.get(id=team2_id)
+            # The form already loaded the season's weeks and teams
+            week = next(w for w in weeks if w.id == int(week_id))
+            teams_by_id = {t.id: t for t in teams}
+            team1 = teams_by_id[int(team1_id)]
+            team2 = teams_by_id[int(team2_id)]
             
             # Remove any existing matchup for either team in this week
             existing_matchups = Matchup.objects.filter(week=week, teams__in=[team1, team2]).distinct()
@@ -776,8 +715,7 @@ def enter_schedule(request, league_slug=None, year=None):
                 week=week
             )
             matchup.save()
-            matchup.teams.add(team1)
-            matchup.teams.add(team2)
+            matchup.teams.add(team1, team2)
             
             # Print info for debugging
             print(f'Week: {week}')
@@ -811,10 +749,8 @@ def enter_schedule(request, league_slug=None, year=None):
     return render(request, 'enter_schedule.html', {'form': form, 'message': message, 'message_type': message_type})
 
 
+@query_budget(31)
 def golfer_stats(request, golfer_id, year=None, league_slug=None):
-    import json
-    from django.db.models import Avg, Count, Q, Min, Max
-    
     league = resolve_league(league_slug)
     # Get the golfer object
     golfer = Golfer.objects.get(id=golfer_id)
@@ -830,183 +766,279 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
     if not season:
         return redirect_home(league, year)
     
+    context = _golfer_stats_page_context(golfer, league, season)
+    return render(request, 'golfer_stats.html', context)
+
+
+def _golfer_stats_page_context(golfer, league, season):
+    # The golfer's history spans the league; the next week's handicap depends on the date
+    next_week = get_next_week(season)
+    return cached_context(
+        'golfer_stats', league_version(league), lambda: _golfer_stats_context(golfer, league, season),
+        golfer.pk, season.pk, next_week.pk if next_week else None,
+    )
+
+
+@page_warmer
+def _warm_golfer_stats(season):
+    for golfer in Golfer.objects.filter(score__week__season=season).distinct():
+        _golfer_stats_page_context(golfer, season.league, season)
+
+
+def _golfer_stats_context(golfer, league, season):
+    """Golfer stats page context for ``golfer`` in ``season`` of ``league``."""
     # Get all weeks for the season
-    weeks = Week.objects.filter(season=season, rained_out=False).order_by('number')
+    weeks = list(Week.objects.filter(season=season, rained_out=False).order_by('number'))
     
-    # Get best and worst gross scores per year for all years the golfer has played
-    yearly_gross_stats = []
+    # The golfer's whole league history is loaded once and grouped in memory
+    history = ScoreHistory(golfer, league)
+    yearly_gross = yearly_gross_stats(history)
+    yearly_holes, hole_trends = yearly_hole_stats(history)
+    hole_stats, scoring_breakdown, hole_extremes = season_hole_stats(history, season.pk)
     
-    # Get all unique seasons where this golfer has scores (within this league)
-    golfer_seasons = Score.objects.filter(
-        golfer=golfer,
-        week__season__league=league,
-    ).values_list('week__season__year', flat=True).distinct().order_by('week__season__year')
+    # Week-by-week results for the season
+    season_rounds = SeasonRounds(golfer, season, weeks)
+    weekly = weekly_summary(season_rounds)
+    handicap_data = weekly['handicap_data']
+    next_week, next_week_hcp_value = next_week_handicap(golfer, season, handicap_data)
+    summary = season_summary(weekly, next_week_hcp_value)
     
-    for cal_year in golfer_seasons:
-        # Get all scores for this golfer in this year
-        year_scores = Score.objects.filter(
-            golfer=golfer,
-            week__season__year=cal_year,
-            week__season__league=league,
-        ).select_related('week', 'hole')
+    subs_as_sub, subs_for_absent = sub_history(golfer, season)
+    
+    # Find best and worst holes (by average vs par)
+    played_holes = {num: stats for num, stats in hole_stats.items() if stats['rounds_played'] > 0}
+    if played_holes:
+        best_hole = min(played_holes.items(), key=lambda x: x[1]['avg_vs_par'])
+        worst_hole = max(played_holes.items(), key=lambda x: x[1]['avg_vs_par'])
+    else:
+        best_hole = worst_hole = None
+    
+    opponent_stats = opponent_vs_handicap(season_rounds)
+    wager_stats, actual_skins, actual_games, hypothetical_skins = wager_summary(golfer, season, weeks)
+    total_birdies, total_eagles = league_birdies_and_eagles()
+    
+    context = {
+        'golfer': golfer,
+        'season': season,
+        'charts': build_charts(weekly, next_week, next_week_hcp_value, hole_stats, yearly_holes),
+        'weekly_stats': weekly['weekly_stats'],
+        'performance_vs_opponent': weekly['performance_vs_opponent'],
         
-        # Group scores by week to calculate gross scores per round
-        weekly_gross_scores = {}
-        for score in year_scores:
-            week_key = score.week.id
-            if week_key not in weekly_gross_scores:
-                weekly_gross_scores[week_key] = {
-                    'week': score.week,
-                    'scores': []
-                }
-            weekly_gross_scores[week_key]['scores'].append(score.score)
+        # Season averages
+        'avg_gross': round(summary['avg_gross'], 1),
+        'avg_net': round(summary['avg_net'], 1),
+        'avg_points': round(summary['avg_points'], 1),
+        'total_points': round(summary['total_points'], 1),
         
-        # Calculate gross scores for each week
-        gross_scores_for_year = []
-        for week_data in weekly_gross_scores.values():
-            if len(week_data['scores']) >= 9:  # Only count rounds with at least 9 holes
-                gross_score = sum(week_data['scores'])
-                gross_scores_for_year.append({
-                    'week': week_data['week'],
-                    'gross_score': gross_score
-                })
+        # Best/Worst weeks
+        'best_gross_week': summary['best_gross_week'],
+        'worst_gross_week': summary['worst_gross_week'],
+        'best_net_week': summary['best_net_week'],
+        'worst_net_week': summary['worst_net_week'],
+        'best_points_week': summary['best_points_week'],
+        'worst_points_week': summary['worst_points_week'],
         
-        if gross_scores_for_year:
-            best_gross = min(gross_scores_for_year, key=lambda x: x['gross_score'])
-            worst_gross = max(gross_scores_for_year, key=lambda x: x['gross_score'])
-            
-            yearly_gross_stats.append({
-                'year': cal_year,
-                'best_gross': best_gross,
-                'worst_gross': worst_gross,
-                'total_rounds': len(gross_scores_for_year),
-                'avg_gross': sum(round_data['gross_score'] for round_data in gross_scores_for_year) / len(gross_scores_for_year)
-            })
-    
-    # Calculate yearly hole-by-hole statistics
-    yearly_hole_stats = {}
-    hole_trends = {}
-    
-    for cal_year in golfer_seasons:
-        # Get all scores for this golfer in this year
-        year_scores = Score.objects.filter(
-            golfer=golfer,
-            week__season__year=cal_year,
-            week__season__league=league,
-        ).select_related('week', 'hole')
+        # Match play stats
+        'wins': summary['wins'],
+        'losses': summary['losses'],
+        'ties': summary['ties'],
+        'win_percentage': round(summary['win_percentage'], 1),
+        'total_matches': len(weekly['performance_vs_opponent']),
+        
+        # Handicap trend
+        'handicap_trend': summary['handicap_trend'],
+        'handicap_trend_positive': summary['handicap_trend_positive'],
+        # Current handicap should be the immediate next week's handicap if available; else last played week's
+        'current_handicap': next_week_hcp_value if next_week_hcp_value is not None else (handicap_data[-1]['handicap'] if handicap_data else 'N/A'),
+        'starting_handicap': handicap_data[0]['handicap'] if handicap_data else 'N/A',
         
-        # Group scores by hole number, but only include scores from the correct season
-        hole_scores = {}
-        for score in year_scores:
-            hole_num = score.hole.number
-            if score.week.season.year != cal_year:
-                continue
-            if hole_num not in hole_scores:
-                hole_scores[hole_num] = []
-            hole_scores[hole_num].append(score.score)
+        # Subs information
+        'subs_as_sub': subs_as_sub,
+        'subs_for_absent': subs_for_absent,
         
-        # Calculate average score for each hole
-        yearly_hole_stats[cal_year] = {}
-        for hole_num in range(1, 19):
-            if hole_num in hole_scores and hole_scores[hole_num]:
-                avg_score = sum(hole_scores[hole_num]) / len(hole_scores[hole_num])
-                yearly_hole_stats[cal_year][hole_num] = {
-                    'avg_score': round(avg_score, 2),
-                    'rounds_played': len(hole_scores[hole_num]),
-                    'par': year_scores.filter(hole__number=hole_num).first().hole.par if year_scores.filter(hole__number=hole_num).exists() else None
-                }
-            else:
-                yearly_hole_stats[cal_year][hole_num] = {
-                    'avg_score': None,
-                    'rounds_played': 0,
-                    'par': None
-                }
+        # Hole-by-hole analysis
+        'hole_stats': hole_stats,
+        'scoring_breakdown': scoring_breakdown,
+        'best_hole': best_hole,
+        'worst_hole': worst_hole,
+        'consistency_stats': consistency_stats(season_rounds, hole_stats),
+
+        # Opponent vs Handicap Analysis
+        'opp_vs_hcp_list': opponent_stats['opp_vs_hcp_list'],
+        'avg_opp_vs_hcp': round(opponent_stats['avg_opp_vs_hcp'], 1),
+        'num_better': opponent_stats['num_better'],
+        'num_worse': opponent_stats['num_worse'],
+        'num_even': opponent_stats['num_even'],
+        
+        # Yearly gross score statistics
+        'yearly_gross_stats': yearly_gross,
+        
+        # Yearly hole-by-hole statistics
+        'yearly_hole_stats': yearly_holes,
+        'hole_trends': hole_trends,
+        'sorted_years': sorted(yearly_holes),
+        
+        # Create flattened data for easier template rendering
+        'yearly_hole_table_data': yearly_hole_table(yearly_holes, hole_trends),
+        
+        # Wager statistics
+        'wager_stats': wager_stats,
+        
+        # Theoretical rounds
+        'theoretical_rounds': theoretical_rounds(hole_extremes, summary['best_gross_week'], summary['worst_gross_week']),
+        'hypothetical_skins': hypothetical_skins,
+        'actual_skins': actual_skins,
+        'actual_games': actual_games,
+        'total_birdies': total_birdies,
+        'total_eagles': total_eagles,
+    }
+
+    return context
+
+
+# Repeats: the sub golfer list is read for the cached context and the page
+@query_budget(20, duplicates=1)
+def sub_stats(request, golfer_id=None, year=None, league_slug=None):
+    """
+    View for sub statistics - shows stats for any golfer who has subbed in the season
+    """
+    league = resolve_league(league_slug)
+    # Get season - either specified year or current season
+    if year is not None:
+        season = get_current_season(year, league)
+        if not season:
+            return redirect_home(league, year)
+    else:
+        season = get_current_season(league=league)
     
-    # Calculate trends (comparing to previous year)
-    sorted_years = sorted(golfer_seasons)
-    for i, sy in enumerate(sorted_years):
-        if i > 0:  # Skip first year (no previous year to compare)
-            prev_year = sorted_years[i-1]
-            hole_trends[sy] = {}
-            
-            for hole_num in range(1, 19):
-                current_avg = yearly_hole_stats[sy][hole_num]['avg_score']
-                prev_avg = yearly_hole_stats[prev_year][hole_num]['avg_score']
-                
-                if current_avg is not None and prev_avg is not None:
-                    if current_avg < prev_avg:
-                        hole_trends[sy][hole_num] = 'down'  # Improved (green)
-                    elif current_avg > prev_avg:
-                        hole_trends[sy][hole_num] = 'up'    # Worsened (red)
-                    else:
-                        hole_trends[sy][hole_num] = 'same'  # No change
-                else:
-                    hole_trends[sy][hole_num] = None
+    if not season:
+        return render(request, 'sub_stats.html', {
+            'golfer': None,
+            'season': None,
+            'sub_golfers': Golfer.objects.none(),
+            'no_subs': True,
+        })
+    
+    # Get all golfers who have subbed in the current season
+    sub_golfers = Golfer.objects.filter(
+        sub__week__season=season
+    ).distinct().order_by('name')
+    
+    # Check if golfer_id is passed as query parameter (from dropdown)
+    if golfer_id is None:
+        golfer_id = request.GET.get('golfer_id')
+    
+    # If no specific golfer selected, redirect to first sub golfer or show empty state
+    if golfer_id is None:
+        if sub_golfers.exists():
+            # Redirect to the first sub golfer
+            _yr = year if year is not None else season.year
+            return redirect_sub_stats_detail(sub_golfers.first().id, league, _yr)
+        else:
+            # No sub golfers exist, show empty state
+            return render(request, 'sub_stats.html', {
+                'golfer': None,
+                'season': season,
+                'sub_golfers': sub_golfers,
+                'no_subs': True,
+            })
+    
+    # Get the specific golfer
+    try:
+        golfer = Golfer.objects.get(id=golfer_id)
+    except Golfer.DoesNotExist:
+        if sub_golfers.exists():
+            # Redirect to the first sub golfer if the requested one doesn't exist
+            _yr = year if year is not None else season.year
+            return redirect_sub_stats_detail(sub_golfers.first().id, league, _yr)
+        else:
+            return render(request, 'sub_stats.html', {
+                'golfer': None,
+                'season': season,
+                'sub_golfers': sub_golfers,
+                'no_subs': True,
+            })
+    
+    context = _sub_stats_page_context(golfer, season, sub_golfers)
+    return render(request, 'sub_stats.html', context)
+
+
+def _sub_stats_page_context(golfer, season, sub_golfers):
+    return cached_context(
+        'sub_stats', season_version(season), lambda: _sub_stats_context(golfer, season, sub_golfers),
+        golfer.pk, season.pk,
+    )
+
+
+@page_warmer
+def _warm_sub_stats(season):
+    sub_golfers = Golfer.objects.filter(sub__week__season=season).distinct().order_by('name')
+    for golfer in sub_golfers:
+        _sub_stats_page_context(golfer, season, sub_golfers)
+
+
+def _sub_stats_context(golfer, season, sub_golfers):
+    """Sub stats page context for ``golfer``'s sub rounds in ``season``."""
+    import json
+    from django.db.models import Avg, Count, Q
+
+    # Get all weeks for the season
+    weeks = Week.objects.filter(season=season, rained_out=False).order_by('number')
     
-    # Get all rounds for this golfer in the season
+    # Get all rounds for this golfer in the season (only as a sub)
     rounds = Round.objects.filter(
         golfer=golfer, 
-        week__season=season
+        week__season=season,
+        subbing_for__isnull=False  # Only sub rounds
     ).select_related('week', 'handicap').order_by('week__number')
     
-    # Get all scores for this golfer in the season for hole-by-hole analysis
-    all_scores = Score.objects.filter(
-        golfer=golfer,
-        week__season=season
-    ).select_related('hole', 'week').order_by('hole__number', 'week__number')
-    
-    # Get all golfer matchups for this golfer
+    # Get all golfer matchups for this golfer (only as a sub)
     golfer_matchups = GolferMatchup.objects.filter(
-        Q(golfer=golfer) | Q(subbing_for_golfer=golfer),
-        week__season=season
+        golfer=golfer,
+        week__season=season,
+        subbing_for_golfer__isnull=False  # Only sub matchups
     ).select_related('week', 'opponent').order_by('week__number')
     
+    # Get this golfer's hole scores for hole-by-hole analysis from the sub rounds themselves
+    sub_hole_scores = hole_scores(rounds)
+    
     # Get subs information for this golfer
     subs_as_sub = Sub.objects.filter(
         sub_golfer=golfer,
         week__season=season
-    ).select_related('week', 'absent_golfer').order_by('week__number')
+    ).select_related('week', 'absent_golfer').prefetch_related('absent_golfer__team_set').order_by('week__number')
     
-    subs_for_absent = Sub.objects.filter(
-        absent_golfer=golfer,
-        week__season=season
-    ).select_related('week', 'sub_golfer').order_by('week__number')
-
-    # Gather points earned when someone subbed for this golfer
-    subs_for_absent_with_points = []
-    for sub in subs_for_absent:
-        # Get the Round where someone subbed for this golfer
-        round_obj = Round.objects.filter(
-            week=sub.week, 
-            subbing_for=golfer
-        ).first()
-        points = round_obj.total_points if round_obj else None
-        subs_for_absent_with_points.append({
-            'week': sub.week,
-            'sub_golfer': sub.sub_golfer,
-            'no_sub': sub.no_sub,
-            'points': points,
-        })
-
-    # Gather sub points for each sub week
+    # Index the sub rounds by week and matchup so the loops below don't query per week
+    rounds = list(rounds)
+    golfer_matchups = list(golfer_matchups)
+    round_for_sub = {}
+    round_for_week = {}
+    for round_obj in rounds:
+        round_for_sub.setdefault((round_obj.week_id, round_obj.subbing_for_id), round_obj)
+        round_for_week.setdefault(round_obj.week_id, round_obj)
+    matchup_for_week = {}
+    for week_matchup in golfer_matchups:
+        matchup_for_week.setdefault(week_matchup.week_id, week_matchup)
+    opponent_rounds = {}
+    for round_obj in Round.objects.filter(
+        week__season=season,
+        golfer_id__in={week_matchup.opponent_id for week_matchup in golfer_matchups},
+    ):
+        opponent_rounds.setdefault((round_obj.golfer_id, round_obj.week_id), round_obj)
+    
+    # Gather sub points for each sub week using the new subbing_for field
     subs_as_sub_with_points = []
     for sub in subs_as_sub:
         # Get the Round where this golfer subbed for the absent golfer
-        round_obj = Round.objects.filter(
-            week=sub.week, 
-            golfer=golfer, 
-            subbing_for=sub.absent_golfer
-        ).first()
+        round_obj = round_for_sub.get((sub.week_id, sub.absent_golfer_id))
         points = round_obj.total_points if round_obj else None
         subs_as_sub_with_points.append({
             'week': sub.week,
             'absent_golfer': sub.absent_golfer,
-            'team': [team for team in sub.absent_golfer.team_set.all() if team.season == season],
+            'team': [team for team in sub.absent_golfer.team_set.all() if team.season_id == season.id],
             'points': points,
         })
     
-    print("subs_as_sub_with_points:", subs_as_sub_with_points)
-
     # Initialize data structures for charts
     handicap_data = []
     points_data = []
@@ -1017,8 +1049,8 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
     
     # Process each week
     for week in weeks:
-        week_round = rounds.filter(week=week).first()
-        week_matchup = golfer_matchups.filter(week=week).first()
+        week_round = round_for_week.get(week.id)
+        week_matchup = matchup_for_week.get(week.id)
         
         if week_round and week_matchup:
             # Handicap data
@@ -1046,10 +1078,7 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
             })
             
             # Performance vs opponent
-            opponent_round = Round.objects.filter(
-                golfer=week_matchup.opponent,
-                week=week
-            ).first()
+            opponent_round = opponent_rounds.get((week_matchup.opponent_id, week.id))
             
             if opponent_round:
                 # Calculate net score difference (positive = golfer won, negative = opponent won)
@@ -1091,23 +1120,9 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
         ties = sum(1 for perf in performance_vs_opponent if perf['result'] == 'Tie')
         win_percentage = (wins / len(performance_vs_opponent) * 100) if performance_vs_opponent else 0
         
-        # Handicap trend: compare starting handicap to the immediate next week's handicap
-        # after the last played week if it exists; otherwise use the last played week's handicap.
-        if handicap_data:
-            start_handicap_value = float(handicap_data[0]['handicap'])
-            # Determine effective end handicap value (next week's if available)
-            effective_end_hcp = float(handicap_data[-1]['handicap'])
-            try:
-                last_played_week_num = handicap_data[-1]['week']
-                next_week_obj = Week.objects.filter(season=season, number__gt=last_played_week_num).order_by('number').first()
-                if next_week_obj:
-                    next_hcp = Handicap.objects.filter(golfer=golfer, week=next_week_obj).first()
-                    if next_hcp:
-                        effective_end_hcp = float(next_hcp.handicap)
-            except Exception:
-                pass
-            # Only show a numeric trend if we effectively have two points (start and end may be the same week, but that's ok)
-            handicap_trend = effective_end_hcp - start_handicap_value
+        # Handicap trend
+        if len(handicap_data) > 1:
+            handicap_trend = handicap_data[-1]['handicap'] - handicap_data[0]['handicap']
             handicap_trend_text = f"{handicap_trend:+.1f}" if handicap_trend != 0 else "No change"
             handicap_trend_positive = handicap_trend > 0
         else:
@@ -1124,28 +1139,11 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
     charts = {}
     
     if handicap_data:
-        # Extend handicap data with ONLY the immediate next week's handicap after last played week, if present
-        extended_handicap_data = list(handicap_data)
-        next_week_hcp_value = None
-        try:
-            last_played_week_num = extended_handicap_data[-1]['week']
-            next_week_obj = Week.objects.filter(season=season, number__gt=last_played_week_num).order_by('number').first()
-            if next_week_obj:
-                next_hcp = Handicap.objects.filter(golfer=golfer, week=next_week_obj).first()
-                if next_hcp:
-                    next_week_hcp_value = float(next_hcp.handicap)
-                    extended_handicap_data.append({
-                        'week': next_week_obj.number,
-                        'handicap': next_week_hcp_value
-                    })
-        except Exception:
-            next_week_hcp_value = None
-
-        # Handicap progression chart (using possibly extended data)
+        # Handicap progression chart
         handicap_chart = {
             'data': [{
-                'x': [d['week'] for d in extended_handicap_data],
-                'y': [round(d['handicap'], 2) for d in extended_handicap_data],
+                'x': [d['week'] for d in handicap_data],
+                'y': [round(d['handicap'], 2) for d in handicap_data],
                 'type': 'scatter',
                 'mode': 'lines+markers',
                 'name': 'Handicap',
@@ -1185,7 +1183,7 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
         charts['points'] = json.dumps(points_chart)
     
     if gross_scores and net_scores:
-        # Gross vs Net scores chart (mobile-friendly legend below chart with extra spacing)
+        # Gross vs Net scores chart (mobile-friendly legend below chart)
         scores_chart = {
             'data': [
                 {
@@ -1255,15 +1253,23 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
     scoring_breakdown = {'eagle': 0, 'birdie': 0, 'par': 0, 'bogey': 0, 'double': 0, 'triple': 0, 'worse': 0}
     all_hole_scores = []
     
+    # Group the scores by hole in week order: hole number -> (par, scores)
+    scores_by_hole = {}
+    counted = set()
+    for week_id, _golfer_id, hole, gross in sub_hole_scores:
+        # Rounds subbing for two golfers in one week share the same scores
+        if (week_id, hole.number) in counted:
+            continue
+        counted.add((week_id, hole.number))
+        scores_by_hole.setdefault(hole.number, (hole.par, []))[1].append(gross)
+    
     # Analyze each hole
     for hole_num in range(1, 19):
-        hole_scores = all_scores.filter(hole__number=hole_num)
-        if hole_scores.exists():
-            scores_list = list(hole_scores.values_list('score', flat=True))
+        if hole_num in scores_by_hole:
+            hole_par, scores_list = scores_by_hole[hole_num]
             avg_score = sum(scores_list) / len(scores_list)
             
             # Calculate scoring breakdown for this hole
-            hole_par = hole_scores.first().hole.par
             for score in scores_list:
                 relative_to_par = score - hole_par
                 if relative_to_par <= -2:
@@ -1388,1100 +1394,14 @@ def golfer_stats(request, golfer_id, year=None, league_slug=None):
             }
         }
         charts['hole_by_hole'] = json.dumps(hole_chart)
-        
-        # Build per-hole consistency (std dev of score vs par) chart
-        consistency_x = []
-        consistency_y = []
-        consistency_colors = []
-        consistency_custom = []
-        
-        for hole_num in played_hole_numbers:
-            stats = hole_stats.get(hole_num)
-            if not stats or not stats['scores']:
-                continue
-            scores_list = stats['scores']
-            par = stats['par']
-            rel_scores = [s - par for s in scores_list]
-            if len(rel_scores) >= 2:
-                mean_rel = sum(rel_scores) / len(rel_scores)
-                variance = sum((s - mean_rel) ** 2 for s in rel_scores) / len(rel_scores)
-                std_dev = round(variance ** 0.5, 2)
-            else:
-                std_dev = None
-            score_range = round(max(rel_scores) - min(rel_scores), 2) if rel_scores else None
-            
-            consistency_x.append(hole_num)
-            consistency_y.append(std_dev if std_dev is not None else 0)
-            if std_dev is None:
-                consistency_colors.append('#BBBBBB')
-            elif std_dev <= 0.5:
-                consistency_colors.append('#2ca02c')
-            elif std_dev <= 1.0:
-                consistency_colors.append('#ff7f0e')
-            else:
-                consistency_colors.append('#d62728')
-            consistency_custom.append([len(rel_scores), score_range, stats['avg_vs_par']])
-        
-        if consistency_x:
-            hole_consistency_chart = {
-                'data': [{
-                    'x': consistency_x,
-                    'y': consistency_y,
-                    'type': 'bar',
-                    'name': 'Std Dev (Score vs Par)',
-                    'marker': {
-                        'color': consistency_colors
-                    },
-                    'customdata': consistency_custom,
-                    'hovertemplate': 'Hole: %{x}' +
-                                     '<br>Std Dev: %{y:.2f}' +
-                                     '<br>Rounds: %{customdata[0]}' +
-                                     '<br>Range: %{customdata[1]:+.2f}' +
-                                     '<br>Avg vs Par: %{customdata[2]:+.2f}<extra></extra>'
-                }],
-                'layout': {
-                    'title': {'text': 'Per-Hole Consistency<br>(Lower = More Consistent)', 'x': 0.5, 'xanchor': 'center'},
-                    'xaxis': {'title': 'Hole Number'},
-                    'yaxis': {'title': 'Std Dev of (Score - Par)'},
-                    'height': 400,
-                    'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50}
-                }
-            }
-            charts['hole_consistency'] = json.dumps(hole_consistency_chart)
-        
-        # Build per-hole consistency (std dev of score vs par) chart
-        consistency_x = []
-        consistency_y = []
-        consistency_colors = []
-        consistency_custom = []  # rounds, range, avg_vs_par
-        
-        for hole_num in played_hole_numbers:
-            stats = hole_stats.get(hole_num)
-            if not stats or not stats['scores']:
-                continue
-            scores_list = stats['scores']
-            par = stats['par']
-            rel_scores = [s - par for s in scores_list]
-            if len(rel_scores) >= 2:
-                mean_rel = sum(rel_scores) / len(rel_scores)
-                variance = sum((s - mean_rel) ** 2 for s in rel_scores) / len(rel_scores)
-                std_dev = round(variance ** 0.5, 2)
-            else:
-                std_dev = None
-            score_range = round(max(rel_scores) - min(rel_scores), 2) if rel_scores else None
-            
-            consistency_x.append(hole_num)
-            consistency_y.append(std_dev if std_dev is not None else 0)
-            # Color mapping: greener for lower std dev, red for higher
-            if std_dev is None:
-                consistency_colors.append('#BBBBBB')
-            elif std_dev <= 0.5:
-                consistency_colors.append('#2ca02c')
-            elif std_dev <= 1.0:
-                consistency_colors.append('#ff7f0e')
-            else:
-                consistency_colors.append('#d62728')
-            consistency_custom.append([len(rel_scores), score_range, stats['avg_vs_par']])
-        
-        if consistency_x:
-            hole_consistency_chart = {
-                'data': [{
-                    'x': consistency_x,
-                    'y': consistency_y,
-                    'type': 'bar',
-                    'name': 'Std Dev (Score vs Par)',
-                    'marker': {
-                        'color': consistency_colors
-                    },
-                    'customdata': consistency_custom,
-                    'hovertemplate': 'Hole: %{x}' +
-                                     '<br>Std Dev: %{y:.2f}' +
-                                     '<br>Rounds: %{customdata[0]}' +
-                                     '<br>Range: %{customdata[1]:+.2f}' +
-                                     '<br>Avg vs Par: %{customdata[2]:+.2f}<extra></extra>'
-                }],
-                'layout': {
-                    'title': {'text': 'Per-Hole Consistency<br>(Lower = More Consistent)', 'x': 0.5, 'xanchor': 'center'},
-                    'xaxis': {'title': 'Hole Number'},
-                    'yaxis': {'title': 'Std Dev of (Score - Par)'},
-                    'height': 400,
-                    'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50}
-                }
-            }
-            charts['hole_consistency'] = json.dumps(hole_consistency_chart)
-    
-    # Create yearly hole-by-hole heat map
-    if yearly_hole_stats and len(yearly_hole_stats) > 1:
-        # Prepare data for heat map
-        years = sorted(yearly_hole_stats.keys())
-        holes = list(range(1, 19))
-        
-        # Create z-values for heat map (strokes over/under par)
-        z_values = []
-        all_vs_par = []  # Collect all valid vs par values for min/max calculation
-        
-        for year in years:
-            year_data = []
-            for hole in holes:
-                if yearly_hole_stats[year][hole]['avg_score'] is not None and yearly_hole_stats[year][hole]['par'] is not None:
-                    avg_score = yearly_hole_stats[year][hole]['avg_score']
-                    par = yearly_hole_stats[year][hole]['par']
-                    vs_par = round(avg_score - par, 2)  # Positive = over par, negative = under par
-                    year_data.append(vs_par)
-                    all_vs_par.append(vs_par)
-                else:
-                    year_data.append(None)
-            z_values.append(year_data)
-        
-        # Calculate min and max vs par values; cap lower end at -1 and ensure upper end is reasonable
-        if all_vs_par:
-            min_vs_par = min(all_vs_par)
-            max_vs_par = max(all_vs_par)
-            # Legend (colorbar) should start at -1, as averages rarely go below -1
-            zmin = -1
-            # Ensure the upper bound includes at least +2 for visibility and any data max
-            zmax = max(max_vs_par, 2)
-        else:
-            zmin = -1  # Default lower cap at -1
-            zmax = 2   # Default upper cap at +2
-        
-        # Create custom color scale:
-        # - Dark green capped at -1 (values <= -1 share the same dark green)
-        # - White aligned at +1
-        # - Orange near +2, Red at top
-        # Compute normalized positions in [0,1]
-        p_white = (1 - zmin) / (zmax - zmin)
-        p_neg1 = (-1 - zmin) / (zmax - zmin)
-        p_plus2 = (2 - zmin) / (zmax - zmin)
-        # Clamp positions
-        def _clamp01(v):
-            return 0 if v < 0 else (1 if v > 1 else v)
-        p_white = _clamp01(p_white)
-        p_neg1 = _clamp01(p_neg1)
-        p_plus2 = _clamp01(p_plus2)
-        # Intermediate light-green stop between -1 and +1
-        p_light = _clamp01(p_neg1 + 0.6 * (p_white - p_neg1))
-        
-        # Transpose heatmap so holes are on Y and years on X (better on mobile),
-        # and move colorbar to the side; also expand title margin to avoid clipping
-        z_transposed = [list(col) for col in zip(*z_values)] if z_values else []
-        hole_heatmap = {
-            'data': [{
-                'z': z_transposed,
-                'x': years,
-                'y': holes,
-                'type': 'heatmap',
-                'colorscale': [
-                    [0, 'rgb(0, 128, 0)'],               # Dark green floor
-                    [p_neg1, 'rgb(0, 128, 0)'],           # Cap dark green at -1
-                    [p_light, 'rgb(144, 238, 144)'],      # Light green towards +1
-                    [p_white, 'rgb(255, 255, 255)'],      # White at +1
-                    [p_plus2, 'rgb(255, 165, 0)'],        # Orange near +2
-                    [1, 'rgb(255, 0, 0)']                 # Red at top
-                ],
-                'zmin': zmin,
-                'zmax': zmax,
-                'colorbar': {
-                    'title': 'Strokes vs Par',
-                    'titleside': 'right',
-                    'tickformat': '+.1f',
-                    'tickmode': 'auto',
-                    'nticks': 7,
-                    'len': 0.85,
-                    'thickness': 18
-                },
-                'hovertemplate': 'Year: %{x}<br>Hole: %{y}<br>Avg vs Par: %{z:+.2f}<extra></extra>'
-            }],
-            'layout': {
-                'title': {
-                    'text': 'Yearly Hole-by-Hole Performance vs Par',
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'y': 0.98,
-                    'yanchor': 'top',
-                    'pad': {'t': 20}
-                },
-                'xaxis': {
-                    'title': 'Year',
-                    'tickmode': 'linear',
-                    'tick0': min(years),
-                    'dtick': 1,
-                    'automargin': True,
-                    'range': [min(years) - 0.5, max(years) + 0.5],
-                    'constrain': 'domain'
-                },
-                'yaxis': {
-                    'title': 'Hole Number',
-                    'tickmode': 'linear',
-                    'tick0': 1,
-                    'dtick': 1,
-                    'automargin': True,
-                    'scaleanchor': 'x',
-                    'scaleratio': 1,
-                    'range': [18.5, 0.5],  # Flip so Hole 1 appears at the top
-                    'constrain': 'domain'
-                },
-                'height': 650,
-                'margin': {'l': 40, 'r': 60, 't': 140, 'b': 80},
-                'autosize': True,
-                'responsive': True
-            }
-        }
-        charts['yearly_hole_heatmap'] = json.dumps(hole_heatmap)
-    
-    # --- Opponent vs Handicap Analysis ---
-    opponent_vs_hcp_list = []
-    for week in weeks:
-        week_round = rounds.filter(week=week).first()
-        week_matchup = golfer_matchups.filter(week=week).first()
-        if week_round and week_matchup:
-            opponent_round = Round.objects.filter(golfer=week_matchup.opponent, week=week).first()
-            if opponent_round:
-                # Get par for the 9 holes played that week
-                if week.is_front:
-                    holes = Hole.objects.filter(config=season.course_config, number__in=range(1, 10))
-                else:
-                    holes = Hole.objects.filter(config=season.course_config, number__in=range(10, 19))
-                week_par = sum(hole.par for hole in holes)
-                opp_vs_hcp = opponent_round.net - week_par
-                opponent_vs_hcp_list.append({
-                    'week': week.number,
-                    'opponent': week_matchup.opponent.name,
-                    'opp_vs_hcp': opp_vs_hcp,
-                })
-            else:
-                opponent_vs_hcp_list.append({
-                    'week': week.number,
-                    'opponent': week_matchup.opponent.name,
-                    'opp_vs_hcp': None,
-                })
-        else:
-            opponent_vs_hcp_list.append({
-                'week': week.number,
-                'opponent': None,
-                'opp_vs_hcp': None,
-            })
-    # Season summary for opponent vs handicap
-    opp_vs_hcp_values = [item['opp_vs_hcp'] for item in opponent_vs_hcp_list if item['opp_vs_hcp'] is not None]
-    if opp_vs_hcp_values:
-        avg_opp_vs_hcp = sum(opp_vs_hcp_values) / len(opp_vs_hcp_values)
-        num_better = sum(1 for v in opp_vs_hcp_values if v < 0)
-        num_worse = sum(1 for v in opp_vs_hcp_values if v > 0)
-        num_even = sum(1 for v in opp_vs_hcp_values if v == 0)
-    else:
-        avg_opp_vs_hcp = 0
-        num_better = num_worse = num_even = 0
-
-    # Calculate wager statistics for this golfer
-    wager_stats = {}
-    
-    # Calculate skins money wagered and won, and build actual skins details
-    skin_entries = SkinEntry.objects.filter(golfer=golfer, week__season=season)
-    total_skins_wagered = skin_entries.count() * (season.skins_entry_fee if getattr(season, 'playing_skins', False) else 0)
-    
-    skins_won = 0
-    actual_skins = None
-    actual_skins_total = 0.0
-    actual_skins_count = 0
-    actual_skins_details = []
-    for week in weeks:
-        if not getattr(season, 'playing_skins', False):
-            continue
-        skin_winners = calculate_skin_winners(week)
-        if skin_winners:
-            week_winners = [winner for winner in skin_winners if winner['golfer'].id == golfer.id]
-            if week_winners:
-                week_skin_entries = SkinEntry.objects.filter(week=week)
-                week_skins_pot = week_skin_entries.count() * week.season.skins_entry_fee
-                skin_winner_payout = week_skins_pot / len(skin_winners) if len(skin_winners) > 0 else 0
-                skins_won += skin_winner_payout * len(week_winners)
-                # Build details list (one row per skin won by this golfer)
-                for w in week_winners:
-                    actual_skins_count += 1
-                    actual_skins_total += skin_winner_payout
-                    actual_skins_details.append({
-                        'week': week.number,
-                        'date': timezone.localtime(week.date).strftime('%m/%d') if hasattr(week, 'date') else '',
-                        'hole': w['hole'],
-                        'score': w['score'],
-                        'payout': round(skin_winner_payout, 2),
-                    })
-    if actual_skins_count > 0:
-        actual_skins = {
-            'total': round(actual_skins_total, 2),
-            'skins': actual_skins_count,
-            'details': actual_skins_details,
-        }
-    
-    # Calculate games money wagered and won; build actual games details
-    game_entries = GameEntry.objects.filter(golfer=golfer, week__season=season)
-    total_games_wagered = game_entries.count() * (season.game_entry_fee if getattr(season, 'playing_games', False) else 0)
-    
-    games_won = 0
-    actual_games = None
-    actual_games_total = 0.0
-    actual_games_count = 0
-    actual_games_details = []
-    for week in weeks:
-        if not getattr(season, 'playing_games', False):
-            continue
-        game_winners = GameEntry.objects.filter(week=week, golfer=golfer, winner=True).select_related('game')
-        if game_winners.exists():
-            week_game_entries = GameEntry.objects.filter(week=week)
-            week_games_pot = week_game_entries.count() * week.season.game_entry_fee
-            total_winners = GameEntry.objects.filter(week=week, winner=True).count()
-            game_winner_payout = week_games_pot / total_winners if total_winners > 0 else 0
-            games_won += game_winner_payout * game_winners.count()
-            for ge in game_winners:
-                actual_games_count += 1
-                actual_games_total += game_winner_payout
-                actual_games_details.append({
-                    'week': week.number,
-                    'date': timezone.localtime(week.date).strftime('%m/%d') if hasattr(week, 'date') else '',
-                    'game': ge.game.name if ge.game else 'Game',
-                    'payout': round(game_winner_payout, 2),
-                })
-    if actual_games_count > 0:
-        actual_games = {
-            'total': round(actual_games_total, 2),
-            'wins': actual_games_count,
-            'details': actual_games_details,
-        }
-    
-    # Calculate total earnings
-    total_earned = skins_won + games_won
-    total_wagered = total_skins_wagered + total_games_wagered
-    net_earnings = total_earned - total_wagered
-    
-    wager_stats = {
-        'total_skins_wagered': total_skins_wagered,
-        'total_games_wagered': total_games_wagered,
-        'total_wagered': total_wagered,
-        'skins_won': round(skins_won, 2),
-        'games_won': round(games_won, 2),
-        'total_earned': round(total_earned, 2),
-        'net_earnings': round(net_earnings, 2),
-        'skins_entries': skin_entries.count(),
-        'games_entries': game_entries.count(),
-    }
-
-    # Hypothetical skins earnings if the golfer didn't enter skins at all
-    hypothetical_skins = None
-    try:
-        golfer_skins_count = SkinEntry.objects.filter(golfer=golfer, week__season=season).count()
-    except Exception:
-        golfer_skins_count = 0
-
-    if golfer_skins_count == 0 and getattr(season, 'playing_skins', False):
-        hypothetical_total = 0.0
-        hypothetical_details = []
-        hypothetical_skins_count = 0
-
-        # Consider only weeks that had skins entries to avoid degenerate single-entry cases
-        weeks_with_entries = (
-            Week.objects
-            .filter(season=season, rained_out=False, skinentry__isnull=False)
-            .distinct()
-            .order_by('number')
-        )
-
-        for wk in weeks_with_entries:
-            entries = list(SkinEntry.objects.filter(week=wk).select_related('golfer'))
-            participants = [e.golfer for e in entries]
-
-            if golfer not in participants:
-                participants.append(golfer)
-
-            # Determine the 9 holes for the week
-            if wk.is_front:
-                holes = list(Hole.objects.filter(config=season.course_config, number__in=range(1, 10)))
-            else:
-                holes = list(Hole.objects.filter(config=season.course_config, number__in=range(10, 19)))
-
-            # Fetch all scores for these participants for the week in one query
-            scores_qs = (
-                Score.objects
-                .filter(week=wk, golfer__in=participants)
-                .select_related('golfer', 'hole')
-            )
-
-            # Build fast lookup: (golfer_id, hole_number) -> score
-            score_map = {}
-            for s in scores_qs:
-                score_map[(s.golfer_id, s.hole.number)] = s.score
-
-            # Compute winners with injected golfer
-            winners_all = []  # list of (golfer_id, hole_number)
-            for hole in holes:
-                hole_scores = []
-                for p in participants:
-                    val = score_map.get((p.id, hole.number))
-                    if val is not None:
-                        hole_scores.append((p.id, val))
-                if not hole_scores:
-                    continue
-                min_score = min(v for _, v in hole_scores)
-                winners = [pid for (pid, v) in hole_scores if v == min_score]
-                if len(winners) == 1:
-                    winners_all.append((winners[0], hole.number))
-
-            if winners_all:
-                # Pot uses season-configured entry fee
-                pot_entries = len(participants)
-                total_pot = pot_entries * float(wk.season.skins_entry_fee)
-                per_skin_value = total_pot / len(winners_all) if len(winners_all) > 0 else 0.0
-
-                # Add only this golfer's skins to details and totals
-                for winner_id, hole_num in winners_all:
-                    if winner_id == golfer.id:
-                        hypothetical_skins_count += 1
-                        hypothetical_total += per_skin_value
-                        # Find this golfer's score for display
-                        g_score = score_map.get((golfer.id, hole_num))
-                        hypothetical_details.append({
-                            'week': wk.number,
-                            'date': timezone.localtime(wk.date).strftime('%m/%d') if hasattr(wk, 'date') else '',
-                            'hole': hole_num,
-                            'score': g_score,
-                            'payout': round(per_skin_value, 2),
-                        })
-
-        if hypothetical_skins_count > 0:
-            hypothetical_skins = {
-                'total': round(hypothetical_total, 2),
-                'skins': hypothetical_skins_count,
-                'details': hypothetical_details,
-            }
-
-    # Calculate theoretical best and worst rounds
-    theoretical_rounds = {}
-    if all_scores.exists():
-        # Group scores by hole number
-        hole_scores = {}
-        for score in all_scores:
-            hole_num = score.hole.number
-            if hole_num not in hole_scores:
-                hole_scores[hole_num] = []
-            hole_scores[hole_num].append(score.score)
-        
-        # Calculate theoretical best round (best score on each hole)
-        theoretical_best_scores = []
-        theoretical_best_total = 0
-        for hole_num in range(1, 19):
-            if hole_num in hole_scores and hole_scores[hole_num]:
-                best_score = min(hole_scores[hole_num])
-                theoretical_best_scores.append({
-                    'hole': hole_num,
-                    'score': best_score,
-                    'week': all_scores.filter(hole__number=hole_num, score=best_score).first().week.number
-                })
-                theoretical_best_total += best_score
-            else:
-                theoretical_best_scores.append({
-                    'hole': hole_num,
-                    'score': None,
-                    'week': None
-                })
-        
-        # Calculate theoretical worst round (worst score on each hole)
-        theoretical_worst_scores = []
-        theoretical_worst_total = 0
-        for hole_num in range(1, 19):
-            if hole_num in hole_scores and hole_scores[hole_num]:
-                worst_score = max(hole_scores[hole_num])
-                theoretical_worst_scores.append({
-                    'hole': hole_num,
-                    'score': worst_score,
-                    'week': all_scores.filter(hole__number=hole_num, score=worst_score).first().week.number
-                })
-                theoretical_worst_total += worst_score
-            else:
-                theoretical_worst_scores.append({
-                    'hole': hole_num,
-                    'score': None,
-                    'week': None
-                })
-        
-        theoretical_rounds = {
-            'best': {
-                'total': theoretical_best_total,
-                'scores': theoretical_best_scores,
-                'vs_actual_best': theoretical_best_total - best_gross_week['gross'] if best_gross_week else None
-            },
-            'worst': {
-                'total': theoretical_worst_total,
-                'scores': theoretical_worst_scores,
-                'vs_actual_worst': theoretical_worst_total - worst_gross_week['gross'] if worst_gross_week else None
-            }
-        }
-
-    # Calculate total birdies and eagles for the season
-    total_birdies = Score.objects.filter(round__subbing_for__isnull=True, score=F('hole__par') - 1).count()
-    total_eagles = Score.objects.filter(round__subbing_for__isnull=True, score__lte=F('hole__par') - 2).count()
-
-    context = {
-        'golfer': golfer,
-        'season': season,
-        'charts': charts,
-        'weekly_stats': weekly_stats,
-        'performance_vs_opponent': performance_vs_opponent,
-        
-        # Season averages
-        'avg_gross': round(avg_gross, 1),
-        'avg_net': round(avg_net, 1),
-        'avg_points': round(avg_points, 1),
-        'total_points': round(total_points, 1),
-        
-        # Best/Worst weeks
-        'best_gross_week': best_gross_week,
-        'worst_gross_week': worst_gross_week,
-        'best_net_week': best_net_week,
-        'worst_net_week': worst_net_week,
-        'best_points_week': best_points_week,
-        'worst_points_week': worst_points_week,
-        
-        # Match play stats
-        'wins': wins,
-        'losses': losses,
-        'ties': ties,
-        'win_percentage': round(win_percentage, 1),
-        'total_matches': len(performance_vs_opponent),
-        
-        # Handicap trend
-        'handicap_trend': handicap_trend_text,
-        'handicap_trend_positive': handicap_trend_positive,
-        # Current handicap should be the immediate next week's handicap if available; else last played week's
-        'current_handicap': (next_week_hcp_value if ('next_week_hcp_value' in locals() and next_week_hcp_value is not None) else (handicap_data[-1]['handicap'] if handicap_data else 'N/A')),
-        'starting_handicap': handicap_data[0]['handicap'] if handicap_data else 'N/A',
-        
-        # Subs information
-        'subs_as_sub': subs_as_sub_with_points,
-        'subs_for_absent': subs_for_absent_with_points,
-        
-        # Hole-by-hole analysis
-        'hole_stats': hole_stats,
-        'scoring_breakdown': scoring_breakdown,
-        'best_hole': best_hole,
-        'worst_hole': worst_hole,
-        'consistency_stats': consistency_stats,
-
-        # Opponent vs Handicap Analysis
-        'opp_vs_hcp_list': opponent_vs_hcp_list,
-        'avg_opp_vs_hcp': round(avg_opp_vs_hcp, 1),
-        'num_better': num_better,
-        'num_worse': num_worse,
-        'num_even': num_even,
-        
-        # Yearly gross score statistics
-        'yearly_gross_stats': yearly_gross_stats,
-        
-        # Yearly hole-by-hole statistics
-        'yearly_hole_stats': yearly_hole_stats,
-        'hole_trends': hole_trends,
-        'sorted_years': sorted(yearly_hole_stats.keys()) if yearly_hole_stats else [],
-        
-        # Create flattened data for easier template rendering
-        'yearly_hole_table_data': [
-            {
-                'year': yk,
-                'holes': [
-                    {
-                        'hole_num': hole_num,
-                        'avg_score': yearly_hole_stats[yk][hole_num]['avg_score'] if yearly_hole_stats[yk][hole_num]['avg_score'] else None,
-                        'par': yearly_hole_stats[yk][hole_num]['par'] if yearly_hole_stats[yk][hole_num]['par'] else None,
-                        'vs_par': (yearly_hole_stats[yk][hole_num]['avg_score'] - yearly_hole_stats[yk][hole_num]['par']) if (yearly_hole_stats[yk][hole_num]['avg_score'] is not None and yearly_hole_stats[yk][hole_num]['par'] is not None) else None,
-                        'trend': hole_trends.get(yk, {}).get(hole_num) if yk in hole_trends else None
-                    }
-                    for hole_num in range(1, 19)
-                ]
-            }
-            for yk in sorted(yearly_hole_stats.keys()) if yearly_hole_stats
-        ],
-        
-        # Wager statistics
-        'wager_stats': wager_stats,
-        
-        # Theoretical rounds
-        'theoretical_rounds': theoretical_rounds,
-        'hypothetical_skins': hypothetical_skins,
-        'actual_skins': actual_skins,
-        'actual_games': actual_games,
-        'total_birdies': total_birdies,
-        'total_eagles': total_eagles,
-    }
-    
-    return render(request, 'golfer_stats.html', context)
-
-
-def sub_stats(request, golfer_id=None, year=None, league_slug=None):
-    """
-    View for sub statistics - shows stats for any golfer who has subbed in the season
-    """
-    import json
-    from django.db.models import Avg, Count, Q
-    
-    league = resolve_league(league_slug)
-    # Get season - either specified year or current season
-    if year is not None:
-        season = get_current_season(year, league)
-        if not season:
-            return redirect_home(league, year)
-    else:
-        season = get_current_season(league=league)
-    
-    if not season:
-        return render(request, 'sub_stats.html', {
-            'golfer': None,
-            'season': None,
-            'sub_golfers': Golfer.objects.none(),
-            'no_subs': True,
-        })
-    
-    # Get all golfers who have subbed in the current season
-    sub_golfers = Golfer.objects.filter(
-        sub__week__season=season
-    ).distinct().order_by('name')
-    
-    # Check if golfer_id is passed as query parameter (from dropdown)
-    if golfer_id is None:
-        golfer_id = request.GET.get('golfer_id')
-    
-    # If no specific golfer selected, redirect to first sub golfer or show empty state
-    if golfer_id is None:
-        if sub_golfers.exists():
-            # Redirect to the first sub golfer
-            _yr = year if year is not None else season.year
-            return redirect_sub_stats_detail(sub_golfers.first().id, league, _yr)
-        else:
-            # No sub golfers exist, show empty state
-            return render(request, 'sub_stats.html', {
-                'golfer': None,
-                'season': season,
-                'sub_golfers': sub_golfers,
-                'no_subs': True,
-            })
-    
-    # Get the specific golfer
-    try:
-        golfer = Golfer.objects.get(id=golfer_id)
-    except Golfer.DoesNotExist:
-        if sub_golfers.exists():
-            # Redirect to the first sub golfer if the requested one doesn't exist
-            _yr = year if year is not None else season.year
-            return redirect_sub_stats_detail(sub_golfers.first().id, league, _yr)
-        else:
-            return render(request, 'sub_stats.html', {
-                'golfer': None,
-                'season': season,
-                'sub_golfers': sub_golfers,
-                'no_subs': True,
-            })
-    
-    # Get all weeks for the season
-    weeks = Week.objects.filter(season=season, rained_out=False).order_by('number')
-    
-    # Get all rounds for this golfer in the season (only as a sub)
-    rounds = Round.objects.filter(
-        golfer=golfer, 
-        week__season=season,
-        subbing_for__isnull=False  # Only sub rounds
-    ).select_related('week', 'handicap').order_by('week__number')
-    
-    # Get all golfer matchups for this golfer (only as a sub)
-    golfer_matchups = GolferMatchup.objects.filter(
-        golfer=golfer,
-        week__season=season,
-        subbing_for_golfer__isnull=False  # Only sub matchups
-    ).select_related('week', 'opponent').order_by('week__number')
-    
-    # Get all scores for this golfer in the season for hole-by-hole analysis (only sub rounds)
-    all_scores = Score.objects.filter(
-        golfer=golfer,
-        week__season=season,
-        round__subbing_for__isnull=False  # Only scores from sub rounds
-    ).select_related('hole', 'week').order_by('hole__number', 'week__number')
-    
-    # Get subs information for this golfer
-    subs_as_sub = Sub.objects.filter(
-        sub_golfer=golfer,
-        week__season=season
-    ).select_related('week', 'absent_golfer').order_by('week__number')
-    
-    # Gather sub points for each sub week using the new subbing_for field
-    subs_as_sub_with_points = []
-    for sub in subs_as_sub:
-        # Get the Round where this golfer subbed for the absent golfer
-        round_obj = Round.objects.filter(
-            week=sub.week, 
-            golfer=golfer, 
-            subbing_for=sub.absent_golfer
-        ).first()
-        points = round_obj.total_points if round_obj else None
-        subs_as_sub_with_points.append({
-            'week': sub.week,
-            'absent_golfer': sub.absent_golfer,
-            'team': [team for team in sub.absent_golfer.team_set.all() if team.season == season],
-            'points': points,
-        })
-    
-    # Initialize data structures for charts
-    handicap_data = []
-    points_data = []
-    gross_scores = []
-    net_scores = []
-    performance_vs_opponent = []
-    weekly_stats = []
-    
-    # Process each week
-    for week in weeks:
-        week_round = rounds.filter(week=week).first()
-        week_matchup = golfer_matchups.filter(week=week).first()
-        
-        if week_round and week_matchup:
-            # Handicap data
-            handicap_data.append({
-                'week': week.number,
-                'handicap': float(week_round.handicap.handicap) if week_round.handicap else 0
-            })
-            
-            # Points data - use total points (hole points + round points)
-            total_points = week_round.total_points if week_round.total_points else 0
-            points_data.append({
-                'week': week.number,
-                'points': float(total_points)
-            })
-            
-            # Gross and net scores
-            gross_scores.append({
-                'week': week.number,
-                'score': week_round.gross if week_round.gross else 0
-            })
-            
-            net_scores.append({
-                'week': week.number,
-                'score': week_round.net if week_round.net else 0
-            })
-            
-            # Performance vs opponent
-            opponent_round = Round.objects.filter(
-                golfer=week_matchup.opponent,
-                week=week
-            ).first()
-            
-            if opponent_round:
-                # Calculate net score difference (positive = golfer won, negative = opponent won)
-                net_diff = (week_round.net or 0) - (opponent_round.net or 0)
-                performance_vs_opponent.append({
-                    'week': week.number,
-                    'opponent': week_matchup.opponent.name,
-                    'net_diff': net_diff,
-                    'result': 'Win' if net_diff < 0 else 'Loss' if net_diff > 0 else 'Tie'
-                })
-            
-            # Weekly stats summary
-            weekly_stats.append({
-                'week': week.number,
-                'gross': week_round.gross or 0,
-                'net': week_round.net or 0,
-                'points': week_round.total_points or 0,
-                'handicap': float(week_round.handicap.handicap) if week_round.handicap else 0,
-                'opponent': week_matchup.opponent.name if week_matchup else 'N/A'
-            })
-    
-    # Calculate season statistics
-    if weekly_stats:
-        avg_gross = sum(stat['gross'] for stat in weekly_stats) / len(weekly_stats)
-        avg_net = sum(stat['net'] for stat in weekly_stats) / len(weekly_stats)
-        avg_points = sum(stat['points'] for stat in weekly_stats) / len(weekly_stats)
-        total_points = sum(stat['points'] for stat in weekly_stats)
-        
-        best_gross_week = min(weekly_stats, key=lambda x: x['gross'])
-        worst_gross_week = max(weekly_stats, key=lambda x: x['gross'])
-        best_net_week = min(weekly_stats, key=lambda x: x['net'])
-        worst_net_week = max(weekly_stats, key=lambda x: x['net'])
-        best_points_week = max(weekly_stats, key=lambda x: x['points'])
-        worst_points_week = min(weekly_stats, key=lambda x: x['points'])
-        
-        # Performance vs opponent stats
-        wins = sum(1 for perf in performance_vs_opponent if perf['result'] == 'Win')
-        losses = sum(1 for perf in performance_vs_opponent if perf['result'] == 'Loss')
-        ties = sum(1 for perf in performance_vs_opponent if perf['result'] == 'Tie')
-        win_percentage = (wins / len(performance_vs_opponent) * 100) if performance_vs_opponent else 0
-        
-        # Handicap trend
-        if len(handicap_data) > 1:
-            handicap_trend = handicap_data[-1]['handicap'] - handicap_data[0]['handicap']
-            handicap_trend_text = f"{handicap_trend:+.1f}" if handicap_trend != 0 else "No change"
-            handicap_trend_positive = handicap_trend > 0
-        else:
-            handicap_trend_text = "N/A"
-            handicap_trend_positive = False
-    else:
-        avg_gross = avg_net = avg_points = total_points = 0
-        best_gross_week = worst_gross_week = best_net_week = worst_net_week = best_points_week = worst_points_week = None
-        wins = losses = ties = win_percentage = 0
-        handicap_trend_text = "N/A"
-        handicap_trend_positive = False
-    
-    # Create Plotly charts
-    charts = {}
-    
-    if handicap_data:
-        # Handicap progression chart
-        handicap_chart = {
-            'data': [{
-                'x': [d['week'] for d in handicap_data],
-                'y': [round(d['handicap'], 2) for d in handicap_data],
-                'type': 'scatter',
-                'mode': 'lines+markers',
-                'name': 'Handicap',
-                'line': {'color': '#1f77b4', 'width': 3},
-                'marker': {'size': 8},
-                'hovertemplate': 'Week: %{x}<br>Handicap: %{y:.2f}<extra></extra>'
-            }],
-            'layout': {
-                'title': 'Handicap Progression',
-                'xaxis': {'title': 'Week'},
-                'yaxis': {'title': 'Handicap'},
-                'height': 400,
-                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
-            }
-        }
-        charts['handicap'] = json.dumps(handicap_chart)
-    
-    if points_data:
-        # Points per week chart
-        points_chart = {
-            'data': [{
-                'x': [d['week'] for d in points_data],
-                'y': [round(d['points'], 2) for d in points_data],
-                'type': 'bar',
-                'name': 'Points',
-                'marker': {'color': '#2ca02c'},
-                'hovertemplate': 'Week: %{x}<br>Points: %{y:.2f}<extra></extra>'
-            }],
-            'layout': {
-                'title': 'Points per Week',
-                'xaxis': {'title': 'Week'},
-                'yaxis': {'title': 'Points'},
-                'height': 400,
-                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
-            }
-        }
-        charts['points'] = json.dumps(points_chart)
-    
-    if gross_scores and net_scores:
-        # Gross vs Net scores chart (mobile-friendly legend below chart)
-        scores_chart = {
-            'data': [
-                {
-                    'x': [d['week'] for d in gross_scores],
-                    'y': [round(d['score'], 2) for d in gross_scores],
-                    'type': 'scatter',
-                    'mode': 'lines+markers',
-                    'name': 'Gross Score',
-                    'line': {'color': '#ff7f0e', 'width': 3},
-                    'marker': {'size': 8},
-                    'hovertemplate': 'Week: %{x}<br>Gross Score: %{y:.2f}<extra></extra>'
-                },
-                {
-                    'x': [d['week'] for d in net_scores],
-                    'y': [round(d['score'], 2) for d in net_scores],
-                    'type': 'scatter',
-                    'mode': 'lines+markers',
-                    'name': 'Net Score',
-                    'line': {'color': '#d62728', 'width': 3},
-                    'marker': {'size': 8},
-                    'hovertemplate': 'Week: %{x}<br>Net Score: %{y:.2f}<extra></extra>'
-                }
-            ],
-            'layout': {
-                'title': 'Gross vs Net Scores',
-                'xaxis': {'title': 'Week'},
-                'yaxis': {'title': 'Score'},
-                'height': 400,
-                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 140},
-                'legend': {
-                    'orientation': 'h',
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'y': -0.3,
-                    'yanchor': 'top',
-                    'tracegroupgap': 20
-                }
-            }
-        }
-        charts['scores'] = json.dumps(scores_chart)
-    
-    if performance_vs_opponent:
-        # Performance vs opponent chart (wrap title for mobile)
-        perf_chart = {
-            'data': [{
-                'x': [d['week'] for d in performance_vs_opponent],
-                'y': [round(d['net_diff'], 2) for d in performance_vs_opponent],
-                'type': 'bar',
-                'name': 'Net Score Difference',
-                'marker': {
-                    'color': ['green' if d['net_diff'] < 0 else 'red' if d['net_diff'] > 0 else 'gray' for d in performance_vs_opponent]
-                },
-                'hovertemplate': 'Week: %{x}<br>Net Score Difference: %{y:+.2f}<extra></extra>'
-            }],
-            'layout': {
-                'title': {'text': 'Performance vs Opponent<br>(Negative = Win)', 'x': 0.5, 'xanchor': 'center'},
-                'xaxis': {'title': 'Week'},
-                'yaxis': {'title': 'Net Score Difference'},
-                'height': 400,
-                'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50}
-            }
-        }
-        charts['performance'] = json.dumps(perf_chart)
-    
-    # Hole-by-hole analysis
-    hole_stats = {}
-    scoring_breakdown = {'eagle': 0, 'birdie': 0, 'par': 0, 'bogey': 0, 'double': 0, 'triple': 0, 'worse': 0}
-    all_hole_scores = []
-    
-    # Analyze each hole
-    for hole_num in range(1, 19):
-        hole_scores = all_scores.filter(hole__number=hole_num)
-        if hole_scores.exists():
-            scores_list = list(hole_scores.values_list('score', flat=True))
-            avg_score = sum(scores_list) / len(scores_list)
-            
-            # Calculate scoring breakdown for this hole
-            hole_par = hole_scores.first().hole.par
-            for score in scores_list:
-                relative_to_par = score - hole_par
-                if relative_to_par <= -2:
-                    scoring_breakdown['eagle'] += 1
-                elif relative_to_par == -1:
-                    scoring_breakdown['birdie'] += 1
-                elif relative_to_par == 0:
-                    scoring_breakdown['par'] += 1
-                elif relative_to_par == 1:
-                    scoring_breakdown['bogey'] += 1
-                elif relative_to_par == 2:
-                    scoring_breakdown['double'] += 1
-                elif relative_to_par == 3:
-                    scoring_breakdown['triple'] += 1
-                else:
-                    scoring_breakdown['worse'] += 1
-            
-            hole_stats[hole_num] = {
-                'avg_score': round(avg_score, 2),
-                'best_score': min(scores_list),
-                'worst_score': max(scores_list),
-                'rounds_played': len(scores_list),
-                'par': hole_par,
-                'avg_vs_par': round(avg_score - hole_par, 2),
-                'scores': scores_list
-            }
-            all_hole_scores.append(avg_score)
-        else:
-            hole_stats[hole_num] = {
-                'avg_score': None,
-                'best_score': None,
-                'worst_score': None,
-                'rounds_played': 0,
-                'par': None,
-                'avg_vs_par': None,
-                'scores': []
-            }
-            all_hole_scores.append(None)
-    
-    # Find best and worst holes (by average vs par)
-    played_holes = {num: stats for num, stats in hole_stats.items() if stats['rounds_played'] > 0}
-    if played_holes:
-        best_hole = min(played_holes.items(), key=lambda x: x[1]['avg_vs_par'])
-        worst_hole = max(played_holes.items(), key=lambda x: x[1]['avg_vs_par'])
-    else:
-        best_hole = worst_hole = None
-    
-    # Calculate consistency stats
-    consistency_stats = {}
-    if played_holes:
-        # Get all rounds for this golfer in this season
-        golfer_rounds = Round.objects.filter(
-            golfer=golfer,
-            week__season=season,
-            subbing_for__isnull=True
-        ).order_by('week__number')
-        
-        if golfer_rounds.count() > 1:
-            # Calculate standard deviation of net scores (week-to-week consistency)
-            net_scores = list(golfer_rounds.values_list('net', flat=True))
-            mean_net = sum(net_scores) / len(net_scores)
-            variance = sum((score - mean_net) ** 2 for score in net_scores) / len(net_scores)
-            consistency_stats['std_dev'] = round(variance ** 0.5, 2)
-            
-            # Range of net scores
-            consistency_stats['score_range'] = round(max(net_scores) - min(net_scores), 2)
-            
-            # Rounds within 2 strokes of average
-            within_two_strokes = sum(1 for score in net_scores if abs(score - mean_net) <= 2)
-            consistency_stats['holes_within_half_stroke'] = within_two_strokes
-            consistency_stats['consistency_percentage'] = round((within_two_strokes / len(net_scores)) * 100, 1)
-        else:
-            # Fallback to hole-to-hole consistency if only one round
-            avg_scores = [stats['avg_score'] for stats in played_holes.values()]
-            mean_avg = sum(avg_scores) / len(avg_scores)
-            variance = sum((score - mean_avg) ** 2 for score in avg_scores) / len(avg_scores)
-            consistency_stats['std_dev'] = round(variance ** 0.5, 2)
-            
-            # Range of average scores
-            consistency_stats['score_range'] = round(max(avg_scores) - min(avg_scores), 2)
-            
-            # Holes within 0.5 strokes of average
-            within_half_stroke = sum(1 for score in avg_scores if abs(score - mean_avg) <= 0.5)
-            consistency_stats['holes_within_half_stroke'] = within_half_stroke
-            consistency_stats['consistency_percentage'] = round((within_half_stroke / len(avg_scores)) * 100, 1)
-    
-    # Create hole-by-hole chart showing strokes over/under par (only for holes actually played)
-    played_hole_numbers = []
-    played_hole_scores = []
-    played_hole_colors = []
-    
-    for hole_num in range(1, 19):
-        if hole_stats[hole_num]['avg_vs_par'] is not None:
-            played_hole_numbers.append(hole_num)
-            played_hole_scores.append(round(hole_stats[hole_num]['avg_vs_par'], 2))
-            # Color coding: red for over par, green for under par, gray for par
-            if hole_stats[hole_num]['avg_vs_par'] > 0:
-                played_hole_colors.append('red')
-            elif hole_stats[hole_num]['avg_vs_par'] < 0:
-                played_hole_colors.append('green')
-            else:
-                played_hole_colors.append('gray')
-    
-    if played_hole_numbers:
-        hole_chart = {
-            'data': [{
-                'x': played_hole_numbers,
-                'y': played_hole_scores,
-                'type': 'bar',
-                'name': 'Strokes vs Par',
-                'marker': {
-                    'color': played_hole_colors
-                },
-                'hovertemplate': 'Hole: %{x}<br>Avg vs Par: %{y:+.2f}<extra></extra>'
-            }],
-            'layout': {
-                'title': 'Average Strokes vs Par by Hole',
-                'xaxis': {'title': 'Hole Number'},
-                'yaxis': {'title': 'Strokes vs Par'},
-                'height': 400,
-                'margin': {'l': 50, 'r': 50, 't': 80, 'b': 50}
-            }
-        }
-        charts['hole_by_hole'] = json.dumps(hole_chart)
-    
-    context = {
-        'golfer': golfer,
-        'season': season,
-        'charts': charts,
-        'weekly_stats': weekly_stats,
-        'performance_vs_opponent': performance_vs_opponent,
-        'sub_golfers': sub_golfers,  # For dropdown
+    
+    context = {
+        'golfer': golfer,
+        'season': season,
+        'charts': charts,
+        'weekly_stats': weekly_stats,
+        'performance_vs_opponent': performance_vs_opponent,
+        'sub_golfers': sub_golfers,  # For dropdown
         
         # Season averages
         'avg_gross': round(avg_gross, 1),
@@ -2520,10 +1440,11 @@ def sub_stats(request, golfer_id=None, year=None, league_slug=None):
         'worst_hole': worst_hole,
         'consistency_stats': consistency_stats,
     }
-    
-    return render(request, 'sub_stats.html', context)
+
+    return context
 
 
+@query_budget(17)
 def scorecards(request, week, year=None, league_slug=None):
     """
     Unified scorecards view that handles both current season and past seasons.
@@ -2544,189 +1465,29 @@ def scorecards(request, week, year=None, league_slug=None):
             })
     else:
         # Use current season
-        season = get_current_season(league=league)
-        if not season:
-            return render(request, 'blank_scorecards.html', {
-                'error': 'No season found.'
-            })
-    
-    try:
-        week = Week.objects.get(number=week_number, season=season, rained_out=False)
-    except Week.DoesNotExist:
-        return render(request, 'blank_scorecards.html', {
-            'error': f'Week {week_number} not found for season {season.year}.'
-        })
-    
-    holes = list(Hole.objects.filter(
-        config=season.course_config,
-        number__in=(range(1, 10) if week.is_front else range(10, 19))
-    ).order_by('number'))
-    
-    hole_string = "Front 9" if week.is_front else "Back 9"
-    
-    total_yards = sum(h.yards for h in holes)
-
-    # Get all matchups for the week (each matchup = one scorecard)
-    matchups = Matchup.objects.filter(week=week).prefetch_related('teams__golfers')
-    
-    if not matchups.exists():
-        return render(request, 'blank_scorecards.html', {
-            'error': f'No matchups found for Week {week.number}. Please enter the schedule first.'
-        })
-    
-    # Get all golfer matchups for the week
-    golfer_matchups = GolferMatchup.objects.filter(week=week).select_related(
-        'golfer', 'opponent', 'subbing_for_golfer'
-    )
-    
-    # Get all rounds for the week
-    rounds = Round.objects.filter(week=week).select_related(
-        'golfer', 'golfer_matchup', 'handicap'
-    ).prefetch_related('scores', 'points')
-    
-    cards = []
-    
-    for matchup in matchups:
-        teams = list(matchup.teams.all())
-            
-        team1, team2 = teams[0], teams[1]
-        
-        # Check if this is a virtual matchup (one team absent, replaced by random drawn team)
-        random_drawn_team = RandomDrawnTeam.objects.filter(week=week, absent_team__in=[team1, team2]).first()
-        
-        # Get all golfers from both teams
-        team1_golfers = list(team1.golfers.all())
-        team2_golfers = list(team2.golfers.all())
-        
-        # Find golfer matchups for each team's golfers
-        # We need to get ALL golfer matchups for each team, not just one per golfer
-        # This handles no_sub scenarios where the same golfer appears in both A and B positions
-        team1_golfer_matchups = []
-        team2_golfer_matchups = []
-        
-        # Get all golfer matchups for team1 (both A and B positions)
-        team1_golfer_matchups = list(golfer_matchups.filter(
-            Q(golfer__in=team1_golfers) | Q(subbing_for_golfer__in=team1_golfers)
-        ))
-        
-        # Get all golfer matchups for team2 (both A and B positions)
-        team2_golfer_matchups = list(golfer_matchups.filter(
-            Q(golfer__in=team2_golfers) | Q(subbing_for_golfer__in=team2_golfers)
-        ))
-        
-        # Sort golfer matchups by is_A (A golfers first)
-        team1_golfer_matchups.sort(key=lambda x: not x.is_A)  # True (A) comes before False (B)
-        team2_golfer_matchups.sort(key=lambda x: not x.is_A)  # True (A) comes before False (B)
-        
-        # Create card data structure
-        card = {
-            'team1_golferA': None,
-            'team1_golferB': None,
-            'team2_golferA': None,
-            'team2_golferB': None,
-            'is_virtual_matchup': False,
-            'virtual_team_info': None,
-        }
-        
-        # Handle virtual matchups
-        if random_drawn_team:
-            card['is_virtual_matchup'] = True
-            
-            # Determine which team is present and which is absent
-            absent_team = random_drawn_team.absent_team
-            drawn_team = random_drawn_team.drawn_team
-            
-            if absent_team == team1:
-                # Team1 is absent, team2 is present
-                present_team_matchups = team2_golfer_matchups
-                present_team_prefix = 'team2'
-                absent_team_prefix = 'team1'
-            else:
-                # Team2 is absent, team1 is present  
-                present_team_matchups = team1_golfer_matchups
-                present_team_prefix = 'team1'
-                absent_team_prefix = 'team2'
-            
-            # Process present team normally
-            for i, golfer_matchup in enumerate(present_team_matchups[:2]):
-                golfer_data = _build_golfer_data(golfer_matchup, rounds, holes, week)
-                if i == 0:
-                    card[f'{present_team_prefix}_golferA'] = golfer_data
-                else:
-                    card[f'{present_team_prefix}_golferB'] = golfer_data
-            
-            # Create virtual data for absent team showing drawn team info
-            drawn_team_golfers = list(drawn_team.golfers.all())
-            card['virtual_team_info'] = {
-                'absent_team': absent_team,
-                'drawn_team': drawn_team,
-                'drawn_golfers': drawn_team_golfers
-            }
-            
-            # Create placeholder data for absent team positions
-            if len(drawn_team_golfers) >= 2:
-                # Sort drawn team golfers by handicap to determine A/B
-                drawn_golfer_hcps = []
-                for golfer in drawn_team_golfers:
-                    hcp_obj = Handicap.objects.filter(golfer=golfer, week=week).first()
-                    hcp = hcp_obj.handicap if hcp_obj else 0
-                    drawn_golfer_hcps.append((golfer, hcp))
-                
-                # Sort by handicap (lower handicap = A golfer)
-                drawn_golfer_hcps.sort(key=lambda x: x[1])
-                
-                for i, (golfer, hcp) in enumerate(drawn_golfer_hcps[:2]):
-                    virtual_golfer_data = {
-                        'golfer': golfer,
-                        'is_sub': False,
-                        'sub_for': None,
-                        'hcp': hcp,
-                        'scores': ['--' for _ in holes],
-                        'hole_points': ['--' for _ in holes],
-                        'stroke_info': [0 for _ in holes],
-                        'score_classes': ['' for _ in holes],
-                        'gross': '--',
-                        'net': '--',
-                        'round_points': '--',
-                        'total_points': '--',
-                        'is_virtual': True,
-                        'virtual_note': f'Drawn team playing for {absent_team}'
-                    }
-                    
-                    if i == 0:
-                        card[f'{absent_team_prefix}_golferA'] = virtual_golfer_data
-                    else:
-                        card[f'{absent_team_prefix}_golferB'] = virtual_golfer_data
-        else:
-            # Normal matchup - process both teams normally
-            for i, golfer_matchup in enumerate(team1_golfer_matchups[:2]):
-                golfer_data = _build_golfer_data(golfer_matchup, rounds, holes, week)
-                if i == 0:
-                    card['team1_golferA'] = golfer_data
-                else:
-                    card['team1_golferB'] = golfer_data
-            
-            for i, golfer_matchup in enumerate(team2_golfer_matchups[:2]):
-                golfer_data = _build_golfer_data(golfer_matchup, rounds, holes, week)
-                if i == 0:
-                    card['team2_golferA'] = golfer_data
-                else:
-                    card['team2_golferB'] = golfer_data
-        
-        # Add card if we have at least one golfer from each team (including virtual)
-        if card['team1_golferA'] or card['team1_golferB'] or card['team2_golferA'] or card['team2_golferB']:
-            cards.append(card)
+        season = get_current_season(league=league)
+        if not season:
+            return render(request, 'blank_scorecards.html', {
+                'error': 'No season found.'
+            })
     
-    context = {
-        "week_number": week_number,
-        "holes": holes,
-        "hole_string": hole_string,
-        "cards": cards,
-        "total": total_yards,
-        "week": week,
-        "hole_pars": [hole.par for hole in holes],
-        "season": week.season,
-    }
+    try:
+        week = Week.objects.get(number=week_number, season=season, rained_out=False)
+    except Week.DoesNotExist:
+        return render(request, 'blank_scorecards.html', {
+            'error': f'Week {week_number} not found for season {season.year}.'
+        })
+    
+    # Cards are rebuilt only when the season's data changes
+    data_version = season_version(season)
+    context = _scorecards_page_context(week, data_version)
+
+    if context is None:
+        return render(request, 'blank_scorecards.html', {
+            'error': f'No matchups found for Week {week.number}. Please enter the schedule first.'
+        })
+
+    context = {**context, 'week_number': week_number, 'data_version': data_version, 'page_cache_timeout': page_cache_timeout()}
     
     # Add year to context if it's a past season
     if year is not None:
@@ -2735,6 +1496,43 @@ def scorecards(request, week, year=None, league_slug=None):
     return render(request, 'scorecards.html', context)
 
 
+def _scorecards_page_context(week, data_version):
+    return cached_context(
+        'scorecards', data_version, lambda: _scorecards_context(week), week.season_id, week.number
+    )
+
+
+@page_warmer
+def _warm_scorecards(season):
+    data_version = season_version(season)
+    for week in Week.objects.filter(season=season, rained_out=False).select_related('season'):
+        _scorecards_page_context(week, data_version)
+
+
+def _scorecards_context(week):
+    """Scorecards page context for ``week``, or None if its schedule has not been entered."""
+    holes = list(Hole.objects.filter(
+        config=week.season.course_config,
+        number__in=(range(1, 10) if week.is_front else range(10, 19))
+    ).order_by('number'))
+
+    # Each matchup is one scorecard
+    week_scorecards = WeekScorecards(week, holes)
+    if not week_scorecards.matchups:
+        return None
+
+    return {
+        "holes": holes,
+        "hole_string": "Front 9" if week.is_front else "Back 9",
+        "cards": week_scorecards.cards(),
+        "total": sum(h.yards for h in holes),
+        "week": week,
+        "hole_pars": [hole.par for hole in holes],
+        "season": week.season,
+    }
+
+
+@query_budget(8)
 @league_manager_required
 def set_rainout(request, league_slug=None, year=None):
     season, league = _management_season(league_slug, year)
@@ -2755,6 +1553,8 @@ def set_rainout(request, league_slug=None, year=None):
     })
 
 
+# Repeats: both golfer fields list the league's golfers
+@query_budget(9, duplicates=1)
 @league_manager_required
 def create_team(request, league_slug=None, year=None):
     season, league = _management_season(league_slug, year)
@@ -2787,6 +1587,7 @@ def create_team(request, league_slug=None, year=None):
     return render(request, 'create_team.html', {'form': form})
 
 
+@query_budget(3)
 @user_passes_test(lambda u: u.is_superuser)
 def set_holes(request):
     course_configs = CourseConfig.objects.select_related('course').order_by('course__name', 'name')
@@ -2854,6 +1655,24 @@ def set_holes(request):
     )
 
 
+@query_budget(5)
+@user_passes_test(lambda u: u.is_superuser)
+def request_profiles(request):
+    """Per-view timings collected by the request profiling middleware (superuser only)."""
+    if request.method == 'POST':
+        clear_profiles()
+        messages.success(request, 'Request profiles cleared.')
+        return redirect('request_profiles')
+    return render(request, 'request_profiles.html', {
+        'rows': view_summaries(),
+        'enabled': profiling_enabled(),
+        'sample_rate': sample_rate(),
+        'window': profile_window(),
+    })
+
+
+# Repeats: the course list renders in two places
+@query_budget(5, duplicates=1)
 @user_passes_test(lambda u: u.is_superuser)
 def manage_courses(request):
     """Create/edit courses and course layouts (not league-scoped)."""
@@ -2949,6 +1768,7 @@ def manage_courses(request):
     return _render(course_form, config_form, editing_course, editing_config)
 
 
+@query_budget(11)
 @league_manager_required
 def generate_rounds_page(request, league_slug=None, year=None):
     """View for generating rounds for a specific week"""
@@ -2968,8 +1788,25 @@ def generate_rounds_page(request, league_slug=None, year=None):
         generate_matchups_only = request.POST.get('generate_matchups_only')
         generate_handicaps_only = request.POST.get('generate_handicaps_only')
         generate_rounds_only = request.POST.get('generate_rounds_only')
+        recompute_id = request.POST.get('recompute_id')
 
-        if recalc_all:
+        if recompute_id:
+            recompute = SeasonRecompute.objects.filter(pk=recompute_id, season__league=league, status='failed').first()
+            if recompute is None:
+                message = "That recalculation is no longer waiting to be resumed."
+                message_type = "error"
+            elif request.POST.get('resume_recompute'):
+                if resume_season_recompute(recompute):
+                    message = f"Resumed the recalculation of the {recompute.season.year} season from where it stopped."
+                    message_type = "success"
+                else:
+                    message = f"The {recompute.season.year} season is busy; a full recalculation will start once the running task finishes."
+                    message_type = "warning"
+            else:
+                abandon_season_recompute(recompute)
+                message = f"Abandoned the recalculation of the {recompute.season.year} season; its pages now show the data as it is."
+                message_type = "success"
+        elif recalc_all:
             # Recalculate all data for the current season
             try:
                 current_season = mgmt_season
@@ -2978,7 +1815,7 @@ def generate_rounds_page(request, league_slug=None, year=None):
                     message_type = "error"
                 else:
                     # Start async task for complete recalculation
-                    recalculate_all_async.delay(current_season.pk)
+                    request_task(recalculate_all_async, current_season.pk)
                     
                     message = f"Started async recalculation of all data for {current_season.year} season. Task is running in the background."
                     message_type = "success"
@@ -2992,7 +1829,7 @@ def generate_rounds_page(request, league_slug=None, year=None):
                     raise Week.DoesNotExist
 
                 # Start async task for generating golfer matchups for specific week
-                generate_matchups_async.delay(week.id)
+                request_task(generate_matchups_async, week.id)
                 
                 message = f"Started async generation of golfer matchups for Week {week.number} ({week.date.date()}). Task is running in the background."
                 message_type = "success"
@@ -3030,7 +1867,7 @@ def generate_rounds_page(request, league_slug=None, year=None):
 
                 # Start async tasks for all operations
                 calculate_handicaps_async.delay(week.season.pk)
-                generate_matchups_async.delay(week.id)
+                request_task(generate_matchups_async, week.id)
                 generate_rounds_async.delay(week.season.pk)
                 set_skin_winners_async.delay(week.id)
                 
@@ -3053,18 +1890,33 @@ def generate_rounds_page(request, league_slug=None, year=None):
         'weeks': weeks,
         'message': message,
         'message_type': message_type,
+        'season': mgmt_season,
+        'task_runs': season_task_runs(mgmt_season),
     }
 
     return render(request, 'generate_rounds.html', context)
 
 
+def _round_leader(round_objs, field, highest=False):
+    """First round with the lowest (or highest) ``field``; missing values count as 0."""
+    key = lambda round_obj: getattr(round_obj, field) or 0
+    return max(round_objs, key=key) if highest else min(round_objs, key=key)
+
+
+def _top_ten(entries, key, rank_key, reverse=False):
+    """The ``entries`` ranked 10 or better by ``key``, ties included, each with its rank under ``rank_key``."""
+    ranked = []
+    for rank, entry in rank_with_ties(entries, key, 10, reverse=reverse):
+        entry[rank_key] = rank
+        ranked.append(entry)
+    return ranked
+
+
+@query_budget(13)
 def league_stats(request, year=None, league_slug=None):
     """
     View for league-wide statistics and leaderboards
     """
-    import json
-    from django.db.models import Avg, Count, Min, Max, Q
-    
     league = resolve_league(league_slug)
     # Get season - either specified year or current season
     if year is not None:
@@ -3077,6 +1929,25 @@ def league_stats(request, year=None, league_slug=None):
     if not season:
         return redirect_home(league, year)
     
+    context = _league_stats_page_context(season)
+    return render(request, 'league_stats.html', context)
+
+
+def _league_stats_page_context(season):
+    return cached_context('league_stats', season_version(season), lambda: _league_stats_context(season), season.pk)
+
+
+@page_warmer
+def _warm_league_stats(season):
+    _league_stats_page_context(season)
+
+
+def _league_stats_context(season):
+    """League-wide statistics and leaderboards for ``season``."""
+    import json
+    from collections import defaultdict
+    from django.db.models import Avg
+
     # Get all weeks for the season
     weeks = Week.objects.filter(season=season, rained_out=False).order_by('number')
     
@@ -3086,29 +1957,30 @@ def league_stats(request, year=None, league_slug=None):
         subbing_for__isnull=True  # Exclude sub rounds
     ).select_related('golfer', 'week', 'handicap').order_by('week__number')
     
-    # Get all scores for hole-by-hole analysis (excluding subs)
-    all_scores = Score.objects.filter(
-        week__season=season,
-        round__subbing_for__isnull=True  # Exclude scores from sub rounds
-    ).select_related('hole', 'week', 'golfer').order_by('hole__number', 'week__number')
+    round_list = list(rounds)
+    rounds_by_week = defaultdict(list)
+    for round_obj in round_list:
+        rounds_by_week[round_obj.week_id].append(round_obj)
     
     # League Averages
     league_stats = {}
     
     # Overall averages
-    if rounds.exists():
-        league_stats['avg_gross'] = rounds.aggregate(avg=Avg('gross'))['avg']
-        league_stats['avg_net'] = rounds.aggregate(avg=Avg('net'))['avg']
-        league_stats['avg_points'] = rounds.aggregate(avg=Avg('total_points'))['avg']
-        league_stats['avg_handicap'] = rounds.aggregate(avg=Avg('handicap__handicap'))['avg']
+    if round_list:
+        league_stats.update(rounds.aggregate(
+            avg_gross=Avg('gross'),
+            avg_net=Avg('net'),
+            avg_points=Avg('total_points'),
+            avg_handicap=Avg('handicap__handicap'),
+        ))
         
         # Best and worst scores
-        best_gross = rounds.order_by('gross').first()
-        worst_gross = rounds.order_by('-gross').first()
-        best_net = rounds.order_by('net').first()
-        worst_net = rounds.order_by('-net').first()
-        best_points = rounds.order_by('-total_points').first()
-        worst_points = rounds.order_by('total_points').first()
+        best_gross = _round_leader(round_list, 'gross')
+        worst_gross = _round_leader(round_list, 'gross', highest=True)
+        best_net = _round_leader(round_list, 'net')
+        worst_net = _round_leader(round_list, 'net', highest=True)
+        best_points = _round_leader(round_list, 'total_points', highest=True)
+        worst_points = _round_leader(round_list, 'total_points')
         
         league_stats['best_gross'] = {
             'score': best_gross.gross,
@@ -3144,13 +2016,13 @@ def league_stats(request, year=None, league_slug=None):
     # Weekly Leaders
     weekly_leaders = []
     for week in weeks:
-        week_rounds = rounds.filter(week=week)
-        if week_rounds.exists():
-            best_gross_week = week_rounds.order_by('gross').first()
-            worst_gross_week = week_rounds.order_by('-gross').first()
-            best_net_week = week_rounds.order_by('net').first()
-            worst_net_week = week_rounds.order_by('-net').first()
-            best_points_week = week_rounds.order_by('-total_points').first()
+        week_rounds = rounds_by_week.get(week.id)
+        if week_rounds:
+            best_gross_week = _round_leader(week_rounds, 'gross')
+            worst_gross_week = _round_leader(week_rounds, 'gross', highest=True)
+            best_net_week = _round_leader(week_rounds, 'net')
+            worst_net_week = _round_leader(week_rounds, 'net', highest=True)
+            best_points_week = _round_leader(week_rounds, 'total_points', highest=True)
             
             weekly_leaders.append({
                 'week': week.number,
@@ -3178,98 +2050,43 @@ def league_stats(request, year=None, league_slug=None):
                 }
             })
     
-    # Hole-by-hole league averages and scoring distribution counts
+    # Hole-by-hole league averages and scoring distribution counts, read from the distribution cube
     hole_stats = {}
-    for hole_num in range(1, 19):
-        hole_scores = all_scores.filter(hole__number=hole_num)
-        if hole_scores.exists():
-            avg_score = hole_scores.aggregate(avg=Avg('score'))['avg']
-            best_score = hole_scores.aggregate(min=Min('score'))['min']
-            worst_score = hole_scores.aggregate(max=Max('score'))['max']
-            total_rounds = hole_scores.count()
-
-            # Get par for this hole
-            hole_par = hole_scores.first().hole.par
-
-            # Per-hole scoring distribution (exclude eagles per request)
-            eagle_count = 0
-            birdie_count = 0
-            par_count = 0
-            bogey_count = 0
-            double_count = 0
-            triple_count = 0
-            worse_count = 0
-            for score_obj in hole_scores:
-                relative_to_par = score_obj.score - hole_par
-                if relative_to_par <= -2:
-                    eagle_count += 1
-                elif relative_to_par == -1:
-                    birdie_count += 1
-                elif relative_to_par == 0:
-                    par_count += 1
-                elif relative_to_par == 1:
-                    bogey_count += 1
-                elif relative_to_par == 2:
-                    double_count += 1
-                elif relative_to_par == 3:
-                    triple_count += 1
-                elif relative_to_par > 3:
-                    worse_count += 1
-
-            hole_stats[hole_num] = {
-                'avg_score': round(avg_score, 2),
-                'best_score': best_score,
-                'worst_score': worst_score,
-                'total_rounds': total_rounds,
-                'par': hole_par,
-                'avg_vs_par': round(avg_score - hole_par, 2),
-                'eagle_count': eagle_count,
-                'birdie_count': birdie_count,
-                'par_count': par_count,
-                'bogey_count': bogey_count,
-                'double_count': double_count,
-                'triple_count': triple_count,
-                'worse_count': worse_count,
-            }
+    scoring_breakdown = dict.fromkeys(SCORING_BUCKETS, 0)
+    total_holes = 0
+    for hole_num, hole in hole_distribution(season).items():
+        hole_par = hole['par']
+        counts = hole['counts']
+        hole_total = sum(counts.values())
+        avg_score = sum((hole_par + to_par) * count for to_par, count in counts.items()) / hole_total
+        buckets = bucket_counts(counts)
+
+        hole_stats[hole_num] = {
+            'avg_score': round(avg_score, 2),
+            'best_score': hole_par + min(counts),
+            'worst_score': hole_par + max(counts),
+            'total_rounds': hole_total,
+            'par': hole_par,
+            'avg_vs_par': round(avg_score - hole_par, 2),
+            'eagle_count': buckets['eagle'],
+            'birdie_count': buckets['birdie'],
+            'par_count': buckets['par'],
+            'bogey_count': buckets['bogey'],
+            'double_count': buckets['double'],
+            'triple_count': buckets['triple'],
+            'worse_count': buckets['worse'],
+        }
+        for score_type, count in buckets.items():
+            scoring_breakdown[score_type] += count
+        total_holes += hole_total
     
     # Compute per-column maxima for hole scoring distribution
     hole_stats_column_max = {}
     if hole_stats:
-        distribution_keys = [
-            'eagle_count', 'birdie_count', 'par_count',
-            'bogey_count', 'double_count', 'triple_count', 'worse_count'
-        ]
-        for key in distribution_keys:
-            values = [stats.get(key, 0) for stats in hole_stats.values()]
-            hole_stats_column_max[key] = max(values) if values else 0
+        for score_type in SCORING_BUCKETS:
+            key = f'{score_type}_count'
+            hole_stats_column_max[key] = max(stats[key] for stats in hole_stats.values())
 
-    # Scoring breakdown (eagles, birdies, pars, etc.)
-    scoring_breakdown = {'eagle': 0, 'birdie': 0, 'par': 0, 'bogey': 0, 'double': 0, 'triple': 0, 'worse': 0}
-    total_holes = 0
-    
-    for hole_num in range(1, 19):
-        hole_scores = all_scores.filter(hole__number=hole_num)
-        if hole_scores.exists():
-            hole_par = hole_scores.first().hole.par
-            for score_obj in hole_scores:
-                score = score_obj.score
-                relative_to_par = score - hole_par
-                if relative_to_par <= -2:
-                    scoring_breakdown['eagle'] += 1
-                elif relative_to_par == -1:
-                    scoring_breakdown['birdie'] += 1
-                elif relative_to_par == 0:
-                    scoring_breakdown['par'] += 1
-                elif relative_to_par == 1:
-                    scoring_breakdown['bogey'] += 1
-                elif relative_to_par == 2:
-                    scoring_breakdown['double'] += 1
-                elif relative_to_par == 3:
-                    scoring_breakdown['triple'] += 1
-                else:
-                    scoring_breakdown['worse'] += 1
-                total_holes += 1
-    
     # Calculate percentages
     scoring_percentages = {}
     for score_type, count in scoring_breakdown.items():
@@ -3280,8 +2097,10 @@ def league_stats(request, year=None, league_slug=None):
     
     # Golfer performance rankings
     golfer_stats = {}
-    for round_obj in rounds:
+    net_scores_by_golfer = defaultdict(list)
+    for round_obj in round_list:
         golfer_name = round_obj.golfer.name
+        net_scores_by_golfer[golfer_name].append(round_obj.net)
         if golfer_name not in golfer_stats:
             golfer_stats[golfer_name] = {
                 'rounds_played': 0,
@@ -3340,26 +2159,16 @@ def league_stats(request, year=None, league_slug=None):
                 'total_points': stats['total_points']
             })
     
-    # Sort rankings
-    gross_rankings = sorted(golfer_rankings, key=lambda x: x['avg_gross'])
-    net_rankings = sorted(golfer_rankings, key=lambda x: x['avg_net'])
-    points_rankings = sorted(golfer_rankings, key=lambda x: x['avg_points'], reverse=True)
-    
-    # Add rankings to each golfer
-    for i, golfer in enumerate(gross_rankings):
-        golfer['gross_rank'] = i + 1
-    for i, golfer in enumerate(net_rankings):
-        golfer['net_rank'] = i + 1
-    for i, golfer in enumerate(points_rankings):
-        golfer['points_rank'] = i + 1
+    # Top 10 rankings, ties included
+    gross_rankings = _top_ten(golfer_rankings, 'avg_gross', 'gross_rank')
+    net_rankings = _top_ten(golfer_rankings, 'avg_net', 'net_rank')
+    points_rankings = _top_ten(golfer_rankings, 'avg_points', 'points_rank', reverse=True)
     
     # Most consistent golfer (lowest standard deviation of net scores)
     consistency_rankings = []
     for golfer_name, stats in golfer_stats.items():
         if stats['rounds_played'] > 1:
-            # Get all net scores for this golfer
-            golfer_rounds = rounds.filter(golfer__name=golfer_name)
-            net_scores = list(golfer_rounds.values_list('net', flat=True))
+            net_scores = net_scores_by_golfer[golfer_name]
             
             # Calculate standard deviation of net scores (round-to-round consistency)
             mean_net = sum(net_scores) / len(net_scores)
@@ -3372,58 +2181,32 @@ def league_stats(request, year=None, league_slug=None):
                 'rounds_played': stats['rounds_played']
             })
     
-    consistency_rankings.sort(key=lambda x: x['std_dev'])
-    for i, golfer in enumerate(consistency_rankings):
-        golfer['rank'] = i + 1
+    consistency_rankings = _top_ten(consistency_rankings, 'std_dev', 'rank')
     
     # Money/Earnings Analysis
     money_stats = {}
     
-    # Calculate skins money (season-configurable)
-    skin_entries = SkinEntry.objects.filter(week__season=season)
-    total_skins_wagered = skin_entries.count() * (season.skins_entry_fee if getattr(season, 'playing_skins', False) else 0)
-    
-    # Calculate skins won by golfer
+    # Skins and games money from the payout ledger (only counted when the season plays them)
+    payouts = live_payouts(week__season=season)
+    totals = payout_totals(payouts)
+    total_skins_wagered = totals['skins_wagered']
+    total_games_wagered = totals['games_wagered']
+
     golfer_skins_won = {}
-    for week in weeks:
-        if getattr(season, 'playing_skins', False):
-            skin_winners = calculate_skin_winners(week)
-        else:
-            skin_winners = None
-        if skin_winners:
-            # Calculate payout for this week
-            week_skin_entries = SkinEntry.objects.filter(week=week)
-            week_skins_pot = week_skin_entries.count() * week.season.skins_entry_fee
-            skin_winner_payout = week_skins_pot / len(skin_winners) if len(skin_winners) > 0 else 0
-            
-            # Group by golfer
-            for winner in skin_winners:
-                golfer_name = winner['golfer'].name
-                if golfer_name not in golfer_skins_won:
-                    golfer_skins_won[golfer_name] = 0
-                golfer_skins_won[golfer_name] += skin_winner_payout
-    
-    # Calculate games money
-    game_entries = GameEntry.objects.filter(week__season=season)
-    total_games_wagered = game_entries.count() * (season.game_entry_fee if getattr(season, 'playing_games', False) else 0)
-    
-    # Calculate games won by golfer
     golfer_games_won = {}
-    for week in weeks:
-        game_winners = GameEntry.objects.filter(week=week, winner=True).select_related('golfer', 'game') if getattr(season, 'playing_games', False) else GameEntry.objects.none()
-        if game_winners.exists():
-            # Calculate payout for this week
-            week_game_entries = GameEntry.objects.filter(week=week)
-            week_games_pot = week_game_entries.count() * week.season.game_entry_fee
-            game_winner_payout = week_games_pot / game_winners.count() if game_winners.count() > 0 else 0
-            
-            # Group by golfer
-            for winner in game_winners:
-                golfer_name = winner.golfer.name
-                if golfer_name not in golfer_games_won:
-                    golfer_games_won[golfer_name] = 0
-                golfer_games_won[golfer_name] += game_winner_payout
-    
+    golfer_total_wagered = {}
+    for row in payout_totals(payouts, 'golfer__name'):
+        golfer_name = row['golfer__name']
+        if row['skins_won']:
+            golfer_skins_won[golfer_name] = row['skins_won']
+        if row['games_won']:
+            golfer_games_won[golfer_name] = row['games_won']
+        golfer_total_wagered[golfer_name] = {
+            'skins_wagered': row['skins_wagered'],
+            'games_wagered': row['games_wagered'],
+            'total_wagered': row['skins_wagered'] + row['games_wagered'],
+        }
+
     # Calculate total earnings by golfer
     golfer_total_earnings = {}
     all_golfers = set(list(golfer_skins_won.keys()) + list(golfer_games_won.keys()))
@@ -3439,31 +2222,14 @@ def league_stats(request, year=None, league_slug=None):
             'total_earned': round(total_earned, 2)
         }
     
-    # Create sorted leaderboard (will enrich with wagers and net)
-    sorted_earnings = sorted(
-        golfer_total_earnings.items(), 
-        key=lambda x: x[1]['total_earned'], 
-        reverse=True
-    )
-
-    # Calculate wagered by golfer (season only)
-    golfer_total_wagered = {}
-    for golfer_name, _ in sorted_earnings:
-        skins_entries = SkinEntry.objects.filter(week__season=season, golfer__name=golfer_name).count()
-        games_entries = GameEntry.objects.filter(week__season=season, golfer__name=golfer_name).count()
-        skins_wagered = skins_entries * (season.skins_entry_fee if getattr(season, 'playing_skins', False) else 0)
-        games_wagered = games_entries * (season.game_entry_fee if getattr(season, 'playing_games', False) else 0)
-        golfer_total_wagered[golfer_name] = {
-            'skins_wagered': skins_wagered,
-            'games_wagered': games_wagered,
-            'total_wagered': skins_wagered + games_wagered,
-        }
-
-    # Enrich leaderboard with wagers and net winnings (limit top 10 by total earned)
+    # Top 10 by total earned, ties included, with wagers and net winnings
     earnings_leaderboard = []
-    for golfer_name, earnings in sorted_earnings[:10]:
+    for rank, (golfer_name, earnings) in rank_with_ties(
+        sorted(golfer_total_earnings.items()), lambda x: x[1]['total_earned'], 10, reverse=True
+    ):
         wagers = golfer_total_wagered.get(golfer_name, {'skins_wagered': 0, 'games_wagered': 0, 'total_wagered': 0})
         earnings_leaderboard.append({
+            'rank': rank,
             'golfer': golfer_name,
             'skins_earned': earnings['skins_earned'],
             'games_earned': earnings['games_earned'],
@@ -3555,20 +2321,22 @@ def league_stats(request, year=None, league_slug=None):
         'hole_stats_column_max': hole_stats_column_max,
         'scoring_breakdown': scoring_breakdown,
         'scoring_percentages': scoring_percentages,
-        'gross_rankings': gross_rankings[:10],  # Top 10
-        'net_rankings': net_rankings[:10],      # Top 10
-        'points_rankings': points_rankings[:10], # Top 10
-        'consistency_rankings': consistency_rankings[:10], # Top 10
+        'gross_rankings': gross_rankings,
+        'net_rankings': net_rankings,
+        'points_rankings': points_rankings,
+        'consistency_rankings': consistency_rankings,
         'charts': charts,
-        'total_rounds': rounds.count(),
+        'total_rounds': len(round_list),
         'total_golfers': len(golfer_stats),
         'total_holes': total_holes,
         'money_stats': money_stats,
     }
-    
-    return render(request, 'league_stats.html', context)
+
+    return context
 
 
+# Repeats: the view and the form each look up the next week
+@query_budget(18, duplicates=1)
 @league_manager_required
 def manage_skins(request, league_slug=None, year=None):
     """View for managing skins entries and automatically calculating winners"""
@@ -3595,6 +2363,8 @@ def manage_skins(request, league_slug=None, year=None):
                         golfer=golfer,
                         week=week
                     )
+                # Resettle the week so its results and payouts include the new entries
+                mark_skin_winners(SeasonSkins(week.season, [week]))
                 message = f"Successfully added {len(golfers)} golfers to skins for Week {week.number}"
                 message_type = "success"
             else:
@@ -3614,27 +2384,30 @@ def manage_skins(request, league_slug=None, year=None):
     # Get skins entries for current season
     skins_entries = {}
     if current_season:
-        weeks = Week.objects.filter(season=current_season).order_by('-number')
+        weeks = Week.objects.filter(season=current_season).select_related('season__league').order_by('-number')
+        entries_by_week = {}
+        for entry in SkinEntry.objects.filter(week__season=current_season).select_related('golfer').order_by('id'):
+            entries_by_week.setdefault(entry.week_id, []).append(entry)
+        winners_by_week = stored_skin_winners(season=current_season)
+        pots = {
+            row['week_id']: row['skins_wagered']
+            for row in payout_totals(Payout.objects.filter(week__season=current_season), 'week_id')
+        }
         for week in weeks:
-            entries = SkinEntry.objects.filter(week=week).select_related('golfer')
-            if entries.exists():
-                # Calculate skin winners for display
-                skin_winners = calculate_skin_winners(week)
-                # Calculate individual payouts
-                total_pot = entries.count() * (week.season.skins_entry_fee)
+            entries = entries_by_week.get(week.id)
+            if entries:
+                skin_winners = winners_by_week.get(week.id, [])
+                total_pot = pots.get(week.id, 0)
                 if skin_winners:
                     # Each skin is worth total pot divided by number of skins
-                    per_skin_value = total_pot / len(skin_winners)
+                    per_skin_value = skin_winners[0]['payout']
                     # Count how many skins each golfer won
                     golfer_skin_counts = {}
                     for winner in skin_winners:
                         golfer_name = winner['golfer'].name
-                        if golfer_name not in golfer_skin_counts:
-                            golfer_skin_counts[golfer_name] = 0
-                        golfer_skin_counts[golfer_name] += 1
+                        golfer_skin_counts[golfer_name] = golfer_skin_counts.get(golfer_name, 0) + 1
                     # Calculate individual payouts (per skin value × number of skins won)
                     for winner in skin_winners:
-                        winner['payout'] = per_skin_value
                         winner['total_payout'] = golfer_skin_counts[winner['golfer'].name] * per_skin_value
                 else:
                     per_skin_value = 0
@@ -3654,6 +2427,8 @@ def manage_skins(request, league_slug=None, year=None):
     return render(request, 'manage_skins.html', context)
 
 
+# Repeats: each of the three forms lists the season's weeks, and the next week is looked up twice
+@query_budget(20, duplicates=4)
 @league_manager_required
 def manage_games(request, league_slug=None, year=None):
     """View for managing game entries and winners"""
@@ -3700,6 +2475,7 @@ def manage_games(request, league_slug=None, year=None):
                             week=week,
                             game=game
                         )
+                    record_game_payouts([week])
                     return _manage_games_redirect(league, nav_year, week.id)
             else:
                 message = "Please correct the errors below."
@@ -3722,6 +2498,7 @@ def manage_games(request, league_slug=None, year=None):
                         game_entry = GameEntry.objects.get(golfer=winner, week=week, game=game)
                         game_entry.winner = True
                         game_entry.save()
+                        record_game_payouts([week])
                         return _manage_games_redirect(league, nav_year, week.id)
                     else:
                         message = f"{winner.name} is not in {game.name} for Week {week.number}"
@@ -3759,10 +2536,13 @@ def manage_games(request, league_slug=None, year=None):
     # Get game entries for current season
     game_entries = {}
     if current_season:
-        weeks = Week.objects.filter(season=current_season).order_by('-number')
+        weeks = Week.objects.filter(season=current_season).select_related('season__league').order_by('-number')
+        entries_by_week = {}
+        for entry in GameEntry.objects.filter(week__season=current_season).select_related('golfer', 'game'):
+            entries_by_week.setdefault(entry.week_id, []).append(entry)
         for week in weeks:
-            entries = GameEntry.objects.filter(week=week).select_related('golfer', 'game')
-            if entries.exists():
+            entries = entries_by_week.get(week.id)
+            if entries:
                 # Calculate payouts for each game
                 game_data = {}
                 for entry in entries:
@@ -3798,6 +2578,8 @@ def manage_games(request, league_slug=None, year=None):
     return render(request, 'manage_games.html', context)
 
 
+# Repeats: the golfer matchup auto-heal reloads the team golfers
+@query_budget(21, duplicates=1)
 @league_manager_required
 def blank_scorecards(request, league_slug=None, year=None):
     """View for blank scorecards for the next week to be played"""
@@ -3834,15 +2616,23 @@ def blank_scorecards(request, league_slug=None, year=None):
     matchups = Matchup.objects.filter(week=week).prefetch_related('teams__golfers')
     
     # Get all golfer matchups for the week
-    golfer_matchups = GolferMatchup.objects.filter(week=week).select_related(
+    golfer_matchups = list(GolferMatchup.objects.filter(week=week).select_related(
         'golfer', 'opponent', 'subbing_for_golfer'
-    )
+    ).order_by('id'))
     
-    if not golfer_matchups.exists():
+    if not golfer_matchups:
         return render(request, 'blank_scorecards.html', {
             'error': f'No golfer matchups found for Week {week.number}. Please generate rounds first.'
         })
     
+    # Index golfer matchups by the rostered golfer they cover, first match wins
+    matchup_by_golfer = {}
+    for golfer_matchup in golfer_matchups:
+        matchup_by_golfer.setdefault(golfer_matchup.golfer_id, golfer_matchup)
+        if golfer_matchup.subbing_for_golfer_id:
+            matchup_by_golfer.setdefault(golfer_matchup.subbing_for_golfer_id, golfer_matchup)
+    handicaps = dict(Handicap.objects.filter(week=week).values_list('golfer_id', 'handicap'))
+    
     cards = []
     
     for matchup in matchups:
@@ -3855,26 +2645,8 @@ def blank_scorecards(request, league_slug=None, year=None):
         team2_golfers = list(team2.golfers.all())
         
         # Find golfer matchups for each team's golfers
-        team1_golfer_matchups = []
-        team2_golfer_matchups = []
-        
-        # For team1 golfers
-        for golfer in team1_golfers:
-            golfer_matchup = golfer_matchups.filter(
-                Q(golfer=golfer) | Q(subbing_for_golfer=golfer)
-            ).first()
-            
-            if golfer_matchup:
-                team1_golfer_matchups.append(golfer_matchup)
-        
-        # For team2 golfers  
-        for golfer in team2_golfers:
-            golfer_matchup = golfer_matchups.filter(
-                Q(golfer=golfer) | Q(subbing_for_golfer=golfer)
-            ).first()
-            
-            if golfer_matchup:
-                team2_golfer_matchups.append(golfer_matchup)
+        team1_golfer_matchups = [matchup_by_golfer[g.id] for g in team1_golfers if g.id in matchup_by_golfer]
+        team2_golfer_matchups = [matchup_by_golfer[g.id] for g in team2_golfers if g.id in matchup_by_golfer]
         
         # Sort golfer matchups by is_A (A golfers first)
         team1_golfer_matchups.sort(key=lambda x: not x.is_A)
@@ -3890,7 +2662,7 @@ def blank_scorecards(request, league_slug=None, year=None):
         
         # Process team1 golfers (A and B positions)
         for i, golfer_matchup in enumerate(team1_golfer_matchups[:2]):
-            golfer_data = _build_blank_golfer_data(golfer_matchup, holes, week)
+            golfer_data = _build_blank_golfer_data(golfer_matchup, holes, week, handicaps)
             if i == 0:
                 card['team1_golferA'] = golfer_data
             else:
@@ -3898,7 +2670,7 @@ def blank_scorecards(request, league_slug=None, year=None):
         
         # Process team2 golfers (A and B positions)
         for i, golfer_matchup in enumerate(team2_golfer_matchups[:2]):
-            golfer_data = _build_blank_golfer_data(golfer_matchup, holes, week)
+            golfer_data = _build_blank_golfer_data(golfer_matchup, holes, week, handicaps)
             if i == 0:
                 card['team2_golferA'] = golfer_data
             else:
@@ -3927,7 +2699,7 @@ def blank_scorecards(request, league_slug=None, year=None):
     })
 
 
-def _build_blank_golfer_data(golfer_matchup, holes, week):
+def _build_blank_golfer_data(golfer_matchup, holes, week, handicaps):
     """Helper function to build blank golfer data for scorecard"""
     
     # Determine the actual golfer (could be the golfer or the sub)
@@ -3936,12 +2708,10 @@ def _build_blank_golfer_data(golfer_matchup, holes, week):
     sub_for = golfer_matchup.subbing_for_golfer.name if golfer_matchup.subbing_for_golfer else None
     
     # Get handicap
-    hcp_obj = Handicap.objects.filter(golfer=actual_golfer, week=week).first()
-    hcp = hcp_obj.handicap if hcp_obj else 0
+    hcp = handicaps.get(actual_golfer.id, 0)
     
     # Get opponent handicap for stroke calculations
-    opponent_hcp = golfer_matchup.opponent.handicap_set.filter(week=week).first()
-    opponent_hcp_value = opponent_hcp.handicap if opponent_hcp else 0
+    opponent_hcp_value = handicaps.get(golfer_matchup.opponent_id, 0)
     
     # Calculate handicap difference for strokes
     hcp_diff = conventional_round(hcp) - conventional_round(opponent_hcp_value)
@@ -3978,131 +2748,38 @@ def _build_blank_golfer_data(golfer_matchup, holes, week):
     }
 
 
-def _build_golfer_data(golfer_matchup, rounds, holes, week):
-    """Helper function to build golfer data for scorecard"""
-    
-    # Determine the actual golfer (could be the golfer or the sub)
-    actual_golfer = golfer_matchup.golfer
-    is_sub = golfer_matchup.subbing_for_golfer is not None
-    sub_for = golfer_matchup.subbing_for_golfer.name if golfer_matchup.subbing_for_golfer else None
-    
-    # Find the round for this golfer matchup
-    round_obj = rounds.filter(golfer_matchup=golfer_matchup).first()
-    
-    if not round_obj:
-        return None
-    
-    # Get handicap
-    hcp = round_obj.handicap.handicap if round_obj.handicap else 0
-    
-    # Get opponent handicap for stroke calculations
-    opponent_hcp = Handicap.objects.filter(golfer=golfer_matchup.opponent, week=week).first()
-    opponent_hcp_value = opponent_hcp.handicap if opponent_hcp else 0
-    
-    # Calculate handicap difference for strokes
-    hcp_diff = conventional_round(hcp - opponent_hcp_value)  # Use conventional rounding for handicap difference
-    if hcp_diff > 9:
-        hcp_diff = hcp_diff - 9
-        rollover = 1
+# Repeats: the data version is read for the page and its league
+@query_budget(20, duplicates=1)
+def historics(request, league_slug=None):
+    """
+    All-time league statistics and leaderboards across all seasons (scoped to one league).
+    """
+    league = resolve_league(league_slug)
+    if league is None:
+        context = _historics_context(league)
     else:
-        rollover = 0
-    
-    # Get scores for each hole
-    scores = []
-    hole_points = []
-    stroke_info = []
-    score_classes = []
-    
-    for hole in holes:
-        # Find score for this hole
-        score_obj = round_obj.scores.filter(hole=hole).first()
-        score = score_obj.score if score_obj else 0
-        scores.append(score)
-        
-        # Find points for this hole - get directly from database since Round only has current golfer's points
-        points_obj = Points.objects.filter(golfer=actual_golfer, week=week, hole=hole, opponent=golfer_matchup.opponent).first()
-        points = points_obj.points if points_obj else 0
-        hole_points.append(points)
-        
- 
-        
-        # Calculate stroke info for this hole
-        strokes = 0
-        if hcp_diff > 0:  # Golfer is getting strokes
-            if hole.handicap9 <= hcp_diff:
-                strokes = 1 + rollover
-            elif rollover == 1:
-                strokes = 1
-        stroke_info.append(strokes)
-        
-        # Calculate score class for color coding
-        if score == 0:
-            score_classes.append("")
-        else:
-            relative_to_par = score - hole.par
-            if relative_to_par <= -2:
-                score_classes.append("score-eagle")
-            elif relative_to_par == -1:
-                score_classes.append("score-birdie")
-            elif relative_to_par == 0:
-                score_classes.append("score-par")
-            elif relative_to_par == 1:
-                score_classes.append("score-bogey")
-            elif relative_to_par == 2:
-                score_classes.append("score-double")
-            elif relative_to_par == 3:
-                score_classes.append("score-triple")
-            else:
-                score_classes.append("score-worse")
-    
-    return {
-        'golfer': actual_golfer,
-        'is_sub': is_sub,
-        'sub_for': sub_for,
-        'hcp': hcp,
-        'scores': scores,
-        'hole_points': hole_points,
-        'stroke_info': stroke_info,
-        'score_classes': score_classes,
-        'gross': round_obj.gross,
-        'net': round_obj.net,
-        'round_points': round_obj.round_points,
-        'total_points': round_obj.total_points or 0,
-    }
+        context = _historics_page_context(league)
+    return render(request, 'historics.html', context)
 
 
-def get_top_n_with_ties(queryset, field, n, reverse=False):
-    # Get values and annotate with rank, including ties
-    values = list(queryset.order_by(f'-{field}' if reverse else field))
-    if not values:
-        return []
-    result = []
-    rank = 1
-    prev_value = getattr(values[0], field)
-    count = 0
-    for i, obj in enumerate(values):
-        value = getattr(obj, field)
-        if i == 0:
-            rank = 1
-        elif value != prev_value:
-            rank = count + 1
-        if rank > n and value != prev_value:
-            break
-        result.append({'rank': rank, 'obj': obj})
-        prev_value = value
-        count += 1
-    return result
+def _historics_page_context(league):
+    return cached_context('historics', league_version(league), lambda: _historics_context(league), league.pk)
 
 
-def historics(request, league_slug=None):
-    """
-    All-time league statistics and leaderboards across all seasons (scoped to one league).
-    """
-    import json
-    from django.db.models import Avg, Count, Min, Max, Q, F
-    from collections import defaultdict
+@page_warmer
+def _warm_historics(season):
+    _historics_page_context(season.league)
+
+
+def _round_leaderboard(rounds, field, reverse=False):
+    """The five best (or worst) ``rounds`` by ``field``, ties included, for the historics tables."""
+    return [{'rank': rank, 'obj': obj} for rank, obj in top_n_with_ties(rounds, field, 5, reverse=reverse)]
+
+
+def _historics_context(league):
+    """All-time statistics and leaderboards for ``league``."""
+    from django.db.models import Count, Q, StdDev
 
-    league = resolve_league(league_slug)
     league_golfers = Golfer.objects.filter(
         Q(team__season__league=league) | Q(round__week__season__league=league)
     ).distinct()
@@ -4112,273 +2789,78 @@ def historics(request, league_slug=None):
         subbing_for__isnull=True,
         week__season__league=league,
     ).select_related('golfer', 'week', 'handicap').order_by('week__date')
-    all_scores = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-    ).select_related('hole', 'week', 'golfer').order_by('hole__number', 'week__date')
-    weeks = Week.objects.filter(season__league=league, rained_out=False)
-
-    # Money/Earnings (all-time) using SkinEntry.winner
-    # Use per-week season fee since all-time can span seasons with different fees
-    total_skins_wagered = 0
-    for wk in weeks:
-        total_skins_wagered += SkinEntry.objects.filter(week=wk).count() * (wk.season.skins_entry_fee if getattr(wk.season, 'playing_skins', False) else 0)
-    # Aggregate skins won by golfer using winner field
-    golfer_skins_won = defaultdict(float)
-    # For money, need to know payout per week
-    for week in weeks:
-        week_winners = SkinEntry.objects.filter(week=week, winner=True)
-        week_entries = SkinEntry.objects.filter(week=week)
-        if week_winners.exists() and week_entries.exists() and getattr(week.season, 'playing_skins', False):
-            week_skins_pot = week_entries.count() * week.season.skins_entry_fee
-            skin_winner_payout = week_skins_pot / week_winners.count()
-            for entry in week_winners:
-                golfer_skins_won[entry.golfer.name] += skin_winner_payout
-    total_games_wagered = 0
-    for wk in weeks:
-        total_games_wagered += GameEntry.objects.filter(week=wk).count() * (wk.season.game_entry_fee if getattr(wk.season, 'playing_games', False) else 0)
-    golfer_games_won = defaultdict(float)
-    for week in weeks:
-        game_winners = GameEntry.objects.filter(week=week, winner=True).select_related('golfer', 'game')
-        if game_winners.exists() and getattr(week.season, 'playing_games', False):
-            week_game_entries = GameEntry.objects.filter(week=week)
-            week_games_pot = week_game_entries.count() * week.season.game_entry_fee
-            game_winner_payout = week_games_pot / game_winners.count() if game_winners.count() > 0 else 0
-            for winner in game_winners:
-                golfer_name = winner.golfer.name
-                golfer_games_won[golfer_name] += game_winner_payout
+
+    # Money/Earnings (all-time) from the payout ledger; each week carries its own season's fees
     golfer_total_earnings = {}
-    all_golfers = set(list(golfer_skins_won.keys()) + list(golfer_games_won.keys()))
-    for golfer_name in all_golfers:
-        skins_earned = golfer_skins_won.get(golfer_name, 0)
-        games_earned = golfer_games_won.get(golfer_name, 0)
-        total_earned = skins_earned + games_earned
-        golfer_total_earnings[golfer_name] = {
-            'skins_earned': round(skins_earned, 2),
-            'games_earned': round(games_earned, 2),
+    golfer_total_wagered = {}
+    for row in payout_totals(live_payouts(week__season__league=league, week__rained_out=False), 'golfer__name'):
+        golfer_total_wagered[row['golfer__name']] = {
+            'skins_wagered': row['skins_wagered'],
+            'games_wagered': row['games_wagered'],
+            'total_wagered': row['skins_wagered'] + row['games_wagered'],
+        }
+        if not (row['skins_won'] or row['games_won']):
+            continue
+        total_earned = row['skins_won'] + row['games_won']
+        golfer_total_earnings[row['golfer__name']] = {
+            'skins_earned': round(row['skins_won'], 2),
+            'games_earned': round(row['games_won'], 2),
             'total_earned': round(total_earned, 2)
         }
-    earnings_leaderboard = sorted(
-        golfer_total_earnings.items(),
-        key=lambda x: x[1]['total_earned'],
-        reverse=True
-    )
-    # Find the cutoff for top 5, include ties
-    top_earnings = []
-    prev = None
-    rank = 1
-    for i, (golfer, earnings) in enumerate(earnings_leaderboard):
-        if i == 0:
-            rank = 1
-        elif earnings['total_earned'] != prev:
-            rank = i + 1
-        if rank > 5 and earnings['total_earned'] != prev:
-            break
-        top_earnings.append({'rank': rank, 'golfer': golfer, **earnings})
-        prev = earnings['total_earned']
 
     # Best/Worst Rounds (gross/net) with ties
-    best_gross_rounds = get_top_n_with_ties(rounds, 'gross', 5, reverse=False)
-    worst_gross_rounds = get_top_n_with_ties(rounds, 'gross', 5, reverse=True)
-    best_net_rounds = get_top_n_with_ties(rounds, 'net', 5, reverse=False)
-    worst_net_rounds = get_top_n_with_ties(rounds, 'net', 5, reverse=True)
-    # Removed best_points_rounds and worst_points_rounds
+    best_gross_rounds = _round_leaderboard(rounds, 'gross')
+    worst_gross_rounds = _round_leaderboard(rounds, 'gross', reverse=True)
+    best_net_rounds = _round_leaderboard(rounds, 'net')
+    worst_net_rounds = _round_leaderboard(rounds, 'net', reverse=True)
 
     # Most rounds played
-    rounds_played_qs = rounds.values('golfer__name').annotate(num_rounds=Count('id')).order_by('-num_rounds')
-    # Find cutoff for top 5, include ties
-    top_rounds_played = []
-    prev = None
-    rank = 1
-    for i, row in enumerate(rounds_played_qs):
-        if i == 0:
-            rank = 1
-        elif row['num_rounds'] != prev:
-            rank = i + 1
-        if rank > 5 and row['num_rounds'] != prev:
-            break
-        top_rounds_played.append({'rank': rank, **row})
-        prev = row['num_rounds']
+    rounds_played_qs = rounds.values('golfer__name').annotate(num_rounds=Count('id')).order_by('golfer__name')
+    top_rounds_played = [
+        {'rank': rank, **row} for rank, row in top_n_with_ties(rounds_played_qs, 'num_rounds', 5, reverse=True)
+    ]
 
     # Most birdies/eagles/pars/bogeys/doubles/triples/worse by rate (min 90 holes, robust per golfer)
-    top_birdie_golfers = []
-    top_eagle_golfers = []
-    top_par_golfers = []
-    top_bogey_golfers = []
-    top_double_golfers = []
-    top_triple_golfers = []
-    top_worse_golfers = []
+    leaderboards = {score_type: [] for score_type in SCORING_BUCKETS}
+    distribution = golfer_distribution(league)
     for golfer in league_golfers:
-        scores = Score.objects.filter(
-            golfer=golfer,
-            round__subbing_for__isnull=True,
-            week__season__league=league,
-        )
-        holes_played = scores.count()
+        counts = distribution.get(golfer.id, {})
+        holes_played = sum(counts.values())
         if holes_played >= 90:
-            birdies = scores.filter(score=F('hole__par') - 1).count()
-            eagles = scores.filter(score__lte=F('hole__par') - 2).count()
-            pars = scores.filter(score=F('hole__par')).count()
-            bogeys = scores.filter(score=F('hole__par') + 1).count()
-            doubles = scores.filter(score=F('hole__par') + 2).count()
-            triples = scores.filter(score=F('hole__par') + 3).count()
-            worse = scores.filter(score__gte=F('hole__par') + 4).count()
-            birdie_rate = birdies / holes_played if holes_played else 0
-            eagle_rate = eagles / holes_played if holes_played else 0
-            par_rate = pars / holes_played if holes_played else 0
-            bogey_rate = bogeys / holes_played if holes_played else 0
-            double_rate = doubles / holes_played if holes_played else 0
-            triple_rate = triples / holes_played if holes_played else 0
-            worse_rate = worse / holes_played if holes_played else 0
-            top_birdie_golfers.append({'golfer': golfer, 'rate': birdie_rate, 'holes': holes_played, 'count': birdies})
-            top_eagle_golfers.append({'golfer': golfer, 'rate': eagle_rate, 'holes': holes_played, 'count': eagles})
-            top_par_golfers.append({'golfer': golfer, 'rate': par_rate, 'holes': holes_played, 'count': pars})
-            top_bogey_golfers.append({'golfer': golfer, 'rate': bogey_rate, 'holes': holes_played, 'count': bogeys})
-            top_double_golfers.append({'golfer': golfer, 'rate': double_rate, 'holes': holes_played, 'count': doubles})
-            top_triple_golfers.append({'golfer': golfer, 'rate': triple_rate, 'holes': holes_played, 'count': triples})
-            top_worse_golfers.append({'golfer': golfer, 'rate': worse_rate, 'holes': holes_played, 'count': worse})
-    # Sort and rank with ties
-    def rank_leaderboard(entries, key):
-        entries.sort(key=lambda x: x[key], reverse=True)
-        ranked = []
-        prev = None
-        rank = 1
-        for i, entry in enumerate(entries):
-            if i == 0:
-                rank = 1
-            elif entry[key] != prev:
-                rank = i + 1
-            if rank > 5 and entry[key] != prev:
-                break
-            entry['rank'] = rank
-            ranked.append(entry)
-            prev = entry[key]
-        return ranked
-    top_birdie_golfers = rank_leaderboard(top_birdie_golfers, 'rate')
-    top_eagle_golfers = rank_leaderboard(top_eagle_golfers, 'rate')
-    top_par_golfers = rank_leaderboard(top_par_golfers, 'rate')
-    top_bogey_golfers = rank_leaderboard(top_bogey_golfers, 'rate')
-    top_double_golfers = rank_leaderboard(top_double_golfers, 'rate')
-    top_triple_golfers = rank_leaderboard(top_triple_golfers, 'rate')
-    top_worse_golfers = rank_leaderboard(top_worse_golfers, 'rate')
+            for score_type, count in bucket_counts(counts).items():
+                leaderboards[score_type].append({'golfer': golfer, 'rate': count / holes_played, 'holes': holes_played, 'count': count})
     # For template compatibility
-    top_birdie_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_birdie_golfers
-    ]
-    top_eagle_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_eagle_golfers
-    ]
-    top_par_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_par_golfers
-    ]
-    top_bogey_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_bogey_golfers
-    ]
-    top_double_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_double_golfers
-    ]
-    top_triple_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_triple_golfers
-    ]
-    top_worse_golfers = [
-        {'rank': e['rank'], 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']} for e in top_worse_golfers
-    ]
+    top_golfers = {
+        score_type: [
+            {'rank': rank, 'name': e['golfer'].name, 'rate': e['rate'], 'holes': e['holes'], 'count': e['count']}
+            for rank, e in rank_with_ties(entries, 'rate', 5, reverse=True)
+        ]
+        for score_type, entries in leaderboards.items()
+    }
 
     # Most consistent (lowest std dev of net, min 10 rounds)
-    import math
-    golfer_stddev = {}
-    for golfer in league_golfers:
-        golfer_rounds = rounds.filter(golfer=golfer)
-        if golfer_rounds.count() >= 10:
-            net_scores = list(golfer_rounds.values_list('net', flat=True))
-            mean = sum(net_scores) / len(net_scores)
-            variance = sum((x - mean) ** 2 for x in net_scores) / len(net_scores)
-            stddev = math.sqrt(variance)
-            golfer_stddev[golfer.name] = stddev
-    stddev_list = sorted(golfer_stddev.items(), key=lambda x: x[1])
-    most_consistent = []
-    prev = None
-    rank = 1
-    for i, (name, stddev) in enumerate(stddev_list):
-        if i == 0:
-            rank = 1
-        elif stddev != prev:
-            rank = i + 1
-        if rank > 5 and stddev != prev:
-            break
-        most_consistent.append({'rank': rank, 'name': name, 'stddev': stddev})
-        prev = stddev
-
-    # Calculate total birdies and eagles for the season
-    total_birdies = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score=F('hole__par') - 1,
-    ).count()
-    total_eagles = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score__lte=F('hole__par') - 2,
-    ).count()
-    total_pars = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score=F('hole__par'),
-    ).count()
-    total_bogeys = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score=F('hole__par') + 1,
-    ).count()
-    total_doubles = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score=F('hole__par') + 2,
-    ).count()
-    total_triples = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score=F('hole__par') + 3,
-    ).count()
-    total_worse = Score.objects.filter(
-        round__subbing_for__isnull=True,
-        week__season__league=league,
-        score__gte=F('hole__par') + 4,
-    ).count()
+    golfer_stddev = (
+        rounds.values('golfer_id', 'golfer__name')
+        .annotate(num_rounds=Count('id'), stddev=StdDev('net'))
+        .filter(num_rounds__gte=10)
+        .order_by('golfer__name')
+    )
+    most_consistent = [
+        {'rank': rank, 'name': row['golfer__name'], 'stddev': row['stddev']}
+        for rank, row in top_n_with_ties(golfer_stddev, 'stddev', 5)
+    ]
 
-    # Calculate total wagered by golfer (skins + games)
-    golfer_total_wagered = {}
-    for golfer_name in all_golfers:
-        # Compute wagered per week to respect per-season fees and enable flags
-        skins_wagered = 0
-        games_wagered = 0
-        for wk in weeks:
-            skins_count = SkinEntry.objects.filter(week=wk, golfer__name=golfer_name).count()
-            if getattr(wk.season, 'playing_skins', False):
-                skins_wagered += skins_count * wk.season.skins_entry_fee
-            games_count = GameEntry.objects.filter(week=wk, golfer__name=golfer_name).count()
-            if getattr(wk.season, 'playing_games', False):
-                games_wagered += games_count * wk.season.game_entry_fee
-        total_wagered = skins_wagered + games_wagered
-        golfer_total_wagered[golfer_name] = {
-            'skins_wagered': skins_wagered,
-            'games_wagered': games_wagered,
-            'total_wagered': total_wagered
-        }
+    # League-wide totals by score type
+    totals = dict.fromkeys(SCORING_BUCKETS, 0)
+    for counts in distribution.values():
+        for score_type, count in bucket_counts(counts).items():
+            totals[score_type] += count
 
     # Add wagered and net winnings to leaderboard
     top_earnings = []
-    prev = None
-    rank = 1
-    for i, (golfer, earnings) in enumerate(earnings_leaderboard):
+    for rank, (golfer, earnings) in rank_with_ties(golfer_total_earnings.items(), lambda x: x[1]['total_earned'], 5, reverse=True):
         wagered = golfer_total_wagered.get(golfer, {'skins_wagered': 0, 'games_wagered': 0, 'total_wagered': 0})
         net_winnings = earnings['total_earned'] - wagered['total_wagered']
-        if i == 0:
-            rank = 1
-        elif earnings['total_earned'] != prev:
-            rank = i + 1
-        if rank > 5 and earnings['total_earned'] != prev:
-            break
         top_earnings.append({
             'rank': rank,
             'golfer': golfer,
@@ -4388,7 +2870,6 @@ def historics(request, league_slug=None):
             'total_wagered': wagered['total_wagered'],
             'net_winnings': round(net_winnings, 2)
         })
-        prev = earnings['total_earned']
 
     show_money_historics = Season.objects.filter(league=league).filter(
         Q(playing_skins=True) | Q(playing_games=True)
@@ -4402,26 +2883,28 @@ def historics(request, league_slug=None):
         'best_net_rounds': best_net_rounds,
         'worst_net_rounds': worst_net_rounds,
         'rounds_played': top_rounds_played,
-        'top_birdie_golfers': top_birdie_golfers,
-        'top_eagle_golfers': top_eagle_golfers,
-        'top_par_golfers': top_par_golfers,
-        'top_bogey_golfers': top_bogey_golfers,
-        'top_double_golfers': top_double_golfers,
-        'top_triple_golfers': top_triple_golfers,
-        'top_worse_golfers': top_worse_golfers,
+        'top_birdie_golfers': top_golfers['birdie'],
+        'top_eagle_golfers': top_golfers['eagle'],
+        'top_par_golfers': top_golfers['par'],
+        'top_bogey_golfers': top_golfers['bogey'],
+        'top_double_golfers': top_golfers['double'],
+        'top_triple_golfers': top_golfers['triple'],
+        'top_worse_golfers': top_golfers['worse'],
         'most_consistent': most_consistent,
         'total_rounds': rounds.count(),
-        'total_birdies': total_birdies,
-        'total_eagles': total_eagles,
-        'total_pars': total_pars,
-        'total_bogeys': total_bogeys,
-        'total_doubles': total_doubles,
-        'total_triples': total_triples,
-        'total_worse': total_worse,
+        'total_birdies': totals['birdie'],
+        'total_eagles': totals['eagle'],
+        'total_pars': totals['par'],
+        'total_bogeys': totals['bogey'],
+        'total_doubles': totals['double'],
+        'total_triples': totals['triple'],
+        'total_worse': totals['worse'],
     }
-    return render(request, 'historics.html', context)
+
+    return context
 
 
+@query_budget(7)
 @league_manager_required
 def manage_weeks(request, league_slug=None, year=None):
     from .models import Season, Week
@@ -4439,7 +2922,7 @@ def manage_weeks(request, league_slug=None, year=None):
             'prev_week': None,
             'next_week': None,
         })
-    weeks = Week.objects.filter(season=season).order_by('date')
+    weeks = Week.objects.filter(season=season).select_related('season__league').order_by('date')
 
     selected_week_id = request.GET.get('selected_week')
     selected_week = None
@@ -4496,10 +2979,10 @@ def manage_weeks(request, league_slug=None, year=None):
                 num_matchups = week.matchup_set.count()
                 if num_matchups == num_teams // 2:
                     if Score.objects.filter(week=week).exists():
-                        process_week_async.delay(week.id)
+                        request_task(process_week_async, week.id)
                         messages.info(request, f'Background task started: Regenerating matchups and rounds for week {week.number}.')
                     else:
-                        generate_matchups_async.delay(week.id)
+                        request_task(generate_matchups_async, week.id)
                         messages.info(request, f'Background task started: Regenerating matchups for week {week.number}.')
                 else:
                     messages.warning(request, f'Not all matchups are entered for week {week.number}. No background tasks started.')
@@ -4541,10 +3024,10 @@ def manage_weeks(request, league_slug=None, year=None):
                         num_matchups = w.matchup_set.count()
                         if num_matchups == num_teams // 2:
                             if Score.objects.filter(week=w).exists():
-                                process_week_async.delay(w.id)
+                                request_task(process_week_async, w.id)
                                 messages.info(request, f'Background task started: Regenerating matchups and rounds for week {w.number}.')
                             else:
-                                generate_matchups_async.delay(w.id)
+                                request_task(generate_matchups_async, w.id)
                                 messages.info(request, f'Background task started: Regenerating matchups for week {w.number}.')
                         else:
                             # Do not warn the user if not all matchups are entered; just skip background task